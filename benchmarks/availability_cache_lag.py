@@ -0,0 +1,188 @@
+"""
+Cache de disponibilidad contra un Postgres local: consistencia y demora
+
+Carga la cache con un snapshot (RPC availability_snapshot vía asyncpg), la
+conecta al canal availability_changes con PostgresListener y aplica
+cambios reales (reservas, movimientos, cancelaciones y bloques). Después de
+cada commit mide cuánto tarda la cache en coincidir con un recálculo desde
+cero: es la ventana de lectura desactualizada.
+
+Requiere tables_schema.sql, availability_schema.sql, booking_schema.sql y
+availability_events_schema.sql. Crea su propio negocio y lo elimina al final.
+
+Uso:
+    DATABASE_URL=postgresql://postgres@localhost/iris \\
+        python benchmarks/availability_cache_lag.py [--employees 20] [--days 14] [--changes 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover
+    sys.exit("Este script requiere asyncpg: pip install asyncpg")
+
+from src.services.availability import AvailabilitySnapshot, compute_availability, snapshot_range  # noqa: E402
+from src.database.notifications import PostgresListener  # noqa: E402
+from src.services.availability_cache import CHANNEL, AvailabilityCache, slots_by_employee  # noqa: E402
+
+STEP_MINUTES = 15
+SNAPSHOT = "SELECT * FROM availability_snapshot($1, $2, $3, $4)"
+
+
+async def seed(conn, employees: int) -> dict:
+    business_id = await conn.fetchval(
+        "INSERT INTO businesses (name, address, access_code) VALUES ($1, 'Test', $2) RETURNING id",
+        f"Cache {uuid.uuid4().hex[:8]}", uuid.uuid4().hex[:8].upper(),
+    )
+    await conn.executemany(
+        "INSERT INTO business_hours (business_id, day_of_week, open_time, close_time, is_closed) VALUES ($1, $2, '09:00', '20:00', $3)",
+        [(business_id, day, day == 0) for day in range(7)],
+    )
+    service_id = await conn.fetchval(
+        "INSERT INTO services (business_id, name, price, duration_minutes) VALUES ($1, 'Corte', 1000, 45) RETURNING id",
+        business_id,
+    )
+    employee_ids = [
+        await conn.fetchval("INSERT INTO employees (business_id, name) VALUES ($1, $2) RETURNING id", business_id, f"Empleado {i}")
+        for i in range(employees)
+    ]
+    customer_id = uuid.uuid4()
+    await conn.execute(
+        "INSERT INTO customer_businesses (customer_id, business_id, customer_name) VALUES ($1, $2, 'Cliente')",
+        customer_id, business_id,
+    )
+    return {"business_id": business_id, "service_id": service_id, "employees": employee_ids, "customer_id": customer_id}
+
+
+async def load(conn, seeded: dict, date_from: date, date_to: date) -> dict:
+    row = await conn.fetchrow(SNAPSHOT, seeded["business_id"], seeded["service_id"], *snapshot_range(date_from, date_to))
+    return {key: json.loads(value) for key, value in row.items()}
+
+
+def local_start(day: date, minutes: int) -> datetime:
+    # Los negocios de prueba usan la zona por defecto (UTC-3, sin horario de verano)
+    return datetime.combine(day, datetime.min.time(), timezone(timedelta(hours=-3))) + timedelta(minutes=minutes)
+
+
+async def random_change(conn, seeded: dict, days: list, booked: list, blocks: list) -> None:
+    """Reserva, mueve, cancela o bloquea al azar (conflictos y días cerrados se ignoran)"""
+    action = random.choice(("book", "book", "move", "cancel", "block", "unblock"))
+    employee = random.choice(seeded["employees"])
+    start = local_start(random.choice(days), random.randrange(9 * 60, 19 * 60, STEP_MINUTES))
+    try:
+        if action == "book" or (action in ("move", "cancel") and not booked):
+            appointment_id = await conn.fetchval(
+                "SELECT id FROM book_appointment($1, $2, $3, $4, $5)",
+                seeded["business_id"], seeded["customer_id"], employee, seeded["service_id"], start,
+            )
+            booked.append(appointment_id)
+        elif action == "move":
+            await conn.execute(
+                "UPDATE appointments SET start_datetime = $2, end_datetime = $2::timestamptz + interval '45 minutes' WHERE id = $1",
+                random.choice(booked), start,
+            )
+        elif action == "cancel":
+            await conn.execute("UPDATE appointments SET status = 'cancelled' WHERE id = $1", booked.pop())
+        elif action == "block" or not blocks:
+            block_id = await conn.fetchval(
+                "INSERT INTO employee_blocks (business_id, employee_id, start_datetime, end_datetime) "
+                "VALUES ($1, $2, $3, $3::timestamptz + interval '30 minutes') RETURNING id",
+                seeded["business_id"], employee, start,
+            )
+            blocks.append(block_id)
+        else:
+            await conn.execute("DELETE FROM employee_blocks WHERE id = $1", blocks.pop())
+    except (asyncpg.exceptions.ExclusionViolationError, asyncpg.exceptions.InvalidParameterValueError):
+        pass
+
+
+def cached_slots(cache: AvailabilityCache, seeded: dict, days: list, now: datetime):
+    view = cache.lookup(str(seeded["business_id"]), str(seeded["service_id"]), days)
+    return None if view is None else slots_by_employee(*view, STEP_MINUTES, now=now)
+
+
+def percentile(values: list, q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL", "postgresql://postgres@localhost/postgres"))
+    parser.add_argument("--employees", type=int, default=20)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--changes", type=int, default=200)
+    args = parser.parse_args()
+
+    conn = await asyncpg.connect(args.dsn)
+    seeded = await seed(conn, args.employees)
+    cache = AvailabilityCache(ttl=300, max_entries=100_000)
+    listener = PostgresListener(args.dsn, keepalive=5)
+    listener.subscribe(CHANNEL, cache.apply_event, on_connect=cache.connected, on_disconnect=cache.disconnected)
+    listener.start()
+    failed = False
+    try:
+        while not cache.enabled:
+            await asyncio.sleep(0.01)
+
+        date_from = date.today() + timedelta(days=1)
+        date_to = date_from + timedelta(days=args.days - 1)
+        days = [date_from + timedelta(days=i) for i in range(args.days)]
+        now = datetime.now(timezone.utc)
+
+        since = cache.sequence
+        started = time.perf_counter()
+        data = await load(conn, seeded, date_from, date_to)
+        cache.store(AvailabilitySnapshot.from_rpc(data), data, str(seeded["service_id"]), days, since)
+        miss_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        cached_slots(cache, seeded, days, now)
+        hit_ms = (time.perf_counter() - started) * 1000
+
+        stale_ms, mismatches = [], 0
+        booked, blocks = [], []
+        for _ in range(args.changes):
+            await random_change(conn, seeded, days, booked, blocks)
+            committed = time.perf_counter()
+            fresh_data = await load(conn, seeded, date_from, date_to)
+            fresh = compute_availability(AvailabilitySnapshot.from_rpc(fresh_data), date_from, date_to, STEP_MINUTES, now=now)
+            # Esperar (como máximo 2 s) a que la cache refleje el cambio
+            while cached_slots(cache, seeded, days, now) != fresh:
+                if time.perf_counter() - committed > 2:
+                    mismatches += 1
+                    break
+                await asyncio.sleep(0.0005)
+            stale_ms.append((time.perf_counter() - committed) * 1000)
+
+        stats = cache.stats()
+        print(f"empleados={args.employees} días={args.days} cambios={args.changes} eventos={stats['events']}")
+        print(f"consulta sin cache (RPC + cálculo)  {miss_ms:8.2f} ms")
+        print(f"consulta con cache                   {hit_ms:8.2f} ms")
+        print(f"ventana desactualizada p50={statistics.median(stale_ms):.2f} ms "
+              f"p99={percentile(stale_ms, 0.99):.2f} ms max={max(stale_ms):.2f} ms "
+              f"(incluye el recálculo de referencia)")
+        print(f"demora de eventos última={stats['last_event_lag_ms']} ms máx={stats['max_event_lag_ms']} ms")
+        print(f"entradas={stats['size']} sin converger={mismatches}")
+        failed = mismatches > 0
+    finally:
+        await listener.stop()
+        await conn.execute("DELETE FROM businesses WHERE id = $1", seeded["business_id"])
+        await conn.close()
+
+    print("FALLÓ" if failed else "OK: la cache siempre convergió al estado de la base")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
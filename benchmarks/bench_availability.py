@@ -0,0 +1,131 @@
+"""
+Benchmark: motor de disponibilidad (50 empleados × 30 días)
+
+Arma un snapshot sintético (mismo formato que la RPC availability_snapshot)
+con turnos ocupando ~60% de cada jornada y mide:
+  - from_rpc: parseo del snapshot y construcción de los índices
+  - compute_availability: huecos con bisect + turnos generados por aritmética
+  - scan ingenuo: chequear cada turno candidato contra todos los ocupados
+Verifica además que ambos métodos devuelvan los mismos turnos.
+
+Uso:
+    python benchmarks/bench_availability.py [--employees 50] [--days 30] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.availability import (  # noqa: E402
+    AvailabilitySnapshot,
+    _working_window,
+    compute_availability,
+)
+
+TZ = "America/Argentina/Buenos_Aires"
+STEP_MINUTES = 15
+DURATION_MINUTES = 45
+
+
+def build_rpc(employees: int, days: int, start: date, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    offset = timezone(timedelta(hours=-3))
+    business_hours = [
+        {"day_of_week": dow, "open_time": "09:00:00", "close_time": "20:00:00", "is_closed": dow == 0}
+        for dow in range(7)
+    ]
+    staff, busy = [], []
+    for e in range(employees):
+        employee_id = f"00000000-0000-0000-0000-{e:012d}"
+        staff.append({
+            "id": employee_id,
+            "name": f"Empleado {e}",
+            "hours": [
+                {"day_of_week": dow, "start_time": "10:00:00", "end_time": "19:00:00", "is_available": dow != 1}
+                for dow in range(7)
+            ],
+        })
+        for d in range(days):
+            cursor = datetime.combine(start + timedelta(days=d), datetime.min.time(), offset) + timedelta(hours=10)
+            end_of_day = cursor + timedelta(hours=9)
+            while cursor < end_of_day:
+                length = timedelta(minutes=rng.choice((30, 45, 60, 90)))
+                if rng.random() < 0.6:
+                    busy.append([employee_id, cursor.isoformat(), (cursor + length).isoformat(), str(uuid.UUID(int=len(busy)))])
+                cursor += length + timedelta(minutes=rng.choice((0, 0, 15)))
+    return {
+        "business": {"id": "b0000000-0000-0000-0000-000000000000", "timezone": TZ},
+        "service": {"id": "s0000000-0000-0000-0000-000000000000", "name": "Corte", "duration_minutes": DURATION_MINUTES},
+        "business_hours": business_hours,
+        "employees": staff,
+        "busy": busy,
+    }
+
+
+def naive_availability(snapshot: AvailabilitySnapshot, date_from: date, date_to: date, now: datetime) -> dict:
+    """Referencia: cada turno candidato se compara con todos los intervalos ocupados"""
+    duration = snapshot.duration_minutes * 60
+    step = STEP_MINUTES * 60
+    not_before = now.timestamp()
+    result = {}
+    for employee in snapshot.employees:
+        busy = list(employee.busy._intervals)
+        slots = []
+        day = date_from
+        while day <= date_to:
+            window = _working_window(snapshot, employee, day)
+            if window is not None:
+                t = window[0]
+                while t + duration <= window[1]:
+                    if t >= not_before and not any(s < t + duration and e > t for s, e in busy):
+                        slots.append(t)
+                    t += step
+            day += timedelta(days=1)
+        result[employee.id] = slots
+    return result
+
+
+def best_of(repeat: int, fn) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    date_from = date(2030, 3, 1)
+    date_to = date_from + timedelta(days=args.days - 1)
+    now = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    data = build_rpc(args.employees, args.days, date_from)
+
+    snapshot = AvailabilitySnapshot.from_rpc(data)
+    fast = compute_availability(snapshot, date_from, date_to, STEP_MINUTES, now=now)
+    slow = naive_availability(snapshot, date_from, date_to, now)
+    assert fast == slow, "los métodos no coinciden"
+
+    parse = best_of(args.repeat, lambda: AvailabilitySnapshot.from_rpc(data))
+    indexed = best_of(args.repeat, lambda: compute_availability(snapshot, date_from, date_to, STEP_MINUTES, now=now))
+    naive = best_of(args.repeat, lambda: naive_availability(snapshot, date_from, date_to, now))
+
+    total_slots = sum(len(s) for s in fast.values())
+    print(f"empleados={args.employees} días={args.days} ocupados={len(data['busy'])} turnos libres={total_slots}")
+    print(f"from_rpc (parseo + índices) {parse * 1000:8.2f} ms")
+    print(f"compute_availability        {indexed * 1000:8.2f} ms")
+    print(f"scan ingenuo                {naive * 1000:8.2f} ms  ({naive / indexed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: costo en el event loop del logging estructurado
+
+Compara, en el hilo que loguea (CPU del hilo con time.thread_time, así no se
+cuenta la espera del GIL mientras el hilo escritor serializa):
+  - handler síncrono (JSON + escritura en el mismo hilo)
+  - ContextQueueHandler (JSON + escritura en el hilo del QueueListener)
+y el overhead por request de RequestLoggingMiddleware con distintos muestreos.
+La salida va a /dev/null para medir solo el costo del pipeline.
+
+Uso:
+    python benchmarks/bench_logging.py [--events 100000]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.middleware.request_logging import RequestLoggingMiddleware  # noqa: E402
+from src.core import log  # noqa: E402
+
+
+def time_logging(logger: logging.Logger, n: int) -> float:
+    log.new_log_context(request_id="bench", user_id="u-1", business_id="b-1")
+    start = time.thread_time()
+    for i in range(n):
+        logger.info("appointment created", extra={"appointment_id": i, "duration_ms": 12.5})
+    return time.thread_time() - start
+
+
+async def app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def time_app(handler, n: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/test/ping", "headers": []}
+    start = time.thread_time()
+    for _ in range(n):
+        await handler(dict(scope), receive, send)
+    return time.thread_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.events
+    devnull = open(os.devnull, "w")
+
+    # Handler síncrono: serializa y escribe en el hilo que loguea
+    sync_logger = logging.getLogger("bench.sync")
+    sync_logger.propagate = False
+    handler = logging.StreamHandler(devnull)
+    handler.setFormatter(log.JSONFormatter())
+    sync_logger.addHandler(handler)
+    sync_logger.setLevel(logging.INFO)
+    sync = time_logging(sync_logger, n)
+
+    # Pipeline de la aplicación: cola + hilo escritor
+    log.setup_logging("INFO", "json", stream=devnull)
+    queued = time_logging(logging.getLogger("bench.queued"), n)
+    flush_start = time.perf_counter()
+    log.shutdown_logging()
+    flush = time.perf_counter() - flush_start
+
+    print(f"eventos={n}")
+    print(f"handler síncrono      {sync / n * 1e6:7.2f} µs/evento en el event loop")
+    print(f"ContextQueueHandler   {queued / n * 1e6:7.2f} µs/evento en el event loop "
+          f"(hilo escritor vació la cola en {flush * 1000:.0f} ms)")
+
+    log.setup_logging("INFO", "json", stream=devnull)
+    bare = asyncio.run(time_app(app, n))
+    for rate in (1.0, 0.1, 0.0):
+        elapsed = asyncio.run(time_app(RequestLoggingMiddleware(app, sample_rate=rate), n))
+        print(f"middleware sample={rate:<4}  {(elapsed - bare) / n * 1e6:7.2f} µs/request")
+    log.shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: costo por request de MetricsMiddleware y de la instrumentación
+del transporte httpx hacia Supabase
+
+Llama directamente a la app ASGI (sin sockets) con y sin middleware, y a un
+transporte httpx falso con y sin InstrumentedAsyncTransport.
+
+Uso:
+    python benchmarks/bench_metrics.py [--requests 200000] [--server-timing]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.middleware.metrics import MetricsMiddleware  # noqa: E402
+from src.core.metrics import InstrumentedAsyncTransport, registry  # noqa: E402
+
+
+class _Route:
+    path_format = "/appointments/{appointment_id}"
+
+
+async def app(scope, receive, send):
+    """App mínima: simula el match del router y responde 200"""
+    scope["route"] = _Route()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+class NullTransport(httpx.AsyncBaseTransport):
+    async def handle_async_request(self, request):
+        return httpx.Response(200, request=request)
+
+
+async def time_app(handler, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        scope = {"type": "http", "method": "GET", "path": f"/api/v1/appointments/{i}", "headers": []}
+        await handler(scope, receive, send)
+    return time.perf_counter() - start
+
+
+async def time_transport(transport, requests) -> float:
+    start = time.perf_counter()
+    for request in requests:
+        await transport.handle_async_request(request)
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--server-timing", action="store_true")
+    args = parser.parse_args()
+    n = args.requests
+
+    instrumented = MetricsMiddleware(app, server_timing=args.server_timing)
+    await time_app(app, 10_000)
+    await time_app(instrumented, 10_000)
+    bare = await time_app(app, n)
+    with_metrics = await time_app(instrumented, n)
+
+    requests = [
+        httpx.Request("GET", "http://localhost:54321/rest/v1/appointments?select=*&business_id=eq.1"),
+        httpx.Request("POST", "http://localhost:54321/rest/v1/rpc/onboard_owner"),
+        httpx.Request("POST", "http://localhost:54321/auth/v1/token?grant_type=password"),
+    ] * (n // 3)
+    null = NullTransport()
+    await time_transport(null, requests[:10_000])
+    await time_transport(InstrumentedAsyncTransport(null), requests[:10_000])
+    bare_transport = await time_transport(null, requests)
+    instrumented_transport = await time_transport(InstrumentedAsyncTransport(null), requests)
+
+    print(f"requests={n} server_timing={args.server_timing}")
+    print(f"middleware overhead   {(with_metrics - bare) / n * 1e6:7.2f} µs/req")
+    print(f"transporte overhead   {(instrumented_transport - bare_transport) / len(requests) * 1e6:7.2f} µs/llamada")
+    print(f"render /metrics       {len(registry.render())} bytes")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
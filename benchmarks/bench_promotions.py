@@ -0,0 +1,106 @@
+"""
+Benchmark: promociones vigentes de un negocio con miles de promociones
+
+Arma promociones sintéticas (mismo formato que devuelve PostgREST) repartidas
+en un año y mide, para una secuencia de consultas con la hora avanzando:
+  - BusinessPromotions.active: cursor sobre los límites + heap de vencimientos
+  - filtro ingenuo: recorrer todas y comparar valid_from <= ahora <= valid_until
+  - construcción del índice (la carga de un negocio)
+Verifica además que ambos métodos devuelvan las mismas promociones.
+
+Uso:
+    python benchmarks/bench_promotions.py [--promotions 5000] [--lookups 20000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.promotions import BusinessPromotions, micros  # noqa: E402
+
+START = datetime(2030, 1, 1, tzinfo=timezone.utc)
+YEAR = 365 * 86400
+
+
+def build_promotions(count: int, seed: int = 1) -> list:
+    """Promociones de entre una hora y 30 días, con inicios repartidos en el año"""
+    rng = random.Random(seed)
+    promotions = []
+    for i in range(count):
+        valid_from = START + timedelta(seconds=rng.randrange(YEAR))
+        valid_until = valid_from + timedelta(seconds=rng.randrange(3600, 30 * 86400))
+        promotions.append({
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "title": f"Promo {i}",
+            "description": None,
+            "valid_from": valid_from.isoformat(),
+            "valid_until": valid_until.isoformat(),
+            "status": "active",
+        })
+    return promotions
+
+
+def parse(promotions: list) -> list:
+    return [
+        (datetime.fromisoformat(p["valid_from"]), datetime.fromisoformat(p["valid_until"]), p)
+        for p in promotions
+    ]
+
+
+def naive_active(parsed: list, now: datetime) -> list:
+    """Referencia: lo que haría el filtro por fecha en cada request (sin el round trip)"""
+    active = [(valid_until, p["id"], p) for valid_from, valid_until, p in parsed if valid_from <= now <= valid_until]
+    return [p for _, _, p in sorted(active, key=lambda a: a[:2])]
+
+
+def best_of(repeat: int, fn) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--promotions", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    promotions = build_promotions(args.promotions)
+    parsed = parse(promotions)
+    # Consultas con la hora avanzando durante un día (como los requests reales)
+    day = START + timedelta(days=180)
+    times = sorted(day + timedelta(seconds=random.randrange(86400)) for _ in range(args.lookups))
+    stamps = [micros(t) for t in times]
+
+    sample = list(zip(times, stamps))[::max(1, args.lookups // 200)]
+    for t, stamp in sample:
+        fresh = BusinessPromotions(promotions, 0.0)
+        assert [p["id"] for p in fresh.active(stamp)] == [p["id"] for p in naive_active(parsed, t)], "no coinciden"
+
+    def indexed_lookups():
+        entry = BusinessPromotions(promotions, 0.0)
+        for stamp in stamps:
+            entry.active(stamp)
+
+    build = best_of(args.repeat, lambda: BusinessPromotions(promotions, 0.0))
+    indexed = best_of(args.repeat, indexed_lookups) - build
+    naive = best_of(args.repeat, lambda: [naive_active(parsed, t) for t, _ in sample]) / len(sample)
+
+    active = len(BusinessPromotions(promotions, 0.0).active(stamps[-1]))
+    per_lookup = indexed / args.lookups
+    print(f"promociones={args.promotions} vigentes={active} consultas={args.lookups}")
+    print(f"carga del índice            {build * 1000:8.2f} ms")
+    print(f"active() por consulta       {per_lookup * 1e6:8.2f} µs")
+    print(f"filtro ingenuo por consulta {naive * 1e6:8.2f} µs  ({naive / per_lookup:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: costo por request del RateLimitMiddleware (backend en memoria)
+
+Llama directamente a la app ASGI (sin sockets) con y sin middleware y reporta
+la diferencia en microsegundos por request. También mide backend.hit() solo,
+con muchas IPs distintas para incluir el costo de crecer/podar el dict.
+
+Uso:
+    python benchmarks/bench_rate_limit.py [--requests 200000] [--ips 50000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.middleware.rate_limit import RateLimitMiddleware  # noqa: E402
+from src.core.rate_limit import MemoryRateLimitBackend  # noqa: E402
+
+
+async def app(scope, receive, send):
+    """App mínima: responde 200 sin cuerpo"""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+def scope_for(ip: str) -> dict:
+    return {"type": "http", "method": "GET", "path": "/test/cache-stats", "headers": [], "client": (ip, 1234)}
+
+
+async def run(handler, scopes) -> float:
+    start = time.perf_counter()
+    for scope in scopes:
+        await handler(scope, receive, send)
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--ips", type=int, default=50_000)
+    args = parser.parse_args()
+
+    scopes = [scope_for(f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}") for i in range(args.ips)]
+    scopes = (scopes * (args.requests // len(scopes) + 1))[: args.requests]
+
+    # Límite alto para que todas las requests pasen por el camino completo
+    limited = RateLimitMiddleware(
+        app, backend=MemoryRateLimitBackend(), requests=10_000, window=60,
+        overrides={"/auth/register/owner": (5, 60)},
+    )
+
+    await run(app, scopes[:10_000])
+    await run(limited, scopes[:10_000])
+    bare = await run(app, scopes)
+    with_limit = await run(limited, scopes)
+
+    backend = MemoryRateLimitBackend(max_keys=args.ips // 2)
+    keys = [f"ip:{s['client'][0]}:global" for s in scopes]
+    start = time.perf_counter()
+    for key in keys:
+        await backend.hit(key, 100, 60)
+    hit_only = time.perf_counter() - start
+
+    n = args.requests
+    print(f"requests={n} ips={args.ips}")
+    print(f"app sola            {bare / n * 1e6:7.2f} µs/req")
+    print(f"app + rate limit    {with_limit / n * 1e6:7.2f} µs/req")
+    print(f"overhead middleware {(with_limit - bare) / n * 1e6:7.2f} µs/req")
+    print(f"backend.hit (poda)  {hit_only / n * 1e6:7.2f} µs/hit  (max_keys={backend.max_keys}, final={len(backend)})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,160 @@
+"""
+Benchmark: serialización de respuestas con listas grandes
+Arma payloads representativos (catálogo de un negocio con muchos servicios,
+una lista de turnos como la devuelve PostgREST y la disponibilidad de un mes)
+y mide cada camino de serialización:
+  - jsonable_encoder + json.dumps: ruta sin response_model (JSONResponse)
+  - validar + dump_json: ruta con response_model (lo que hace FastAPI)
+  - modelos + dump_json: la ruta devuelve modelos ya construidos
+  - dumps (orjson): datos propios sin validar (FastJSONResponse / trusted_response)
+Verifica además que dumps produzca los mismos bytes que pydantic para la
+disponibilidad y que el cuerpo del catálogo (y su ETag) no cambie respecto
+de json.dumps.
+
+Uso:
+    python benchmarks/bench_serialization.py [--services 300] [--appointments 2000] [--employees 20] [--days 31] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from src.schemas.appointments import AppointmentResponse, AvailabilityResponse  # noqa: E402
+from src.schemas.businesses import BusinessCatalogResponse  # noqa: E402
+from src.services.business_catalog import build_catalog  # noqa: E402
+from src.utils.serialization import dumps, type_adapter  # noqa: E402
+from src.utils.time import get_timezone, to_local  # noqa: E402
+
+START = datetime(2026, 3, 20, tzinfo=timezone.utc)
+
+
+def ids(count: int, prefix: int) -> list:
+    return [str(uuid.UUID(int=(prefix << 64) + i)) for i in range(count)]
+
+
+def catalog_payload(services: int) -> dict:
+    """Negocio con horarios y `services` servicios, con la forma de get_catalog"""
+    business = {
+        "id": ids(1, 1)[0],
+        "name": "Salón de Belleza Ejemplo",
+        "address": "Av. Corrientes 1234, CABA",
+        "phone": "+54 11 5555-0000",
+        "timezone": "America/Argentina/Buenos_Aires",
+        "business_hours": [
+            {"day_of_week": day, "open_time": "09:00:00", "close_time": "19:00:00", "is_closed": day == 0}
+            for day in range(7)
+        ],
+        "services": [
+            {"id": service_id, "name": f"Servicio {i:04d}", "description": "Corte, lavado y peinado",
+             "price": 1500.0 + i, "duration_minutes": 30 + i % 4 * 15, "points_awarded": i % 50,
+             "is_active": i % 10 != 0}
+            for i, service_id in enumerate(ids(services, 2))
+        ],
+    }
+    return build_catalog(business)
+
+
+def appointments_payload(count: int) -> list:
+    """Turnos con el formato de PostgREST (timestamps como texto)"""
+    rows = []
+    for i, appointment_id in enumerate(ids(count, 3)):
+        start = START + timedelta(minutes=30 * i)
+        rows.append({
+            "id": appointment_id,
+            "business_id": ids(1, 1)[0],
+            "customer_id": str(uuid.UUID(int=(4 << 64) + i % 97)),
+            "employee_id": str(uuid.UUID(int=(5 << 64) + i % 12)),
+            "service_id": str(uuid.UUID(int=(2 << 64) + i % 40)),
+            "start_datetime": start.isoformat(),
+            "end_datetime": (start + timedelta(minutes=45)).isoformat(),
+            "status": "scheduled",
+            "notes": None if i % 3 else "Traer referencia",
+        })
+    return rows
+
+
+def availability_payload(employees: int, days: int) -> dict:
+    """Disponibilidad de un mes cada 15 minutos, armada como en get_availability"""
+    tz = get_timezone("America/Santiago")
+    first = START.timestamp()
+    slots = [first + 900 * i for i in range(days * 96)]
+    return {
+        "business_id": ids(1, 1)[0],
+        "service_id": uuid.UUID(ids(1, 2)[0]),
+        "duration_minutes": 45,
+        "timezone": str(tz),
+        "date_from": START.date(),
+        "date_to": START.date() + timedelta(days=days - 1),
+        "employees": [
+            {"employee_id": employee_id, "name": f"Empleado {i}", "slots": to_local(slots, tz)}
+            for i, employee_id in enumerate(ids(employees, 5))
+        ],
+    }
+
+
+def best_of(repeat: int, fn) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def measure(name: str, content, schema, repeat: int) -> None:
+    adapter = type_adapter(schema)
+    models = adapter.validate_python(content)
+    results = [
+        ("jsonable_encoder + json.dumps", best_of(repeat, lambda: json.dumps(
+            jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode())),
+        ("validar + dump_json", best_of(repeat, lambda: adapter.dump_json(
+            adapter.validate_python(content, from_attributes=True)
+        ))),
+        ("modelos + dump_json", best_of(repeat, lambda: adapter.dump_json(
+            adapter.validate_python(models, from_attributes=True)
+        ))),
+        ("dumps (orjson)", best_of(repeat, lambda: dumps(content))),
+    ]
+    size = len(dumps(content))
+    print(f"{name} ({size / 1024:.0f} KiB)")
+    for label, elapsed in results:
+        print(f"  {label:30s} {elapsed * 1000:8.2f} ms  ({results[0][1] / elapsed:5.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=300)
+    parser.add_argument("--appointments", type=int, default=2000)
+    parser.add_argument("--employees", type=int, default=20)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    catalog = catalog_payload(args.services)
+    appointments = appointments_payload(args.appointments)
+    availability = availability_payload(args.employees, args.days)
+
+    # Mismo cuerpo (y ETag) del catálogo que con json.dumps
+    assert dumps(catalog, sort_keys=True) == json.dumps(
+        catalog, ensure_ascii=False, separators=(",", ":"), sort_keys=True
+    ).encode()
+    # La disponibilidad sin validar sale igual que por el response_model
+    adapter = type_adapter(AvailabilityResponse)
+    assert dumps(availability) == adapter.dump_json(adapter.validate_python(availability))
+
+    measure("catálogo", catalog, BusinessCatalogResponse, args.repeat)
+    measure("turnos", appointments, List[AppointmentResponse], args.repeat)
+    measure("disponibilidad", availability, AvailabilityResponse, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Micro-benchmark: cliente admin creado por request vs cliente del pool compartido
+
+Levanta un servidor HTTP local que imita PostgREST y mide requests/seg de
+una consulta a user_profiles con ambas estrategias.
+
+Uso:
+    python benchmarks/bench_supabase_client.py [--requests 500]
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Claves con formato JWT (el cliente de Supabase valida el formato)
+FAKE_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.bench"
+
+
+class FakePostgrestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        # Consumir el cuerpo (postgrest-py envía "{}" también en GET). El ACK
+        # inmediato evita que Nagle + delayed ACK sumen ~40ms por request.
+        if hasattr(socket, "TCP_QUICKACK"):
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        body = json.dumps([{"role": "owner", "business_id": "b-1"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(label, get_client, total):
+    start = time.perf_counter()
+    for _ in range(total):
+        client = get_client()
+        client.table("user_profiles").select("role, business_id").eq("id", "u-1").execute()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {total / elapsed:>10.1f} req/s  ({elapsed * 1000 / total:.3f} ms/req)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakePostgrestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    os.environ.update({
+        "SUPABASE_URL": url,
+        "SUPABASE_ANON_KEY": FAKE_KEY,
+        "SUPABASE_SERVICE_ROLE_KEY": FAKE_KEY,
+        "ADMIN_SECRET": "bench",
+    })
+    from supabase import create_client
+    from src.database.supabase import supabase_client
+
+    run("antes: create_client()", lambda: create_client(url, FAKE_KEY), args.requests)
+    run("después: pool compartido", supabase_client.get_admin_client, args.requests)
+
+    supabase_client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
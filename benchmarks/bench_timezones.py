@@ -0,0 +1,108 @@
+"""
+Benchmark: conversión de zonas horarias en lote vs pytz por elemento
+
+Convierte los inicios de turno de un mes (cada 15 minutos, varios empleados)
+y calcula las ventanas UTC de los días locales de varios años, y mide:
+  - pytz por elemento: utc.localize(...).astimezone(tz) / tz.localize(...)
+  - zoneinfo por elemento: datetime.fromtimestamp(t, tz)
+  - src.utils.time en lote: to_local, local_dates, day_windows
+Verifica además que los resultados coincidan con zoneinfo y cuenta los días
+en que la ventana de pytz (localize con is_dst=False) no empieza en el
+primer instante del día local (medianoches que no existen o se repiten;
+con --zone America/Havana pytz se equivoca en 2 días por año).
+
+Uso:
+    python benchmarks/bench_timezones.py [--zone America/Santiago] [--employees 20] [--days 31] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time as timer
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import pytz
+except ImportError:  # pragma: no cover
+    sys.exit("Este script requiere pytz: pip install pytz")
+
+from src.utils.time import day_windows, get_timezone, local_dates, offset_table, to_local  # noqa: E402
+
+EPOCH = datetime(1970, 1, 1)
+STEP = 15 * 60
+
+
+def pytz_local(timestamps: list, tz) -> list:
+    return [pytz.utc.localize(EPOCH + timedelta(seconds=t)).astimezone(tz) for t in timestamps]
+
+
+def pytz_windows(days: list, tz) -> list:
+    return [
+        (tz.localize(datetime.combine(day, time.min)).timestamp(),
+         tz.localize(datetime.combine(day + timedelta(days=1), time.min)).timestamp())
+        for day in days
+    ]
+
+
+def best_of(repeat: int, fn) -> float:
+    times = []
+    for _ in range(repeat):
+        start = timer.perf_counter()
+        fn()
+        times.append(timer.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zone", default="America/Santiago", help="zona con cambios de horario a medianoche")
+    parser.add_argument("--employees", type=int, default=20)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--years", type=int, default=10, help="años de ventanas de días")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    zone = ZoneInfo(args.zone)
+    legacy = pytz.timezone(args.zone)
+    # Un mes que cruza un cambio de horario, repetido por empleado (como la respuesta de disponibilidad)
+    first = datetime(2026, 3, 20, tzinfo=timezone.utc).timestamp()
+    month = [first + STEP * i for i in range(args.days * 96)]
+    timestamps = [t for _ in range(args.employees) for t in month]
+    days = [date(2020, 1, 1) + timedelta(days=i) for i in range(args.years * 365)]
+
+    reference = [datetime.fromtimestamp(t, zone) for t in timestamps]
+    assert [d.isoformat() for d in to_local(timestamps, get_timezone(args.zone))] == [d.isoformat() for d in reference]
+    assert [d.isoformat() for d in pytz_local(timestamps, legacy)] == [d.isoformat() for d in reference]
+    assert local_dates(timestamps, zone) == [d.date() for d in reference]
+    windows = day_windows(days, zone)
+    for day, (start, _) in zip(days, windows):
+        assert datetime.fromtimestamp(start, zone).date() == day > datetime.fromtimestamp(start - 1, zone).date()
+    wrong = sum(a != b for a, b in zip(pytz_windows(days, legacy), windows))
+
+    n = len(timestamps)
+    table = best_of(1, lambda: offset_table(ZoneInfo.no_cache(args.zone)).segment(first))
+    # (nombre, segundos, elementos, fila de pytz con la que se compara)
+    results = [
+        ("pytz localize/astimezone", best_of(args.repeat, lambda: pytz_local(timestamps, legacy)), n, None),
+        ("pytz timezone() por elemento", best_of(args.repeat, lambda: [
+            pytz.utc.localize(EPOCH + timedelta(seconds=t)).astimezone(pytz.timezone(args.zone)) for t in timestamps
+        ]), n, 0),
+        ("zoneinfo fromtimestamp", best_of(args.repeat, lambda: [datetime.fromtimestamp(t, zone) for t in timestamps]), n, 0),
+        ("to_local (lote)", best_of(args.repeat, lambda: to_local(timestamps, zone)), n, 0),
+        ("fechas pytz", best_of(args.repeat, lambda: [d.date() for d in pytz_local(timestamps, legacy)]), n, None),
+        ("local_dates (lote)", best_of(args.repeat, lambda: local_dates(timestamps, zone)), n, 4),
+        ("ventanas pytz localize", best_of(args.repeat, lambda: pytz_windows(days, legacy)), len(days), None),
+        ("day_windows (lote)", best_of(args.repeat, lambda: day_windows(days, zone)), len(days), 6),
+    ]
+
+    print(f"zona={args.zone} timestamps={n} días={len(days)} tabla de offsets (1 año)={table * 1000:.2f} ms")
+    for name, elapsed, count, base in results:
+        speedup = f"  ({results[base][1] / elapsed:.1f}x)" if base is not None else ""
+        print(f"{name:30s} {elapsed * 1000:8.2f} ms {elapsed / count * 1e9:8.0f} ns/elemento{speedup}")
+    print(f"ventanas de pytz que no empiezan en el primer instante del día: {wrong} de {len(days)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Test de concurrencia: cientos de reservas simultáneas del mismo turno
+
+Conecta directo a Postgres (asyncpg) y llama a book_appointment desde muchas
+conexiones a la vez, sin pasar por PostgREST. Requiere tables_schema.sql,
+availability_schema.sql y booking_schema.sql cargados (con btree_gist).
+Crea su propio negocio de prueba y lo elimina al terminar.
+
+Escenarios:
+  same-slot: N clientes piden exactamente el mismo horario -> 1 reserva, N-1 conflictos
+  staggered: N clientes piden horarios que se pisan parcialmente -> ninguna superposición
+
+Uso:
+    DATABASE_URL=postgresql://postgres@localhost/iris \\
+        python benchmarks/concurrent_booking.py [--bookings 300] [--connections 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover
+    sys.exit("Este script requiere asyncpg: pip install asyncpg")
+
+DURATION_MINUTES = 60
+BOOK = "SELECT id FROM book_appointment($1, $2, $3, $4, $5)"
+
+
+async def seed(conn, customers: int) -> dict:
+    """Negocio abierto todos los días 00:00-23:59, un servicio, un empleado y clientes"""
+    business_id = await conn.fetchval(
+        "INSERT INTO businesses (name, address, access_code) VALUES ($1, 'Test', $2) RETURNING id",
+        f"Concurrencia {uuid.uuid4().hex[:8]}", uuid.uuid4().hex[:8].upper(),
+    )
+    await conn.executemany(
+        "INSERT INTO business_hours (business_id, day_of_week, open_time, close_time) VALUES ($1, $2, '00:00', '23:59')",
+        [(business_id, day) for day in range(7)],
+    )
+    service_id = await conn.fetchval(
+        "INSERT INTO services (business_id, name, price, duration_minutes) VALUES ($1, 'Corte', 1000, $2) RETURNING id",
+        business_id, DURATION_MINUTES,
+    )
+    employee_id = await conn.fetchval(
+        "INSERT INTO employees (business_id, name) VALUES ($1, 'Empleado') RETURNING id", business_id
+    )
+    customer_ids = [uuid.uuid4() for _ in range(customers)]
+    await conn.executemany(
+        "INSERT INTO customer_businesses (customer_id, business_id, customer_name) VALUES ($1, $2, 'Cliente')",
+        [(c, business_id) for c in customer_ids],
+    )
+    return {"business_id": business_id, "service_id": service_id, "employee_id": employee_id, "customers": customer_ids}
+
+
+async def fire(pool, data: dict, starts: list) -> tuple:
+    """Lanza todas las reservas a la vez; devuelve (ok, conflictos, errores, segundos)"""
+    gate = asyncio.Event()
+
+    async def book(customer_id, start):
+        async with pool.acquire() as conn:
+            await gate.wait()
+            try:
+                await conn.fetchval(BOOK, data["business_id"], customer_id, data["employee_id"], data["service_id"], start)
+                return "ok"
+            except asyncpg.exceptions.ExclusionViolationError:
+                return "conflict"
+
+    tasks = [asyncio.create_task(book(c, s)) for c, s in zip(data["customers"], starts)]
+    await asyncio.sleep(0.2)  # que las tareas tomen conexión y esperen en la barrera
+    started = time.perf_counter()
+    gate.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    errors = [r for r in results if isinstance(r, BaseException)]
+    for error in errors[:3]:
+        print(f"  error inesperado: {error!r}")
+    return results.count("ok"), results.count("conflict"), len(errors), elapsed
+
+
+async def overlapping_pairs(conn, business_id) -> int:
+    return await conn.fetchval("""
+        SELECT count(*) FROM appointments a
+        JOIN appointments b ON a.employee_id = b.employee_id AND a.id < b.id
+        WHERE a.business_id = $1 AND a.status != 'cancelled' AND b.status != 'cancelled'
+          AND tstzrange(a.start_datetime, a.end_datetime) && tstzrange(b.start_datetime, b.end_datetime)
+    """, business_id)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL", "postgresql://postgres@localhost/postgres"))
+    parser.add_argument("--bookings", type=int, default=300)
+    parser.add_argument("--connections", type=int, default=50)
+    args = parser.parse_args()
+
+    pool = await asyncpg.create_pool(args.dsn, min_size=args.connections, max_size=args.connections)
+    failed = False
+    async with pool.acquire() as conn:
+        data = await seed(conn, args.bookings)
+    try:
+        base = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=2)
+        base = base.replace(hour=10)
+
+        ok, conflicts, errors, elapsed = await fire(pool, data, [base] * args.bookings)
+        print(f"same-slot  reservas={args.bookings} ok={ok} conflictos={conflicts} errores={errors} ({elapsed * 1000:.0f} ms)")
+        failed |= ok != 1 or errors > 0
+
+        # Inicios cada 15 minutos en una ventana de 6 horas: se pisan parcialmente
+        day = base + timedelta(days=1)
+        starts = [day + timedelta(minutes=15 * random.randrange(24)) for _ in range(args.bookings)]
+        ok, conflicts, errors, elapsed = await fire(pool, data, starts)
+        async with pool.acquire() as conn:
+            overlaps = await overlapping_pairs(conn, data["business_id"])
+        print(f"staggered  reservas={args.bookings} ok={ok} conflictos={conflicts} errores={errors} "
+              f"superpuestos={overlaps} ({elapsed * 1000:.0f} ms)")
+        failed |= overlaps > 0 or errors > 0 or ok == 0
+    finally:
+        async with pool.acquire() as conn:
+            await conn.execute("DELETE FROM businesses WHERE id = $1", data["business_id"])
+        await pool.close()
+
+    print("FALLÓ" if failed else "OK: nunca hubo dos turnos superpuestos")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,137 @@
+"""
+Ledger de puntos: lectura del saldo y canjes simultáneos
+
+Conecta directo a Postgres (asyncpg). Requiere tables_schema.sql y
+loyalty_schema.sql cargados. Crea su propio negocio de prueba y lo elimina
+al terminar.
+
+Escenarios:
+  lectura: saldo sumando el historial (como antes) vs el saldo materializado
+  canjes:  N canjes simultáneos del mismo cliente -> solo los que alcanza el
+           saldo, que nunca queda negativo
+  verify:  el saldo materializado coincide con la suma del ledger
+
+Uso:
+    DATABASE_URL=postgresql://postgres@localhost/iris \\
+        python benchmarks/concurrent_loyalty.py [--entries 2000] [--redeems 100] [--connections 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover
+    sys.exit("Este script requiere asyncpg: pip install asyncpg")
+
+REWARD_POINTS = 30
+REDEEM = "SELECT balance FROM loyalty_redeem($1, $2, $3)"
+SUM_ON_READ = """
+    SELECT COALESCE(SUM(loyalty_entry_delta(transaction_type, points_earned)), 0)
+    FROM loyalty_points WHERE customer_id = $1 AND business_id = $2
+"""
+MATERIALIZED = "SELECT balance FROM loyalty_balances WHERE customer_id = $1 AND business_id = $2"
+
+
+async def seed(conn, entries: int) -> dict:
+    """Negocio con una recompensa y un cliente con `entries` movimientos de 1 punto"""
+    business_id = await conn.fetchval(
+        "INSERT INTO businesses (name, address, access_code) VALUES ($1, 'Test', $2) RETURNING id",
+        f"Puntos {uuid.uuid4().hex[:8]}", uuid.uuid4().hex[:8].upper(),
+    )
+    reward_id = await conn.fetchval(
+        "INSERT INTO loyalty_rewards (business_id, name, points_required, reward_type, discount_fixed) "
+        "VALUES ($1, 'Descuento', $2, 'discount_fixed', 500) RETURNING id",
+        business_id, REWARD_POINTS,
+    )
+    customer_id = uuid.uuid4()
+    # Un solo INSERT: el trigger del ledger actualiza el saldo una vez para toda la sentencia
+    await conn.execute(
+        "INSERT INTO loyalty_points (business_id, customer_id, points_earned, transaction_type) "
+        "SELECT $1, $2, 1, 'adjusted' FROM generate_series(1, $3)",
+        business_id, customer_id, entries,
+    )
+    return {"business_id": business_id, "reward_id": reward_id, "customer_id": customer_id}
+
+
+async def time_query(conn, query: str, *args, repeat: int = 200) -> float:
+    """Mediana en ms de `repeat` ejecuciones"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await conn.fetchval(query, *args)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def fire(pool, data: dict, redeems: int) -> tuple:
+    """Lanza todos los canjes a la vez; devuelve (ok, sin saldo, errores, segundos)"""
+    gate = asyncio.Event()
+
+    async def redeem():
+        async with pool.acquire() as conn:
+            await gate.wait()
+            try:
+                await conn.fetchval(REDEEM, data["business_id"], data["customer_id"], data["reward_id"])
+                return "ok"
+            except asyncpg.exceptions.RaiseError as e:
+                if str(e) == "insufficient_points":
+                    return "insufficient"
+                raise
+
+    tasks = [asyncio.create_task(redeem()) for _ in range(redeems)]
+    await asyncio.sleep(0.2)  # que las tareas tomen conexión y esperen en la barrera
+    started = time.perf_counter()
+    gate.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    errors = [r for r in results if isinstance(r, BaseException)]
+    for error in errors[:3]:
+        print(f"  error inesperado: {error!r}")
+    return results.count("ok"), results.count("insufficient"), len(errors), elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL", "postgresql://postgres@localhost/postgres"))
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--redeems", type=int, default=100)
+    parser.add_argument("--connections", type=int, default=20)
+    args = parser.parse_args()
+
+    pool = await asyncpg.create_pool(args.dsn, min_size=args.connections, max_size=args.connections)
+    failed = False
+    async with pool.acquire() as conn:
+        data = await seed(conn, args.entries)
+    try:
+        key = (data["customer_id"], data["business_id"])
+        async with pool.acquire() as conn:
+            summed = await time_query(conn, SUM_ON_READ, *key)
+            materialized = await time_query(conn, MATERIALIZED, *key)
+        print(f"lectura    movimientos={args.entries} suma={summed:.3f} ms materializado={materialized:.3f} ms "
+              f"({summed / materialized:.1f}x)")
+
+        expected = min(args.redeems, args.entries // REWARD_POINTS)
+        ok, insufficient, errors, elapsed = await fire(pool, data, args.redeems)
+        async with pool.acquire() as conn:
+            balance = await conn.fetchval(MATERIALIZED, *key)
+            mismatches = await conn.fetch("SELECT * FROM loyalty_verify_balances($1)", data["business_id"])
+        print(f"canjes     pedidos={args.redeems} ok={ok} sin_saldo={insufficient} errores={errors} "
+              f"saldo={balance} ({elapsed * 1000:.0f} ms)")
+        print(f"verify     diferencias={len(mismatches)}")
+        failed |= ok != expected or errors > 0 or balance != args.entries - ok * REWARD_POINTS or bool(mismatches)
+    finally:
+        async with pool.acquire() as conn:
+            await conn.execute("DELETE FROM businesses WHERE id = $1", data["business_id"])
+        await pool.close()
+
+    print("FALLÓ" if failed else "OK: los canjes nunca gastaron más puntos que el saldo")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,515 @@
+"""
+Supabase falso en proceso: GoTrue (/auth/v1) y PostgREST (/rest/v1)
+Implementa lo que usan src/database/supabase.py y async_supabase.py: la API
+admin y de sesiones de Auth, y tablas en memoria con los filtros, orden,
+rangos, upserts y RPCs que piden los repositorios. Los tokens son JWT HS256
+firmados con JWT_SECRET, así la API los verifica localmente como en
+producción. Cada request puede demorarse una latencia fija (más un jitter
+con semilla) para simular la red y la base.
+
+En el mismo proceso (en un hilo con su propio event loop):
+
+    with FakeSupabase(auth_latency=0.02, rest_latency=0.005) as fake:
+        os.environ.update(fake.environ())
+        ...
+
+Como servidor aparte (p. ej. para benchmarks/load_workers.py):
+
+    python benchmarks/fake_supabase.py [--port 54321] [--auth-latency-ms 20] [--rest-latency-ms 5]
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import secrets
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import jwt
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+JWT_SECRET = "fake-supabase-jwt-secret-with-at-least-32-characters"
+
+# Columnas únicas además de "id" (la clave primaria de todas las tablas)
+UNIQUE = {
+    "businesses": ("access_code",),
+    "jobs": ("dedupe_key",),
+    "employees": ("email",),
+}
+
+# Valores por defecto de las columnas (los DEFAULT de las tablas)
+DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "businesses": {"is_active": True, "timezone": "America/Argentina/Buenos_Aires", "phone": None},
+    "services": {"is_active": True, "description": None, "points_awarded": 0},
+    "employees": {"is_active": True},
+    "jobs": {"status": "pending", "attempts": 0, "last_error": None, "locked_until": None},
+    "promotions": {"status": "active", "description": None},
+}
+
+# Tabla embebida -> columna que la vincula con la tabla padre ("services(...)" en businesses)
+SINGULAR = {"businesses": "business", "user_profiles": "user", "appointments": "appointment"}
+
+ACCESS_CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+
+# Más que el keepalive_expiry del pool de la API (30 s): cerrar antes produce
+# errores de conexión reutilizada que el Supabase real no da
+KEEPALIVE = 120
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _error(status: int, code: str, message: str) -> JSONResponse:
+    return JSONResponse({"code": code, "message": message, "details": None, "hint": None}, status_code=status)
+
+
+def _split_top(text: str) -> List[str]:
+    """Separar por comas de primer nivel (las de "services(id, name)" quedan adentro)"""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current.append(char)
+    parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+
+def _compare(value: Any, raw: str) -> Tuple[Any, Any]:
+    """Valores comparables: el parámetro llega como texto"""
+    if isinstance(value, bool):
+        return str(value).lower(), raw
+    if isinstance(value, (int, float)):
+        try:
+            return value, float(raw)
+        except ValueError:
+            return str(value), raw
+    return ("" if value is None else str(value)), raw
+
+
+def _matches(row: Dict[str, Any], column: str, expression: str) -> bool:
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    operator, _, raw = expression.partition(".")
+    value = row.get(column)
+    if operator == "is":
+        result = value is None if raw == "null" else str(value).lower() == raw
+    elif operator == "in":
+        result = str(value) in {item.strip().strip('"') for item in raw.strip("()").split(",")}
+    elif value is None:
+        result = False
+    else:
+        left, right = _compare(value, raw)
+        result = {
+            "eq": lambda: left == right,
+            "neq": lambda: left != right,
+            "gt": lambda: left > right,
+            "gte": lambda: left >= right,
+            "lt": lambda: left < right,
+            "lte": lambda: left <= right,
+        }.get(operator, lambda: False)()
+    return result != negate
+
+
+class FakeSupabase:
+    """
+    GoTrue + PostgREST en memoria. `auth_latency` y `rest_latency` (segundos)
+    se suman a cada request de cada servicio, más un jitter uniforme de hasta
+    `jitter` segundos (aleatorio con `seed`, repetible entre corridas).
+    """
+
+    RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+    def __init__(
+        self,
+        auth_latency: float = 0.0,
+        rest_latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: int = 1,
+        autoconfirm: bool = True,
+        jwt_secret: str = JWT_SECRET,
+    ):
+        self.auth_latency = auth_latency
+        self.rest_latency = rest_latency
+        self.jitter = jitter
+        self.autoconfirm = autoconfirm
+        self.jwt_secret = jwt_secret
+        self.url = ""
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.counts: Dict[str, int] = {"auth": 0, "rest": 0}
+        self.rpcs: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "onboard_owner": self._onboard_owner,
+            "claim_jobs": lambda params: [],
+        }
+        self._random = random.Random(seed)
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self.app = Starlette(routes=[
+            Route("/auth/v1/health", self._auth_health, methods=["GET"]),
+            Route("/auth/v1/.well-known/jwks.json", self._jwks, methods=["GET"]),
+            Route("/auth/v1/admin/users", self._admin_create_user, methods=["POST"]),
+            Route("/auth/v1/admin/users/{user_id}", self._admin_delete_user, methods=["DELETE"]),
+            Route("/auth/v1/signup", self._signup, methods=["POST"]),
+            Route("/auth/v1/token", self._token, methods=["POST"]),
+            Route("/auth/v1/user", self._get_user, methods=["GET"]),
+            Route("/rest/v1/rpc/{name}", self._rpc, methods=["POST"]),
+            Route("/rest/v1/{table}", self._table, methods=["GET", "HEAD", "POST", "PATCH", "DELETE"]),
+        ])
+
+    # --- Ciclo de vida ---
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Servir en un hilo aparte; devuelve la URL base (SUPABASE_URL)"""
+        config = uvicorn.Config(
+            self.app, host=host, port=port, log_level="warning", lifespan="off", timeout_keep_alive=KEEPALIVE
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="fake-supabase", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("no arrancó el Supabase falso")
+            time.sleep(0.01)
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=10)
+            self._server = self._thread = None
+
+    def __enter__(self) -> "FakeSupabase":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def environ(self) -> Dict[str, str]:
+        """Variables de entorno para que la API use este Supabase"""
+        return {
+            "SUPABASE_URL": self.url,
+            "SUPABASE_ANON_KEY": self.api_key("anon"),
+            "SUPABASE_SERVICE_ROLE_KEY": self.api_key("service_role"),
+            "SUPABASE_JWT_SECRET": self.jwt_secret,
+        }
+
+    def api_key(self, role: str) -> str:
+        return jwt.encode({"iss": "supabase", "role": role}, self.jwt_secret, algorithm="HS256")
+
+    # --- Datos (para preparar escenarios desde el mismo proceso) ---
+
+    def insert(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        row = self._with_defaults(table, row)
+        self.tables.setdefault(table, []).append(row)
+        return row
+
+    def rows(self, table: str, **equals: Any) -> List[Dict[str, Any]]:
+        return [
+            row for row in self.tables.get(table, [])
+            if all(row.get(column) == value for column, value in equals.items())
+        ]
+
+    def _with_defaults(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        stamp = now_iso()
+        return {"id": str(uuid.uuid4()), **DEFAULTS.get(table, {}), "created_at": stamp, "updated_at": stamp, **row}
+
+    async def _delay(self, latency: float) -> None:
+        total = latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if total > 0:
+            await asyncio.sleep(total)
+
+    # --- GoTrue ---
+
+    def _user_json(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in user.items() if key != "password"}
+
+    def _session(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        issued = int(time.time())
+        claims = {
+            "sub": user["id"],
+            "email": user["email"],
+            "aud": "authenticated",
+            "role": "authenticated",
+            "iss": f"{self.url}/auth/v1",
+            "iat": issued,
+            "exp": issued + 3600,
+            "app_metadata": user["app_metadata"],
+            "user_metadata": user["user_metadata"],
+        }
+        return {
+            "access_token": jwt.encode(claims, self.jwt_secret, algorithm="HS256"),
+            "refresh_token": secrets.token_urlsafe(16),
+            "token_type": "bearer",
+            "expires_in": 3600,
+            "expires_at": issued + 3600,
+            "user": self._user_json(user),
+        }
+
+    def _create_user(self, body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        email = (body.get("email") or "").lower()
+        if any(user["email"] == email for user in self.users.values()):
+            return None
+        stamp = now_iso()
+        user = {
+            "id": str(uuid.uuid4()),
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": email,
+            "email_confirmed_at": stamp if self.autoconfirm or body.get("email_confirm") else None,
+            "app_metadata": {"provider": "email", "providers": ["email"]},
+            "user_metadata": body.get("user_metadata") or body.get("data") or {},
+            "identities": [],
+            "created_at": stamp,
+            "updated_at": stamp,
+            "password": body.get("password"),
+        }
+        self.users[user["id"]] = user
+        return user
+
+    @staticmethod
+    def _duplicate_email() -> JSONResponse:
+        return JSONResponse(
+            {"code": 422, "msg": 'duplicate key value violates unique constraint "users_email_key"'},
+            status_code=422,
+        )
+
+    async def _auth(self) -> None:
+        self.counts["auth"] += 1
+        await self._delay(self.auth_latency)
+
+    async def _auth_health(self, request: Request) -> Response:
+        await self._auth()
+        return JSONResponse({"version": "fake", "name": "GoTrue", "description": "FakeSupabase"})
+
+    async def _jwks(self, request: Request) -> Response:
+        await self._auth()
+        return JSONResponse({"keys": []})
+
+    async def _admin_create_user(self, request: Request) -> Response:
+        await self._auth()
+        user = self._create_user(await request.json())
+        if user is None:
+            return self._duplicate_email()
+        return JSONResponse(self._user_json(user))
+
+    async def _admin_delete_user(self, request: Request) -> Response:
+        await self._auth()
+        if self.users.pop(request.path_params["user_id"], None) is None:
+            return JSONResponse({"code": 404, "msg": "User not found"}, status_code=404)
+        return JSONResponse({})
+
+    async def _signup(self, request: Request) -> Response:
+        await self._auth()
+        user = self._create_user(await request.json())
+        if user is None:
+            return self._duplicate_email()
+        return JSONResponse(self._session(user) if self.autoconfirm else self._user_json(user))
+
+    async def _token(self, request: Request) -> Response:
+        await self._auth()
+        body = await request.json()
+        email = (body.get("email") or "").lower()
+        for user in self.users.values():
+            if user["email"] == email and user["password"] == body.get("password"):
+                return JSONResponse(self._session(user))
+        return JSONResponse(
+            {"error": "invalid_grant", "error_description": "Invalid login credentials"}, status_code=400
+        )
+
+    async def _get_user(self, request: Request) -> Response:
+        await self._auth()
+        token = request.headers.get("authorization", "").partition(" ")[2]
+        try:
+            claims = jwt.decode(token, self.jwt_secret, algorithms=["HS256"], audience="authenticated")
+        except jwt.PyJWTError:
+            return JSONResponse({"code": 401, "msg": "invalid JWT"}, status_code=401)
+        user = self.users.get(claims["sub"])
+        if user is None:
+            return JSONResponse({"code": 404, "msg": "User not found"}, status_code=404)
+        return JSONResponse(self._user_json(user))
+
+    # --- PostgREST ---
+
+    def _filtered(self, table: str, request: Request) -> List[Dict[str, Any]]:
+        rows = self.tables.get(table, [])
+        for column, expression in request.query_params.multi_items():
+            if column not in self.RESERVED_PARAMS and "." not in column:
+                rows = [row for row in rows if _matches(row, column, expression)]
+        return rows
+
+    def _project(self, table: str, rows: List[Dict[str, Any]], select: str) -> List[Dict[str, Any]]:
+        columns = _split_top(re.sub(r"\s+", "", select or "*"))
+        if columns == ["*"]:
+            return [dict(row) for row in rows]
+        result = []
+        for row in rows:
+            projected: Dict[str, Any] = {}
+            for column in columns:
+                if column == "*":
+                    projected.update(row)
+                elif "(" in column:
+                    # Recurso embebido uno a muchos: hijos con <padre>_id = row["id"]
+                    child, inner = column[:-1].split("(", 1)
+                    key = f"{SINGULAR.get(table, table.rstrip('s'))}_id"
+                    projected[child] = self._project(child, self.rows(child, **{key: row["id"]}), inner)
+                else:
+                    projected[column] = row.get(column)
+            result.append(projected)
+        return result
+
+    @staticmethod
+    def _order(rows: List[Dict[str, Any]], order: Optional[str]) -> List[Dict[str, Any]]:
+        if not order:
+            return rows
+        for term in reversed(order.split(",")):
+            column, *modifiers = term.split(".")
+            present = [row for row in rows if row.get(column) is not None]
+            missing = [row for row in rows if row.get(column) is None]
+            present.sort(key=lambda row: row[column], reverse="desc" in modifiers)
+            # PostgreSQL: nulls al final en asc y al principio en desc
+            nulls_first = "nullsfirst" in modifiers or ("desc" in modifiers and "nullslast" not in modifiers)
+            rows = missing + present if nulls_first else present + missing
+        return rows
+
+    @staticmethod
+    def _window(rows: List[Dict[str, Any]], request: Request) -> List[Dict[str, Any]]:
+        match = re.fullmatch(r"(\d+)-(\d*)", request.headers.get("range", ""))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) + 1 if match.group(2) else None
+            rows = rows[start:end]
+        offset = int(request.query_params.get("offset", 0))
+        limit = request.query_params.get("limit")
+        return rows[offset:offset + int(limit)] if limit is not None else rows[offset:]
+
+    def _respond(self, request: Request, table: str, rows: List[Dict[str, Any]], status: int = 200) -> Response:
+        prefer = request.headers.get("prefer", "")
+        if request.method != "GET" and "return=representation" not in prefer:
+            return Response(status_code=201 if status == 201 else 204)
+        data = self._project(table, rows, request.query_params.get("select", "*"))
+        if request.headers.get("accept", "").startswith("application/vnd.pgrst.object+json"):
+            if len(data) != 1:
+                return _error(406, "PGRST116", "JSON object requested, multiple (or no) rows returned")
+            return JSONResponse(data[0], status_code=status)
+        headers = {"Content-Range": f"0-{len(data) - 1}/*" if data else "*/*"}
+        return JSONResponse(data, status_code=status, headers=headers)
+
+    def _conflict(self, table: str, row: Dict[str, Any], columns: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        for existing in self.tables.get(table, []):
+            for column in columns:
+                if row.get(column) is not None and existing.get(column) == row.get(column):
+                    return existing
+        return None
+
+    async def _table(self, request: Request) -> Response:
+        self.counts["rest"] += 1
+        await self._delay(self.rest_latency)
+        table = request.path_params["table"]
+
+        if request.method in ("GET", "HEAD"):
+            rows = self._filtered(table, request)
+            rows = self._window(self._order(rows, request.query_params.get("order")), request)
+            return self._respond(request, table, rows)
+
+        if request.method == "POST":
+            body = await request.json()
+            prefer = request.headers.get("prefer", "")
+            on_conflict = request.query_params.get("on_conflict")
+            unique = ("id",) + UNIQUE.get(table, ())
+            created = []
+            for row in body if isinstance(body, list) else [body]:
+                existing = self._conflict(table, row, tuple(on_conflict.split(",")) if on_conflict else unique)
+                if existing is not None:
+                    if "resolution=ignore-duplicates" in prefer:
+                        continue
+                    if "resolution=merge-duplicates" in prefer:
+                        existing.update(row, updated_at=now_iso())
+                        created.append(existing)
+                        continue
+                    column = next(c for c in unique if row.get(c) is not None and existing.get(c) == row.get(c))
+                    return _error(
+                        409, "23505", f'duplicate key value violates unique constraint "{table}_{column}_key"'
+                    )
+                created.append(self.insert(table, row))
+            return self._respond(request, table, created, status=201)
+
+        rows = self._filtered(table, request)
+        if request.method == "PATCH":
+            values = await request.json()
+            for row in rows:
+                row.update(values, updated_at=values.get("updated_at", now_iso()))
+        else:
+            removed = {id(row) for row in rows}
+            self.tables[table] = [row for row in self.tables.get(table, []) if id(row) not in removed]
+        return self._respond(request, table, rows)
+
+    async def _rpc(self, request: Request) -> Response:
+        self.counts["rest"] += 1
+        await self._delay(self.rest_latency)
+        name = request.path_params["name"]
+        handler = self.rpcs.get(name)
+        if handler is None:
+            return _error(404, "PGRST202", f"Could not find the function public.{name} in the schema cache")
+        return JSONResponse(handler(await request.json()))
+
+    def _onboard_owner(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        access_code = "".join(secrets.choice(ACCESS_CODE_ALPHABET) for _ in range(8))
+        business = self.insert("businesses", {**params["p_business"], "access_code": access_code})
+        self.insert("user_profiles", {
+            "id": params["p_user_id"],
+            "role": "owner",
+            "business_id": business["id"],
+            "first_name": params.get("p_first_name"),
+            "last_name": params.get("p_last_name"),
+        })
+        for hours in params.get("p_hours") or []:
+            self.insert("business_hours", {**hours, "business_id": business["id"]})
+        services = [
+            self.insert("services", {**s, "business_id": business["id"]}) for s in params.get("p_services") or []
+        ]
+        employees = [
+            self.insert("employees", {**e, "business_id": business["id"]}) for e in params.get("p_employees") or []
+        ]
+        return [{"business": business, "services": services, "employees": employees}]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--auth-latency-ms", type=float, default=0.0)
+    parser.add_argument("--rest-latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    fake = FakeSupabase(args.auth_latency_ms / 1000, args.rest_latency_ms / 1000, args.jitter_ms / 1000, args.seed)
+    fake.url = f"http://{args.host}:{args.port}"
+    print("Variables para la API:")
+    for name, value in fake.environ().items():
+        print(f"export {name}={json.dumps(value)}")
+    uvicorn.run(
+        fake.app, host=args.host, port=args.port, log_level="warning", lifespan="off", timeout_keep_alive=KEEPALIVE
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Load test reproducible de la API contra el Supabase falso (sin proyecto real)
+Levanta benchmarks/fake_supabase.py en un hilo, apunta la API a él y la
+carga en el mismo proceso (httpx + ASGITransport, con el lifespan de la app)
+con una concurrencia fija. Por escenario hace --warmup requests sin medir y
+--rounds rondas de --requests medidos; reporta la ronda con más req/s (la de
+menos interferencia, como best_of) con p50/p95/p99 y llamadas a Supabase por
+request, y las req/s de todas las rondas para ver la dispersión:
+  - register_owner / register_customer / register_employee (POST /auth/register/*)
+  - auth_test: GET /test/auth-test (verificación local del JWT)
+  - owner_promotions: GET /api/v1/promotions/all (require_owner)
+  - customer_balance: GET /api/v1/loyalty/balance (require_any_user, cliente)
+  - active_promotions: GET /api/v1/promotions (índice en memoria)
+
+El resultado es JSON (--output o stdout) con el commit, el entorno y los
+parámetros; con --baseline se compara contra un resultado anterior. Para que
+dos corridas sean comparables usar los mismos parámetros en la misma máquina.
+
+Uso:
+    python benchmarks/load_api.py [--requests 500] [--concurrency 16] [--auth-latency-ms 20] [--rest-latency-ms 5]
+                                  [--scenarios auth_test,owner_promotions] [--output result.json] [--baseline prev.json]
+"""
+import argparse
+import asyncio
+import gc
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_supabase import FakeSupabase  # noqa: E402
+
+PASSWORD = "Bench-Password-123"
+PROMOTIONS = 20
+
+
+class Scenario:
+    """Un request por iteración: `build(i)` devuelve (método, path, json) y se espera `expected`"""
+
+    def __init__(self, name: str, build: Callable[[int], tuple], token: Optional[str] = None, expected: int = 200):
+        self.name = name
+        self.build = build
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.expected = expected
+
+
+def percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def git_commit() -> Dict[str, Any]:
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+
+    return {
+        "commit": git("rev-parse", "HEAD") or None,
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+async def register(client: httpx.AsyncClient, role: str, email: str, token: Optional[str] = None) -> Dict[str, Any]:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    response = await client.post(
+        f"/auth/register/{role}", json={"email": email, "password": PASSWORD, "first_name": "Bench"}, headers=headers
+    )
+    if response.status_code != 201:
+        raise SystemExit(f"no se pudo registrar {role}: {response.status_code} {response.text}")
+    return response.json()
+
+
+async def prepare(client: httpx.AsyncClient, fake: FakeSupabase) -> List[Scenario]:
+    """Owner con promociones y un cliente con saldo de puntos (no se mide)"""
+    owner = await register(client, "owner", "owner@bench.example.com")
+    customer = await register(client, "customer", "customer@bench.example.com")
+    owner_token, customer_token = owner["tokens"]["access_token"], customer["tokens"]["access_token"]
+    business_id = fake.rows("user_profiles", id=owner["user"]["id"])[0]["business_id"]
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i in range(PROMOTIONS):
+        response = await client.post("/api/v1/promotions", headers={"Authorization": f"Bearer {owner_token}"}, json={
+            "title": f"Promo {i}",
+            "valid_from": (start + timedelta(days=30 * i)).isoformat(),
+            "valid_until": (start + timedelta(days=30 * i + 400)).isoformat(),
+        })
+        if response.status_code != 201:
+            raise SystemExit(f"no se pudo crear la promoción: {response.status_code} {response.text}")
+    fake.insert("loyalty_balances", {
+        "customer_id": customer["user"]["id"], "business_id": business_id, "balance": 120, "lifetime_earned": 300,
+    })
+
+    def signup(role: str) -> Callable[[int], tuple]:
+        """Registro con un email nuevo por iteración"""
+        return lambda i: ("POST", f"/auth/register/{role}", {
+            "email": f"{role}-{i}@bench.example.com", "password": PASSWORD, "first_name": "Bench",
+        })
+
+    return [
+        Scenario("register_owner", signup("owner"), expected=201),
+        Scenario("register_customer", signup("customer"), expected=201),
+        Scenario("register_employee", signup("employee"), token=owner_token, expected=201),
+        Scenario("auth_test", lambda i: ("GET", "/test/auth-test", None), token=customer_token),
+        Scenario("owner_promotions", lambda i: ("GET", "/api/v1/promotions/all", None), token=owner_token),
+        Scenario(
+            "customer_balance", lambda i: ("GET", f"/api/v1/loyalty/balance?business_id={business_id}", None),
+            token=customer_token,
+        ),
+        Scenario(
+            "active_promotions", lambda i: ("GET", f"/api/v1/promotions?business_id={business_id}", None),
+            token=customer_token,
+        ),
+    ]
+
+
+def summarize(
+    latencies: List[float], statuses: Dict[str, int], elapsed: float, calls: int, requests: int
+) -> Dict[str, Any]:
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": requests - len(latencies),
+        "statuses": statuses,
+        "elapsed_s": round(elapsed, 4),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(statistics.mean(latencies), 3) if latencies else 0.0,
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+        "supabase_calls_per_request": round(calls / requests, 2),
+    }
+
+
+async def drive(client: httpx.AsyncClient, scenario: Scenario, first: int, count: int, concurrency: int) -> tuple:
+    """`count` requests con `concurrency` conexiones que los toman de a uno"""
+    counter = itertools.count(first)
+    end = first + count
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async def connection():
+        for i in counter:
+            if i >= end:
+                return
+            method, path, body = scenario.build(i)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body, headers=scenario.headers)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            if status == scenario.expected:
+                latencies.append((time.perf_counter() - start) * 1000)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+async def run(args, fake: FakeSupabase) -> Dict[str, Dict[str, Any]]:
+    from src.main import app
+
+    results: Dict[str, Dict[str, Any]] = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost", timeout=30) as client:
+            scenarios = await prepare(client, fake)
+            selected = args.scenarios.split(",") if args.scenarios else [s.name for s in scenarios]
+            for scenario in scenarios:
+                if scenario.name not in selected:
+                    continue
+                await drive(client, scenario, 0, args.warmup, args.concurrency)
+                rounds = []
+                for n in range(args.rounds):
+                    # Que la basura de la preparación o de la ronda anterior no se recolecte midiendo
+                    gc.collect()
+                    calls = sum(fake.counts.values())
+                    latencies, statuses, elapsed = await drive(
+                        client, scenario, args.warmup + n * args.requests, args.requests, args.concurrency
+                    )
+                    calls = sum(fake.counts.values()) - calls
+                    rounds.append(summarize(latencies, statuses, elapsed, calls, args.requests))
+                # Como best_of en los micro-benchmarks: la ronda con menos interferencia
+                best = max(rounds, key=lambda r: r["rps"])
+                results[scenario.name] = {
+                    **best,
+                    "rounds_rps": [r["rps"] for r in rounds],
+                    "rounds_errors": [r["errors"] for r in rounds],
+                }
+    return results
+
+
+def report(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Any]]) -> None:
+    """Tabla legible en stderr; con baseline, la variación de req/s y p99"""
+    previous = (baseline or {}).get("scenarios", {})
+    for name, r in results.items():
+        line = (
+            f"{name:<18} {r['rps']:8.1f} req/s  p50={r['p50_ms']:7.2f}ms p95={r['p95_ms']:7.2f}ms "
+            f"p99={r['p99_ms']:7.2f}ms  supabase/req={r['supabase_calls_per_request']:.2f}  errores={r['errors']}"
+        )
+        before = previous.get(name)
+        if before and before["rps"] and before["p99_ms"]:
+            line += (
+                f"  (req/s {(r['rps'] / before['rps'] - 1) * 100:+.1f}%, "
+                f"p99 {(r['p99_ms'] / before['p99_ms'] - 1) * 100:+.1f}%)"
+            )
+        print(line, file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500, help="requests medidos por escenario")
+    parser.add_argument("--warmup", type=int, default=50, help="requests previos sin medir")
+    parser.add_argument("--rounds", type=int, default=3, help="rondas medidas por escenario (se reporta la mejor)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--auth-latency-ms", type=float, default=20.0, help="latencia de cada request a Auth")
+    parser.add_argument("--rest-latency-ms", type=float, default=5.0, help="latencia de cada request a PostgREST")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenarios", default=None, help="escenarios separados por coma (por defecto todos)")
+    parser.add_argument("--output", default=None, help="archivo JSON de resultados (por defecto stdout)")
+    parser.add_argument("--baseline", default=None, help="resultado anterior para comparar")
+    args = parser.parse_args()
+
+    fake = FakeSupabase(args.auth_latency_ms / 1000, args.rest_latency_ms / 1000, args.jitter_ms / 1000, args.seed)
+    with fake:
+        # Antes de importar la app: la configuración se lee del entorno
+        os.environ.update(fake.environ())
+        os.environ.update({
+            "ADMIN_SECRET": os.environ.get("ADMIN_SECRET", "bench"),
+            "AUTH_VERIFICATION_MODE": "local",
+            "DATABASE_URL": "",
+            "CACHE_BACKEND": "memory",
+            "REDIS_URL": "",
+            "RATE_LIMIT_ENABLED": "false",
+            "JOBS_ENABLED": "false",
+            "SMTP_HOST": "",
+            "LOG_LEVEL": "WARNING",
+        })
+        results = asyncio.run(run(args, fake))
+
+    output = {
+        "benchmark": "load_api",
+        **git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parameters": {
+            key: getattr(args, key)
+            for key in (
+                "requests", "warmup", "rounds", "concurrency", "auth_latency_ms", "rest_latency_ms", "jitter_ms", "seed",
+            )
+        },
+        "scenarios": results,
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("parameters") != output["parameters"]:
+            print("aviso: el baseline se midió con otros parámetros", file=sys.stderr)
+    report(results, baseline)
+
+    text = json.dumps(output, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
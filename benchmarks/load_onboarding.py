@@ -0,0 +1,133 @@
+"""
+Load test: onboarding por tabla (un request PostgREST por tabla) vs RPC onboard_owner
+
+Usa el proyecto de Supabase configurado en .env (requiere onboarding_schema.sql).
+Crea usuarios y negocios de prueba y los elimina al terminar.
+
+Uso:
+    python benchmarks/load_onboarding.py [--iterations 50] [--concurrency 10] [--mode both]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.async_supabase import async_supabase_client  # noqa: E402
+from src.database.repositories import (  # noqa: E402
+    get_auth_repository,
+    get_business_repository,
+    get_profile_repository,
+)
+
+HOURS = [
+    {"day_of_week": day, "open_time": "09:00", "close_time": "19:00", "is_closed": day == 0}
+    for day in range(7)
+]
+SERVICES = [
+    {"name": f"Servicio {i}", "price": 1000 + i * 100, "duration_minutes": 30 + i * 15, "points_awarded": 10}
+    for i in range(5)
+]
+EMPLOYEES = [{"name": f"Empleado {i}", "email": f"empleado{i}@example.com"} for i in range(3)]
+
+
+async def per_table(user_id: str) -> str:
+    """Camino actual: un insert por tabla, en secuencia"""
+    db = async_supabase_client.admin_rest
+    business = (await db.table("businesses").insert({
+        "name": f"Load {user_id[:8]}",
+        "address": "Dirección pendiente",
+        "access_code": uuid.uuid4().hex[:8].upper(),
+    }).execute()).data[0]
+    business_id = business["id"]
+    try:
+        await db.table("user_profiles").insert({"id": user_id, "role": "owner", "business_id": business_id}).execute()
+        await db.table("business_hours").insert([{**h, "business_id": business_id} for h in HOURS]).execute()
+        await db.table("services").insert([{**s, "business_id": business_id} for s in SERVICES]).execute()
+        await db.table("employees").insert([{**e, "business_id": business_id} for e in EMPLOYEES]).execute()
+    except Exception:
+        # Sin transacción: no dejar el negocio a medio crear
+        await db.table("user_profiles").delete().eq("id", user_id).execute()
+        await db.table("businesses").delete().eq("id", business_id).execute()
+        raise
+    return business_id
+
+
+async def rpc(user_id: str) -> str:
+    """Camino nuevo: una transacción y un round trip"""
+    result = await get_business_repository().onboard_owner(
+        user_id,
+        {"name": f"Load {user_id[:8]}", "address": "Dirección pendiente"},
+        hours=HOURS,
+        services=SERVICES,
+        employees=EMPLOYEES,
+    )
+    return result["business"]["id"]
+
+
+async def run_mode(name, fn, iterations, concurrency):
+    auth = get_auth_repository()
+    businesses = get_business_repository()
+    profiles = get_profile_repository()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    created = []
+
+    async def one():
+        async with semaphore:
+            user = await auth.create_user(f"load-{uuid.uuid4().hex[:12]}@example.com", uuid.uuid4().hex)
+            # Registrado antes de onboardear: si fn falla el usuario también se elimina
+            entry = [user.id, None]
+            created.append(entry)
+            start = time.perf_counter()
+            entry[1] = await fn(user.id)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    try:
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(one() for _ in range(iterations)), return_exceptions=True)
+        elapsed = time.perf_counter() - start
+
+        errors = [o for o in outcomes if isinstance(o, BaseException)]
+        if errors:
+            print(f"{name:<10} {len(errors)} onboardings fallaron (primero: {errors[0]!r})", file=sys.stderr)
+        if latencies:
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+            print(
+                f"{name:<10} n={len(latencies):<4} p50={statistics.median(latencies):8.1f}ms "
+                f"p95={p95:8.1f}ms mean={statistics.mean(latencies):8.1f}ms  "
+                f"{len(latencies) / elapsed:6.1f} onboardings/s"
+            )
+    finally:
+        # Limpieza: el negocio borra en cascada horarios/servicios/empleados
+        for user_id, business_id in created:
+            try:
+                await profiles.delete(user_id)
+                if business_id:
+                    await businesses.delete(business_id)
+                await auth.delete_user(user_id)
+            except Exception as e:
+                print(f"no se pudo limpiar {user_id}: {e!r}", file=sys.stderr)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--mode", choices=["per-table", "rpc", "both"], default="both")
+    args = parser.parse_args()
+
+    if args.mode in ("per-table", "both"):
+        await run_mode("per-table", per_table, args.iterations, args.concurrency)
+    if args.mode in ("rpc", "both"):
+        await run_mode("rpc", rpc, args.iterations, args.concurrency)
+    await async_supabase_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
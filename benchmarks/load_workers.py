@@ -0,0 +1,172 @@
+"""
+Load test: throughput del servidor de producción (python -m src.server) según
+la cantidad de workers
+
+Para cada valor de --workers arranca el servidor con WEB_WORKERS, espera a
+/health y lo carga durante --duration segundos desde varios procesos cliente
+(asyncio + httpx, keep-alive) contra:
+  - GET /health
+  - GET /test/auth-test (verificación local del JWT; se omite sin token)
+El token es --token o uno HS256 firmado con SUPABASE_JWT_SECRET.
+
+Usa el .env del proyecto; el rate limiting se desactiva para la prueba.
+
+Uso:
+    python benchmarks/load_workers.py [--workers 1,2,4] [--duration 10] [--concurrency 64] [--clients 4]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def make_token() -> str:
+    """Token HS256 como los que emite Supabase Auth, o '' sin secreto"""
+    from src.core.config import settings
+
+    if not settings.supabase_jwt_secret:
+        return ""
+    import jwt
+
+    now = int(time.time())
+    return jwt.encode(
+        {
+            "sub": str(uuid.uuid4()),
+            "email": "load@example.com",
+            "role": "authenticated",
+            "aud": "authenticated",
+            "iss": f"{settings.supabase_url.rstrip('/')}/auth/v1",
+            "iat": now,
+            "exp": now + 3600,
+        },
+        settings.supabase_jwt_secret,
+        algorithm="HS256",
+    )
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "WEB_WORKERS": str(workers),
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "RATE_LIMIT_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "src.server"], cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"el servidor terminó con código {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                # Dar tiempo a que todos los workers terminen su lifespan
+                time.sleep(1)
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    stop_server(server)
+    raise SystemExit("el servidor no respondió /health a tiempo")
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=40)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+async def drive(url: str, headers: dict, concurrency: int, duration: float) -> tuple:
+    """Requests secuenciales por conexión hasta que vence duration"""
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=10) as client:
+        deadline = time.perf_counter() + duration
+
+        async def connection():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(connection() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def client_process(args: tuple) -> tuple:
+    return asyncio.run(drive(*args))
+
+
+def load(pool, url: str, headers: dict, clients: int, concurrency: int, duration: float) -> tuple:
+    per_client = max(1, concurrency // clients)
+    results = pool.map(client_process, [(url, headers, per_client, duration)] * clients)
+    latencies = sorted(latency for result in results for latency in result[0])
+    return latencies, sum(result[1] for result in results)
+
+
+def percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4", help="cantidades de workers separadas por coma")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64, help="conexiones simultáneas en total")
+    parser.add_argument("--clients", type=int, default=4, help="procesos que generan la carga")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token", default=None, help="JWT para /test/auth-test (por defecto HS256 con SUPABASE_JWT_SECRET)")
+    args = parser.parse_args()
+
+    token = args.token if args.token is not None else make_token()
+    routes = [("/health", {})]
+    if token:
+        routes.append(("/test/auth-test", {"Authorization": f"Bearer {token}"}))
+    else:
+        print("sin --token ni SUPABASE_JWT_SECRET: se omite /test/auth-test")
+
+    print(f"duración={args.duration:.0f}s conexiones={args.concurrency} procesos cliente={args.clients}")
+    with multiprocessing.Pool(args.clients) as pool:
+        for workers in (int(w) for w in args.workers.split(",")):
+            server = start_server(workers, args.port)
+            try:
+                for path, headers in routes:
+                    url = f"http://127.0.0.1:{args.port}{path}"
+                    latencies, errors = load(pool, url, headers, args.clients, args.concurrency, args.duration)
+                    print(
+                        f"workers={workers:<3} {path:<16} {len(latencies) / args.duration:9.0f} req/s  "
+                        f"p50={statistics.median(latencies) if latencies else 0:7.2f}ms "
+                        f"p99={percentile(latencies, 0.99):7.2f}ms  errores={errors}"
+                    )
+            finally:
+                stop_server(server)
+
+
+if __name__ == "__main__":
+    main()
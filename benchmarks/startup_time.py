@@ -0,0 +1,122 @@
+"""
+Benchmark: tiempo de import y de arranque de un worker
+
+Cada medición corre en un proceso nuevo (como un worker recién creado):
+  - import src.main, con el desglose de -X importtime (módulos más lentos)
+  - import de todos los módulos de src (main incluido) con el entorno vacío:
+    no debe leer la configuración ni fallar por variables faltantes
+  - arranque completo: import + startup del lifespan de la app
+Con --budget-ms termina con código 1 si la mediana del import de src.main
+supera el presupuesto (sirve como chequeo en CI).
+
+Armar la app (create_app) y el lifespan necesitan las variables de entorno
+de la app (.env).
+
+Uso:
+    python benchmarks/startup_time.py [--runs 5] [--top 15] [--budget-ms 1500]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_MAIN = """
+import json, time
+start = time.perf_counter()
+import src.main
+print(json.dumps({"ms": (time.perf_counter() - start) * 1000}))
+"""
+
+IMPORT_WITHOUT_ENV = """
+import importlib, json, pkgutil, time
+start = time.perf_counter()
+import src
+names = [m.name for m in pkgutil.walk_packages(src.__path__, "src.")]
+for name in names:
+    importlib.import_module(name)
+elapsed = (time.perf_counter() - start) * 1000
+from src.core.config import get_settings
+print(json.dumps({"ms": elapsed, "modules": len(names), "settings_loaded": get_settings.cache_info().currsize > 0}))
+"""
+
+STARTUP = """
+import asyncio, json, time
+start = time.perf_counter()
+from src.main import app
+imported = time.perf_counter()
+
+async def main():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+    return ready
+
+ready = asyncio.run(main())
+print(json.dumps({"ms": (ready - start) * 1000, "lifespan_ms": (ready - imported) * 1000}))
+"""
+
+
+def run(code: str, env: dict, importtime: bool = False) -> tuple:
+    args = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    result = subprocess.run(args, cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"falló:\n{result.stderr[-2000:]}")
+    # Los logs de la app también salen por stdout: el resultado es la última línea
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_imports(stderr: str, top: int) -> list:
+    """(self µs, cumulativo µs, módulo) de la salida de -X importtime"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, module = line[len("import time:"):].split("|")
+        if own.strip().isdigit():
+            rows.append((int(own), int(cumulative), module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    empty_env = {"PATH": os.environ.get("PATH", ""), "PYTHONPATH": ROOT}
+
+    # Primera corrida: genera los .pyc y da el desglose por módulo
+    _, stderr = run(IMPORT_MAIN, env, importtime=True)
+
+    imports = [run(IMPORT_MAIN, env)[0]["ms"] for _ in range(args.runs)]
+    bare = [run(IMPORT_WITHOUT_ENV, empty_env)[0] for _ in range(args.runs)]
+    startups = [run(STARTUP, env)[0] for _ in range(args.runs)]
+
+    print(f"corridas={args.runs} (mediana, procesos nuevos)")
+    print(f"import src.main                        {statistics.median(imports):8.1f} ms")
+    print(
+        f"import de {bare[0]['modules']} módulos sin entorno         {statistics.median(b['ms'] for b in bare):8.1f} ms"
+        f"  (configuración leída: {'sí' if any(b['settings_loaded'] for b in bare) else 'no'})"
+    )
+    print(
+        f"import + lifespan (worker listo)       {statistics.median(s['ms'] for s in startups):8.1f} ms"
+        f"  (lifespan {statistics.median(s['lifespan_ms'] for s in startups):.1f} ms)"
+    )
+
+    print("\nmódulos más lentos (tiempo propio, -X importtime):")
+    for own, cumulative, module in slowest_imports(stderr, args.top):
+        print(f"  {own / 1000:7.1f} ms  (acumulado {cumulative / 1000:7.1f} ms)  {module.strip()}")
+
+    if any(b["settings_loaded"] for b in bare):
+        raise SystemExit("importar los módulos leyó la configuración")
+    if args.budget_ms is not None and statistics.median(imports) > args.budget_ms:
+        raise SystemExit(f"import src.main supera el presupuesto de {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Dependencies de rate limiting por endpoint
+Permiten declarar límites propios de una ruta por IP, por usuario o por
+negocio. Los de usuario/negocio reutilizan el AuthContext ya resuelto en el
+request, así que no agregan llamadas a Supabase.
+"""
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
+
+from src.core.auth import get_auth_context, get_current_user
+from src.core.rate_limit import client_ip, rate_limit_backend
+from src.models.user import AuthContext
+from src.utils.routing import route_template
+
+
+class RateLimit:
+    """
+    Límite de `requests` cada `window` segundos por IP.
+    `scope` nombra el balde; por defecto es "MÉTODO ruta".
+    """
+
+    def __init__(self, requests: int, window: float, scope: Optional[str] = None):
+        self.requests = requests
+        self.window = window
+        self.scope = scope
+
+    def _bucket(self, request: Request, identity: str) -> str:
+        scope = self.scope
+        if scope is None:
+            scope = f"{request.method} {route_template(request.scope) or request.url.path}"
+        return f"{identity}:{scope}"
+
+    async def _check(self, request: Request, identity: str) -> None:
+        result = await rate_limit_backend.hit(self._bucket(request, identity), self.requests, self.window)
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Demasiadas solicitudes. Intentá de nuevo más tarde.",
+                headers=result.headers(),
+            )
+
+    async def __call__(self, request: Request) -> None:
+        await self._check(request, f"ip:{client_ip(request.scope)}")
+
+
+class UserRateLimit(RateLimit):
+    """Límite por usuario autenticado"""
+
+    async def __call__(self, request: Request, current_user: AuthContext = Depends(get_current_user)) -> None:
+        await self._check(request, f"user:{current_user.user_id}")
+
+
+class BusinessRateLimit(RateLimit):
+    """Límite compartido por todos los usuarios de un negocio"""
+
+    async def __call__(self, request: Request, context: AuthContext = Depends(get_auth_context)) -> None:
+        identity = f"business:{context.business_id}" if context.business_id else f"user:{context.user_id}"
+        await self._check(request, identity)
@@ -0,0 +1,64 @@
+"""
+Middleware ASGI de métricas por request
+Cuenta requests y mide su latencia por ruta (plantilla, no la URL concreta) y,
+si está habilitado, agrega el header Server-Timing con el desglose de las
+llamadas a Supabase hechas durante el request.
+"""
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.metrics import http_request_duration, http_requests_total, request_timings
+from src.utils.routing import route_template
+
+
+def _server_timing(timings: List[Tuple[str, float]], total: float) -> bytes:
+    grouped: Dict[str, List[float]] = defaultdict(list)
+    for name, elapsed in timings:
+        grouped[name].append(elapsed)
+    parts = [
+        f'{i};desc="{name} x{len(values)}";dur={sum(values) * 1000:.1f}'
+        for i, (name, values) in enumerate(grouped.items())
+    ]
+    parts.append(f"app;dur={total * 1000:.1f}")
+    return ", ".join(parts).encode("latin-1", errors="replace")
+
+
+class MetricsMiddleware:
+    """Registra iris_http_requests_total e iris_http_request_duration_seconds"""
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        timings: List[Tuple[str, float]] = []
+        token = request_timings.set(timings)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", ()))
+                    headers.append((b"server-timing", _server_timing(timings, time.perf_counter() - start)))
+                    message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_timings.reset(token)
+            # Las rutas sin match se agrupan para no disparar la cardinalidad
+            route = route_template(scope) or "unmatched"
+            method = scope["method"]
+            http_requests_total.inc((method, route, str(status_code)))
+            http_request_duration.observe(time.perf_counter() - start, (method, route))
@@ -0,0 +1,80 @@
+"""
+Middleware ASGI de rate limiting por IP
+Aplica el límite global (rate_limit_requests / rate_limit_window) a cada IP,
+con overrides por ruta exacta. Los límites por usuario o por negocio se
+declaran en cada endpoint con las dependencies de src.api.dependencies.rate_limit.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.rate_limit import RateLimitBackend, RateLimitResult, client_ip
+
+_TOO_MANY_REQUESTS_BODY = (
+    '{"detail":"Demasiadas solicitudes. Intentá de nuevo más tarde."}'.encode("utf-8")
+)
+
+
+class RateLimitMiddleware:
+    """
+    Token bucket por IP. Es ASGI puro (sin BaseHTTPMiddleware) para que el
+    costo por request sea una búsqueda en un dict y unas pocas operaciones.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: RateLimitBackend,
+        requests: int,
+        window: float,
+        overrides: Optional[Dict[str, Tuple[int, float]]] = None,
+        exempt_paths: Iterable[str] = (),
+    ):
+        self.app = app
+        self.backend = backend
+        self.requests = requests
+        self.window = window
+        self.overrides = overrides or {}
+        self.exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        override = self.overrides.get(path)
+        if override is None:
+            limit, window, bucket = self.requests, self.window, "global"
+        else:
+            (limit, window), bucket = override, path
+
+        result = await self.backend.hit(f"ip:{client_ip(scope)}:{bucket}", limit, window)
+        if not result.allowed:
+            await self._reject(result, send)
+            return
+
+        remaining = str(result.remaining).encode()
+        limit_header = str(limit).encode()
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.append((b"x-ratelimit-limit", limit_header))
+                headers.append((b"x-ratelimit-remaining", remaining))
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    async def _reject(result: RateLimitResult, send: Send) -> None:
+        headers = [(k.lower().encode(), v.encode()) for k, v in result.headers().items()]
+        headers.append((b"content-type", b"application/json"))
+        headers.append((b"content-length", str(len(_TOO_MANY_REQUESTS_BODY)).encode()))
+        await send({"type": "http.response.start", "status": 429, "headers": headers})
+        await send({"type": "http.response.body", "body": _TOO_MANY_REQUESTS_BODY})
@@ -0,0 +1,79 @@
+"""
+Middleware ASGI de contexto y log de requests
+Asigna un request_id (o respeta el X-Request-ID entrante), lo devuelve en la
+respuesta y emite un evento "request" por cada request. Las respuestas
+exitosas y rápidas se muestrean con `sample_rate`; errores y requests lentos
+se registran siempre.
+"""
+import logging
+import random
+import time
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.log import new_log_context
+from src.utils.routing import route_template
+
+logger = logging.getLogger("iris.request")
+
+
+def _incoming_request_id(scope: Scope) -> str:
+    for name, value in scope.get("headers", ()):
+        if name == b"x-request-id":
+            request_id = value.decode("latin-1")
+            if 0 < len(request_id) <= 128 and request_id.isprintable():
+                return request_id
+            break
+    return uuid.uuid4().hex
+
+
+class RequestLoggingMiddleware:
+    """request_id por request y log estructurado con muestreo de los éxitos"""
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 1.0, slow_threshold_ms: float = 1000.0):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold_ms / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        request_id = _incoming_request_id(scope)
+        # No se resetea al terminar: cada request corre en su propia tarea y así
+        # el handler global de excepciones (más externo) todavía ve el contexto
+        new_log_context(request_id=request_id)
+        header = (b"x-request-id", request_id.encode("latin-1"))
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", ())) + [header]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            if status_code >= 500:
+                level = logging.ERROR
+            elif status_code >= 400 or elapsed >= self.slow_threshold:
+                level = logging.WARNING
+            elif self.sample_rate >= 1.0 or random.random() < self.sample_rate:
+                level = logging.INFO
+            else:
+                level = None
+
+            if level is not None and logger.isEnabledFor(level):
+                logger.log(level, "request", extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route_template(scope),
+                    "status": status_code,
+                    "duration_ms": round(elapsed * 1000, 2),
+                })
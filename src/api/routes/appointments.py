@@ -0,0 +1,192 @@
+"""
+Endpoints de Turnos (appointments) y Disponibilidad
+"""
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from postgrest.exceptions import APIError
+
+from src.core.auth import require_any_user
+from src.core.config import settings
+from src.database.repositories import AppointmentRepository, get_appointment_repository
+from src.models.user import AuthContext
+from src.schemas.appointments import (
+    AlternativeSlot,
+    AppointmentCreateSchema,
+    AppointmentResponse,
+    AvailabilityResponse,
+    BookingConflictResponse,
+)
+from src.services.availability import AvailabilitySnapshot, alternative_slots, snapshot_range
+from src.services.availability_cache import availability_cache, slots_by_employee
+from src.utils.serialization import trusted_response
+from src.utils.time import to_local
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Errores de validación de book_appointment (el message de RAISE EXCEPTION)
+BOOKING_ERRORS = {
+    "service_not_found": (status.HTTP_404_NOT_FOUND, "Servicio no encontrado"),
+    "employee_not_found": (status.HTTP_404_NOT_FOUND, "Empleado no encontrado o no realiza este servicio"),
+    "customer_not_found": (status.HTTP_404_NOT_FOUND, "El cliente no está adherido a este negocio."),
+    "outside_business_hours": (status.HTTP_422_UNPROCESSABLE_CONTENT, "El turno está fuera del horario de atención."),
+}
+
+
+def resolve_business_id(context: AuthContext, business_id: Optional[UUID]) -> str:
+    """
+    Negocio sobre el que opera el request: owners y empleados solo el propio;
+    los clientes (que pueden pertenecer a varios) deben indicarlo.
+    """
+    if context.role in ("owner", "employee"):
+        if business_id is not None and str(business_id) != context.business_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No tenés acceso a este negocio.")
+        if not context.business_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuario no asociado a ningún negocio")
+        return context.business_id
+    if business_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Indicá el business_id del salón.")
+    return str(business_id)
+
+
+@router.get("/availability", response_model=AvailabilityResponse)
+async def get_availability(
+    service_id: UUID,
+    date_from: date,
+    date_to: Optional[date] = Query(None, description="Inclusive; por defecto una semana desde date_from"),
+    employee_id: Optional[UUID] = None,
+    business_id: Optional[UUID] = None,
+    current_user: AuthContext = Depends(require_any_user),
+    appointments: AppointmentRepository = Depends(get_appointment_repository)
+):
+    """
+    Turnos libres para un servicio entre dos fechas (locales del salón),
+    agrupados por empleado. Con la cache de disponibilidad activa no consulta
+    la base si todos los días pedidos ya están cacheados.
+    """
+    date_to = date_to or date_from + timedelta(days=6)
+    if date_to < date_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_to debe ser posterior a date_from.")
+    if (date_to - date_from).days + 1 > settings.availability_max_days:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El rango máximo es de {settings.availability_max_days} días."
+        )
+
+    business = resolve_business_id(current_user, business_id)
+    service = str(service_id)
+    employee = str(employee_id) if employee_id else None
+    days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+
+    cached = availability_cache.lookup(business, service, days, employee)
+    if cached is None:
+        since = availability_cache.sequence
+        data = await appointments.availability_snapshot(business, service, *snapshot_range(date_from, date_to))
+        if not data or not data.get("business"):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Negocio no encontrado")
+        if not data.get("service"):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Servicio no encontrado")
+        cached = availability_cache.store(AvailabilitySnapshot.from_rpc(data), data, service, days, since)
+
+    catalog, view = cached
+    slots = slots_by_employee(catalog, view, settings.availability_slot_minutes, employee_id=employee)
+
+    # Armada acá con la forma de AvailabilityResponse: se serializa sin revalidar miles de turnos
+    tz = catalog.timezone
+    return trusted_response({
+        "business_id": business,
+        "service_id": service_id,
+        "duration_minutes": catalog.duration_minutes,
+        "timezone": str(tz),
+        "date_from": date_from,
+        "date_to": date_to,
+        "employees": [
+            {"employee_id": employee_id, "name": name, "slots": to_local(slots[employee_id], tz)}
+            for employee_id, name in catalog.employees
+            if employee_id in slots
+        ],
+    }, AvailabilityResponse)
+
+
+async def _booking_conflict(
+    appointments: AppointmentRepository, business_id: str, booking: AppointmentCreateSchema
+) -> HTTPException:
+    """409 con los turnos libres más cercanos al pedido"""
+    alternatives = []
+    day = booking.start_datetime.date()
+    data = await appointments.availability_snapshot(
+        business_id, str(booking.service_id), *snapshot_range(day - timedelta(days=1), day + timedelta(days=1))
+    )
+    if data and data.get("business") and data.get("service"):
+        snapshot = AvailabilitySnapshot.from_rpc(data)
+        alternatives = [
+            AlternativeSlot(employee_id=employee_id, start_datetime=datetime.fromtimestamp(t, snapshot.timezone))
+            for employee_id, t in alternative_slots(
+                snapshot,
+                booking.start_datetime,
+                str(booking.employee_id),
+                step_minutes=settings.availability_slot_minutes,
+                limit=settings.booking_alternatives,
+            )
+        ]
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": "El horario ya no está disponible.",
+            "alternatives": [a.model_dump(mode="json") for a in alternatives],
+        },
+    )
+
+
+@router.post(
+    "",
+    response_model=AppointmentResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_409_CONFLICT: {"model": BookingConflictResponse}},
+)
+async def create_appointment(
+    booking: AppointmentCreateSchema,
+    current_user: AuthContext = Depends(require_any_user),
+    appointments: AppointmentRepository = Depends(get_appointment_repository)
+):
+    """
+    Reservar un turno. La reserva es un solo insert protegido por el EXCLUDE
+    de appointments: si el horario se ocupó entre la consulta de
+    disponibilidad y la reserva, responde 409 con alternativas.
+    """
+    business_id = resolve_business_id(current_user, booking.business_id)
+    if current_user.role == "customer":
+        customer_id = current_user.user_id
+    elif booking.customer_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Indicá el customer_id del cliente.")
+    else:
+        customer_id = str(booking.customer_id)
+
+    if booking.start_datetime <= datetime.now(timezone.utc):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No se pueden reservar turnos en el pasado.")
+
+    try:
+        appointment = await appointments.book(
+            business_id,
+            customer_id,
+            str(booking.employee_id),
+            str(booking.service_id),
+            booking.start_datetime,
+            booking.notes,
+        )
+    except APIError as e:
+        if e.code == "23P01":
+            raise await _booking_conflict(appointments, business_id, booking)
+        if e.message in BOOKING_ERRORS:
+            code, detail = BOOKING_ERRORS[e.message]
+            raise HTTPException(status_code=code, detail=detail)
+        logger.exception("Error reservando turno")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error reservando el turno")
+
+    if not appointment:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error reservando el turno")
+    return appointment
@@ -1,280 +1,214 @@
 """
 Endpoints para Autenticación y Registro de Usuarios
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from supabase import Client
-from typing import Dict, Any
-import uuid
+from typing import List
 
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+
+from src.api.dependencies.rate_limit import BusinessRateLimit
+from src.core.auth import require_owner
 from src.core.config import settings
-from src.core.auth import get_current_user, require_owner
-from src.database.supabase import get_supabase, get_supabase_admin
+from src.database.repositories import (
+    AuthRepository,
+    BusinessRepository,
+    UserProfileRepository,
+    get_auth_repository,
+    get_business_repository,
+    get_profile_repository,
+)
+from src.models.user import AuthContext
+from src.services.emails import enqueue_welcome_email
+from src.services.employee_import import (
+    ImportFormatError,
+    import_employees,
+    parse_upload,
+    rows_from_schemas,
+)
+from src.services.registration import (
+    customer_registration,
+    employee_registration,
+    owner_registration,
+    registration_http_error,
+)
+from src.services.saga import SagaError
 from src.schemas.auth import (
     OwnerRegisterSchema,
     EmployeeRegisterSchema,
     CustomerRegisterSchema,
     RegisterResponse,
     UserPublic,
-    TokenSchema
+    TokenSchema,
+    BulkEmployeeRegisterResponse,
 )
 
 router = APIRouter()
 
+# Las importaciones masivas son costosas: límite compartido por negocio
+bulk_import_limit = BusinessRateLimit(requests=10, window=3600, scope="bulk_import")
+
+
+def _owner_business_id(current_user: AuthContext) -> str:
+    """business_id del owner autenticado (viene de RoleChecker)"""
+    if not current_user.business_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Owner no tiene business_id asociado.")
+    return current_user.business_id
+
+
 @router.post("/register/owner", response_model=RegisterResponse, status_code=status.HTTP_201_CREATED)
 async def register_owner(
     owner_data: OwnerRegisterSchema,
-    db: Client = Depends(get_supabase),
-    admin_db: Client = Depends(get_supabase_admin)
+    auth_repo: AuthRepository = Depends(get_auth_repository),
+    businesses: BusinessRepository = Depends(get_business_repository),
+    profiles: UserProfileRepository = Depends(get_profile_repository)
 ):
     """
     Registra un nuevo usuario propietario (owner) y crea su negocio inicial.
     Este endpoint es público para que cualquier persona pueda registrar su salón.
     """
-    new_user = None
     try:
-        # Crear usuario en Supabase Auth
-        user_response = admin_db.auth.admin.create_user({
+        result = await owner_registration.run({
+            "auth_repo": auth_repo,
+            "businesses": businesses,
+            "profiles": profiles,
             "email": owner_data.email,
             "password": owner_data.password,
-            "email_confirm": True,
         })
-        new_user = user_response.user
-
-        if not new_user:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No se pudo crear el usuario en Supabase Auth.")
-
-        # Generar código de acceso único para el negocio
-        access_code = str(uuid.uuid4())[:8].upper()
+    except SagaError as e:
+        raise registration_http_error(e)
 
-        # Crear el negocio (business) usando el cliente ADMIN
-        business_response = admin_db.table("businesses").insert({
-            "name": f"Salón de {owner_data.email.split('@')[0]}",
-            "address": "Dirección pendiente",
-            "access_code": access_code,
-            "is_active": True
-        }).execute()
+    # Construir la respuesta
+    new_user, session = result["create_user"], result["sign_in"]
+    enqueue_welcome_email(new_user.email, "owner")
+    user_public = UserPublic(id=new_user.id, email=new_user.email, role="owner")
+    token_schema = TokenSchema(access_token=session.access_token, refresh_token=session.refresh_token)
 
-        if not business_response.data:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="No se pudo crear el negocio.")
-        
-        new_business = business_response.data[0]
-
-        # Crear el perfil de usuario (user_profile) usando el cliente ADMIN
-        profile_response = admin_db.table("user_profiles").insert({
-            "id": new_user.id,
-            "role": "owner",
-            "business_id": new_business['id'],
-        }).execute()
-
-        if not profile_response.data:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="No se pudo crear el perfil de usuario.")
-
-        # Devolver Tokens
-        session_response = db.auth.sign_in_with_password({
-            "email": owner_data.email,
-            "password": owner_data.password
-        })
-        
-        if not session_response.session:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Usuario creado pero no se pudo iniciar sesión.")
-
-        # Construir la respuesta
-        user_public = UserPublic(id=new_user.id, email=new_user.email, role="owner")
-        token_schema = TokenSchema(access_token=session_response.session.access_token, refresh_token=session_response.session.refresh_token)
-        
-        return RegisterResponse(user=user_public, tokens=token_schema)
-
-    except Exception as e:
-        if new_user:
-            try:
-                admin_db.auth.admin.delete_user(new_user.id)
-            except Exception as delete_e:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Error crítico: Falló la creación y también el rollback. Usuario fantasma creado: {new_user.id}. Error original: {e}. Error de borrado: {delete_e}"
-                )
-        
-        if "duplicate key value violates unique constraint" in str(e) and "users_email_key" in str(e):
-             raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="El email ya está registrado."
-            )
-        
-        if isinstance(e, HTTPException):
-            raise e
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Ocurrió un error inesperado durante el registro: {e}"
-            )
+    return RegisterResponse(user=user_public, tokens=token_schema)
 
 
 @router.post("/register/employee", response_model=RegisterResponse, status_code=status.HTTP_201_CREATED)
 async def register_employee(
     employee_data: EmployeeRegisterSchema,
-    current_user: Dict[str, Any] = Depends(require_owner),
-    db: Client = Depends(get_supabase),
-    admin_db: Client = Depends(get_supabase_admin)
+    current_user: AuthContext = Depends(require_owner),
+    auth_repo: AuthRepository = Depends(get_auth_repository),
+    profiles: UserProfileRepository = Depends(get_profile_repository)
 ):
     """
     Permite a un propietario registrar un nuevo empleado.
     Solo los owners autenticados pueden acceder a este endpoint.
     """
-    new_user = None
-    try:
-        # Obtener business_id del owner autenticado (viene de RoleChecker)
-        business_id = current_user.get("business_id")
-        if not business_id:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Owner no tiene business_id asociado.")
+    business_id = _owner_business_id(current_user)
 
-        # Crear usuario en Supabase Auth
-        user_response = admin_db.auth.admin.create_user({
+    try:
+        result = await employee_registration.run({
+            "auth_repo": auth_repo,
+            "profiles": profiles,
+            "business_id": business_id,
             "email": employee_data.email,
             "password": employee_data.password,
-            "email_confirm": True,
         })
-        new_user = user_response.user
+    except SagaError as e:
+        raise registration_http_error(e)
 
-        if not new_user:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No se pudo crear el usuario en Supabase Auth.")
+    # Construir la respuesta
+    new_user, session = result["create_user"], result["sign_in"]
+    enqueue_welcome_email(new_user.email, "employee")
+    user_public = UserPublic(id=new_user.id, email=new_user.email, role="employee")
+    token_schema = TokenSchema(access_token=session.access_token, refresh_token=session.refresh_token)
 
-        # Crear el perfil de usuario (user_profile) usando el cliente ADMIN
-        profile_response = admin_db.table("user_profiles").insert({
-            "id": new_user.id,
-            "role": "employee",
-            "business_id": business_id,
-        }).execute()
+    return RegisterResponse(user=user_public, tokens=token_schema)
 
-        if not profile_response.data:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="No se pudo crear el perfil de usuario.")
 
-        # Devolver Tokens
-        session_response = db.auth.sign_in_with_password({
-            "email": employee_data.email,
-            "password": employee_data.password
-        })
+async def _bulk_register(rows, business_id, auth_repo, profiles) -> BulkEmployeeRegisterResponse:
+    results = await import_employees(
+        rows, business_id, auth_repo, profiles, concurrency=settings.bulk_import_concurrency
+    )
+    created = sum(1 for r in results if r.status == "created")
+    return BulkEmployeeRegisterResponse(
+        total=len(results), created=created, failed=len(results) - created, results=results
+    )
 
-        if not session_response.session:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Usuario creado pero no se pudo iniciar sesión.")
 
-        # Construir la respuesta
-        user_public = UserPublic(id=new_user.id, email=new_user.email, role="employee")
-        token_schema = TokenSchema(access_token=session_response.session.access_token, refresh_token=session_response.session.refresh_token)
+@router.post(
+    "/register/employees/bulk",
+    response_model=BulkEmployeeRegisterResponse,
+    dependencies=[Depends(bulk_import_limit)],
+)
+async def register_employees_bulk(
+    employees: List[EmployeeRegisterSchema],
+    current_user: AuthContext = Depends(require_owner),
+    auth_repo: AuthRepository = Depends(get_auth_repository),
+    profiles: UserProfileRepository = Depends(get_profile_repository)
+):
+    """
+    Permite a un propietario registrar varios empleados en una sola llamada.
+    Devuelve el resultado de cada fila; no inicia sesión por cada empleado.
+    """
+    business_id = _owner_business_id(current_user)
+    if len(employees) > settings.bulk_import_max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Se pueden importar como máximo {settings.bulk_import_max_rows} empleados por llamada."
+        )
 
-        return RegisterResponse(user=user_public, tokens=token_schema)
+    return await _bulk_register(rows_from_schemas(employees), business_id, auth_repo, profiles)
 
-    except Exception as e:
-        if new_user:
-            try:
-                admin_db.auth.admin.delete_user(new_user.id)
-            except Exception as delete_e:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Error crítico: Falló la creación y también el rollback. Usuario fantasma creado: {new_user.id}. Error original: {e}. Error de borrado: {delete_e}"
-                )
 
-        if "duplicate key value violates unique constraint" in str(e) and "users_email_key" in str(e):
-             raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="El email ya está registrado."
-            )
+@router.post(
+    "/register/employees/bulk/upload",
+    response_model=BulkEmployeeRegisterResponse,
+    dependencies=[Depends(bulk_import_limit)],
+)
+async def register_employees_bulk_upload(
+    file: UploadFile = File(..., description="CSV con encabezado (email,password,first_name,last_name) o NDJSON"),
+    current_user: AuthContext = Depends(require_owner),
+    auth_repo: AuthRepository = Depends(get_auth_repository),
+    profiles: UserProfileRepository = Depends(get_profile_repository)
+):
+    """
+    Igual que /register/employees/bulk pero a partir de un archivo CSV o NDJSON.
+    Las filas inválidas se reportan sin interrumpir la importación.
+    """
+    business_id = _owner_business_id(current_user)
+    try:
+        rows = await parse_upload(file, max_rows=settings.bulk_import_max_rows)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-        if isinstance(e, HTTPException):
-            raise e
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Ocurrió un error inesperado durante el registro: {e}"
-            )
+    return await _bulk_register(rows, business_id, auth_repo, profiles)
 
 
 @router.post("/register/customer", response_model=RegisterResponse, status_code=status.HTTP_201_CREATED)
 async def register_customer(
     customer_data: CustomerRegisterSchema,
-    db: Client = Depends(get_supabase),
-    admin_db: Client = Depends(get_supabase_admin)
+    auth_repo: AuthRepository = Depends(get_auth_repository),
+    profiles: UserProfileRepository = Depends(get_profile_repository)
 ):
     """
     Permite el auto-registro de clientes.
     Este endpoint es público y puede ser llamado por cualquier usuario no autenticado.
     """
-    new_user = None
     try:
-        # Crear usuario en Supabase Auth usando sign_up para auto-registro
-        user_response = db.auth.sign_up({
+        result = await customer_registration.run({
+            "auth_repo": auth_repo,
+            "profiles": profiles,
             "email": customer_data.email,
-            "password": customer_data.password
+            "password": customer_data.password,
         })
+    except SagaError as e:
+        raise registration_http_error(e)
 
-        if not user_response.user:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No se pudo crear el usuario en Supabase Auth.")
-
-        new_user = user_response.user
-
-        # Crear el perfil de usuario (user_profile) usando el cliente ADMIN
-        profile_response = admin_db.table("user_profiles").insert({
-            "id": new_user.id,
-            "role": "customer",
-            "business_id": None,  # Los clientes pueden pertenecer a múltiples negocios
-        }).execute()
-
-        if not profile_response.data:
-            # Si falla la creación del perfil, intentar eliminar el usuario
-            try:
-                admin_db.auth.admin.delete_user(new_user.id)
-            except:
-                pass  # Si no se puede eliminar, al menos reportar el error principal
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="No se pudo crear el perfil de usuario.")
-
-        # Verificar si tenemos tokens de la sesión
-        tokens = None
-        if user_response.session:
-            tokens = TokenSchema(
-                access_token=user_response.session.access_token,
-                refresh_token=user_response.session.refresh_token
-            )
-        else:
-            # Si no hay sesión (puede pasar con sign_up si requiere confirmación)
-            # Intentar hacer sign_in para obtener tokens
-            try:
-                session_response = db.auth.sign_in_with_password({
-                    "email": customer_data.email,
-                    "password": customer_data.password
-                })
-                if session_response.session:
-                    tokens = TokenSchema(
-                        access_token=session_response.session.access_token,
-                        refresh_token=session_response.session.refresh_token
-                    )
-            except:
-                # Si no se puede hacer sign_in, puede ser porque necesita confirmación de email
-                tokens = TokenSchema(access_token="pending_confirmation", refresh_token="pending_confirmation")
-
-        # Construir la respuesta
-        user_public = UserPublic(id=new_user.id, email=new_user.email, role="customer")
-
-        return RegisterResponse(user=user_public, tokens=tokens)
+    # Sin sesión el email requiere confirmación: un sign_in también fallaría
+    new_user, session = result["sign_up"].user, result["sign_up"].session
 
-    except Exception as e:
-        if new_user:
-            try:
-                admin_db.auth.admin.delete_user(new_user.id)
-            except Exception as delete_e:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Error crítico: Falló la creación y también el rollback. Usuario fantasma creado: {new_user.id}. Error original: {e}. Error de borrado: {delete_e}"
-                )
+    if session:
+        tokens = TokenSchema(access_token=session.access_token, refresh_token=session.refresh_token)
+        # Con confirmación pendiente la bienvenida no va antes del email de confirmación
+        enqueue_welcome_email(new_user.email, "customer")
+    else:
+        # Sin sesión: el email requiere confirmación antes de iniciar sesión
+        tokens = TokenSchema(access_token="pending_confirmation", refresh_token="pending_confirmation")
 
-        if "duplicate key value violates unique constraint" in str(e) and "users_email_key" in str(e):
-             raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="El email ya está registrado."
-            )
+    # Construir la respuesta
+    user_public = UserPublic(id=new_user.id, email=new_user.email, role="customer")
 
-        if isinstance(e, HTTPException):
-            raise e
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Ocurrió un error inesperado durante el registro: {e}"
-            )
+    return RegisterResponse(user=user_public, tokens=tokens)
@@ -0,0 +1,58 @@
+"""
+Endpoints públicos de Negocios: catálogo (datos, horarios y servicios activos)
+Las respuestas llevan ETag; un GET con If-None-Match vigente recibe 304 sin
+cuerpo y sin consultar la base.
+"""
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+
+from src.core.config import settings
+from src.database.repositories import BusinessRepository, get_business_repository
+from src.schemas.businesses import BusinessCatalogResponse
+from src.services.business_catalog import get_catalog, get_catalog_by_code
+from src.utils.http import etag_matches
+
+router = APIRouter()
+
+CATALOG_RESPONSES: Dict[int | str, Dict[str, Any]] = {
+    status.HTTP_304_NOT_MODIFIED: {"description": "El catálogo no cambió desde el ETag enviado"},
+    status.HTTP_404_NOT_FOUND: {"description": "Negocio no encontrado"},
+}
+
+
+def catalog_response(entry: Optional[Dict[str, Any]], if_none_match: Optional[str]) -> Response:
+    """200 con el cuerpo cacheado, o 304 si el cliente ya tiene esa versión"""
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Negocio no encontrado"
+        )
+    headers = {
+        "ETag": entry["etag"],
+        "Cache-Control": f"public, max-age={settings.catalog_max_age}, must-revalidate",
+    }
+    if etag_matches(if_none_match, entry["etag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+
+@router.get("/{business_id}/catalog", response_model=BusinessCatalogResponse, responses=CATALOG_RESPONSES)
+async def get_business_catalog(
+    business_id: UUID,
+    if_none_match: Optional[str] = Header(default=None),
+    businesses: BusinessRepository = Depends(get_business_repository)
+):
+    """Catálogo público de un negocio activo"""
+    return catalog_response(await get_catalog(str(business_id), businesses), if_none_match)
+
+
+@router.get("/by-code/{access_code}/catalog", response_model=BusinessCatalogResponse, responses=CATALOG_RESPONSES)
+async def get_business_catalog_by_code(
+    access_code: str,
+    if_none_match: Optional[str] = Header(default=None),
+    businesses: BusinessRepository = Depends(get_business_repository)
+):
+    """Catálogo público de un negocio, buscado por su código de acceso"""
+    return catalog_response(await get_catalog_by_code(access_code, businesses), if_none_match)
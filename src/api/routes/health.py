@@ -0,0 +1,34 @@
+"""
+Endpoints de liveness y readiness para el balanceador / orquestador
+"""
+import time
+from datetime import datetime, timezone
+
+from fastapi import APIRouter
+
+from src.services.health import health_monitor
+from src.utils.serialization import FastJSONResponse
+
+router = APIRouter()
+
+_started_at = time.monotonic()
+
+
+@router.get("/health")
+async def health_check():
+    """Liveness: el proceso responde. No consulta dependencias"""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "uptime_seconds": round(time.monotonic() - _started_at, 1),
+    }
+
+
+@router.get("/ready")
+async def readiness_check():
+    """
+    Readiness: último resultado de las sondas de Supabase (cacheado).
+    Responde 503 si alguna dependencia falla o el resultado es muy viejo.
+    """
+    snapshot = health_monitor.snapshot()
+    return FastJSONResponse(status_code=200 if snapshot["ready"] else 503, content=snapshot)
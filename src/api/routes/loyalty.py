@@ -0,0 +1,140 @@
+"""
+Endpoints de Puntos de fidelización
+"""
+import logging
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from postgrest.exceptions import APIError
+
+from src.api.routes.appointments import resolve_business_id
+from src.core.auth import require_any_user, require_owner
+from src.database.repositories import LoyaltyRepository, get_loyalty_repository
+from src.models.user import AuthContext
+from src.schemas.loyalty import (
+    LoyaltyAdjustResponse,
+    LoyaltyAdjustSchema,
+    LoyaltyBalanceResponse,
+    LoyaltyHistoryResponse,
+    LoyaltyRedeemResponse,
+    LoyaltyRedeemSchema,
+    LoyaltyVerifyResponse,
+)
+from src.services.loyalty import LOYALTY_ERRORS, enqueue_rebuild
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def resolve_customer_id(context: AuthContext, customer_id: Optional[UUID]) -> str:
+    """Los clientes operan sobre sus propios puntos; owners y empleados indican el cliente"""
+    if context.role == "customer":
+        if customer_id is not None and str(customer_id) != context.user_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Solo podés ver tus propios puntos.")
+        return context.user_id
+    if customer_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Indicá el customer_id del cliente.")
+    return str(customer_id)
+
+
+def _loyalty_error(e: APIError, action: str) -> HTTPException:
+    if e.message in LOYALTY_ERRORS:
+        code, detail = LOYALTY_ERRORS[e.message]
+        return HTTPException(status_code=code, detail=detail)
+    logger.exception("Error %s puntos", action)
+    return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error {action} los puntos")
+
+
+@router.get("/balance", response_model=LoyaltyBalanceResponse)
+async def get_balance(
+    business_id: Optional[UUID] = None,
+    customer_id: Optional[UUID] = None,
+    current_user: AuthContext = Depends(require_any_user),
+    loyalty: LoyaltyRepository = Depends(get_loyalty_repository)
+):
+    """Saldo de puntos de un cliente (lectura por clave del saldo materializado)"""
+    business = resolve_business_id(current_user, business_id)
+    customer = resolve_customer_id(current_user, customer_id)
+    balance = await loyalty.balance(customer, business) or {"balance": 0, "lifetime_earned": 0}
+    return LoyaltyBalanceResponse(customer_id=customer, business_id=business, **balance)
+
+
+@router.get("/history", response_model=LoyaltyHistoryResponse)
+async def get_history(
+    business_id: Optional[UUID] = None,
+    customer_id: Optional[UUID] = None,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    current_user: AuthContext = Depends(require_any_user),
+    loyalty: LoyaltyRepository = Depends(get_loyalty_repository)
+):
+    """Movimientos de puntos de un cliente, del más reciente al más viejo"""
+    business = resolve_business_id(current_user, business_id)
+    customer = resolve_customer_id(current_user, customer_id)
+    entries = await loyalty.history(customer, business, limit, offset)
+    return LoyaltyHistoryResponse(customer_id=customer, business_id=business, entries=entries)
+
+
+@router.post("/redeem", response_model=LoyaltyRedeemResponse, status_code=status.HTTP_201_CREATED)
+async def redeem_reward(
+    redeem: LoyaltyRedeemSchema,
+    current_user: AuthContext = Depends(require_any_user),
+    loyalty: LoyaltyRepository = Depends(get_loyalty_repository)
+):
+    """
+    Canjear una recompensa. Validar el saldo, registrar el canje y descontar
+    los puntos es una sola llamada a la base: dos canjes simultáneos no
+    pueden gastar los mismos puntos (el segundo responde 409).
+    """
+    business_id = resolve_business_id(current_user, redeem.business_id)
+    customer_id = resolve_customer_id(current_user, redeem.customer_id)
+    try:
+        result = await loyalty.redeem(
+            business_id,
+            customer_id,
+            str(redeem.reward_id),
+            str(redeem.appointment_id) if redeem.appointment_id else None,
+        )
+    except APIError as e:
+        raise _loyalty_error(e, "canjeando")
+
+    if not result:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error canjeando los puntos")
+    return result
+
+
+@router.post("/adjust", response_model=LoyaltyAdjustResponse)
+async def adjust_points(
+    adjustment: LoyaltyAdjustSchema,
+    current_user: AuthContext = Depends(require_owner),
+    loyalty: LoyaltyRepository = Depends(get_loyalty_repository)
+):
+    """Sumar o restar puntos a mano (queda registrado como movimiento 'adjusted')"""
+    if adjustment.points == 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El ajuste no puede ser de 0 puntos.")
+    business_id = resolve_business_id(current_user, None)
+    try:
+        balance = await loyalty.adjust(
+            business_id, str(adjustment.customer_id), adjustment.points, adjustment.description
+        )
+    except APIError as e:
+        raise _loyalty_error(e, "ajustando")
+    return LoyaltyAdjustResponse(customer_id=adjustment.customer_id, balance=balance)
+
+
+@router.get("/verify", response_model=LoyaltyVerifyResponse)
+async def verify_balances(
+    current_user: AuthContext = Depends(require_owner),
+    loyalty: LoyaltyRepository = Depends(get_loyalty_repository)
+):
+    """Saldos del negocio que no coinciden con su historial de movimientos"""
+    business_id = resolve_business_id(current_user, None)
+    return LoyaltyVerifyResponse(mismatches=await loyalty.verify(business_id))
+
+
+@router.post("/rebuild", status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_balances(current_user: AuthContext = Depends(require_owner)):
+    """Recalcular los saldos del negocio desde el historial (en segundo plano)"""
+    enqueue_rebuild(resolve_business_id(current_user, None))
+    return {"message": "Recálculo de saldos encolado"}
@@ -0,0 +1,37 @@
+"""
+Endpoint de métricas en formato de texto de Prometheus
+Requiere `Authorization: Bearer <METRICS_TOKEN>` (o ADMIN_SECRET si no hay un
+token propio para el scraper): las métricas exponen rutas, volumen y errores.
+"""
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from src.core.config import settings
+from src.core.metrics import registry
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+bearer = HTTPBearer(auto_error=False)
+
+
+async def require_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer)) -> None:
+    """Token del scraper (METRICS_TOKEN, o ADMIN_SECRET si no está configurado)"""
+    expected = settings.metrics_token or settings.admin_secret
+    if credentials is None or not secrets.compare_digest(credentials.credentials.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de métricas inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    """Métricas del proceso (requests, llamadas a Supabase, pasos de sagas)"""
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,57 @@
+"""
+Endpoints de Onboarding de Owners
+Alta completa del salón (negocio, perfil, horarios, servicios y empleados)
+en una sola transacción de base de datos
+"""
+from fastapi import APIRouter, Depends, status
+
+from src.database.repositories import (
+    AuthRepository,
+    BusinessRepository,
+    get_auth_repository,
+    get_business_repository,
+)
+from src.services.emails import enqueue_welcome_email
+from src.services.registration import owner_onboarding, registration_http_error
+from src.services.saga import SagaError
+from src.schemas.auth import TokenSchema, UserPublic
+from src.schemas.onboarding import OnboardedBusiness, OnboardingResponse, OwnerOnboardingSchema
+
+router = APIRouter()
+
+
+@router.post("/owner", response_model=OnboardingResponse, status_code=status.HTTP_201_CREATED)
+async def onboard_owner(
+    onboarding_data: OwnerOnboardingSchema,
+    auth_repo: AuthRepository = Depends(get_auth_repository),
+    businesses: BusinessRepository = Depends(get_business_repository)
+):
+    """
+    Registra un owner y da de alta su salón completo.
+    El usuario se crea en Supabase Auth y todo lo demás se escribe con la
+    función onboard_owner: una transacción y un round trip a PostgREST.
+    """
+    payload = onboarding_data.model_dump(mode="json", exclude={"email", "password"})
+
+    try:
+        result = await owner_onboarding.run({
+            "auth_repo": auth_repo,
+            "businesses": businesses,
+            "email": onboarding_data.email,
+            "password": onboarding_data.password,
+            "onboarding": payload,
+        })
+    except SagaError as e:
+        raise registration_http_error(e)
+
+    # Construir la respuesta
+    new_user, session, onboarded = result["create_user"], result["sign_in"], result["onboard"]
+    enqueue_welcome_email(new_user.email, "owner")
+
+    return OnboardingResponse(
+        user=UserPublic(id=new_user.id, email=new_user.email, role="owner"),
+        tokens=TokenSchema(access_token=session.access_token, refresh_token=session.refresh_token),
+        business=OnboardedBusiness(**onboarded["business"]),
+        services_created=len(onboarded.get("services") or []),
+        employees_created=len(onboarded.get("employees") or []),
+    )
@@ -0,0 +1,118 @@
+"""
+Endpoints de Promociones
+Los clientes ven las vigentes, resueltas en memoria (src/services/promotions.py);
+los owners las administran y sus cambios se aplican al índice en el momento.
+"""
+import logging
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from postgrest.exceptions import APIError
+
+from src.api.routes.appointments import resolve_business_id
+from src.core.auth import require_any_user, require_owner
+from src.database.repositories import PromotionRepository, get_promotion_repository
+from src.models.user import AuthContext
+from src.schemas.promotions import (
+    ActivePromotionsResponse,
+    PromotionCreateSchema,
+    PromotionResponse,
+    PromotionUpdateSchema,
+)
+from src.services.promotions import promotion_index
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+INVALID_RANGE = "valid_until debe ser posterior a valid_from."
+
+
+def _save_error(e: APIError, action: str) -> HTTPException:
+    # CHECK (valid_until > valid_from) con un solo extremo en el PATCH
+    if e.code == "23514":
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_RANGE)
+    logger.exception("Error %s promoción", action)
+    return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error {action} la promoción")
+
+
+@router.get("", response_model=ActivePromotionsResponse)
+async def get_active_promotions(
+    business_id: Optional[UUID] = None,
+    current_user: AuthContext = Depends(require_any_user),
+    promotions: PromotionRepository = Depends(get_promotion_repository)
+):
+    """
+    Promociones vigentes del salón (valid_from <= ahora <= valid_until).
+    Con el negocio ya cargado en el worker no consulta la base.
+    """
+    business = resolve_business_id(current_user, business_id)
+    active = await promotion_index.active(business, promotions)
+    return ActivePromotionsResponse(business_id=business, promotions=list(active))
+
+
+@router.get("/all", response_model=List[PromotionResponse])
+async def list_promotions(
+    current_user: AuthContext = Depends(require_owner),
+    promotions: PromotionRepository = Depends(get_promotion_repository)
+):
+    """Todas las promociones del negocio (vigentes, futuras, vencidas e inactivas)"""
+    return await promotions.list_all(resolve_business_id(current_user, None))
+
+
+@router.post("", response_model=PromotionResponse, status_code=status.HTTP_201_CREATED)
+async def create_promotion(
+    promotion: PromotionCreateSchema,
+    current_user: AuthContext = Depends(require_owner),
+    promotions: PromotionRepository = Depends(get_promotion_repository)
+):
+    """Crear una promoción"""
+    if promotion.valid_until <= promotion.valid_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_RANGE)
+    business_id = resolve_business_id(current_user, None)
+    try:
+        created = await promotions.create({**promotion.model_dump(mode="json"), "business_id": business_id})
+    except APIError as e:
+        raise _save_error(e, "creando")
+    if not created:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error creando la promoción")
+    promotion_index.put(business_id, created)
+    return created
+
+
+@router.patch("/{promotion_id}", response_model=PromotionResponse)
+async def update_promotion(
+    promotion_id: UUID,
+    changes: PromotionUpdateSchema,
+    current_user: AuthContext = Depends(require_owner),
+    promotions: PromotionRepository = Depends(get_promotion_repository)
+):
+    """Editar una promoción (solo los campos enviados)"""
+    values = changes.model_dump(mode="json", exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No hay cambios para aplicar.")
+    if changes.valid_from and changes.valid_until and changes.valid_until <= changes.valid_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_RANGE)
+    business_id = resolve_business_id(current_user, None)
+    try:
+        updated = await promotions.update(business_id, str(promotion_id), values)
+    except APIError as e:
+        raise _save_error(e, "actualizando")
+    if not updated:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Promoción no encontrada")
+    promotion_index.put(business_id, updated)
+    return updated
+
+
+@router.delete("/{promotion_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_promotion(
+    promotion_id: UUID,
+    current_user: AuthContext = Depends(require_owner),
+    promotions: PromotionRepository = Depends(get_promotion_repository)
+):
+    """Eliminar una promoción"""
+    business_id = resolve_business_id(current_user, None)
+    if not await promotions.delete(business_id, str(promotion_id)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Promoción no encontrada")
+    promotion_index.remove(business_id, str(promotion_id))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
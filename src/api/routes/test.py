@@ -1,10 +1,26 @@
 """
 Endpoints de testing para verificar configuración
+Los que devuelven datos de la base o de las caches responden con
+FastJSONResponse: se serializan directo, sin pasar por jsonable_encoder.
 """
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException
-from supabase import Client
-from src.database.supabase import get_supabase, get_supabase_admin
+from src.database.repositories import (
+    BusinessRepository,
+    TableRepository,
+    get_admin_table_repository,
+    get_public_business_repository,
+    get_table_repository,
+)
 from src.core.auth import get_current_user
+from src.models.user import AuthContext
+from src.services.access_codes import access_code_index
+from src.services.availability_cache import availability_cache
+from src.services.business_catalog import catalog_cache
+from src.services.profile_cache import profile_cache
+from src.services.promotions import promotion_index
+from src.utils.serialization import FastJSONResponse
 from typing import Dict, Any
 
 router = APIRouter()
@@ -17,18 +33,18 @@ async def ping():
 
 
 @router.get("/supabase-connection")
-async def test_supabase_connection(supabase: Client = Depends(get_supabase)):
+async def test_supabase_connection(tables: TableRepository = Depends(get_table_repository)):
     """Testear conexión con Supabase"""
     try:
         # Test simple: obtener info del proyecto
-        response = supabase.table("businesses").select("id").limit(1).execute()
+        data = await tables.sample("businesses", "id")
 
-        return {
+        return FastJSONResponse({
             "status": "connected",
             "message": "Conexión con Supabase exitosa",
             "tables_accessible": True,
-            "response_data": response.data
-        }
+            "response_data": data
+        })
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -37,11 +53,9 @@ async def test_supabase_connection(supabase: Client = Depends(get_supabase)):
 
 
 @router.get("/database-test")
-async def test_database_access(supabase: Client = Depends(get_supabase_admin)):
+async def test_database_access(tables: TableRepository = Depends(get_admin_table_repository)):
     """Testear acceso a las tablas principales"""
     try:
-        tables_status = {}
-
         # Testear acceso a cada tabla principal
         main_tables = [
             "businesses",
@@ -52,24 +66,28 @@ async def test_database_access(supabase: Client = Depends(get_supabase_admin)):
             "promotions"
         ]
 
-        for table in main_tables:
+        async def check_table(table: str) -> Dict[str, Any]:
             try:
-                response = supabase.table(table).select("*").limit(1).execute()
-                tables_status[table] = {
+                data = await tables.sample(table)
+                return {
                     "accessible": True,
-                    "count": len(response.data)
+                    "count": len(data)
                 }
             except Exception as e:
-                tables_status[table] = {
+                return {
                     "accessible": False,
                     "error": str(e)
                 }
 
-        return {
+        # Las tablas se consultan en paralelo
+        results = await asyncio.gather(*(check_table(table) for table in main_tables))
+        tables_status = dict(zip(main_tables, results))
+
+        return FastJSONResponse({
             "status": "success",
             "message": "Test de acceso a base de datos completado",
             "tables": tables_status
-        }
+        })
 
     except Exception as e:
         raise HTTPException(
@@ -79,47 +97,48 @@ async def test_database_access(supabase: Client = Depends(get_supabase_admin)):
 
 
 @router.get("/auth-test")
-async def test_auth(current_user: Dict[str, Any] = Depends(get_current_user)):
+async def test_auth(current_user: AuthContext = Depends(get_current_user)):
     """Testear autenticación (requiere token válido)"""
     return {
         "status": "authenticated",
         "message": "Autenticación funcionando correctamente",
-        "user_id": current_user.get("id"),
-        "user_email": current_user.get("email"),
-        "user_metadata": current_user.get("user_metadata", {})
+        "user_id": current_user.user_id,
+        "user_email": current_user.email,
+        "user_metadata": dict(current_user.user_metadata)
     }
 
 
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """Contadores de las caches de perfiles, disponibilidad, catálogo y códigos de acceso"""
+    return FastJSONResponse({
+        "status": "ok",
+        "profile_cache": profile_cache.stats(),
+        "availability_cache": availability_cache.stats(),
+        "catalog_cache": catalog_cache.stats(),
+        "access_codes": access_code_index.stats(),
+        "promotions": promotion_index.stats()
+    })
+
+
 @router.get("/example-business")
-async def get_example_business(supabase: Client = Depends(get_supabase)):
+async def get_example_business(businesses: BusinessRepository = Depends(get_public_business_repository)):
     """Obtener el negocio de ejemplo creado en el script SQL"""
     try:
-        response = supabase.table("businesses").select("""
-            id,
-            name,
-            address,
-            access_code,
-            services (
-                id,
-                name,
-                price,
-                duration_minutes,
-                points_awarded
-            )
-        """).eq("name", "Salón de Belleza Ejemplo").execute()
-
-        if not response.data:
+        business = await businesses.get_with_services_by_name("Salón de Belleza Ejemplo")
+
+        if not business:
             return {
                 "status": "not_found",
                 "message": "No se encontró el negocio de ejemplo",
                 "suggestion": "Verifica que el script SQL se ejecutó correctamente"
             }
 
-        return {
+        return FastJSONResponse({
             "status": "found",
             "message": "Negocio de ejemplo encontrado",
-            "business": response.data[0]
-        }
+            "business": business
+        })
 
     except Exception as e:
         raise HTTPException(
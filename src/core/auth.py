@@ -2,46 +2,124 @@
 Sistema de autenticación simplificado con Supabase
 Solo validación de tokens JWT de Supabase
 """
-from typing import Dict, Any
-from fastapi import HTTPException, status, Depends
+import logging
+
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from src.database.supabase import get_supabase, get_supabase_admin
-from supabase import Client
+from src.core.config import settings
+from src.core.log import bind_log_context, get_log_context
+from src.core.security import NoLocalKeyError, TokenVerificationError, token_verifier
+from src.database.repositories import (
+    AuthRepository,
+    UserProfileRepository,
+    get_auth_repository,
+    get_profile_repository,
+)
+from src.models.user import AuthContext
+from src.services.profile_cache import profile_cache
+
+logger = logging.getLogger(__name__)
 
 # Bearer token scheme
 security = HTTPBearer()
 
+# Atributo de request.state donde se guarda el contexto resuelto
+AUTH_CONTEXT_STATE = "auth_context"
+
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    supabase: Client = Depends(get_supabase)
-) -> Dict[str, Any]:
+    auth_repo: AuthRepository = Depends(get_auth_repository)
+) -> AuthContext:
     """
     Obtener usuario actual validando el token JWT de Supabase
     El token viene del frontend que se autenticó con Supabase
     """
+    cached = getattr(request.state, AUTH_CONTEXT_STATE, None)
+    if cached is not None:
+        return cached
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token inválido o expirado",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        # Supabase valida automáticamente el JWT
-        user_response = supabase.auth.get_user(credentials.credentials)
+    mode = settings.auth_verification_mode
+    token = credentials.credentials
+    context = None
 
-        if not user_response.user:
+    # Verificación local: firma, expiración, audiencia y emisor en proceso.
+    # Un token HS256 sin JWT secret configurado (solo JWKS) se verifica en remoto
+    if mode != "remote" and token_verifier.can_verify_locally:
+        try:
+            context = AuthContext.from_claims(await token_verifier.verify(token))
+        except NoLocalKeyError:
+            pass
+        except TokenVerificationError:
             raise credentials_exception
 
-        return {
-            "id": user_response.user.id,
-            "email": user_response.user.email,
-            "user_metadata": user_response.user.user_metadata or {},
-            "app_metadata": user_response.user.app_metadata or {}
-        }
+    # Verificación remota contra Supabase Auth (detecta tokens revocados)
+    if context is None or mode == "hybrid":
+        try:
+            # Supabase valida automáticamente el JWT
+            user = await auth_repo.get_user(token)
+        except Exception:
+            raise credentials_exception
+
+        if not user:
+            raise credentials_exception
 
+        if context is None:
+            context = AuthContext.from_claims({
+                "sub": user.id,
+                "email": user.email,
+                "user_metadata": user.user_metadata or {},
+                "app_metadata": user.app_metadata or {}
+            })
+
+    setattr(request.state, AUTH_CONTEXT_STATE, context)
+    bind_log_context(user_id=context.user_id)
+    return context
+
+
+async def get_auth_context(
+    request: Request,
+    current_user: AuthContext = Depends(get_current_user),
+    profiles: UserProfileRepository = Depends(get_profile_repository)
+) -> AuthContext:
+    """
+    Contexto de autenticación con rol y business_id desde user_profiles.
+    El perfil se resuelve como mucho una vez por request y se comparte
+    entre todos los RoleChecker.
+    """
+    if current_user.has_profile:
+        return current_user
+
+    # Consultar el rol desde user_profiles usando admin client (con cache)
+    try:
+        user_id = current_user.user_id
+        user_profile = await profile_cache.get_or_load(
+            user_id, lambda: profiles.get_role(user_id)
+        )
     except Exception:
-        raise credentials_exception
+        logger.exception("Error al cargar el perfil de usuario")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al verificar permisos (request_id: {get_log_context().get('request_id')})"
+        )
+
+    if not user_profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Perfil de usuario no encontrado"
+        )
+
+    context = current_user.with_profile(user_profile["role"], user_profile["business_id"])
+    setattr(request.state, AUTH_CONTEXT_STATE, context)
+    bind_log_context(business_id=context.business_id)
+    return context
 
 
 class RoleChecker:
@@ -50,46 +128,20 @@ class RoleChecker:
     """
 
     def __init__(self, allowed_roles: list):
-        self.allowed_roles = allowed_roles
+        self.allowed_roles = frozenset(allowed_roles)
 
     async def __call__(
         self,
-        current_user: Dict[str, Any] = Depends(get_current_user),
-        supabase: Client = Depends(get_supabase_admin)
-    ):
-        # Consultar el rol desde user_profiles usando admin client
-        try:
-            user_profile = supabase.table("user_profiles").select("role, business_id").eq("id", current_user["id"]).execute()
-
-            if not user_profile.data:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Perfil de usuario no encontrado"
-                )
-
-            user_role = user_profile.data[0]["role"]
-            business_id = user_profile.data[0]["business_id"]
-
-            if user_role not in self.allowed_roles:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Permisos insuficientes para esta operación"
-                )
-
-            # Agregar rol y business_id al current_user
-            current_user["role"] = user_role
-            current_user["business_id"] = business_id
-
-            return current_user
-
-        except HTTPException:
-            raise
-        except Exception as e:
+        context: AuthContext = Depends(get_auth_context)
+    ) -> AuthContext:
+        if context.role not in self.allowed_roles:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al verificar permisos: {str(e)}"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Permisos insuficientes para esta operación"
             )
 
+        return context
+
 
 # Checkers de roles para usar como dependencies
 require_owner = RoleChecker(["owner"])
@@ -97,30 +149,24 @@ require_employee = RoleChecker(["owner", "employee"])
 require_any_user = RoleChecker(["owner", "employee", "customer"])
 
 
-def get_user_business_id(current_user: Dict[str, Any]) -> str:
+def get_user_business_id(context: AuthContext) -> str:
     """
     Extraer business_id del usuario para filtros multi-tenant
     """
-    business_id = (
-        current_user.get("app_metadata", {}).get("business_id") or
-        current_user.get("user_metadata", {}).get("business_id")
-    )
-
-    if not business_id:
+    if not context.business_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Usuario no asociado a ningún negocio"
         )
 
-    return business_id
+    return context.business_id
 
 
 async def get_current_user_with_business(
-    current_user: Dict[str, Any] = Depends(get_current_user)
-) -> Dict[str, Any]:
+    context: AuthContext = Depends(get_auth_context)
+) -> AuthContext:
     """
-    Obtener usuario actual con business_id validado
+    Obtener usuario actual con business_id validado (desde user_profiles)
     """
-    business_id = get_user_business_id(current_user)
-    current_user["business_id"] = business_id
-    return current_user
\ No newline at end of file
+    get_user_business_id(context)
+    return context
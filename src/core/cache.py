@@ -0,0 +1,185 @@
+"""
+Cache en proceso con TTL + LRU y backend intercambiable
+El backend "redis" permite que varios workers compartan la misma cache
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.core.config import FromSettings, settings
+
+_redis = None
+
+
+def get_redis():
+    """Cliente Redis compartido por el proceso (se crea al primer uso)"""
+    global _redis
+    if _redis is None:
+        import redis.asyncio as redis
+
+        if not settings.redis_url:
+            raise RuntimeError("REDIS_URL no está configurada")
+        _redis = redis.from_url(settings.redis_url, decode_responses=True)
+    return _redis
+
+
+async def close_redis() -> None:
+    """Cerrar el cliente Redis compartido (apagado de la aplicación)"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+class CacheBackend:
+    """Interfaz de almacenamiento para Cache"""
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Backend en memoria del proceso, acotado por tamaño (LRU) y TTL"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.evictions = 0
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend compartido entre workers sobre Redis (o un servidor compatible)"""
+
+    def __init__(self, namespace: str):
+        self.prefix = f"iris:{namespace}:"
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await get_redis().get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await get_redis().set(self.prefix + key, json.dumps(value), px=int(ttl * 1000))
+
+    async def delete(self, key: str) -> None:
+        await get_redis().delete(self.prefix + key)
+
+    async def clear(self) -> None:
+        redis = get_redis()
+        async for key in redis.scan_iter(match=self.prefix + "*"):
+            await redis.delete(key)
+
+
+def create_cache_backend(namespace: str, max_size: int) -> CacheBackend:
+    """Crear el backend configurado en settings.cache_backend"""
+    if settings.cache_backend == "redis":
+        return RedisCacheBackend(namespace)
+    return MemoryCacheBackend(max_size)
+
+
+class Cache:
+    """
+    Cache con TTL, contadores de aciertos/fallos y backend intercambiable.
+    Las subclases pueden declarar `ttl` y `max_size` con FromSettings (por
+    defecto cache_ttl y cache_max_size); el backend se crea en el primer uso.
+    """
+
+    ttl = FromSettings("cache_ttl")
+    max_size = FromSettings("cache_max_size")
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: Optional[float] = None,
+        max_size: Optional[int] = None,
+        backend: Optional[CacheBackend] = None,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_size = max_size
+        self._backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self) -> CacheBackend:
+        if self._backend is None:
+            self._backend = create_cache_backend(self.namespace, self.max_size)
+        return self._backend
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self.backend.set(key, value, ttl if ttl is not None else self.ttl)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """Leer de la cache o cargar con `loader` (los valores None no se cachean)"""
+        value = await self.get(key)
+        if value is None:
+            value = await loader()
+            if value is not None:
+                await self.set(key, value)
+        return value
+
+    async def invalidate(self, key: str) -> None:
+        await self.backend.delete(key)
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de uso de la cache"""
+        total = self.hits + self.misses
+        stats: Dict[str, Any] = {
+            "namespace": self.namespace,
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+        if isinstance(self.backend, MemoryCacheBackend):
+            stats["size"] = len(self.backend)
+            stats["evictions"] = self.backend.evictions
+        return stats
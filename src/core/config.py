@@ -1,8 +1,11 @@
 """
 Configuración principal de la aplicación IRIS
+El entorno (.env) se lee en el primer acceso a `settings`, no al importar:
+importar módulos no exige las variables de entorno.
 """
 import os
-from typing import List
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Union
 
 from pydantic_settings import BaseSettings
 
@@ -18,12 +21,43 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
 
+    # Servidor de producción (python -m src.server: gunicorn + workers uvicorn)
+    web_workers: Optional[int] = None  # None: uno por CPU disponible
+    # Mayor que el idle timeout del balanceador (60 s en ALB) para evitar 502
+    web_keepalive: int = 75
+    web_timeout: int = 60  # Un worker que no responde en este tiempo se reinicia
+    web_graceful_timeout: int = 30  # Espera a los requests en curso al apagar o reciclar
+    web_max_requests: int = 10000  # Reciclar cada worker tras N requests (0 = nunca)
+    web_max_requests_jitter: int = 1000  # Para que los workers no se reciclen a la vez
+    web_preload: bool = True  # Importar la app una vez en el master antes del fork
+    web_backlog: int = 2048
+    web_forwarded_allow_ips: str = "127.0.0.1"
+
     # Supabase
     supabase_url: str
     supabase_anon_key: str
     supabase_service_role_key: str
+    # Conexión directa a Postgres (no el pooler en modo transacción) para
+    # LISTEN/NOTIFY; sin ella la cache de disponibilidad queda deshabilitada
+    database_url: Optional[str] = None
+
+    # Pool HTTP compartido por los clientes de Supabase
+    supabase_http_max_connections: int = 100
+    supabase_http_max_keepalive: int = 20
+    supabase_http_keepalive_expiry: float = 30.0
+    supabase_http_timeout: float = 10.0
+    supabase_http_connect_timeout: float = 5.0
+    supabase_http_retries: int = 0
 
     # Supabase Auth (no necesitamos JWT propio)
+    # Verificación de tokens: "local" (firma + claims en proceso),
+    # "remote" (auth.get_user en cada request) o "hybrid" (local + remota)
+    auth_verification_mode: str = "local"
+    supabase_jwt_secret: Optional[str] = None
+    jwt_audience: str = "authenticated"
+    jwt_issuer: Optional[str] = None  # Por defecto {supabase_url}/auth/v1
+    jwt_leeway: int = 10
+    jwks_refresh_interval: int = 600
 
     # Security
     admin_secret: str
@@ -31,15 +65,93 @@ class Settings(BaseSettings):
     # CORS
     allowed_origins: str = "http://localhost:3000,http://localhost:3001"
 
-    # Logging
+    # Logging ("json" para producción, "text" legible para desarrollo)
     log_level: str = "DEBUG"
+    log_format: str = "json"
+    log_sample_rate: float = 1.0  # Fracción de requests exitosos que se registran
+    log_slow_request_ms: float = 1000.0  # Los requests más lentos se registran siempre
 
     # Timezone
     default_timezone: str = "America/Argentina/Buenos_Aires"
 
-    # Rate Limiting
+    # Cache ("memory" por proceso o "redis" compartida entre workers)
+    cache_backend: str = "memory"
+    redis_url: Optional[str] = None
+    # TTL y tamaño de las caches que no declaran los suyos
+    cache_ttl: int = 300
+    cache_max_size: int = 10000
+    profile_cache_ttl: int = 300
+    profile_cache_max_size: int = 10000
+
+    # Métricas (/metrics) y header Server-Timing con el desglose por request
+    metrics_enabled: bool = True
+    metrics_server_timing: bool = False
+    # Bearer token del scraper para /metrics (sin configurar se usa ADMIN_SECRET)
+    metrics_token: Optional[str] = None
+
+    # Health checks (/ready sirve el último resultado de sondas en segundo plano)
+    health_check_interval: float = 15.0
+    health_check_timeout: float = 3.0
+    health_check_max_age: float = 60.0
+
+    # Turnos: granularidad de los inicios y rango máximo de una consulta
+    availability_slot_minutes: int = 15
+    availability_max_days: int = 31
+    # Alternativas que se sugieren cuando el horario pedido ya está ocupado (409)
+    booking_alternatives: int = 5
+    # Cache de disponibilidad por (negocio, empleado, día), actualizada por eventos
+    availability_cache_ttl: float = 300.0
+    availability_cache_max_entries: int = 50000
+
+    # Catálogo público de negocios (cacheado con ETag; max-age 0 = revalidar siempre)
+    catalog_cache_ttl: int = 300
+    catalog_cache_max_size: int = 5000
+    catalog_max_age: int = 0
+
+    # Códigos de acceso: cuánto se recuerda una consulta a la base, el código exista o no
+    # (sin LISTEN activo); el tamaño máximo vale para cada una de las dos caches
+    access_code_negative_ttl: float = 60.0
+    access_code_negative_max_size: int = 10000
+
+    # Promociones vigentes en memoria por negocio (los NOTIFY las invalidan antes del TTL)
+    promotions_cache_ttl: float = 300.0
+    promotions_cache_max_businesses: int = 5000
+
+    # Importación masiva de empleados
+    bulk_import_max_rows: int = 500
+    bulk_import_concurrency: int = 10
+
+    # Cola de trabajos en segundo plano (tabla jobs, ver jobs_schema.sql)
+    jobs_enabled: bool = True  # Ejecutar trabajos en este proceso (encolar funciona igual)
+    jobs_concurrency: int = 10
+    jobs_poll_interval: float = 5.0  # Con LISTEN activo los inserts despiertan antes
+    jobs_lease_seconds: int = 300  # Un trabajo "running" más viejo se reintenta
+    jobs_retry_base: float = 30.0  # Backoff exponencial: base * 2^(intento - 1)
+    jobs_retry_max: float = 3600.0
+    jobs_retention_days: int = 7  # Trabajos terminados que se conservan
+
+    # Recordatorios de turnos
+    reminder_lead_hours: float = 24.0
+    reminder_scan_interval: float = 60.0
+
+    # Email (SMTP); sin SMTP_HOST los emails solo se registran en el log
+    smtp_host: Optional[str] = None
+    smtp_port: int = 587
+    smtp_username: Optional[str] = None
+    smtp_password: Optional[str] = None
+    smtp_starttls: bool = True
+    smtp_timeout: float = 10.0
+    email_from: str = "IRIS <no-reply@iris-app.com>"
+
+    # Rate Limiting (token bucket por IP; "memory" por proceso o "redis" compartido)
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"
     rate_limit_requests: int = 100
     rate_limit_window: int = 60
+    rate_limit_register_requests: int = 5
+    rate_limit_register_window: int = 60
+    rate_limit_trust_proxy: bool = False
+    rate_limit_max_keys: int = 100000
 
     @property
     def cors_origins(self) -> List[str]:
@@ -52,5 +164,49 @@ class Settings(BaseSettings):
         extra = "ignore"  # Ignorar variables extra del .env
 
 
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Leer la configuración (una vez por proceso; cache_clear() para releerla)"""
+    return Settings()
+
+
+class LazySettings:
+    """Acceso a los atributos de Settings que construye la configuración en el primer uso"""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+
+class FromSettings:
+    """
+    Atributo cuyo valor por defecto se toma de settings al leerlo: el nombre
+    de un campo o una función de Settings. Asignar un valor distinto de None
+    en la instancia lo reemplaza.
+    """
+
+    def __init__(self, source: Union[str, Callable[[Settings], Any]]):
+        self.source = source
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            pass
+        if callable(self.source):
+            return self.source(get_settings())
+        return getattr(get_settings(), self.source)
+
+    def __set__(self, instance: Any, value: Any) -> None:
+        if value is None:
+            instance.__dict__.pop(self.name, None)
+        else:
+            instance.__dict__[self.name] = value
+
+
 # Instancia global de configuración
-settings = Settings()
\ No newline at end of file
+settings = LazySettings()
\ No newline at end of file
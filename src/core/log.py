@@ -0,0 +1,164 @@
+"""
+Logging estructurado (JSON) asíncrono
+Los registros salen del event loop por una cola (QueueHandler) y un hilo
+(QueueListener) los serializa y escribe. El contexto del request
+(request_id, user_id, business_id) viaja en un contextvar que completan el
+middleware de requests y las dependencies de autenticación.
+"""
+import logging
+import logging.handlers
+import queue
+import sys
+import traceback
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+
+    def _dumps(data: Dict[str, Any]) -> str:
+        return orjson.dumps(data, default=str).decode()
+except ImportError:  # pragma: no cover - orjson es opcional
+    import json
+
+    def _dumps(data: Dict[str, Any]) -> str:
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+# Diccionario mutable por request: lo comparten las tareas hijas y las dependencies
+_log_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar("log_context", default=None)
+
+CONTEXT_FIELDS = ("request_id", "user_id", "business_id")
+
+# Atributos estándar de LogRecord; el resto se considera "extra" del evento
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "context"}
+
+
+def new_log_context(**fields: Any) -> Any:
+    """Iniciar el contexto de un request; devuelve el token para reset_log_context"""
+    return _log_context.set(dict(fields))
+
+
+def reset_log_context(token: Any) -> None:
+    _log_context.reset(token)
+
+
+def bind_log_context(**fields: Any) -> None:
+    """Agregar campos (p. ej. user_id, business_id) al contexto del request actual"""
+    context = _log_context.get()
+    if context is None:
+        _log_context.set(dict(fields))
+    else:
+        context.update(fields)
+
+
+def get_log_context() -> Dict[str, Any]:
+    return _log_context.get() or {}
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Encola el registro con una copia del contexto del request. A diferencia de
+    QueueHandler.prepare no formatea el mensaje en el hilo del event loop:
+    solo se resuelven los args y, si hay excepción, su traceback.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.context = dict(_log_context.get() or ())
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info))
+            record.exc_info = None
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """Un objeto JSON por línea: timestamp, level, logger, event, contexto y extras"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        context = getattr(record, "context", None)
+        if context:
+            data.update(context)
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                data[key] = value
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        elif record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return _dumps(data)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato legible para desarrollo, con el contexto al final"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        context = getattr(record, "context", None)
+        if context:
+            line += " " + " ".join(f"{k}={v}" for k, v in context.items() if v is not None)
+        return line
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_config: tuple = ()
+
+# Librerías que en DEBUG escriben una línea por request saliente (sin muestreo)
+QUIET_LOGGERS = ("httpx", "httpcore", "asyncio")
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json", stream=None) -> None:
+    """
+    Configurar el logger raíz con la cola y arrancar el hilo escritor.
+    Es idempotente: llamadas posteriores no duplican handlers.
+    """
+    global _listener, _config
+    if _listener is not None:
+        return
+    _config = (level, fmt, stream)
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JSONFormatter() if fmt == "json" else TextFormatter())
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [ContextQueueHandler(log_queue)]
+    root.setLevel(level.upper())
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def restart_logging() -> None:
+    """
+    Rearmar la cola y el hilo escritor en un proceso hijo (fork de gunicorn
+    con preload): el hilo del padre no existe en el hijo y los registros
+    quedarían encolados sin escribirse.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener = None
+    setup_logging(*_config)
+
+
+def shutdown_logging() -> None:
+    """Vaciar la cola y detener el hilo escritor (apagado de la aplicación)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
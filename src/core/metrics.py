@@ -0,0 +1,247 @@
+"""
+Métricas en proceso con exposición en formato de texto de Prometheus
+Contadores e histogramas mínimos (sin dependencias externas) y la
+instrumentación de las llamadas HTTP a Supabase a nivel de transporte httpx:
+toda llamada de GoTrue o PostgREST queda registrada sin tocar los repositorios.
+Las métricas son por proceso; con varios workers cada uno expone las suyas.
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import httpx
+
+LabelValues = Tuple[str, ...]
+
+# Buckets por defecto (segundos), pensados para latencias de API
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    """Contador monótono con etiquetas"""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def get(self, labels: LabelValues = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Histograma con buckets fijos; observe() es una bisección y dos sumas"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # etiquetas -> [conteos por bucket (+Inf al final), suma, total]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def count(self, labels: LabelValues = ()) -> int:
+        entry = self._values.get(labels)
+        return entry[2] if entry else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bounds = [_format_number(b) for b in self.buckets] + ["+Inf"]
+        for labels, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}")
+            label_str = _format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{label_str} {total!r}")
+            lines.append(f"{self.name}_count{label_str} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas a exponer en /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Instancia global del registro y métricas de la aplicación
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    "iris_http_requests_total", "Requests HTTP atendidos", ["method", "route", "status"]
+)
+http_request_duration = registry.histogram(
+    "iris_http_request_duration_seconds", "Latencia de los requests HTTP", ["method", "route"]
+)
+supabase_calls_total = registry.counter(
+    "iris_supabase_calls_total", "Llamadas HTTP a Supabase", ["service", "table", "operation", "outcome"]
+)
+supabase_call_duration = registry.histogram(
+    "iris_supabase_call_duration_seconds", "Latencia de las llamadas a Supabase", ["service", "table", "operation"]
+)
+saga_step_duration = registry.histogram(
+    "iris_saga_step_duration_seconds", "Duración de los pasos de las sagas", ["saga", "step", "outcome"]
+)
+availability_cache_requests = registry.counter(
+    "iris_availability_cache_requests_total", "Consultas de disponibilidad según la cache", ["result"]
+)
+availability_event_lag = registry.histogram(
+    "iris_availability_event_lag_seconds",
+    "Demora entre un cambio en la base y su aplicación en la cache de disponibilidad",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+access_code_lookups = registry.counter(
+    "iris_access_code_lookups_total", "Resoluciones de códigos de acceso según dónde se resolvieron", ["result"]
+)
+promotion_lookups = registry.counter(
+    "iris_promotion_lookups_total", "Consultas de promociones vigentes según si el negocio estaba cargado", ["result"]
+)
+jobs_total = registry.counter(
+    "iris_jobs_total", "Trabajos en segundo plano ejecutados según el resultado", ["kind", "result"]
+)
+job_duration = registry.histogram(
+    "iris_job_duration_seconds", "Duración de los trabajos en segundo plano", ["kind"]
+)
+
+
+# --- Desglose por request (header Server-Timing) ---
+
+# Lista mutable por request: la comparten las tareas hijas (asyncio.gather)
+request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+
+def record_saga_step(saga: str, step: str, elapsed: float, ok: bool) -> None:
+    """Hook on_step de las sagas de registro"""
+    saga_step_duration.observe(elapsed, (saga, step, "ok" if ok else "error"))
+
+
+# --- Llamadas a Supabase ---
+
+_REST_OPERATIONS = {"GET": "select", "HEAD": "select", "POST": "insert", "PATCH": "update", "PUT": "upsert", "DELETE": "delete"}
+
+
+def classify_supabase_request(request: httpx.Request) -> Tuple[str, str, str]:
+    """(servicio, tabla/endpoint, operación) a partir de la URL de Supabase"""
+    path = request.url.path
+    if "/rest/v1/" in path:
+        resource = path.split("/rest/v1/", 1)[1].strip("/")
+        if resource.startswith("rpc/"):
+            return "postgrest", resource[4:], "rpc"
+        operation = _REST_OPERATIONS.get(request.method, request.method.lower())
+        if request.method == "POST" and "resolution=merge-duplicates" in request.headers.get("prefer", ""):
+            operation = "upsert"
+        return "postgrest", resource or "-", operation
+    if "/auth/v1/" in path:
+        resource = path.split("/auth/v1/", 1)[1].strip("/")
+        # Los ids de usuario no se usan como etiqueta (cardinalidad)
+        if resource.startswith("admin/users/"):
+            resource = "admin/users/{id}"
+        return "auth", resource or "-", request.method.lower()
+    return "other", "-", request.method.lower()
+
+
+def _record_supabase_call(request: httpx.Request, elapsed: float, outcome: str) -> None:
+    service, table, operation = classify_supabase_request(request)
+    supabase_calls_total.inc((service, table, operation, outcome))
+    supabase_call_duration.observe(elapsed, (service, table, operation))
+    timings = request_timings.get()
+    if timings is not None:
+        timings.append((f"{service}.{operation}.{table}", elapsed))
+
+
+def _outcome(status_code: int) -> str:
+    return "ok" if status_code < 400 else f"http_{status_code // 100}xx"
+
+
+class InstrumentedAsyncTransport(httpx.AsyncBaseTransport):
+    """Transporte httpx asíncrono que mide cada llamada (hasta recibir los headers)"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            _record_supabase_call(request, time.perf_counter() - start, "error")
+            raise
+        _record_supabase_call(request, time.perf_counter() - start, _outcome(response.status_code))
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """Variante síncrona para el cliente de supabase-py (scripts)"""
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = self._transport.handle_request(request)
+        except Exception:
+            _record_supabase_call(request, time.perf_counter() - start, "error")
+            raise
+        _record_supabase_call(request, time.perf_counter() - start, _outcome(response.status_code))
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
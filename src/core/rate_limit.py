@@ -0,0 +1,161 @@
+"""
+Rate limiting con token bucket y backend intercambiable
+Cada clave tiene un balde de `requests` tokens que se rellena a razón de
+`requests / window` tokens por segundo: permite ráfagas cortas y limita el
+promedio. El backend "memory" es por proceso; "redis" lo comparten todos los
+workers (el balde se actualiza atómicamente con un script Lua).
+"""
+import math
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from src.core.cache import get_redis
+from src.core.config import settings
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # Segundos hasta el próximo token (0 si se permitió)
+
+    def headers(self) -> Dict[str, str]:
+        """Headers informativos; Retry-After solo cuando se rechaza"""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class RateLimitBackend:
+    """Interfaz de almacenamiento de los baldes"""
+
+    async def hit(self, key: str, limit: int, window: float, cost: float = 1.0) -> RateLimitResult:
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Baldes en un dict del proceso; se podan los que ya están llenos"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # clave -> (tokens, último acceso, ventana)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _prune(self, now: float) -> None:
+        # Un balde sin uso por más de su ventana está lleno: equivale a no existir
+        self._buckets = {k: b for k, b in self._buckets.items() if now - b[1] < b[2]}
+        if len(self._buckets) >= self.max_keys:
+            # Sigue lleno de claves activas: descartar las más antiguas (y dejar lugar a la nueva)
+            keep = sorted(self._buckets.items(), key=lambda item: item[1][1])[-self.max_keys // 2:]
+            self._buckets = dict(keep)
+
+    async def hit(self, key: str, limit: int, window: float, cost: float = 1.0) -> RateLimitResult:
+        now = time.monotonic()
+        rate = limit / window
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(limit)
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now)
+        else:
+            tokens = min(float(limit), bucket[0] + (now - bucket[1]) * rate)
+
+        if tokens >= cost:
+            tokens -= cost
+            self._buckets[key] = (tokens, now, window)
+            return RateLimitResult(True, limit, int(tokens), 0.0)
+
+        self._buckets[key] = (tokens, now, window)
+        return RateLimitResult(False, limit, 0, (cost - tokens) / rate)
+
+
+# KEYS[1] = balde; ARGV = capacidad, tokens/seg, costo. Usa el reloj de Redis
+# para que todos los workers vean el mismo tiempo.
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Baldes compartidos entre workers sobre Redis"""
+
+    def __init__(self, namespace: str = "ratelimit"):
+        self.prefix = f"iris:{namespace}:"
+        self._script = None
+
+    async def hit(self, key: str, limit: int, window: float, cost: float = 1.0) -> RateLimitResult:
+        if self._script is None:
+            self._script = get_redis().register_script(_TOKEN_BUCKET_LUA)
+        rate = limit / window
+        try:
+            allowed, tokens = await self._script(keys=[self.prefix + key], args=[limit, rate, cost])
+        except Exception:
+            # Si Redis no responde se deja pasar el request (fail-open)
+            return RateLimitResult(True, limit, limit, 0.0)
+        tokens = float(tokens)
+        if allowed:
+            return RateLimitResult(True, limit, int(tokens), 0.0)
+        return RateLimitResult(False, limit, 0, (cost - tokens) / rate)
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    """Crear el backend configurado en settings.rate_limit_backend"""
+    if settings.rate_limit_backend == "redis":
+        return RedisRateLimitBackend()
+    return MemoryRateLimitBackend(settings.rate_limit_max_keys)
+
+
+class ConfiguredRateLimitBackend(RateLimitBackend):
+    """El backend de settings, creado en el primer uso"""
+
+    def __init__(self):
+        self._backend: Optional[RateLimitBackend] = None
+
+    @property
+    def backend(self) -> RateLimitBackend:
+        if self._backend is None:
+            self._backend = create_rate_limit_backend()
+        return self._backend
+
+    async def hit(self, key: str, limit: int, window: float, cost: float = 1.0) -> RateLimitResult:
+        return await self.backend.hit(key, limit, window, cost)
+
+
+def client_ip(scope: dict) -> str:
+    """
+    IP del cliente. Con rate_limit_trust_proxy se usa la última entrada de
+    X-Forwarded-For (la agrega nuestro proxy; las anteriores las controla el cliente)
+    """
+    if settings.rate_limit_trust_proxy:
+        for name, value in scope.get("headers", ()):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[-1].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+# Instancia global compartida por el middleware y las dependencies
+rate_limit_backend = ConfiguredRateLimitBackend()
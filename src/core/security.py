@@ -0,0 +1,202 @@
+"""
+Verificación local de tokens JWT emitidos por Supabase Auth
+Valida firma, expiración, audiencia y emisor sin ir a la red en cada request
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+import jwt
+
+from src.core.config import FromSettings, Settings, settings
+
+# Algoritmos aceptados según el tipo de clave
+SYMMETRIC_ALGORITHMS = ["HS256"]
+ASYMMETRIC_ALGORITHMS = ["RS256", "ES256", "EdDSA"]
+
+# Tiempo mínimo entre refrescos forzados por un `kid` desconocido
+MIN_FORCED_REFRESH_INTERVAL = 30
+
+
+def auth_url(config: Settings) -> str:
+    """URL base de Supabase Auth"""
+    return f"{config.supabase_url.rstrip('/')}/auth/v1"
+
+
+class TokenVerificationError(Exception):
+    """El token no pudo verificarse localmente"""
+
+
+class NoLocalKeyError(TokenVerificationError):
+    """No hay clave local para el algoritmo del token: corresponde verificarlo contra Supabase Auth"""
+
+
+class SigningKeyCache:
+    """
+    Cache de claves de firma de Supabase Auth.
+    Usa el JWT secret del proyecto (HS256) y/o el JWKS publicado en
+    /auth/v1/.well-known/jwks.json, refrescado en segundo plano.
+    """
+
+    jwks_url = FromSettings(lambda config: f"{auth_url(config)}/.well-known/jwks.json")
+    jwt_secret = FromSettings("supabase_jwt_secret")
+    refresh_interval = FromSettings("jwks_refresh_interval")
+
+    def __init__(
+        self,
+        jwks_url: Optional[str] = None,
+        jwt_secret: Optional[str] = None,
+        refresh_interval: Optional[int] = None,
+    ):
+        self.jwks_url = jwks_url
+        self.jwt_secret = jwt_secret
+        self.refresh_interval = refresh_interval
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._fetched_at: float = 0.0
+        self._last_forced_refresh: float = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def has_keys(self) -> bool:
+        """Indica si hay material de clave disponible para verificar"""
+        return bool(self.jwt_secret or self._keys)
+
+    def get_key(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        """Obtener una clave pública del JWKS por su `kid`"""
+        if kid is None:
+            return None
+        return self._keys.get(kid)
+
+    async def refresh(self) -> None:
+        """Descargar el JWKS y reemplazar las claves cacheadas"""
+        async with self._lock:
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                response = await client.get(
+                    self.jwks_url,
+                    headers={"apikey": settings.supabase_anon_key},
+                )
+                response.raise_for_status()
+                jwks = response.json()
+
+            keys: Dict[str, jwt.PyJWK] = {}
+            for key_data in jwks.get("keys", []):
+                try:
+                    key = jwt.PyJWK(key_data)
+                except jwt.PyJWTError:
+                    # Claves con algoritmos no soportados se ignoran
+                    continue
+                if key.key_id:
+                    keys[key.key_id] = key
+
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+
+    async def refresh_for_unknown_kid(self) -> None:
+        """Refrescar el JWKS ante un `kid` desconocido (rotación de claves)"""
+        now = time.monotonic()
+        if now - self._last_forced_refresh < MIN_FORCED_REFRESH_INTERVAL:
+            return
+        self._last_forced_refresh = now
+        try:
+            await self.refresh()
+        except Exception:
+            pass
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Se conservan las claves anteriores hasta el próximo intento
+                pass
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        """Iniciar el refresco periódico del JWKS en segundo plano"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Detener el refresco en segundo plano"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class TokenVerifier:
+    """
+    Verificador de access tokens de Supabase.
+    Devuelve los claims del token si la firma y los claims estándar son válidos.
+    """
+
+    audience = FromSettings("jwt_audience")
+    issuer = FromSettings(lambda config: config.jwt_issuer or auth_url(config))
+    leeway = FromSettings("jwt_leeway")
+
+    def __init__(
+        self,
+        key_cache: SigningKeyCache,
+        audience: Optional[str] = None,
+        issuer: Optional[str] = None,
+        leeway: Optional[int] = None,
+    ):
+        self.key_cache = key_cache
+        self.audience = audience
+        self.issuer = issuer
+        self.leeway = leeway
+
+    @property
+    def can_verify_locally(self) -> bool:
+        return self.key_cache.has_keys
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """Verificar el token y devolver sus claims"""
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f"Token malformado: {e}")
+
+        algorithm = header.get("alg")
+        if algorithm in SYMMETRIC_ALGORITHMS:
+            if not self.key_cache.jwt_secret:
+                raise NoLocalKeyError("No hay JWT secret configurado")
+            key: Any = self.key_cache.jwt_secret
+            algorithms = SYMMETRIC_ALGORITHMS
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            kid = header.get("kid")
+            signing_key = self.key_cache.get_key(kid)
+            if signing_key is None:
+                await self.key_cache.refresh_for_unknown_kid()
+                signing_key = self.key_cache.get_key(kid)
+            if signing_key is None:
+                raise TokenVerificationError("Clave de firma desconocida")
+            key = signing_key.key
+            algorithms = [algorithm]
+        else:
+            raise TokenVerificationError(f"Algoritmo no soportado: {algorithm}")
+
+        try:
+            return jwt.decode(
+                token,
+                key,
+                algorithms=algorithms,
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.leeway,
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(str(e))
+
+
+# Instancia global del verificador (configurada desde settings al usarse)
+signing_key_cache = SigningKeyCache()
+token_verifier = TokenVerifier(signing_key_cache)
@@ -0,0 +1,67 @@
+-- ==============================================
+-- CÓDIGOS DE ACCESO DE NEGOCIOS
+-- ==============================================
+-- Los clientes se adhieren a un salón tipeando su access_code. Los códigos
+-- nuevos usan un alfabeto sin caracteres confundibles (sin 0/O ni 1/I) y la
+-- unicidad la garantiza el índice UNIQUE de businesses.access_code: quien
+-- inserta usa ON CONFLICT (access_code) DO NOTHING y reintenta con otro
+-- código (onboard_owner y src/services/access_codes.py).
+--
+-- Cada alta, baja o cambio de código de un negocio activo publica un NOTIFY
+-- en el canal "access_code_changes" para el índice en memoria de cada worker:
+--   {"business_id", "old", "new"}  (código anterior y nuevo, o null)
+-- Requiere tables_schema.sql. Ejecutar antes de onboarding_schema.sql.
+
+-- 8 caracteres de un alfabeto de 32: 32^8 ≈ 1.1e12 códigos posibles
+CREATE OR REPLACE FUNCTION public.generate_access_code()
+RETURNS VARCHAR(8)
+LANGUAGE plpgsql
+VOLATILE
+AS $$
+DECLARE
+    v_alphabet CONSTANT TEXT := 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789';
+    v_bytes BYTEA := uuid_send(gen_random_uuid());
+    v_code TEXT := '';
+    v_byte INTEGER;
+BEGIN
+    -- Bytes aleatorios del UUID v4 (el 6 y el 8 llevan bits fijos de versión/variante)
+    FOREACH v_byte IN ARRAY ARRAY[0, 1, 2, 3, 4, 5, 9, 10] LOOP
+        v_code := v_code || substr(v_alphabet, (get_byte(v_bytes, v_byte) & 31) + 1, 1);
+    END LOOP;
+    RETURN v_code;
+END;
+$$;
+
+ALTER TABLE businesses ALTER COLUMN access_code SET DEFAULT generate_access_code();
+
+CREATE OR REPLACE FUNCTION public.notify_access_code_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_old TEXT;
+    v_new TEXT;
+BEGIN
+    IF TG_OP <> 'INSERT' AND OLD.is_active THEN
+        v_old := OLD.access_code;
+    END IF;
+    IF TG_OP <> 'DELETE' AND NEW.is_active THEN
+        v_new := NEW.access_code;
+    END IF;
+    IF v_old IS NOT DISTINCT FROM v_new THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('access_code_changes', jsonb_build_object(
+        'business_id', CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END,
+        'old', v_old,
+        'new', v_new
+    )::text);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS businesses_access_code_notify ON businesses;
+CREATE TRIGGER businesses_access_code_notify
+    AFTER INSERT OR UPDATE OF access_code, is_active OR DELETE ON businesses
+    FOR EACH ROW EXECUTE FUNCTION notify_access_code_change();
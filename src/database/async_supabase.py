@@ -0,0 +1,156 @@
+"""
+Clientes asíncronos de Supabase (PostgREST y GoTrue)
+Comparten un único pool httpx.AsyncClient para no bloquear el event loop
+"""
+from typing import Any, Dict, Optional
+
+import httpx
+from gotrue import AsyncGoTrueClient
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+
+from src.core.config import settings
+from src.core.metrics import InstrumentedAsyncTransport
+
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """
+    AsyncPostgrestClient cuya sesión usa el transporte compartido. La sesión
+    por defecto crearía un transporte propio y cargaría los certificados CA
+    (decenas de ms por cliente) solo para descartarlo.
+    """
+
+    def __init__(self, base_url: str, transport: httpx.AsyncBaseTransport, **kwargs: Any):
+        self._shared_transport = transport
+        super().__init__(base_url, **kwargs)
+
+    def create_session(self, base_url: str, headers: Dict[str, str], timeout: Any) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            transport=self._shared_transport,
+        )
+
+
+class AsyncSupabaseClient:
+    """
+    Gestor de clientes asíncronos de Supabase (singleton).
+    Los clientes anon y service-role se crean una sola vez por proceso y usan
+    el mismo transporte HTTP acotado con keep-alive.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+        self._rest: Dict[str, AsyncPostgrestClient] = {}
+        self._auth: Dict[str, AsyncGoTrueClient] = {}
+        self._initialized = True
+
+    @property
+    def rest_url(self) -> str:
+        return f"{settings.supabase_url.rstrip('/')}/rest/v1"
+
+    @property
+    def auth_url(self) -> str:
+        return f"{settings.supabase_url.rstrip('/')}/auth/v1"
+
+    @staticmethod
+    def _timeout() -> httpx.Timeout:
+        return httpx.Timeout(
+            settings.supabase_http_timeout,
+            connect=settings.supabase_http_connect_timeout,
+        )
+
+    @staticmethod
+    def _auth_headers(key: str) -> Dict[str, str]:
+        return {"apiKey": key, "Authorization": f"Bearer {key}"}
+
+    def _get_transport(self) -> httpx.AsyncBaseTransport:
+        """Pool de conexiones compartido por todos los clientes asíncronos"""
+        if self._transport is None:
+            # Cada llamada a Supabase queda registrada en las métricas
+            self._transport = InstrumentedAsyncTransport(httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=settings.supabase_http_max_connections,
+                    max_keepalive_connections=settings.supabase_http_max_keepalive,
+                    keepalive_expiry=settings.supabase_http_keepalive_expiry,
+                ),
+                retries=settings.supabase_http_retries,
+            ))
+        return self._transport
+
+    def _get_rest(self, key: str) -> AsyncPostgrestClient:
+        client = self._rest.get(key)
+        if client is None:
+            client = PooledPostgrestClient(
+                self.rest_url,
+                self._get_transport(),
+                headers={**DEFAULT_POSTGREST_CLIENT_HEADERS, "apiKey": key},
+                timeout=self._timeout(),
+            )
+            client.auth(token=key)
+            self._rest[key] = client
+        return client
+
+    def _get_auth(self, key: str) -> AsyncGoTrueClient:
+        client = self._auth.get(key)
+        if client is None:
+            # Sin sesión persistida ni auto-refresh: el cliente es compartido entre requests
+            client = AsyncGoTrueClient(
+                url=self.auth_url,
+                headers=self._auth_headers(key),
+                auto_refresh_token=False,
+                persist_session=False,
+                http_client=httpx.AsyncClient(
+                    timeout=self._timeout(),
+                    transport=self._get_transport(),
+                ),
+            )
+            self._auth[key] = client
+        return client
+
+    @property
+    def rest(self) -> AsyncPostgrestClient:
+        """Cliente PostgREST con la anon key (aplica RLS)"""
+        return self._get_rest(settings.supabase_anon_key)
+
+    @property
+    def admin_rest(self) -> AsyncPostgrestClient:
+        """Cliente PostgREST con la service-role key"""
+        return self._get_rest(settings.supabase_service_role_key)
+
+    @property
+    def auth(self) -> AsyncGoTrueClient:
+        """Cliente de Supabase Auth con la anon key"""
+        return self._get_auth(settings.supabase_anon_key)
+
+    @property
+    def admin_auth(self) -> AsyncGoTrueClient:
+        """Cliente de Supabase Auth con la service-role key (API admin)"""
+        return self._get_auth(settings.supabase_service_role_key)
+
+    def open(self) -> None:
+        """Crear los clientes y el pool al arrancar: el primer request no paga su construcción"""
+        self.rest, self.admin_rest, self.auth, self.admin_auth
+
+    async def close(self) -> None:
+        """Cerrar el pool de conexiones (apagado de la aplicación)"""
+        if self._transport is not None:
+            await self._transport.aclose()
+        self._transport = None
+        self._rest = {}
+        self._auth = {}
+
+
+# Instancia global del cliente asíncrono
+async_supabase_client = AsyncSupabaseClient()
@@ -0,0 +1,133 @@
+-- ==============================================
+-- EVENTOS DE DISPONIBILIDAD (LISTEN/NOTIFY)
+-- ==============================================
+-- Cada cambio que afecta la disponibilidad publica un NOTIFY en el canal
+-- "availability_changes" para que la cache de disponibilidad de cada worker
+-- se actualice sin volver a consultar (ver src/services/availability_cache.py).
+--
+-- Turnos y bloques: un evento con el estado anterior y el nuevo del intervalo
+-- ocupado ("old"/"new" = {employee_id, start, end} en epoch, o null si no
+-- ocupaba). Crear, mover y cancelar son el mismo evento:
+--   {"business_id", "id", "old", "new", "ts"}
+-- Horarios, servicios y empleados: se descarta todo lo cacheado del negocio:
+--   {"business_id", "reset": true, "ts"}
+-- "ts" es el momento del cambio (clock_timestamp) y permite medir la demora
+-- con la que cada worker aplica el evento.
+-- Requiere tables_schema.sql y availability_schema.sql (employee_blocks).
+
+-- Intervalo ocupado de una fila de appointments o employee_blocks (o null)
+CREATE OR REPLACE FUNCTION public.availability_busy_interval(p_row JSONB)
+RETURNS JSONB
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT CASE
+        WHEN p_row IS NULL
+          OR COALESCE(p_row->>'status', '') = 'cancelled'
+          OR COALESCE((p_row->>'is_override')::BOOLEAN, false)
+        THEN NULL
+        ELSE jsonb_build_object(
+            'employee_id', p_row->>'employee_id',
+            'start', EXTRACT(EPOCH FROM (p_row->>'start_datetime')::TIMESTAMPTZ),
+            'end', EXTRACT(EPOCH FROM (p_row->>'end_datetime')::TIMESTAMPTZ)
+        )
+    END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.notify_availability_interval()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_old JSONB;
+    v_new JSONB;
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        v_old := availability_busy_interval(to_jsonb(OLD));
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        v_new := availability_busy_interval(to_jsonb(NEW));
+    END IF;
+
+    -- Cambios que no mueven el intervalo (notas, confirmación) no se publican
+    IF v_old IS NOT DISTINCT FROM v_new THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('availability_changes', jsonb_build_object(
+        'business_id', CASE WHEN TG_OP = 'DELETE' THEN OLD.business_id ELSE NEW.business_id END,
+        'id', CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END,
+        'old', v_old,
+        'new', v_new,
+        'ts', EXTRACT(EPOCH FROM clock_timestamp())
+    )::text);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.notify_availability_reset()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_row JSONB := to_jsonb(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END);
+    v_business_id UUID;
+BEGIN
+    IF TG_TABLE_NAME = 'businesses' THEN
+        v_business_id := (v_row->>'id')::UUID;
+    ELSIF v_row ? 'business_id' THEN
+        v_business_id := (v_row->>'business_id')::UUID;
+    ELSE
+        SELECT e.business_id INTO v_business_id FROM employees e WHERE e.id = (v_row->>'employee_id')::UUID;
+    END IF;
+
+    IF v_business_id IS NOT NULL THEN
+        PERFORM pg_notify('availability_changes', jsonb_build_object(
+            'business_id', v_business_id,
+            'reset', true,
+            'ts', EXTRACT(EPOCH FROM clock_timestamp())
+        )::text);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS appointments_availability_notify ON appointments;
+CREATE TRIGGER appointments_availability_notify
+    AFTER INSERT OR UPDATE OR DELETE ON appointments
+    FOR EACH ROW EXECUTE FUNCTION notify_availability_interval();
+
+DROP TRIGGER IF EXISTS employee_blocks_availability_notify ON employee_blocks;
+CREATE TRIGGER employee_blocks_availability_notify
+    AFTER INSERT OR UPDATE OR DELETE ON employee_blocks
+    FOR EACH ROW EXECUTE FUNCTION notify_availability_interval();
+
+DROP TRIGGER IF EXISTS businesses_availability_reset ON businesses;
+CREATE TRIGGER businesses_availability_reset
+    AFTER UPDATE OF timezone, is_active ON businesses
+    FOR EACH ROW EXECUTE FUNCTION notify_availability_reset();
+
+DROP TRIGGER IF EXISTS business_hours_availability_reset ON business_hours;
+CREATE TRIGGER business_hours_availability_reset
+    AFTER INSERT OR UPDATE OR DELETE ON business_hours
+    FOR EACH ROW EXECUTE FUNCTION notify_availability_reset();
+
+DROP TRIGGER IF EXISTS services_availability_reset ON services;
+CREATE TRIGGER services_availability_reset
+    AFTER UPDATE OF duration_minutes, is_active OR DELETE ON services
+    FOR EACH ROW EXECUTE FUNCTION notify_availability_reset();
+
+DROP TRIGGER IF EXISTS employees_availability_reset ON employees;
+CREATE TRIGGER employees_availability_reset
+    AFTER INSERT OR UPDATE OF name, status, is_available OR DELETE ON employees
+    FOR EACH ROW EXECUTE FUNCTION notify_availability_reset();
+
+DROP TRIGGER IF EXISTS employee_hours_availability_reset ON employee_hours;
+CREATE TRIGGER employee_hours_availability_reset
+    AFTER INSERT OR UPDATE OR DELETE ON employee_hours
+    FOR EACH ROW EXECUTE FUNCTION notify_availability_reset();
+
+DROP TRIGGER IF EXISTS employee_services_availability_reset ON employee_services;
+CREATE TRIGGER employee_services_availability_reset
+    AFTER INSERT OR UPDATE OR DELETE ON employee_services
+    FOR EACH ROW EXECUTE FUNCTION notify_availability_reset();
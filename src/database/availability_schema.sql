@@ -0,0 +1,109 @@
+-- ==============================================
+-- DISPONIBILIDAD DE TURNOS
+-- ==============================================
+-- Bloques "no disponible" de empleados (descansos, reuniones, días libres) y
+-- una función que devuelve en una sola llamada RPC todo lo necesario para
+-- calcular turnos libres de un negocio en un rango de fechas:
+--   supabase.rpc('availability_snapshot', {...})
+-- Devuelve una sola fila: postgrest-py espera siempre una lista de objetos.
+-- Requiere tables_schema.sql y user_profiles_schema.sql.
+
+CREATE TABLE IF NOT EXISTS employee_blocks (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    business_id UUID NOT NULL REFERENCES businesses(id) ON DELETE CASCADE,
+    employee_id UUID NOT NULL REFERENCES employees(id) ON DELETE CASCADE,
+    start_datetime TIMESTAMPTZ NOT NULL,
+    end_datetime TIMESTAMPTZ NOT NULL,
+    reason TEXT,
+    created_by UUID, -- Usuario que cargó el bloque
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+
+    CHECK (end_datetime > start_datetime)
+);
+
+CREATE INDEX IF NOT EXISTS idx_employee_blocks_business_datetime ON employee_blocks(business_id, start_datetime);
+CREATE INDEX IF NOT EXISTS idx_employee_blocks_employee_datetime ON employee_blocks(employee_id, start_datetime);
+
+ALTER TABLE employee_blocks ENABLE ROW LEVEL SECURITY;
+
+
+CREATE OR REPLACE FUNCTION public.availability_snapshot(
+    p_business_id UUID,
+    p_service_id UUID,
+    p_from TIMESTAMPTZ,
+    p_to TIMESTAMPTZ
+) RETURNS TABLE (
+    business JSONB,
+    service JSONB,
+    business_hours JSONB,
+    employees JSONB,
+    busy JSONB
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT
+        (SELECT jsonb_build_object('id', b.id, 'timezone', b.timezone)
+         FROM businesses b
+         WHERE b.id = p_business_id AND b.is_active),
+
+        (SELECT jsonb_build_object('id', s.id, 'name', s.name, 'duration_minutes', s.duration_minutes)
+         FROM services s
+         WHERE s.id = p_service_id AND s.business_id = p_business_id AND s.is_active),
+
+        (SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                    'day_of_week', h.day_of_week,
+                    'open_time', h.open_time,
+                    'close_time', h.close_time,
+                    'is_closed', h.is_closed)), '[]'::jsonb)
+         FROM business_hours h
+         WHERE h.business_id = p_business_id),
+
+        -- Empleados activos que pueden hacer el servicio (sin servicios
+        -- asignados se asume que hacen todos), con sus horarios
+        (SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                    'id', e.id,
+                    'name', e.name,
+                    'hours', (
+                        SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                                    'day_of_week', eh.day_of_week,
+                                    'start_time', eh.start_time,
+                                    'end_time', eh.end_time,
+                                    'is_available', eh.is_available)), '[]'::jsonb)
+                        FROM employee_hours eh
+                        WHERE eh.employee_id = e.id
+                    )) ORDER BY e.name), '[]'::jsonb)
+         FROM employees e
+         WHERE e.business_id = p_business_id
+           AND e.status = 'active'
+           AND e.is_available
+           AND (
+               EXISTS (SELECT 1 FROM employee_services es WHERE es.employee_id = e.id AND es.service_id = p_service_id)
+               OR NOT EXISTS (SELECT 1 FROM employee_services es WHERE es.employee_id = e.id)
+           )),
+
+        -- Intervalos ocupados: turnos (mismo criterio que el EXCLUDE de
+        -- appointments) y bloques, como [employee_id, inicio, fin, id]
+        (SELECT COALESCE(jsonb_agg(jsonb_build_array(o.employee_id, o.start_datetime, o.end_datetime, o.id)), '[]'::jsonb)
+         FROM (
+             SELECT a.id, a.employee_id, a.start_datetime, a.end_datetime
+             FROM appointments a
+             WHERE a.business_id = p_business_id
+               AND a.status != 'cancelled'
+               AND a.is_override = false
+               AND a.start_datetime < p_to
+               AND a.end_datetime > p_from
+             UNION ALL
+             SELECT k.id, k.employee_id, k.start_datetime, k.end_datetime
+             FROM employee_blocks k
+             WHERE k.business_id = p_business_id
+               AND k.start_datetime < p_to
+               AND k.end_datetime > p_from
+         ) o);
+$$;
+
+-- Solo el backend (service_role) consulta el snapshot completo
+REVOKE ALL ON FUNCTION public.availability_snapshot(UUID, UUID, TIMESTAMPTZ, TIMESTAMPTZ) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.availability_snapshot(UUID, UUID, TIMESTAMPTZ, TIMESTAMPTZ) TO service_role;
@@ -0,0 +1,123 @@
+-- ==============================================
+-- RESERVA DE TURNOS EN UNA SOLA SENTENCIA
+-- ==============================================
+-- Crea un turno validando servicio, empleado, cliente y horario y lo inserta
+-- en la misma transacción:
+--   supabase.rpc('book_appointment', {...})
+-- La protección contra turnos superpuestos es el EXCLUDE de appointments
+-- (btree_gist, ver tables_schema.sql): de dos reservas simultáneas del mismo
+-- horario una falla con exclusion_violation (SQLSTATE 23P01) y la API
+-- responde 409. Sin SELECT ... FOR UPDATE: solo se serializan los inserts
+-- del mismo empleado con un advisory lock.
+-- Errores de validación: SQLSTATE P0002 (service_not_found,
+-- employee_not_found, customer_not_found) y 22023 (outside_business_hours).
+-- Requiere tables_schema.sql y availability_schema.sql (employee_blocks).
+
+CREATE OR REPLACE FUNCTION public.book_appointment(
+    p_business_id UUID,
+    p_customer_id UUID,
+    p_employee_id UUID,
+    p_service_id UUID,
+    p_start TIMESTAMPTZ,
+    p_notes TEXT DEFAULT NULL
+) RETURNS SETOF appointments
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_timezone TEXT;
+    v_end TIMESTAMPTZ;
+    v_local_start TIMESTAMP;
+    v_local_end TIMESTAMP;
+    v_dow INTEGER;
+BEGIN
+    SELECT b.timezone, p_start + make_interval(mins => s.duration_minutes)
+    INTO v_timezone, v_end
+    FROM services s
+    JOIN businesses b ON b.id = s.business_id
+    WHERE s.id = p_service_id
+      AND s.business_id = p_business_id
+      AND s.is_active
+      AND b.is_active;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION USING ERRCODE = 'P0002', MESSAGE = 'service_not_found';
+    END IF;
+
+    -- Mismo criterio que availability_snapshot
+    IF NOT EXISTS (
+        SELECT 1 FROM employees e
+        WHERE e.id = p_employee_id
+          AND e.business_id = p_business_id
+          AND e.status = 'active'
+          AND e.is_available
+          AND (
+              EXISTS (SELECT 1 FROM employee_services es WHERE es.employee_id = e.id AND es.service_id = p_service_id)
+              OR NOT EXISTS (SELECT 1 FROM employee_services es WHERE es.employee_id = e.id)
+          )
+    ) THEN
+        RAISE EXCEPTION USING ERRCODE = 'P0002', MESSAGE = 'employee_not_found';
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM customer_businesses cb
+        WHERE cb.customer_id = p_customer_id AND cb.business_id = p_business_id
+    ) THEN
+        RAISE EXCEPTION USING ERRCODE = 'P0002', MESSAGE = 'customer_not_found';
+    END IF;
+
+    -- El turno tiene que caer entero dentro del horario del salón y, si el
+    -- empleado tiene horarios cargados, dentro del suyo (en hora local)
+    v_local_start := p_start AT TIME ZONE v_timezone;
+    v_local_end := v_end AT TIME ZONE v_timezone;
+    v_dow := EXTRACT(DOW FROM v_local_start);
+    IF v_local_end::date <> v_local_start::date
+       OR NOT EXISTS (
+           SELECT 1 FROM business_hours h
+           WHERE h.business_id = p_business_id
+             AND h.day_of_week = v_dow
+             AND NOT COALESCE(h.is_closed, false)
+             AND h.open_time <= v_local_start::time
+             AND h.close_time >= v_local_end::time
+       )
+       OR (
+           EXISTS (SELECT 1 FROM employee_hours eh WHERE eh.employee_id = p_employee_id)
+           AND NOT EXISTS (
+               SELECT 1 FROM employee_hours eh
+               WHERE eh.employee_id = p_employee_id
+                 AND eh.day_of_week = v_dow
+                 AND eh.is_available
+                 AND eh.start_time <= v_local_start::time
+                 AND eh.end_time >= v_local_end::time
+           )
+       ) THEN
+        RAISE EXCEPTION USING ERRCODE = '22023', MESSAGE = 'outside_business_hours';
+    END IF;
+
+    -- Los bloques no están en el EXCLUDE: se reportan como el mismo conflicto
+    IF EXISTS (
+        SELECT 1 FROM employee_blocks k
+        WHERE k.employee_id = p_employee_id
+          AND k.start_datetime < v_end
+          AND k.end_datetime > p_start
+    ) THEN
+        RAISE EXCEPTION USING ERRCODE = 'exclusion_violation', MESSAGE = 'employee_blocked';
+    END IF;
+
+    -- Las reservas del mismo empleado se hacen de a una (lock hasta el fin de
+    -- la transacción): dos inserts en curso que se pisan se esperarían entre
+    -- sí en el EXCLUDE y Postgres abortaría uno con deadlock_detected (40P01)
+    -- en lugar de exclusion_violation. El que espera ve el turno ya
+    -- confirmado y falla con 23P01 en el acto.
+    PERFORM pg_advisory_xact_lock(hashtextextended('book_appointment:' || p_employee_id::text, 0));
+
+    RETURN QUERY
+    INSERT INTO appointments (business_id, customer_id, employee_id, service_id, start_datetime, end_datetime, notes)
+    VALUES (p_business_id, p_customer_id, p_employee_id, p_service_id, p_start, v_end, p_notes)
+    RETURNING *;
+END;
+$$;
+
+-- Solo el backend (service_role) reserva: valida el rol antes de llamar
+REVOKE ALL ON FUNCTION public.book_appointment(UUID, UUID, UUID, UUID, TIMESTAMPTZ, TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.book_appointment(UUID, UUID, UUID, UUID, TIMESTAMPTZ, TEXT) TO service_role;
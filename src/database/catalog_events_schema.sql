@@ -0,0 +1,37 @@
+-- ==============================================
+-- EVENTOS DEL CATÁLOGO PÚBLICO (LISTEN/NOTIFY)
+-- ==============================================
+-- Cambios en el negocio, sus servicios o sus horarios publican un NOTIFY en
+-- el canal "catalog_changes" para que cada worker descarte el catálogo
+-- cacheado de ese negocio (ver src/services/business_catalog.py):
+--   {"business_id"}
+-- Requiere tables_schema.sql.
+
+CREATE OR REPLACE FUNCTION public.notify_catalog_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_row JSONB := to_jsonb(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END);
+BEGIN
+    PERFORM pg_notify('catalog_changes', jsonb_build_object(
+        'business_id', CASE WHEN TG_TABLE_NAME = 'businesses' THEN v_row->>'id' ELSE v_row->>'business_id' END
+    )::text);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS businesses_catalog_notify ON businesses;
+CREATE TRIGGER businesses_catalog_notify
+    AFTER UPDATE OR DELETE ON businesses
+    FOR EACH ROW EXECUTE FUNCTION notify_catalog_change();
+
+DROP TRIGGER IF EXISTS services_catalog_notify ON services;
+CREATE TRIGGER services_catalog_notify
+    AFTER INSERT OR UPDATE OR DELETE ON services
+    FOR EACH ROW EXECUTE FUNCTION notify_catalog_change();
+
+DROP TRIGGER IF EXISTS business_hours_catalog_notify ON business_hours;
+CREATE TRIGGER business_hours_catalog_notify
+    AFTER INSERT OR UPDATE OR DELETE ON business_hours
+    FOR EACH ROW EXECUTE FUNCTION notify_catalog_change();
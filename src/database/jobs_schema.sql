@@ -0,0 +1,183 @@
+-- ==============================================
+-- COLA DE TRABAJOS EN SEGUNDO PLANO
+-- ==============================================
+-- Emails y otros efectos secundarios que no deben demorar la respuesta de la
+-- API (ver src/services/jobs.py). Cada trabajo es una fila: sobrevive a
+-- reinicios y a la caída de un worker.
+--
+--   pending -> running -> done
+--                      -> pending (reintento con backoff, run_at en el futuro)
+--                      -> failed  (sin más intentos o error permanente)
+--
+-- claim_jobs toma trabajos con FOR UPDATE SKIP LOCKED: varios workers pueden
+-- reclamar a la vez sin repartirse el mismo trabajo. Un trabajo "running"
+-- cuyo locked_until venció (el worker murió) se vuelve a reclamar.
+-- Cada reclamo incrementa attempts; el worker lo usa para que solo el último
+-- reclamo pueda cerrar el trabajo.
+--
+-- Los trabajos "done" se conservan unos días: dedupe_key evita que el
+-- escaneo de recordatorios encole dos veces el mismo turno.
+-- Un INSERT publica un NOTIFY en el canal "job_queue" para despertar a los
+-- workers sin esperar al próximo sondeo.
+-- Requiere tables_schema.sql (appointments, customer_businesses).
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id BIGSERIAL PRIMARY KEY,
+    kind VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5 CHECK (max_attempts > 0),
+    run_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_until TIMESTAMPTZ,
+    dedupe_key TEXT UNIQUE,
+    last_error TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Índices parciales: solo las filas que claim_jobs puede tomar
+CREATE INDEX IF NOT EXISTS idx_jobs_pending_run_at ON jobs(run_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_jobs_running_locked_until ON jobs(locked_until) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_jobs_done_updated_at ON jobs(updated_at) WHERE status = 'done';
+
+DROP TRIGGER IF EXISTS update_jobs_updated_at ON jobs;
+CREATE TRIGGER update_jobs_updated_at BEFORE UPDATE ON jobs FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Solo el backend (service_role) usa la cola
+ALTER TABLE jobs ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION public.claim_jobs(p_limit INTEGER, p_lease_seconds INTEGER)
+RETURNS SETOF jobs
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    UPDATE jobs j
+    SET status = 'running',
+        attempts = j.attempts + 1,
+        locked_until = NOW() + make_interval(secs => p_lease_seconds)
+    FROM (
+        SELECT id FROM jobs
+        WHERE (status = 'pending' AND run_at <= NOW())
+           OR (status = 'running' AND locked_until < NOW())
+        ORDER BY run_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ) due
+    WHERE j.id = due.id
+    RETURNING j.*;
+$$;
+
+CREATE OR REPLACE FUNCTION public.notify_job_queue()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Un aviso por sentencia: el escaneo de recordatorios inserta muchas filas
+    PERFORM pg_notify('job_queue', '{}');
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS jobs_queue_notify ON jobs;
+CREATE TRIGGER jobs_queue_notify
+    AFTER INSERT ON jobs
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_job_queue();
+
+-- ==============================================
+-- EMAILS DE TURNOS
+-- ==============================================
+
+-- Confirmación: se encola en la misma transacción que crea el turno
+-- (book_appointment o cualquier otro insert), sin round trips extra
+CREATE OR REPLACE FUNCTION public.enqueue_appointment_confirmation()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    INSERT INTO jobs (kind, payload, dedupe_key)
+    VALUES ('appointment_confirmation', jsonb_build_object('appointment_id', NEW.id), 'appointment_confirmation:' || NEW.id)
+    ON CONFLICT (dedupe_key) DO NOTHING;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS appointments_confirmation_job ON appointments;
+CREATE TRIGGER appointments_confirmation_job
+    AFTER INSERT ON appointments
+    FOR EACH ROW EXECUTE FUNCTION enqueue_appointment_confirmation();
+
+-- Turnos activos por horario de inicio: el escaneo de recordatorios recorre
+-- una ventana de este índice en lugar de consultar turno por turno
+CREATE INDEX IF NOT EXISTS idx_appointments_start_active ON appointments(start_datetime)
+    WHERE status IN ('scheduled', 'confirmed');
+
+-- Recordatorios de los turnos que empiezan en [p_from, p_to), en una sola
+-- sentencia; devuelve cuántos se encolaron (los ya encolados se saltean)
+CREATE OR REPLACE FUNCTION public.enqueue_appointment_reminders(
+    p_from TIMESTAMPTZ,
+    p_to TIMESTAMPTZ,
+    p_lead_seconds INTEGER
+) RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    INSERT INTO jobs (kind, payload, run_at, dedupe_key)
+    SELECT 'appointment_reminder',
+           jsonb_build_object('appointment_id', a.id),
+           a.start_datetime - make_interval(secs => p_lead_seconds),
+           'appointment_reminder:' || a.id
+    FROM appointments a
+    WHERE a.start_datetime >= p_from
+      AND a.start_datetime < p_to
+      AND a.status IN ('scheduled', 'confirmed')
+      -- Reservados con menos anticipación que el aviso: ya tienen la confirmación
+      AND a.created_at <= a.start_datetime - make_interval(secs => p_lead_seconds)
+    ON CONFLICT (dedupe_key) DO NOTHING;
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$;
+
+-- Datos de un turno para armar su email (null si no existe)
+CREATE OR REPLACE FUNCTION public.appointment_notification(p_appointment_id UUID)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT jsonb_build_object(
+        'id', a.id,
+        'status', a.status,
+        'start_datetime', a.start_datetime,
+        'customer_name', cb.customer_name,
+        'customer_email', COALESCE(cb.customer_email, u.email),
+        'business_name', b.name,
+        'business_address', b.address,
+        'timezone', b.timezone,
+        'service_name', s.name,
+        'employee_name', e.name
+    )
+    FROM appointments a
+    JOIN businesses b ON b.id = a.business_id
+    JOIN services s ON s.id = a.service_id
+    JOIN employees e ON e.id = a.employee_id
+    LEFT JOIN customer_businesses cb ON cb.customer_id = a.customer_id AND cb.business_id = a.business_id
+    LEFT JOIN auth.users u ON u.id = a.customer_id
+    WHERE a.id = p_appointment_id;
+$$;
+
+REVOKE ALL ON FUNCTION public.claim_jobs(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.enqueue_appointment_reminders(TIMESTAMPTZ, TIMESTAMPTZ, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.appointment_notification(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.claim_jobs(INTEGER, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION public.enqueue_appointment_reminders(TIMESTAMPTZ, TIMESTAMPTZ, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION public.appointment_notification(UUID) TO service_role;
@@ -0,0 +1,357 @@
+-- ==============================================
+-- PUNTOS DE FIDELIZACIÓN: LEDGER Y SALDOS
+-- ==============================================
+-- loyalty_points es un ledger de solo inserción: acumular, canjear, ajustar
+-- o vencer puntos agrega una fila y nunca se modifica una existente.
+-- loyalty_balances guarda el saldo de cada (cliente, negocio) y lo mantiene
+-- un trigger en la misma transacción que inserta en el ledger: leer un saldo
+-- es una búsqueda por clave primaria, sin sumar el historial.
+--
+-- Efecto de cada tipo de movimiento en el saldo (loyalty_entry_delta):
+--   earned +puntos, redeemed -puntos, expired -puntos, adjusted ±puntos
+--
+--   loyalty_accrue(appointment_id)  puntos del servicio de un turno completado
+--                                   (idempotente; también lo hace el trigger
+--                                   de appointments al pasar a 'completed')
+--   loyalty_redeem(...)             canje atómico en un round trip: bloquea el
+--                                   saldo, valida y registra canje + movimiento
+--   loyalty_adjust(...)             ajuste manual del owner
+--   loyalty_verify_balances(...)    saldos que no coinciden con el ledger
+--   loyalty_rebuild_balances(...)   recalcula los saldos en bloque
+--
+-- Errores: SQLSTATE P0002 (reward_not_found) y P0001 (insufficient_points,
+-- loyalty_ledger_append_only).
+-- Requiere tables_schema.sql.
+
+ALTER TABLE loyalty_points ADD COLUMN IF NOT EXISTS redemption_id UUID REFERENCES loyalty_redemptions(id);
+
+-- Un turno acumula puntos una sola vez
+CREATE UNIQUE INDEX IF NOT EXISTS idx_loyalty_points_earned_appointment
+    ON loyalty_points(appointment_id) WHERE transaction_type = 'earned';
+-- Historial de un cliente, del más reciente al más viejo
+CREATE INDEX IF NOT EXISTS idx_loyalty_points_customer_business_created
+    ON loyalty_points(customer_id, business_id, created_at DESC);
+
+CREATE TABLE IF NOT EXISTS loyalty_balances (
+    customer_id UUID NOT NULL,
+    business_id UUID NOT NULL REFERENCES businesses(id) ON DELETE CASCADE,
+    balance INTEGER NOT NULL DEFAULT 0 CHECK (balance >= 0),
+    lifetime_earned INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (customer_id, business_id)
+);
+
+ALTER TABLE loyalty_balances ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION public.loyalty_entry_delta(p_type VARCHAR, p_points INTEGER)
+RETURNS INTEGER
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT CASE p_type
+        WHEN 'earned' THEN p_points
+        WHEN 'adjusted' THEN p_points
+        WHEN 'redeemed' THEN -p_points
+        WHEN 'expired' THEN -p_points
+        ELSE 0
+    END;
+$$;
+
+-- ==============================================
+-- LEDGER DE SOLO INSERCIÓN
+-- ==============================================
+
+CREATE OR REPLACE FUNCTION public.loyalty_points_append_only()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Se permite el borrado en cascada al eliminar el negocio
+    IF TG_OP = 'DELETE' AND NOT EXISTS (SELECT 1 FROM businesses WHERE id = OLD.business_id) THEN
+        RETURN OLD;
+    END IF;
+    RAISE EXCEPTION USING ERRCODE = 'P0001', MESSAGE = 'loyalty_ledger_append_only',
+        HINT = 'Registrar un movimiento "adjusted" en lugar de modificar el historial';
+END;
+$$;
+
+DROP TRIGGER IF EXISTS loyalty_points_append_only ON loyalty_points;
+CREATE TRIGGER loyalty_points_append_only
+    BEFORE UPDATE OR DELETE ON loyalty_points
+    FOR EACH ROW EXECUTE FUNCTION loyalty_points_append_only();
+
+-- Saldos: se suman los movimientos de la sentencia por (cliente, negocio).
+-- Los saldos existentes se bloquean en orden de clave (dos inserts en bloque
+-- simultáneos no se bloquean en orden cruzado) y se actualizan; el CHECK
+-- (balance >= 0) se evalúa sobre el saldo resultante. Solo los que no
+-- existen se insertan (un upsert evaluaría el CHECK sobre el delta solo).
+CREATE OR REPLACE FUNCTION public.loyalty_apply_entries()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM 1
+    FROM loyalty_balances b
+    WHERE (b.customer_id, b.business_id) IN (SELECT customer_id, business_id FROM inserted)
+    ORDER BY b.customer_id, b.business_id
+    FOR UPDATE;
+
+    WITH deltas AS (
+        SELECT customer_id,
+               business_id,
+               SUM(loyalty_entry_delta(transaction_type, points_earned)) AS balance,
+               SUM(CASE WHEN transaction_type = 'earned' THEN points_earned ELSE 0 END) AS lifetime_earned
+        FROM inserted
+        GROUP BY customer_id, business_id
+    ), updated AS (
+        UPDATE loyalty_balances b
+        SET balance = b.balance + d.balance,
+            lifetime_earned = b.lifetime_earned + d.lifetime_earned,
+            updated_at = NOW()
+        FROM deltas d
+        WHERE d.customer_id = b.customer_id AND d.business_id = b.business_id
+        RETURNING b.customer_id, b.business_id
+    )
+    INSERT INTO loyalty_balances AS b (customer_id, business_id, balance, lifetime_earned)
+    SELECT d.customer_id, d.business_id, d.balance, d.lifetime_earned
+    FROM deltas d
+    WHERE NOT EXISTS (SELECT 1 FROM updated u WHERE u.customer_id = d.customer_id AND u.business_id = d.business_id)
+    ORDER BY d.customer_id, d.business_id
+    -- Primer movimiento simultáneo de un cliente nuevo
+    ON CONFLICT (customer_id, business_id) DO UPDATE
+    SET balance = b.balance + EXCLUDED.balance,
+        lifetime_earned = b.lifetime_earned + EXCLUDED.lifetime_earned,
+        updated_at = NOW();
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS loyalty_points_apply_entries ON loyalty_points;
+CREATE TRIGGER loyalty_points_apply_entries
+    AFTER INSERT ON loyalty_points
+    REFERENCING NEW TABLE AS inserted
+    FOR EACH STATEMENT EXECUTE FUNCTION loyalty_apply_entries();
+
+-- El saldo materializado reemplaza la suma del historial
+CREATE OR REPLACE FUNCTION public.get_customer_total_points(p_customer_id UUID, p_business_id UUID)
+RETURNS INTEGER
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COALESCE(
+        (SELECT balance FROM loyalty_balances WHERE customer_id = p_customer_id AND business_id = p_business_id),
+        0
+    );
+$$;
+
+-- ==============================================
+-- ACUMULACIÓN
+-- ==============================================
+
+CREATE OR REPLACE FUNCTION public.loyalty_accrue(p_appointment_id UUID)
+RETURNS INTEGER
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH entry AS (
+        INSERT INTO loyalty_points (business_id, customer_id, appointment_id, points_earned, transaction_type, description)
+        SELECT a.business_id, a.customer_id, a.id, s.points_awarded, 'earned', s.name
+        FROM appointments a
+        JOIN services s ON s.id = a.service_id
+        WHERE a.id = p_appointment_id
+          AND a.status = 'completed'
+          AND COALESCE(s.points_awarded, 0) > 0
+        ON CONFLICT (appointment_id) WHERE transaction_type = 'earned' DO NOTHING
+        RETURNING points_earned
+    )
+    SELECT COALESCE((SELECT points_earned FROM entry), 0);
+$$;
+
+-- Turnos que pasan a 'completed' (uno o muchos en la misma sentencia):
+-- un solo INSERT ... SELECT para todos
+CREATE OR REPLACE FUNCTION public.loyalty_accrue_completed()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    INSERT INTO loyalty_points (business_id, customer_id, appointment_id, points_earned, transaction_type, description)
+    SELECT n.business_id, n.customer_id, n.id, s.points_awarded, 'earned', s.name
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    JOIN services s ON s.id = n.service_id
+    WHERE n.status = 'completed'
+      AND o.status IS DISTINCT FROM 'completed'
+      AND COALESCE(s.points_awarded, 0) > 0
+    ORDER BY n.customer_id, n.business_id
+    ON CONFLICT (appointment_id) WHERE transaction_type = 'earned' DO NOTHING;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS appointments_loyalty_accrual ON appointments;
+CREATE TRIGGER appointments_loyalty_accrual
+    AFTER UPDATE ON appointments
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION loyalty_accrue_completed();
+
+-- ==============================================
+-- CANJES Y AJUSTES
+-- ==============================================
+
+CREATE OR REPLACE FUNCTION public.loyalty_redeem(
+    p_business_id UUID,
+    p_customer_id UUID,
+    p_reward_id UUID,
+    p_appointment_id UUID DEFAULT NULL
+) RETURNS TABLE(redemption JSONB, balance INTEGER)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_reward loyalty_rewards;
+    v_balance INTEGER;
+    v_redemption loyalty_redemptions;
+BEGIN
+    SELECT * INTO v_reward
+    FROM loyalty_rewards r
+    WHERE r.id = p_reward_id AND r.business_id = p_business_id AND r.is_active;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION USING ERRCODE = 'P0002', MESSAGE = 'reward_not_found';
+    END IF;
+
+    -- Bloquea el saldo: dos canjes simultáneos del mismo cliente se serializan acá
+    SELECT b.balance INTO v_balance
+    FROM loyalty_balances b
+    WHERE b.customer_id = p_customer_id AND b.business_id = p_business_id
+    FOR UPDATE;
+    IF COALESCE(v_balance, 0) < v_reward.points_required THEN
+        RAISE EXCEPTION USING ERRCODE = 'P0001', MESSAGE = 'insufficient_points';
+    END IF;
+
+    INSERT INTO loyalty_redemptions (business_id, customer_id, reward_id, appointment_id, points_used)
+    VALUES (p_business_id, p_customer_id, p_reward_id, p_appointment_id, v_reward.points_required)
+    RETURNING * INTO v_redemption;
+
+    INSERT INTO loyalty_points (business_id, customer_id, appointment_id, redemption_id, points_earned, transaction_type, description)
+    VALUES (p_business_id, p_customer_id, p_appointment_id, v_redemption.id, v_reward.points_required, 'redeemed', v_reward.name);
+
+    RETURN QUERY SELECT to_jsonb(v_redemption), v_balance - v_reward.points_required;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.loyalty_adjust(
+    p_business_id UUID,
+    p_customer_id UUID,
+    p_points INTEGER,
+    p_description TEXT DEFAULT NULL
+) RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_balance INTEGER;
+BEGIN
+    SELECT b.balance INTO v_balance
+    FROM loyalty_balances b
+    WHERE b.customer_id = p_customer_id AND b.business_id = p_business_id
+    FOR UPDATE;
+    IF COALESCE(v_balance, 0) + p_points < 0 THEN
+        RAISE EXCEPTION USING ERRCODE = 'P0001', MESSAGE = 'insufficient_points';
+    END IF;
+
+    INSERT INTO loyalty_points (business_id, customer_id, points_earned, transaction_type, description)
+    VALUES (p_business_id, p_customer_id, p_points, 'adjusted', p_description);
+
+    RETURN COALESCE(v_balance, 0) + p_points;
+END;
+$$;
+
+-- ==============================================
+-- VERIFICACIÓN Y RECONSTRUCCIÓN DE SALDOS
+-- ==============================================
+
+-- Saldos guardados que no coinciden con la suma del ledger (de un negocio o de todos)
+CREATE OR REPLACE FUNCTION public.loyalty_verify_balances(p_business_id UUID DEFAULT NULL)
+RETURNS TABLE(
+    customer_id UUID,
+    business_id UUID,
+    stored_balance INTEGER,
+    computed_balance INTEGER,
+    stored_lifetime_earned INTEGER,
+    computed_lifetime_earned INTEGER
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH computed AS (
+        SELECT p.customer_id,
+               p.business_id,
+               SUM(loyalty_entry_delta(p.transaction_type, p.points_earned))::INTEGER AS balance,
+               SUM(CASE WHEN p.transaction_type = 'earned' THEN p.points_earned ELSE 0 END)::INTEGER AS lifetime_earned
+        FROM loyalty_points p
+        WHERE p_business_id IS NULL OR p.business_id = p_business_id
+        GROUP BY p.customer_id, p.business_id
+    ), stored AS (
+        SELECT b.customer_id, b.business_id, b.balance, b.lifetime_earned
+        FROM loyalty_balances b
+        WHERE p_business_id IS NULL OR b.business_id = p_business_id
+    )
+    SELECT COALESCE(c.customer_id, s.customer_id),
+           COALESCE(c.business_id, s.business_id),
+           COALESCE(s.balance, 0),
+           COALESCE(c.balance, 0),
+           COALESCE(s.lifetime_earned, 0),
+           COALESCE(c.lifetime_earned, 0)
+    FROM computed c
+    FULL JOIN stored s ON s.customer_id = c.customer_id AND s.business_id = c.business_id
+    WHERE COALESCE(s.balance, 0) <> COALESCE(c.balance, 0)
+       OR COALESCE(s.lifetime_earned, 0) <> COALESCE(c.lifetime_earned, 0);
+$$;
+
+-- Corrige en bloque los saldos que no coinciden; devuelve cuántos cambió.
+-- Bloquea los inserts en el ledger mientras recalcula (las lecturas siguen)
+CREATE OR REPLACE FUNCTION public.loyalty_rebuild_balances(p_business_id UUID DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    LOCK TABLE loyalty_points IN SHARE MODE;
+
+    INSERT INTO loyalty_balances AS b (customer_id, business_id, balance, lifetime_earned)
+    SELECT v.customer_id, v.business_id, v.computed_balance, v.computed_lifetime_earned
+    FROM loyalty_verify_balances(p_business_id) v
+    ORDER BY v.customer_id, v.business_id
+    ON CONFLICT (customer_id, business_id) DO UPDATE
+    SET balance = EXCLUDED.balance,
+        lifetime_earned = EXCLUDED.lifetime_earned,
+        updated_at = NOW();
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$;
+
+-- Solo el backend (service_role) acumula, canjea y ajusta: valida el rol antes de llamar
+REVOKE ALL ON FUNCTION public.loyalty_accrue(UUID) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.loyalty_redeem(UUID, UUID, UUID, UUID) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.loyalty_adjust(UUID, UUID, INTEGER, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.loyalty_verify_balances(UUID) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.loyalty_rebuild_balances(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.loyalty_accrue(UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION public.loyalty_redeem(UUID, UUID, UUID, UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION public.loyalty_adjust(UUID, UUID, INTEGER, TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION public.loyalty_verify_balances(UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION public.loyalty_rebuild_balances(UUID) TO service_role;
+
+-- Saldos iniciales a partir del historial existente (idempotente)
+SELECT public.loyalty_rebuild_balances();
@@ -0,0 +1,136 @@
+"""
+Conexión LISTEN a Postgres compartida por las caches del proceso
+Cada cache se suscribe a un canal (NOTIFY de los triggers de la base) y
+recibe avisos al conectar y al perder la conexión: mientras no hay conexión
+puede haber eventos perdidos. Requiere DATABASE_URL (conexión directa, no el
+pooler en modo transacción) y asyncpg, que se importa solo al arrancar.
+"""
+import asyncio
+import inspect
+import json
+import logging
+from typing import Any, Callable, List, NamedTuple, Optional, Set
+
+from src.core.config import FromSettings
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[..., Any]
+
+
+class Subscription(NamedTuple):
+    channel: str
+    on_event: Callback  # recibe el payload JSON ya parseado
+    on_connect: Optional[Callback]
+    on_disconnect: Optional[Callback]
+
+
+class PostgresListener:
+    """Una conexión LISTEN por proceso para todos los canales; se reconecta sola"""
+
+    dsn = FromSettings("database_url")
+
+    def __init__(self, dsn: Optional[str] = None, keepalive: float = 30.0, reconnect_delay: float = 5.0):
+        self.dsn = dsn
+        self.keepalive = keepalive
+        self.reconnect_delay = reconnect_delay
+        self.connected = False
+        self._subscriptions: List[Subscription] = []
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    def subscribe(
+        self,
+        channel: str,
+        on_event: Callback,
+        on_connect: Optional[Callback] = None,
+        on_disconnect: Optional[Callback] = None,
+    ) -> None:
+        """Registrar callbacks (funciones o corrutinas) para un canal"""
+        self._subscriptions.append(Subscription(channel, on_event, on_connect, on_disconnect))
+
+    def _call(self, callback: Optional[Callback], *args: Any) -> None:
+        if callback is None:
+            return
+        try:
+            result = callback(*args)
+            if inspect.isawaitable(result):
+                task = asyncio.ensure_future(result)
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+        except Exception:
+            logger.exception("Error en callback de %s", getattr(callback, "__qualname__", callback))
+
+    def _handler(self, subscription: Subscription) -> Callback:
+        def on_notify(connection, pid: int, channel: str, payload: str) -> None:
+            try:
+                event = json.loads(payload)
+            except ValueError:
+                logger.warning("Payload inválido en %s", channel)
+                return
+            self._call(subscription.on_event, event)
+        return on_notify
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        connection = await asyncpg.connect(self.dsn, timeout=self.keepalive)
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        try:
+            for subscription in self._subscriptions:
+                await connection.add_listener(subscription.channel, self._handler(subscription))
+            self.connected = True
+            for subscription in self._subscriptions:
+                self._call(subscription.on_connect)
+            logger.info("Escuchando %s", ", ".join(sorted({s.channel for s in self._subscriptions})))
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), timeout=self.keepalive)
+                except asyncio.TimeoutError:
+                    # Detecta conexiones caídas sin cierre (red, failover)
+                    await asyncio.wait_for(connection.fetchval("SELECT 1"), timeout=self.keepalive)
+        finally:
+            if self.connected:
+                self.connected = False
+                for subscription in self._subscriptions:
+                    self._call(subscription.on_disconnect)
+            if not connection.is_closed():
+                connection.terminate()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+                logger.warning("Conexión LISTEN cerrada")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Conexión LISTEN perdida (%s)", e)
+            await asyncio.sleep(self.reconnect_delay)
+
+    def start(self) -> None:
+        """Iniciar la escucha en segundo plano (sin DATABASE_URL o sin asyncpg no hace nada)"""
+        if not self.dsn or not self._subscriptions:
+            return
+        try:
+            import asyncpg  # noqa: F401
+        except ImportError:
+            logger.warning("asyncpg no está instalado: sin invalidación por LISTEN/NOTIFY")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Detener la escucha"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Instancia global: una conexión LISTEN por worker
+postgres_listener = PostgresListener()
@@ -0,0 +1,110 @@
+-- ==============================================
+-- ONBOARDING DE OWNERS EN UNA SOLA TRANSACCIÓN
+-- ==============================================
+-- Crea el negocio, el perfil del owner y (opcionalmente) horarios, servicios
+-- y empleados iniciales en una única llamada RPC:
+--   supabase.rpc('onboard_owner', {...})
+-- Devuelve una sola fila (business, services, employees): postgrest-py
+-- espera siempre una lista de objetos como respuesta.
+-- Requiere tables_schema.sql, user_profiles_schema.sql y access_codes_schema.sql.
+
+CREATE OR REPLACE FUNCTION public.onboard_owner(
+    p_user_id UUID,
+    p_business JSONB,
+    p_first_name TEXT DEFAULT NULL,
+    p_last_name TEXT DEFAULT NULL,
+    p_hours JSONB DEFAULT '[]'::jsonb,
+    p_services JSONB DEFAULT '[]'::jsonb,
+    p_employees JSONB DEFAULT '[]'::jsonb
+) RETURNS TABLE (business JSONB, services JSONB, employees JSONB)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_business businesses;
+    v_services JSONB;
+    v_employees JSONB;
+    v_attempt INTEGER;
+BEGIN
+    -- Negocio: si el access_code (el recibido o uno generado) ya existe, se
+    -- reintenta con otro generado
+    FOR v_attempt IN 1..5 LOOP
+        INSERT INTO businesses (name, address, phone, timezone, access_code, is_active)
+        VALUES (
+            p_business->>'name',
+            p_business->>'address',
+            p_business->>'phone',
+            COALESCE(p_business->>'timezone', 'America/Argentina/Buenos_Aires'),
+            COALESCE(
+                CASE WHEN v_attempt = 1 THEN p_business->>'access_code' END,
+                generate_access_code()
+            ),
+            true
+        )
+        ON CONFLICT (access_code) DO NOTHING
+        RETURNING * INTO v_business;
+        EXIT WHEN FOUND;
+    END LOOP;
+    IF v_business.id IS NULL THEN
+        RAISE EXCEPTION 'access_code_exhausted' USING ERRCODE = 'unique_violation';
+    END IF;
+
+    -- Perfil del owner
+    INSERT INTO user_profiles (id, role, business_id, first_name, last_name)
+    VALUES (p_user_id, 'owner', v_business.id, p_first_name, p_last_name);
+
+    -- Horarios del salón
+    INSERT INTO business_hours (business_id, day_of_week, open_time, close_time, is_closed)
+    SELECT
+        v_business.id,
+        (h->>'day_of_week')::INTEGER,
+        (h->>'open_time')::TIME,
+        (h->>'close_time')::TIME,
+        COALESCE((h->>'is_closed')::BOOLEAN, false)
+    FROM jsonb_array_elements(p_hours) AS h;
+
+    -- Servicios iniciales
+    WITH inserted AS (
+        INSERT INTO services (business_id, name, description, price, duration_minutes, points_awarded)
+        SELECT
+            v_business.id,
+            s->>'name',
+            s->>'description',
+            (s->>'price')::DECIMAL(10,2),
+            (s->>'duration_minutes')::INTEGER,
+            COALESCE((s->>'points_awarded')::INTEGER, 0)
+        FROM jsonb_array_elements(p_services) AS s
+        RETURNING id, name, price, duration_minutes, points_awarded
+    )
+    SELECT COALESCE(jsonb_agg(to_jsonb(inserted)), '[]'::jsonb) INTO v_services FROM inserted;
+
+    -- Empleados iniciales (sin cuenta de usuario todavía)
+    WITH inserted AS (
+        INSERT INTO employees (business_id, name, phone, email)
+        SELECT
+            v_business.id,
+            e->>'name',
+            e->>'phone',
+            e->>'email'
+        FROM jsonb_array_elements(p_employees) AS e
+        RETURNING id, name, email
+    )
+    SELECT COALESCE(jsonb_agg(to_jsonb(inserted)), '[]'::jsonb) INTO v_employees FROM inserted;
+
+    RETURN QUERY SELECT
+        jsonb_build_object(
+            'id', v_business.id,
+            'name', v_business.name,
+            'address', v_business.address,
+            'access_code', v_business.access_code,
+            'timezone', v_business.timezone
+        ),
+        v_services,
+        v_employees;
+END;
+$$;
+
+-- Solo el backend (service_role) puede ejecutar el onboarding
+REVOKE ALL ON FUNCTION public.onboard_owner(UUID, JSONB, TEXT, TEXT, JSONB, JSONB, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.onboard_owner(UUID, JSONB, TEXT, TEXT, JSONB, JSONB, JSONB) TO service_role;
@@ -0,0 +1,41 @@
+-- ==============================================
+-- PROMOCIONES VIGENTES: ÍNDICE Y EVENTOS (LISTEN/NOTIFY)
+-- ==============================================
+-- Cada worker guarda en memoria las promociones activas que no vencieron de
+-- cada negocio consultado y decide con la hora actual cuáles están vigentes
+-- (ver src/services/promotions.py). La base solo se lee al cargar un negocio.
+--
+-- Cambios en promotions publican un NOTIFY en el canal "promotion_changes"
+-- para que cada worker descarte las promociones cacheadas de ese negocio:
+--   {"business_id", "id", "updated_at"}   (updated_at null al eliminar)
+-- El worker que hizo el cambio ya lo aplicó (write-through) y reconoce el
+-- evento por id + updated_at: no vuelve a cargar el negocio.
+-- Requiere tables_schema.sql.
+
+-- Carga de un negocio: activas que todavía no vencieron
+CREATE INDEX IF NOT EXISTS idx_promotions_business_active_until
+    ON promotions (business_id, valid_until)
+    WHERE status = 'active';
+
+CREATE OR REPLACE FUNCTION public.notify_promotion_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('promotion_changes', jsonb_build_object(
+            'business_id', OLD.business_id, 'id', OLD.id, 'updated_at', NULL
+        )::text);
+    ELSE
+        PERFORM pg_notify('promotion_changes', jsonb_build_object(
+            'business_id', NEW.business_id, 'id', NEW.id, 'updated_at', NEW.updated_at
+        )::text);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS promotions_notify ON promotions;
+CREATE TRIGGER promotions_notify
+    AFTER INSERT OR UPDATE OR DELETE ON promotions
+    FOR EACH ROW EXECUTE FUNCTION notify_promotion_change();
@@ -0,0 +1,446 @@
+"""
+Capa de repositorios asíncronos sobre Supabase
+Agrupa las operaciones de PostgREST y GoTrue que usan las rutas y dependencias
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from gotrue import AsyncGoTrueClient
+from gotrue.types import AuthResponse, Session, User
+from postgrest import AsyncPostgrestClient
+
+from src.database.async_supabase import async_supabase_client
+
+
+class AuthRepository:
+    """Operaciones sobre Supabase Auth"""
+
+    def __init__(self, auth: AsyncGoTrueClient, admin_auth: AsyncGoTrueClient):
+        self.auth = auth
+        self.admin_auth = admin_auth
+
+    async def get_user(self, token: str) -> Optional[User]:
+        """Validar un access token contra Supabase Auth"""
+        response = await self.auth.get_user(token)
+        return response.user if response else None
+
+    async def create_user(self, email: str, password: str, email_confirm: bool = True) -> Optional[User]:
+        """Crear un usuario con la API admin"""
+        response = await self.admin_auth.admin.create_user({
+            "email": email,
+            "password": password,
+            "email_confirm": email_confirm,
+        })
+        return response.user
+
+    async def delete_user(self, user_id: str) -> None:
+        """Eliminar un usuario con la API admin"""
+        await self.admin_auth.admin.delete_user(user_id)
+
+    async def sign_up(self, email: str, password: str) -> AuthResponse:
+        """Auto-registro de un usuario"""
+        return await self.auth.sign_up({"email": email, "password": password})
+
+    async def health(self) -> Any:
+        """Estado del servicio de Supabase Auth (GET /auth/v1/health)"""
+        return await self.auth._request("GET", "health")
+
+    async def sign_in_with_password(self, email: str, password: str) -> Optional[Session]:
+        """Iniciar sesión y devolver la sesión con los tokens"""
+        response = await self.auth.sign_in_with_password({"email": email, "password": password})
+        return response.session
+
+
+class TableRepository:
+    """Repositorio base sobre una conexión PostgREST"""
+
+    def __init__(self, db: AsyncPostgrestClient):
+        self.db = db
+
+    async def sample(self, table: str, columns: str = "*", limit: int = 1) -> List[Dict[str, Any]]:
+        """Leer unas pocas filas de una tabla (pruebas de acceso)"""
+        response = await self.db.table(table).select(columns).limit(limit).execute()
+        return response.data
+
+
+class UserProfileRepository(TableRepository):
+    """Operaciones sobre la tabla user_profiles"""
+
+    table = "user_profiles"
+
+    async def get_role(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Obtener rol y business_id de un usuario"""
+        response = await self.db.table(self.table).select("role, business_id").eq("id", user_id).execute()
+        return response.data[0] if response.data else None
+
+    async def create(self, profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Insertar un perfil de usuario"""
+        response = await self.db.table(self.table).insert(profile).execute()
+        return response.data[0] if response.data else None
+
+    async def create_many(self, profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insertar varios perfiles en un único request (insert por lotes)"""
+        response = await self.db.table(self.table).insert(profiles).execute()
+        return response.data
+
+    async def delete(self, user_id: str) -> None:
+        """Eliminar el perfil de un usuario"""
+        await self.db.table(self.table).delete().eq("id", user_id).execute()
+
+
+class BusinessRepository(TableRepository):
+    """Operaciones sobre la tabla businesses"""
+
+    table = "businesses"
+
+    async def create(self, business: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Insertar un negocio"""
+        response = await self.db.table(self.table).insert(business).execute()
+        return response.data[0] if response.data else None
+
+    async def create_unique(self, business: Dict[str, Any], column: str) -> Optional[Dict[str, Any]]:
+        """Insertar un negocio salvo que ya exista uno con el mismo `column` (None si existía)"""
+        response = await self.db.table(self.table).upsert(
+            business, on_conflict=column, ignore_duplicates=True
+        ).execute()
+        return response.data[0] if response.data else None
+
+    async def get_id_by_access_code(self, access_code: str) -> Optional[str]:
+        """Id del negocio activo con ese código de acceso"""
+        response = await self.db.table(self.table).select("id").eq(
+            "access_code", access_code
+        ).eq("is_active", True).execute()
+        return response.data[0]["id"] if response.data else None
+
+    async def list_access_codes(self, start: int, end: int) -> List[Dict[str, Any]]:
+        """Página [start, end] de (id, access_code) de los negocios activos"""
+        response = await self.db.table(self.table).select("id, access_code").eq(
+            "is_active", True
+        ).order("id").range(start, end).execute()
+        return response.data
+
+    async def delete(self, business_id: str) -> None:
+        """Eliminar un negocio"""
+        await self.db.table(self.table).delete().eq("id", business_id).execute()
+
+    async def onboard_owner(
+        self,
+        user_id: str,
+        business: Dict[str, Any],
+        first_name: Optional[str] = None,
+        last_name: Optional[str] = None,
+        hours: Optional[List[Dict[str, Any]]] = None,
+        services: Optional[List[Dict[str, Any]]] = None,
+        employees: Optional[List[Dict[str, Any]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Crear negocio, perfil del owner, horarios, servicios y empleados en una
+        sola transacción y un solo round trip (función onboard_owner)
+        """
+        request = await self.db.rpc("onboard_owner", {
+            "p_user_id": user_id,
+            "p_business": business,
+            "p_first_name": first_name,
+            "p_last_name": last_name,
+            "p_hours": hours or [],
+            "p_services": services or [],
+            "p_employees": employees or [],
+        })
+        response = await request.execute()
+        return response.data[0] if response.data else None
+
+    async def get_with_services_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Obtener un negocio por nombre junto con sus servicios"""
+        response = await self.db.table(self.table).select("""
+            id,
+            name,
+            address,
+            access_code,
+            services (
+                id,
+                name,
+                price,
+                duration_minutes,
+                points_awarded
+            )
+        """).eq("name", name).execute()
+        return response.data[0] if response.data else None
+
+    async def get_catalog(self, business_id: str) -> Optional[Dict[str, Any]]:
+        """Negocio activo con sus horarios y servicios"""
+        response = await self.db.table(self.table).select("""
+            id,
+            name,
+            address,
+            phone,
+            timezone,
+            business_hours (
+                day_of_week,
+                open_time,
+                close_time,
+                is_closed
+            ),
+            services (
+                id,
+                name,
+                description,
+                price,
+                duration_minutes,
+                points_awarded,
+                is_active
+            )
+        """).eq("id", business_id).eq("is_active", True).execute()
+        return response.data[0] if response.data else None
+
+
+class AppointmentRepository(TableRepository):
+    """Operaciones sobre appointments y la disponibilidad de turnos"""
+
+    table = "appointments"
+
+    async def availability_snapshot(
+        self, business_id: str, service_id: str, start: datetime, end: datetime
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Horarios, empleados e intervalos ocupados de un negocio en [start, end)
+        en un solo round trip (función availability_snapshot)
+        """
+        request = await self.db.rpc("availability_snapshot", {
+            "p_business_id": business_id,
+            "p_service_id": service_id,
+            "p_from": start.isoformat(),
+            "p_to": end.isoformat(),
+        })
+        response = await request.execute()
+        return response.data[0] if response.data else None
+
+    async def book(
+        self,
+        business_id: str,
+        customer_id: str,
+        employee_id: str,
+        service_id: str,
+        start: datetime,
+        notes: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Reservar un turno con un solo insert (función book_appointment).
+        Un horario ya ocupado levanta APIError con code 23P01.
+        """
+        request = await self.db.rpc("book_appointment", {
+            "p_business_id": business_id,
+            "p_customer_id": customer_id,
+            "p_employee_id": employee_id,
+            "p_service_id": service_id,
+            "p_start": start.isoformat(),
+            "p_notes": notes,
+        })
+        response = await request.execute()
+        return response.data[0] if response.data else None
+
+    async def notification(self, appointment_id: str) -> Optional[Dict[str, Any]]:
+        """Datos de un turno para su email: cliente, negocio, servicio y horario"""
+        request = await self.db.rpc("appointment_notification", {"p_appointment_id": appointment_id})
+        response = await request.execute()
+        return response.data or None
+
+    async def enqueue_reminders(self, start: datetime, end: datetime, lead_seconds: int) -> int:
+        """
+        Encolar los recordatorios de los turnos que empiezan en [start, end)
+        con una sola sentencia (función enqueue_appointment_reminders)
+        """
+        request = await self.db.rpc("enqueue_appointment_reminders", {
+            "p_from": start.isoformat(),
+            "p_to": end.isoformat(),
+            "p_lead_seconds": lead_seconds,
+        })
+        response = await request.execute()
+        return response.data or 0
+
+
+class JobRepository(TableRepository):
+    """Operaciones sobre la cola de trabajos (tabla jobs)"""
+
+    table = "jobs"
+
+    async def enqueue(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Insertar un trabajo; con dedupe_key repetida no se inserta (None)"""
+        if job.get("dedupe_key"):
+            query = self.db.table(self.table).upsert(job, on_conflict="dedupe_key", ignore_duplicates=True)
+        else:
+            query = self.db.table(self.table).insert(job)
+        response = await query.execute()
+        return response.data[0] if response.data else None
+
+    async def claim(self, limit: int, lease_seconds: int) -> List[Dict[str, Any]]:
+        """Reclamar hasta `limit` trabajos vencidos (función claim_jobs)"""
+        request = await self.db.rpc("claim_jobs", {"p_limit": limit, "p_lease_seconds": lease_seconds})
+        response = await request.execute()
+        return response.data
+
+    async def update_claimed(self, job: Dict[str, Any], values: Dict[str, Any]) -> None:
+        """Cerrar un trabajo reclamado; si otro worker lo volvió a reclamar no cambia nada"""
+        await self.db.table(self.table).update(values).eq("id", job["id"]).eq(
+            "attempts", job["attempts"]
+        ).eq("status", "running").execute()
+
+    async def purge(self, before: datetime) -> None:
+        """Eliminar los trabajos terminados antes de `before`"""
+        await self.db.table(self.table).delete().eq("status", "done").lt("updated_at", before.isoformat()).execute()
+
+
+class LoyaltyRepository(TableRepository):
+    """Operaciones sobre el ledger de puntos (loyalty_points) y los saldos"""
+
+    table = "loyalty_points"
+
+    async def balance(self, customer_id: str, business_id: str) -> Optional[Dict[str, Any]]:
+        """Saldo materializado de un cliente en un negocio (None si nunca tuvo movimientos)"""
+        response = await self.db.table("loyalty_balances").select(
+            "balance, lifetime_earned, updated_at"
+        ).eq("customer_id", customer_id).eq("business_id", business_id).execute()
+        return response.data[0] if response.data else None
+
+    async def history(self, customer_id: str, business_id: str, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        """Movimientos de un cliente, del más reciente al más viejo"""
+        response = await self.db.table(self.table).select(
+            "id, appointment_id, redemption_id, points_earned, transaction_type, description, created_at"
+        ).eq("customer_id", customer_id).eq("business_id", business_id).order(
+            "created_at", desc=True
+        ).range(offset, offset + limit - 1).execute()
+        return response.data
+
+    async def accrue(self, appointment_id: str) -> int:
+        """Acumular los puntos de un turno completado (idempotente; función loyalty_accrue)"""
+        request = await self.db.rpc("loyalty_accrue", {"p_appointment_id": appointment_id})
+        response = await request.execute()
+        return response.data or 0
+
+    async def redeem(
+        self, business_id: str, customer_id: str, reward_id: str, appointment_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Canjear una recompensa en un round trip (función loyalty_redeem): el
+        canje y el movimiento se registran juntos o no se registran. Sin saldo
+        suficiente levanta APIError con message insufficient_points.
+        """
+        request = await self.db.rpc("loyalty_redeem", {
+            "p_business_id": business_id,
+            "p_customer_id": customer_id,
+            "p_reward_id": reward_id,
+            "p_appointment_id": appointment_id,
+        })
+        response = await request.execute()
+        return response.data[0] if response.data else None
+
+    async def adjust(self, business_id: str, customer_id: str, points: int, description: Optional[str]) -> int:
+        """Ajuste manual (positivo o negativo); devuelve el saldo nuevo (función loyalty_adjust)"""
+        request = await self.db.rpc("loyalty_adjust", {
+            "p_business_id": business_id,
+            "p_customer_id": customer_id,
+            "p_points": points,
+            "p_description": description,
+        })
+        response = await request.execute()
+        return response.data
+
+    async def verify(self, business_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Saldos que no coinciden con el ledger (función loyalty_verify_balances)"""
+        request = await self.db.rpc("loyalty_verify_balances", {"p_business_id": business_id})
+        response = await request.execute()
+        return response.data
+
+    async def rebuild(self, business_id: Optional[str] = None) -> int:
+        """Recalcular en bloque los saldos que no coinciden; devuelve cuántos cambió"""
+        request = await self.db.rpc("loyalty_rebuild_balances", {"p_business_id": business_id})
+        response = await request.execute()
+        return response.data or 0
+
+
+class PromotionRepository(TableRepository):
+    """Operaciones sobre promotions"""
+
+    table = "promotions"
+    columns = "id, business_id, title, description, valid_from, valid_until, status, updated_at"
+
+    async def list_current(self, business_id: str, now: datetime) -> List[Dict[str, Any]]:
+        """Promociones activas de un negocio que no vencieron antes de `now` (vigentes y futuras)"""
+        response = await self.db.table(self.table).select(self.columns).eq("business_id", business_id).eq(
+            "status", "active"
+        ).gte("valid_until", now.isoformat()).execute()
+        return response.data
+
+    async def list_all(self, business_id: str) -> List[Dict[str, Any]]:
+        """Todas las promociones de un negocio, de la más reciente a la más vieja"""
+        response = await self.db.table(self.table).select(self.columns).eq("business_id", business_id).order(
+            "valid_from", desc=True
+        ).execute()
+        return response.data
+
+    async def create(self, promotion: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = await self.db.table(self.table).insert(promotion).execute()
+        return response.data[0] if response.data else None
+
+    async def update(self, business_id: str, promotion_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Actualizar una promoción del negocio; None si no existe"""
+        response = await self.db.table(self.table).update(values).eq("id", promotion_id).eq(
+            "business_id", business_id
+        ).execute()
+        return response.data[0] if response.data else None
+
+    async def delete(self, business_id: str, promotion_id: str) -> bool:
+        """Eliminar una promoción del negocio; False si no existe"""
+        response = await self.db.table(self.table).delete().eq("id", promotion_id).eq(
+            "business_id", business_id
+        ).execute()
+        return bool(response.data)
+
+
+def get_auth_repository() -> AuthRepository:
+    """Dependency para operaciones de Supabase Auth"""
+    return AuthRepository(async_supabase_client.auth, async_supabase_client.admin_auth)
+
+
+def get_profile_repository() -> UserProfileRepository:
+    """Dependency para user_profiles (cliente administrativo)"""
+    return UserProfileRepository(async_supabase_client.admin_rest)
+
+
+def get_business_repository() -> BusinessRepository:
+    """Dependency para businesses (cliente administrativo)"""
+    return BusinessRepository(async_supabase_client.admin_rest)
+
+
+def get_public_business_repository() -> BusinessRepository:
+    """Dependency para businesses con la anon key (aplica RLS)"""
+    return BusinessRepository(async_supabase_client.rest)
+
+
+def get_table_repository() -> TableRepository:
+    """Dependency para pruebas de acceso con la anon key"""
+    return TableRepository(async_supabase_client.rest)
+
+
+def get_admin_table_repository() -> TableRepository:
+    """Dependency para pruebas de acceso con el cliente administrativo"""
+    return TableRepository(async_supabase_client.admin_rest)
+
+
+def get_appointment_repository() -> AppointmentRepository:
+    """Dependency para appointments y disponibilidad (cliente administrativo)"""
+    return AppointmentRepository(async_supabase_client.admin_rest)
+
+
+def get_job_repository() -> JobRepository:
+    """Dependency para la cola de trabajos (cliente administrativo)"""
+    return JobRepository(async_supabase_client.admin_rest)
+
+
+def get_loyalty_repository() -> LoyaltyRepository:
+    """Dependency para puntos de fidelización (cliente administrativo)"""
+    return LoyaltyRepository(async_supabase_client.admin_rest)
+
+
+def get_promotion_repository() -> PromotionRepository:
+    """Dependency para promotions (cliente administrativo)"""
+    return PromotionRepository(async_supabase_client.admin_rest)
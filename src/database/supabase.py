@@ -1,50 +1,143 @@
 """
 Configuración y cliente de Supabase
+supabase-py (y storage/realtime) se importan al crear el primer cliente: la
+API usa los clientes asíncronos y no paga esos imports al arrancar.
 """
-from supabase import create_client, Client
+import threading
+from typing import TYPE_CHECKING, Optional
+
+import httpx
+
 from src.core.config import settings
+from src.core.metrics import InstrumentedTransport
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 class SupabaseClient:
-    """Cliente singleton de Supabase"""
+    """
+    Gestor de conexiones de Supabase (singleton).
+    Mantiene clientes anon y service-role de larga vida sobre un único pool
+    HTTP acotado con keep-alive, en lugar de crear clientes por request.
+    """
 
     _instance = None
-    _client: Client = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
         return cls._instance
 
     def __init__(self):
-        if self._client is None:
-            self._client = create_client(
-                settings.supabase_url,
-                settings.supabase_anon_key
-            )
+        if self._initialized:
+            return
+        self._lock = threading.Lock()
+        self._transport: Optional[httpx.BaseTransport] = None
+        self._client: Optional["Client"] = None
+        self._admin_client: Optional["Client"] = None
+        self._initialized = True
+
+    @staticmethod
+    def _timeout() -> httpx.Timeout:
+        return httpx.Timeout(
+            settings.supabase_http_timeout,
+            connect=settings.supabase_http_connect_timeout,
+        )
+
+    def _get_transport(self) -> httpx.BaseTransport:
+        """Pool de conexiones compartido por todos los clientes"""
+        if self._transport is None:
+            # Cada llamada a Supabase queda registrada en las métricas
+            self._transport = InstrumentedTransport(httpx.HTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=settings.supabase_http_max_connections,
+                    max_keepalive_connections=settings.supabase_http_max_keepalive,
+                    keepalive_expiry=settings.supabase_http_keepalive_expiry,
+                ),
+                retries=settings.supabase_http_retries,
+            ))
+        return self._transport
+
+    def _build_client(self, key: str) -> "Client":
+        """Crear un cliente cuyas sesiones HTTP usan el pool compartido"""
+        from gotrue.http_clients import SyncClient as GoTrueHttpClient
+        from postgrest.utils import SyncClient as PostgrestHttpClient
+        from supabase import create_client
+        from supabase.lib.client_options import ClientOptions
+
+        # Opciones nuevas por cliente: el default de create_client es un objeto
+        # compartido cuyos headers se mutan con la key de cada cliente.
+        # Sin sesión persistida ni auto-refresh: el cliente es compartido entre requests.
+        options = ClientOptions(
+            auto_refresh_token=False,
+            persist_session=False,
+            postgrest_client_timeout=self._timeout(),
+        )
+        client = create_client(settings.supabase_url, key, options)
+        transport = self._get_transport()
+
+        # PostgREST
+        default_session = client.postgrest.session
+        client.postgrest.session = PostgrestHttpClient(
+            base_url=default_session.base_url,
+            headers=default_session.headers,
+            timeout=self._timeout(),
+            transport=transport,
+        )
+        default_session.close()
+
+        # GoTrue (el cliente de auth y la API admin comparten sesión)
+        default_auth_session = client.auth._http_client
+        auth_session = GoTrueHttpClient(timeout=self._timeout(), transport=transport)
+        client.auth._http_client = auth_session
+        client.auth.admin._http_client = auth_session
+        default_auth_session.close()
+
+        return client
 
     @property
-    def client(self) -> Client:
+    def client(self) -> "Client":
         """Obtener el cliente de Supabase"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build_client(settings.supabase_anon_key)
         return self._client
 
-    def get_admin_client(self) -> Client:
+    @property
+    def admin_client(self) -> "Client":
+        """Obtener el cliente con privilegios administrativos"""
+        if self._admin_client is None:
+            with self._lock:
+                if self._admin_client is None:
+                    self._admin_client = self._build_client(settings.supabase_service_role_key)
+        return self._admin_client
+
+    def get_admin_client(self) -> "Client":
         """Obtener cliente con privilegios administrativos"""
-        return create_client(
-            settings.supabase_url,
-            settings.supabase_service_role_key
-        )
+        return self.admin_client
+
+    def close(self) -> None:
+        """Cerrar el pool de conexiones (apagado de la aplicación)"""
+        with self._lock:
+            if self._transport is not None:
+                self._transport.close()
+            self._transport = None
+            self._client = None
+            self._admin_client = None
 
 
 # Instancia global del cliente
 supabase_client = SupabaseClient()
 
 
-def get_supabase() -> Client:
+def get_supabase() -> "Client":
     """Dependency para obtener el cliente de Supabase"""
     return supabase_client.client
 
 
-def get_supabase_admin() -> Client:
+def get_supabase_admin() -> "Client":
     """Dependency para obtener el cliente administrativo de Supabase"""
-    return supabase_client.get_admin_client()
\ No newline at end of file
+    return supabase_client.get_admin_client()
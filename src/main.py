@@ -2,45 +2,84 @@
 IRIS Backend API - Aplicación principal
 SaaS de Gestión para Salones de Belleza
 """
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
 from src.core.config import settings
+from src.core.log import setup_logging, shutdown_logging
+from src.core.cache import close_redis
+from src.core.rate_limit import rate_limit_backend
+from src.core.security import signing_key_cache
+from src.api.middleware.metrics import MetricsMiddleware
+from src.api.middleware.rate_limit import RateLimitMiddleware
+from src.api.middleware.request_logging import RequestLoggingMiddleware
+from src.database.async_supabase import async_supabase_client
+from src.database.supabase import supabase_client
+from src.database.notifications import postgres_listener
+from src.utils.serialization import FastJSONResponse
+from src.services.access_codes import access_code_index
+from src.services import emails  # noqa: F401 - registra los handlers de emails en la cola
+from src.services.jobs import job_queue
+from src.services.reminders import reminder_scheduler
+from src.services.health import health_monitor
+from src.api.routes import health
+from src.api.routes import metrics
 from src.api.routes import test
 from src.api.routes import auth as auth_router
+from src.api.routes import onboarding
+from src.api.routes import appointments
+from src.api.routes import businesses
+from src.api.routes import loyalty
+from src.api.routes import promotions
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Arranque y apagado de recursos compartidos"""
+    # Logging estructurado: la escritura ocurre en un hilo aparte
+    setup_logging(settings.log_level, settings.log_format)
+    # Clientes de Supabase y su pool: se crean al arrancar, no al importar ni en el primer request
+    async_supabase_client.open()
+    # Refrescar en segundo plano las claves de firma para verificar JWT localmente
+    if settings.auth_verification_mode != "remote":
+        signing_key_cache.start()
+    # Sondas de dependencias para /ready
+    health_monitor.start()
+    # Índice de códigos de acceso en memoria
+    access_code_index.start()
+    # Cola de trabajos (emails) y escaneo de recordatorios de turnos
+    job_queue.start()
+    reminder_scheduler.start()
+    # Invalidación de caches por LISTEN/NOTIFY (requiere DATABASE_URL)
+    postgres_listener.start()
+    yield
+    await postgres_listener.stop()
+    await reminder_scheduler.stop()
+    # Espera los encolados pendientes y los trabajos en curso (antes de cerrar los clientes)
+    await job_queue.stop()
+    await access_code_index.stop()
+    await health_monitor.stop()
+    await signing_key_cache.stop()
+    await async_supabase_client.close()
+    supabase_client.close()
+    await close_redis()
+    shutdown_logging()
 
-# Crear aplicación FastAPI
-app = FastAPI(
-    title=settings.app_name,
-    version=settings.app_version,
-    description="API Backend para IRIS - Sistema de gestión de salones de belleza",
-    docs_url="/docs" if settings.debug else None,
-    redoc_url="/redoc" if settings.debug else None,
-)
-
-# Middleware CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
-    allow_headers=["*"],
-)
-
-# Middleware de hosts confiables (seguridad)
-if not settings.debug:
-    app.add_middleware(
-        TrustedHostMiddleware,
-        allowed_hosts=["*.iris-app.com", "localhost"]
-    )
 
 # Middleware de manejo de excepciones global
-@app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Maneja cualquier excepcion no capturada y devuelve una respuesta 500."""
-    return JSONResponse(
+    logger.error(
+        "Excepción no manejada en %s %s", request.method, request.url.path,
+        exc_info=(type(exc), exc, exc.__traceback__),
+    )
+    return FastJSONResponse(
         status_code=500,
         content={
             "error": "Internal Server Error",
@@ -48,7 +87,7 @@ async def global_exception_handler(request: Request, exc: Exception):
         },
     )
 
-@app.get("/")
+
 async def root():
     """Endpoint raíz - Health check"""
     return {
@@ -58,27 +97,96 @@ async def root():
         "environment": settings.environment
     }
 
-@app.get("/health")
-async def health_check():
-    """Health check para monitoreo"""
-    return {
-        "status": "healthy",
-        "timestamp": "2024-01-01T00:00:00Z"
-    }
 
-# Incluir routers
-app.include_router(test.router, prefix="/test", tags=["Testing"])
-app.include_router(auth_router.router, prefix="/auth", tags=["Authentication"])
+def create_app() -> FastAPI:
+    """
+    Construir la aplicación con la configuración actual. Importar este
+    módulo no lee la configuración: la app se arma al pedir `app` (uvicorn
+    src.main:app, src.server) o al llamar a esta función (tests).
+    """
+    app = FastAPI(
+        title=settings.app_name,
+        version=settings.app_version,
+        description="API Backend para IRIS - Sistema de gestión de salones de belleza",
+        docs_url="/docs" if settings.debug else None,
+        redoc_url="/redoc" if settings.debug else None,
+        lifespan=lifespan,
+    )
+
+    # Rate limiting por IP (las rutas públicas de registro tienen un límite propio)
+    if settings.rate_limit_enabled:
+        register_limit = (settings.rate_limit_register_requests, settings.rate_limit_register_window)
+        app.add_middleware(
+            RateLimitMiddleware,
+            backend=rate_limit_backend,
+            requests=settings.rate_limit_requests,
+            window=settings.rate_limit_window,
+            overrides={
+                "/auth/register/owner": register_limit,
+                "/auth/register/customer": register_limit,
+                "/onboarding/owner": register_limit,
+            },
+            exempt_paths=["/", "/health", "/ready"],
+        )
+
+    # Middleware CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
+        allow_headers=["*"],
+    )
+
+    # Middleware de hosts confiables (seguridad)
+    if not settings.debug:
+        app.add_middleware(
+            TrustedHostMiddleware,
+            allowed_hosts=["*.iris-app.com", "localhost"]
+        )
+
+    # Métricas por request (dentro del log de requests: mide también CORS y rate limiting)
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware, server_timing=settings.metrics_server_timing)
+
+    # request_id y log de cada request (el más externo: su contexto cubre todo el request)
+    app.add_middleware(
+        RequestLoggingMiddleware,
+        sample_rate=settings.log_sample_rate,
+        slow_threshold_ms=settings.log_slow_request_ms,
+    )
+
+    app.add_exception_handler(Exception, global_exception_handler)
+    app.get("/")(root)
+
+    # Incluir routers
+    app.include_router(health.router, tags=["Health"])
+    if settings.metrics_enabled:
+        app.include_router(metrics.router, tags=["Metrics"])
+    app.include_router(test.router, prefix="/test", tags=["Testing"])
+    app.include_router(auth_router.router, prefix="/auth", tags=["Authentication"])
+    app.include_router(onboarding.router, prefix="/onboarding", tags=["Onboarding"])
+
+    app.include_router(appointments.router, prefix="/api/v1/appointments", tags=["Appointments"])
+    app.include_router(businesses.router, prefix="/api/v1/businesses", tags=["Businesses"])
+    app.include_router(loyalty.router, prefix="/api/v1/loyalty", tags=["Loyalty"])
+    app.include_router(promotions.router, prefix="/api/v1/promotions", tags=["Promotions"])
+    return app
+
 
-# Incluir routers cuando los creemos
-# app.include_router(businesses.router, prefix="/api/v1/businesses", tags=["businesses"])
-# app.include_router(appointments.router, prefix="/api/v1/appointments", tags=["appointments"])
+def __getattr__(name: str):
+    # `app` se construye en el primer acceso (from src.main import app) y queda en el módulo
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
+    # Desarrollo: python -m src.main (producción: python -m src.server)
     import uvicorn
     uvicorn.run(
-        "main:app",
+        "src.main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.debug
@@ -1,6 +1,8 @@
 """
 Modelos de datos Pydantic para Usuarios
 """
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 from uuid import UUID
 from pydantic import BaseModel, EmailStr
 
@@ -9,3 +11,54 @@ class User(BaseModel):
     id: UUID
     email: EmailStr
     is_authenticated: bool = True
+
+
+class AuthContext:
+    """
+    Contexto de autenticación de un request.
+    Se resuelve una sola vez por request y es inmutable: el rol y el
+    business_id se agregan creando un contexto nuevo con `with_profile`.
+    """
+
+    __slots__ = ("user_id", "email", "role", "business_id", "claims")
+
+    def __init__(
+        self,
+        user_id: str,
+        email: Optional[str],
+        claims: Mapping[str, Any],
+        role: Optional[str] = None,
+        business_id: Optional[str] = None,
+    ):
+        object.__setattr__(self, "user_id", user_id)
+        object.__setattr__(self, "email", email)
+        object.__setattr__(self, "claims", MappingProxyType(dict(claims)))
+        object.__setattr__(self, "role", role)
+        object.__setattr__(self, "business_id", business_id)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("AuthContext es inmutable")
+
+    def __repr__(self) -> str:
+        return f"AuthContext(user_id={self.user_id!r}, role={self.role!r}, business_id={self.business_id!r})"
+
+    @classmethod
+    def from_claims(cls, claims: Mapping[str, Any]) -> "AuthContext":
+        """Construir el contexto a partir de los claims del JWT"""
+        return cls(user_id=claims["sub"], email=claims.get("email"), claims=claims)
+
+    @property
+    def has_profile(self) -> bool:
+        return self.role is not None
+
+    @property
+    def user_metadata(self) -> Mapping[str, Any]:
+        return self.claims.get("user_metadata") or {}
+
+    @property
+    def app_metadata(self) -> Mapping[str, Any]:
+        return self.claims.get("app_metadata") or {}
+
+    def with_profile(self, role: str, business_id: Optional[str]) -> "AuthContext":
+        """Devolver un contexto nuevo con los datos de user_profiles"""
+        return AuthContext(self.user_id, self.email, self.claims, role, business_id)
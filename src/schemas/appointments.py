@@ -0,0 +1,51 @@
+"""
+Schemas Pydantic para Turnos (appointments) y Disponibilidad
+"""
+from datetime import date, datetime
+from typing import List
+from uuid import UUID
+from pydantic import AwareDatetime, BaseModel, Field
+
+class EmployeeAvailability(BaseModel):
+    employee_id: UUID
+    name: str
+    slots: List[datetime]
+
+class AvailabilityResponse(BaseModel):
+    business_id: UUID
+    service_id: UUID
+    duration_minutes: int
+    timezone: str
+    date_from: date
+    date_to: date
+    employees: List[EmployeeAvailability]
+
+class AppointmentCreateSchema(BaseModel):
+    service_id: UUID
+    employee_id: UUID
+    start_datetime: AwareDatetime
+    business_id: UUID | None = None  # Requerido para clientes
+    customer_id: UUID | None = None  # Requerido para owners y empleados
+    notes: str | None = Field(default=None, max_length=500)
+
+class AppointmentResponse(BaseModel):
+    id: UUID
+    business_id: UUID
+    customer_id: UUID
+    employee_id: UUID
+    service_id: UUID
+    start_datetime: datetime
+    end_datetime: datetime
+    status: str
+    notes: str | None = None
+
+class AlternativeSlot(BaseModel):
+    employee_id: UUID
+    start_datetime: datetime
+
+class BookingConflictDetail(BaseModel):
+    message: str
+    alternatives: List[AlternativeSlot]
+
+class BookingConflictResponse(BaseModel):
+    detail: BookingConflictDetail
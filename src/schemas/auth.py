@@ -1,6 +1,7 @@
 """
 Schemas Pydantic para Autenticación
 """
+from typing import List, Literal
 from uuid import UUID
 from pydantic import BaseModel, EmailStr
 
@@ -34,4 +35,17 @@ class CustomerRegisterSchema(BaseModel):
     email: EmailStr
     password: str
     first_name: str | None = None
-    last_name: str | None = None
\ No newline at end of file
+    last_name: str | None = None
+
+class BulkEmployeeResult(BaseModel):
+    row: int
+    email: str | None = None
+    status: Literal["created", "failed"]
+    user_id: UUID | None = None
+    error: str | None = None
+
+class BulkEmployeeRegisterResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    results: List[BulkEmployeeResult]
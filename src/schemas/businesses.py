@@ -0,0 +1,26 @@
+"""
+Schemas Pydantic para el Catálogo público de Negocios
+"""
+from decimal import Decimal
+from typing import List
+from uuid import UUID
+from pydantic import BaseModel
+
+from src.schemas.onboarding import BusinessHoursSchema
+
+class CatalogService(BaseModel):
+    id: UUID
+    name: str
+    description: str | None = None
+    price: Decimal
+    duration_minutes: int
+    points_awarded: int = 0
+
+class BusinessCatalogResponse(BaseModel):
+    id: UUID
+    name: str
+    address: str
+    phone: str | None = None
+    timezone: str | None = None
+    hours: List[BusinessHoursSchema]
+    services: List[CatalogService]
@@ -0,0 +1,66 @@
+"""
+Schemas Pydantic para Puntos de fidelización
+"""
+from datetime import datetime
+from typing import List
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+class LoyaltyBalanceResponse(BaseModel):
+    customer_id: UUID
+    business_id: UUID
+    balance: int
+    lifetime_earned: int
+    updated_at: datetime | None = None
+
+class LoyaltyEntry(BaseModel):
+    id: UUID
+    appointment_id: UUID | None = None
+    redemption_id: UUID | None = None
+    points_earned: int
+    transaction_type: str
+    description: str | None = None
+    created_at: datetime
+
+class LoyaltyHistoryResponse(BaseModel):
+    customer_id: UUID
+    business_id: UUID
+    entries: List[LoyaltyEntry]
+
+class LoyaltyRedeemSchema(BaseModel):
+    reward_id: UUID
+    appointment_id: UUID | None = None
+    business_id: UUID | None = None  # Requerido para clientes
+    customer_id: UUID | None = None  # Requerido para owners y empleados
+
+class LoyaltyRedemption(BaseModel):
+    id: UUID
+    reward_id: UUID
+    appointment_id: UUID | None = None
+    points_used: int
+    status: str
+    redeemed_at: datetime
+
+class LoyaltyRedeemResponse(BaseModel):
+    redemption: LoyaltyRedemption
+    balance: int
+
+class LoyaltyAdjustSchema(BaseModel):
+    customer_id: UUID
+    points: int = Field(..., description="Positivo suma, negativo resta")
+    description: str | None = Field(default=None, max_length=500)
+
+class LoyaltyAdjustResponse(BaseModel):
+    customer_id: UUID
+    balance: int
+
+class LoyaltyBalanceMismatch(BaseModel):
+    customer_id: UUID
+    business_id: UUID
+    stored_balance: int
+    computed_balance: int
+    stored_lifetime_earned: int
+    computed_lifetime_earned: int
+
+class LoyaltyVerifyResponse(BaseModel):
+    mismatches: List[LoyaltyBalanceMismatch]
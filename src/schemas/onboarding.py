@@ -0,0 +1,82 @@
+"""
+Schemas Pydantic para el Onboarding de Owners
+"""
+from datetime import time
+from decimal import Decimal
+from typing import List, Literal
+from uuid import UUID
+from pydantic import BaseModel, EmailStr, Field, model_validator
+
+from src.schemas.auth import TokenSchema, UserPublic
+
+# Zonas permitidas por el CHECK de businesses.timezone (tables_schema.sql)
+BusinessTimezone = Literal[
+    "America/Argentina/Buenos_Aires",
+    "America/Argentina/Cordoba",
+    "America/Argentina/Mendoza",
+    "America/Argentina/Tucuman",
+]
+
+class BusinessOnboardingSchema(BaseModel):
+    name: str = Field(max_length=255)
+    address: str
+    phone: str | None = Field(default=None, max_length=20)
+    timezone: BusinessTimezone | None = None
+
+class BusinessHoursSchema(BaseModel):
+    day_of_week: int = Field(ge=0, le=6)  # 0=Domingo, 6=Sábado
+    open_time: time | None = None
+    close_time: time | None = None
+    is_closed: bool = False
+
+    @model_validator(mode="after")
+    def check_times(self) -> "BusinessHoursSchema":
+        if not self.is_closed:
+            if self.open_time is None or self.close_time is None:
+                raise ValueError("Un día abierto necesita open_time y close_time")
+            if self.close_time <= self.open_time:
+                raise ValueError("close_time debe ser posterior a open_time")
+        return self
+
+class ServiceOnboardingSchema(BaseModel):
+    name: str = Field(max_length=255)
+    description: str | None = None
+    price: Decimal = Field(ge=0, max_digits=10, decimal_places=2)  # DECIMAL(10,2)
+    duration_minutes: int = Field(gt=0)
+    points_awarded: int = Field(default=0, ge=0)
+
+class EmployeeOnboardingSchema(BaseModel):
+    name: str = Field(max_length=255)
+    phone: str | None = Field(default=None, max_length=20)
+    email: EmailStr | None = None
+
+class OwnerOnboardingSchema(BaseModel):
+    email: EmailStr
+    password: str
+    first_name: str | None = None
+    last_name: str | None = None
+    business: BusinessOnboardingSchema
+    hours: List[BusinessHoursSchema] = []
+    services: List[ServiceOnboardingSchema] = []
+    employees: List[EmployeeOnboardingSchema] = []
+
+    @model_validator(mode="after")
+    def check_unique_days(self) -> "OwnerOnboardingSchema":
+        days = [h.day_of_week for h in self.hours]
+        if len(days) != len(set(days)):
+            raise ValueError("Cada day_of_week puede aparecer una sola vez en hours")
+        return self
+
+class OnboardedBusiness(BaseModel):
+    id: UUID
+    name: str
+    address: str
+    access_code: str
+    timezone: str | None = None
+
+class OnboardingResponse(BaseModel):
+    user: UserPublic
+    tokens: TokenSchema
+    business: OnboardedBusiness
+    services_created: int
+    employees_created: int
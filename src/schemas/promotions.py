@@ -0,0 +1,41 @@
+"""
+Schemas Pydantic para Promociones
+"""
+from datetime import datetime
+from typing import List, Literal
+from uuid import UUID
+from pydantic import AwareDatetime, BaseModel, Field
+
+class PromotionCreateSchema(BaseModel):
+    title: str = Field(..., min_length=1, max_length=255)
+    description: str | None = None
+    valid_from: AwareDatetime
+    valid_until: AwareDatetime
+    status: Literal["active", "inactive"] = "active"
+
+class PromotionUpdateSchema(BaseModel):
+    title: str | None = Field(default=None, min_length=1, max_length=255)
+    description: str | None = None
+    valid_from: AwareDatetime | None = None
+    valid_until: AwareDatetime | None = None
+    status: Literal["active", "inactive"] | None = None
+
+class PromotionResponse(BaseModel):
+    id: UUID
+    business_id: UUID
+    title: str
+    description: str | None = None
+    valid_from: datetime
+    valid_until: datetime
+    status: str
+
+class ActivePromotion(BaseModel):
+    id: UUID
+    title: str
+    description: str | None = None
+    valid_from: datetime
+    valid_until: datetime
+
+class ActivePromotionsResponse(BaseModel):
+    business_id: UUID
+    promotions: List[ActivePromotion]
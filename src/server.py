@@ -0,0 +1,123 @@
+"""
+Servidor de producción: gunicorn con workers uvicorn (uvloop + httptools)
+Toda la configuración sale de Settings (variables WEB_*, HOST y PORT):
+
+    python -m src.server
+
+Con WEB_PRELOAD la app se importa una sola vez en el master y los workers
+la heredan con el fork (arranque más rápido y memoria compartida). Los
+clientes, pools y tareas de fondo se crean en el lifespan de cada worker,
+después del fork; el hook post_fork rearma el hilo de logging que configura
+main() (el lifespan lo configura si todavía no está).
+"""
+import logging
+import math
+import os
+from typing import Any, Dict
+
+from gunicorn.app.base import BaseApplication
+
+try:
+    from uvicorn_worker import UvicornWorker
+except ImportError:  # uvicorn < 0.30 trae el worker incluido
+    from uvicorn.workers import UvicornWorker
+
+from src.core.config import settings
+from src.core.log import restart_logging, setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Margen para el shutdown del lifespan antes de que gunicorn mate al worker
+LIFESPAN_SHUTDOWN_MARGIN = 5
+
+
+class IrisUvicornWorker(UvicornWorker):
+    """Worker uvicorn con uvloop y httptools (incluidos en uvicorn[standard])"""
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        "server_header": False,
+    }
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # Al apagar o reciclar, uvicorn deja de esperar requests en curso antes
+        # de graceful_timeout: así el lifespan alcanza a cerrar pools y logs
+        self.config.timeout_graceful_shutdown = max(1, self.cfg.graceful_timeout - LIFESPAN_SHUTDOWN_MARGIN)
+
+
+def available_cpus() -> int:
+    """CPUs que puede usar el proceso (afinidad y cuota de cgroup v2 del contenedor)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def post_fork(server, worker) -> None:
+    restart_logging()
+
+
+def when_ready(server) -> None:
+    logger.info(
+        "Servidor listo en %s:%s con %d workers",
+        settings.host, settings.port, server.cfg.workers,
+    )
+
+
+def gunicorn_options() -> Dict[str, Any]:
+    """Configuración de gunicorn a partir de Settings"""
+    return {
+        "bind": f"{settings.host}:{settings.port}",
+        "workers": settings.web_workers or available_cpus(),
+        "worker_class": IrisUvicornWorker,
+        "keepalive": settings.web_keepalive,
+        "timeout": settings.web_timeout,
+        "graceful_timeout": settings.web_graceful_timeout,
+        "max_requests": settings.web_max_requests,
+        "max_requests_jitter": settings.web_max_requests_jitter,
+        "preload_app": settings.web_preload,
+        "backlog": settings.web_backlog,
+        "forwarded_allow_ips": settings.web_forwarded_allow_ips,
+        # El log de cada request lo escribe RequestLoggingMiddleware
+        "accesslog": None,
+        "loglevel": settings.log_level.lower(),
+        "post_fork": post_fork,
+        "when_ready": when_ready,
+    }
+
+
+class IrisApplication(BaseApplication):
+    """Aplicación gunicorn configurada en código (sin gunicorn.conf.py)"""
+
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from src.main import app
+        return app
+
+
+def main() -> None:
+    # Logging del master (when_ready); cada worker lo rearma en post_fork
+    setup_logging(settings.log_level, settings.log_format)
+    IrisApplication(gunicorn_options()).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Códigos de acceso de negocios: generación sin colisiones y resolución en memoria
+Los clientes se adhieren a un salón tipeando su código, así que resolverlo es
+una consulta pública y frecuente. Cada worker mantiene el índice completo
+código -> negocio (se carga al arrancar y lo actualizan los NOTIFY de
+access_codes_schema.sql, canal "access_code_changes").
+
+Con la conexión LISTEN activa el índice es autoritativo: un código que no está
+no existe y se responde sin ir a la base (adivinar códigos no genera
+consultas). Sin conexión, los códigos desconocidos se consultan y el
+resultado, exista o no, se recuerda un rato en caches acotadas (LRU + TTL).
+"""
+import asyncio
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.config import FromSettings
+from src.core.metrics import access_code_lookups
+from src.database.notifications import postgres_listener
+from src.database.repositories import BusinessRepository, get_business_repository
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "access_code_changes"
+
+# Mismo alfabeto que generate_access_code(): sin 0/O ni 1/I
+ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+CODE_LENGTH = 8
+MAX_ATTEMPTS = 5
+PAGE_SIZE = 1000
+
+
+def generate_access_code() -> str:
+    """Código aleatorio de CODE_LENGTH caracteres de ALPHABET"""
+    return "".join(secrets.choice(ALPHABET) for _ in range(CODE_LENGTH))
+
+
+def normalize_access_code(access_code: str) -> Optional[str]:
+    """Código en mayúsculas sin espacios ni guiones, o None si no puede ser un código"""
+    code = access_code.strip().upper().replace("-", "").replace(" ", "")
+    # Los códigos anteriores son hexadecimales: se acepta cualquier alfanumérico
+    if len(code) != CODE_LENGTH or not code.isascii() or not code.isalnum():
+        return None
+    return code
+
+
+class AccessCodeIndex:
+    """Índice en memoria código -> id de negocio activo, con caches de consultas a la base"""
+
+    negative_ttl = FromSettings("access_code_negative_ttl")
+    negative_max_size = FromSettings("access_code_negative_max_size")
+
+    def __init__(self, negative_ttl: Optional[float] = None, negative_max_size: Optional[int] = None):
+        self.negative_ttl = negative_ttl
+        self.negative_max_size = negative_max_size
+        self.loaded = False  # el índice tiene todos los negocios activos
+        self.listening = False  # los cambios llegan por LISTEN
+        self._synced = False  # la última carga empezó con la conexión LISTEN actual
+        self._connection = 0  # se incrementa al conectar y desconectar
+        self._codes: Dict[str, str] = {}
+        # Consultas a la base sin índice autoritativo (mismo TTL y tamaño máximo)
+        self._positive: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._negative: "OrderedDict[str, float]" = OrderedDict()
+        # Eventos recibidos durante una carga, para reaplicarlos sobre ella
+        self._buffer: Optional[List[Dict[str, Any]]] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    @property
+    def authoritative(self) -> bool:
+        """¿Un código ausente del índice seguro no existe?"""
+        return self.listening and self._synced
+
+    def _count(self, result: str) -> None:
+        self.counts[result] = self.counts.get(result, 0) + 1
+        access_code_lookups.inc((result,))
+
+    async def resolve(self, access_code: str, businesses: BusinessRepository) -> Optional[str]:
+        """Id del negocio activo con ese código, o None"""
+        code = normalize_access_code(access_code)
+        if code is None:
+            self._count("rejected")
+            return None
+
+        business_id = self._codes.get(code)
+        if business_id is not None:
+            self._count("hit")
+            return business_id
+        if self.authoritative:
+            self._count("miss")
+            return None
+
+        entry = self._positive.get(code)
+        if entry is not None:
+            expires, business_id = entry
+            if expires > time.monotonic():
+                self._positive.move_to_end(code)
+                self._count("hit")
+                return business_id
+            del self._positive[code]
+
+        expires = self._negative.get(code)
+        if expires is not None:
+            if expires > time.monotonic():
+                self._count("negative")
+                return None
+            del self._negative[code]
+
+        self._count("database")
+        business_id = await businesses.get_id_by_access_code(code)
+        expires = time.monotonic() + self.negative_ttl
+        if business_id is not None:
+            self._remember(self._positive, code, (expires, business_id))
+        else:
+            self._remember(self._negative, code, expires)
+        return business_id
+
+    def _remember(self, cache: "OrderedDict[str, Any]", code: str, value: Any) -> None:
+        cache[code] = value
+        cache.move_to_end(code)
+        while len(cache) > self.negative_max_size:
+            cache.popitem(last=False)
+
+    def add(self, access_code: str, business_id: str) -> None:
+        """Registrar un código (negocio recién creado en este worker)"""
+        self.apply_event({"business_id": business_id, "old": None, "new": access_code})
+
+    def discard(self, access_code: str, business_id: str) -> None:
+        """Quitar un código (negocio eliminado en este worker)"""
+        self.apply_event({"business_id": business_id, "old": access_code, "new": None})
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """Aplicar un evento de access_code_changes"""
+        if self._buffer is not None:
+            self._buffer.append(event)
+        self._apply(self._codes, event)
+
+    def _apply(self, codes: Dict[str, str], event: Dict[str, Any]) -> None:
+        old, new = event.get("old"), event.get("new")
+        if old and codes.get(old) == event["business_id"]:
+            del codes[old]
+        if old and self._positive.get(old, (0, None))[1] == event["business_id"]:
+            del self._positive[old]
+        if new:
+            self._positive.pop(new, None)
+            codes[new] = event["business_id"]
+            self._negative.pop(new, None)
+
+    async def load(self, businesses: BusinessRepository) -> None:
+        """Cargar todos los códigos activos, por páginas"""
+        async with self._lock:
+            connection = self._connection if self.listening else None
+            self._buffer = []
+            try:
+                codes: Dict[str, str] = {}
+                start = 0
+                while True:
+                    rows = await businesses.list_access_codes(start, start + PAGE_SIZE - 1)
+                    for row in rows:
+                        codes[row["access_code"]] = row["id"]
+                    if len(rows) < PAGE_SIZE:
+                        break
+                    start += PAGE_SIZE
+                # Los eventos llegados durante la carga pueden no estar en las páginas
+                for event in self._buffer:
+                    self._apply(codes, event)
+            finally:
+                self._buffer = None
+            self._codes = codes
+            self._positive.clear()
+            self._negative.clear()
+            self.loaded = True
+            self._synced = connection == self._connection
+        logger.info("Índice de códigos de acceso cargado (%d negocios)", len(codes))
+
+    async def _load_in_background(self) -> None:
+        try:
+            await self.load(get_business_repository())
+        except Exception as e:
+            logger.warning("No se pudo cargar el índice de códigos de acceso (%s)", e)
+
+    def start(self) -> None:
+        """Cargar el índice en segundo plano (arranque de la aplicación)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._load_in_background())
+
+    async def stop(self) -> None:
+        """Cancelar una carga en curso"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def connected(self) -> None:
+        """Conexión LISTEN activa: recargar, pudo haber cambios sin aviso"""
+        self.listening = True
+        self._synced = False
+        self._connection += 1
+        await self._load_in_background()
+
+    def disconnected(self) -> None:
+        """Sin LISTEN los cambios de otros workers no llegan"""
+        self.listening = False
+        self._synced = False
+        self._connection += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Tamaño del índice, modo y resultados de las resoluciones"""
+        return {
+            "size": len(self._codes),
+            "authoritative": self.authoritative,
+            "positive_size": len(self._positive),
+            "negative_size": len(self._negative),
+            "lookups": dict(self.counts),
+        }
+
+
+async def create_business(businesses: BusinessRepository, business: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Insertar un negocio con un código de acceso nuevo. El índice UNIQUE decide:
+    si el código ya existe no se inserta nada y se reintenta con otro.
+    """
+    for _ in range(MAX_ATTEMPTS):
+        created = await businesses.create_unique(
+            {**business, "access_code": generate_access_code()}, "access_code"
+        )
+        if created:
+            access_code_index.add(created["access_code"], created["id"])
+            return created
+        logger.warning("Código de acceso repetido, se genera otro")
+    return None
+
+
+# Instancia global (un índice por worker), actualizado por la conexión LISTEN del proceso
+access_code_index = AccessCodeIndex()
+postgres_listener.subscribe(
+    CHANNEL,
+    access_code_index.apply_event,
+    on_connect=access_code_index.connected,
+    on_disconnect=access_code_index.disconnected,
+)
@@ -0,0 +1,274 @@
+"""
+Motor de disponibilidad de turnos
+Calcula los turnos libres de un servicio en un rango de fechas a partir de un
+único snapshot (RPC availability_snapshot): horarios del salón, horarios de
+cada empleado, turnos y bloques ocupados.
+
+Los intervalos ocupados de cada empleado se guardan ordenados por inicio en
+un EmployeeIntervalIndex (timestamps epoch en segundos); los huecos libres de
+una ventana de trabajo se obtienen con bisect y los turnos dentro de cada hueco
+se generan aritméticamente, sin chequear solapamiento turno por turno.
+"""
+import math
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from src.utils.time import get_timezone
+
+Interval = Tuple[float, float]
+
+
+def _parse_time(value: Optional[str]) -> Optional[time]:
+    return time.fromisoformat(value) if value else None
+
+
+def _timestamp(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+class EmployeeIntervalIndex:
+    """
+    Intervalos ocupados [inicio, fin) de un empleado, ordenados por inicio.
+    No se fusionan (así se pueden quitar turnos cancelados); `max_length`
+    acota la búsqueda hacia atrás de intervalos que empiezan antes de la ventana.
+    """
+
+    __slots__ = ("_intervals", "max_length")
+
+    def __init__(self, intervals: Sequence[Interval] = ()):
+        self._intervals: List[Interval] = sorted(intervals)
+        self.max_length = max((end - start for start, end in self._intervals), default=0.0)
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def add(self, start: float, end: float) -> None:
+        insort(self._intervals, (start, end))
+        self.max_length = max(self.max_length, end - start)
+
+    def remove(self, start: float, end: float) -> bool:
+        i = bisect_left(self._intervals, (start, end))
+        if i < len(self._intervals) and self._intervals[i] == (start, end):
+            del self._intervals[i]
+            return True
+        return False
+
+    def overlaps(self, start: float, end: float) -> bool:
+        """¿Algún intervalo ocupado se solapa con [start, end)?"""
+        intervals = self._intervals
+        i = bisect_left(intervals, (start - self.max_length,))
+        while i < len(intervals) and intervals[i][0] < end:
+            if intervals[i][1] > start:
+                return True
+            i += 1
+        return False
+
+    def free_gaps(self, start: float, end: float) -> Iterator[Interval]:
+        """Huecos libres dentro de la ventana [start, end)"""
+        intervals = self._intervals
+        i = bisect_left(intervals, (start - self.max_length,))
+        cursor = start
+        while i < len(intervals):
+            busy_start, busy_end = intervals[i]
+            if busy_start >= end:
+                break
+            if busy_end > cursor:
+                if busy_start > cursor:
+                    yield cursor, busy_start
+                cursor = busy_end
+                if cursor >= end:
+                    return
+            i += 1
+        if cursor < end:
+            yield cursor, end
+
+
+def slots_in_window(
+    index: EmployeeIntervalIndex,
+    window_start: float,
+    window_end: float,
+    duration: float,
+    step: float,
+    not_before: float = float("-inf"),
+) -> List[float]:
+    """Inicios de turnos de `duration` segundos alineados a `step` desde el inicio de la ventana"""
+    return slots_from_gaps(index.free_gaps(window_start, window_end), window_start, duration, step, not_before)
+
+
+def slots_from_gaps(
+    gaps: Iterable[Interval],
+    window_start: float,
+    duration: float,
+    step: float,
+    not_before: float = float("-inf"),
+) -> List[float]:
+    """Como slots_in_window, a partir de huecos libres ya calculados"""
+    slots: List[float] = []
+    for gap_start, gap_end in gaps:
+        gap_start = max(gap_start, not_before)
+        k = math.ceil((gap_start - window_start) / step)
+        first = window_start + k * step
+        last = gap_end - duration
+        if first <= last:
+            slots.extend(first + j * step for j in range(int((last - first) // step) + 1))
+    return slots
+
+
+@dataclass
+class EmployeeSchedule:
+    """Empleado con sus horarios semanales y su índice de intervalos ocupados"""
+    id: str
+    name: str
+    # day_of_week (0=Domingo) -> (inicio, fin); None si no trabaja ese día
+    hours: Optional[Dict[int, Optional[Tuple[time, time]]]] = None
+    busy: EmployeeIntervalIndex = field(default_factory=EmployeeIntervalIndex)
+
+
+@dataclass
+class AvailabilitySnapshot:
+    """Datos de un negocio para calcular disponibilidad en un rango"""
+    business_id: str
+    timezone: ZoneInfo
+    service: Dict[str, Any]
+    business_hours: Dict[int, Optional[Tuple[time, time]]]
+    employees: List[EmployeeSchedule]
+
+    @property
+    def duration_minutes(self) -> int:
+        return int(self.service["duration_minutes"])
+
+    def employee(self, employee_id: str) -> Optional[EmployeeSchedule]:
+        return next((e for e in self.employees if e.id == employee_id), None)
+
+    @classmethod
+    def from_rpc(cls, data: Dict[str, Any]) -> "AvailabilitySnapshot":
+        """Construir el snapshot desde la fila de availability_snapshot"""
+        business_hours = {
+            h["day_of_week"]: None if h.get("is_closed") or not h.get("open_time") or not h.get("close_time")
+            else (_parse_time(h["open_time"]), _parse_time(h["close_time"]))
+            for h in data["business_hours"]
+        }
+
+        busy: Dict[str, List[Interval]] = {}
+        for employee_id, start, end, *_ in data["busy"]:
+            busy.setdefault(employee_id, []).append((_timestamp(start), _timestamp(end)))
+
+        employees = []
+        for e in data["employees"]:
+            hours = None
+            if e.get("hours"):
+                hours = {
+                    h["day_of_week"]: (_parse_time(h["start_time"]), _parse_time(h["end_time"]))
+                    if h.get("is_available", True) and h.get("start_time") and h.get("end_time") else None
+                    for h in e["hours"]
+                }
+            employees.append(EmployeeSchedule(
+                id=e["id"],
+                name=e["name"],
+                hours=hours,
+                busy=EmployeeIntervalIndex(busy.get(e["id"], ())),
+            ))
+
+        return cls(
+            business_id=data["business"]["id"],
+            timezone=get_timezone(data["business"]["timezone"]),
+            service=data["service"],
+            business_hours=business_hours,
+            employees=employees,
+        )
+
+
+def _day_of_week(day: date) -> int:
+    # Python: lunes=0; la base de datos: domingo=0
+    return (day.weekday() + 1) % 7
+
+
+def _working_window(
+    snapshot: AvailabilitySnapshot, employee: EmployeeSchedule, day: date
+) -> Optional[Interval]:
+    """Ventana de trabajo del empleado en `day` (intersección con el horario del salón)"""
+    dow = _day_of_week(day)
+    business = snapshot.business_hours.get(dow)
+    if business is None:
+        return None
+    start, end = business
+    if employee.hours is not None:
+        # Con horarios cargados, un día sin fila es un día no laborable
+        own = employee.hours.get(dow)
+        if own is None:
+            return None
+        start, end = max(start, own[0]), min(end, own[1])
+    if start >= end:
+        return None
+    tz = snapshot.timezone
+    return (
+        datetime.combine(day, start, tzinfo=tz).timestamp(),
+        datetime.combine(day, end, tzinfo=tz).timestamp(),
+    )
+
+
+def compute_availability(
+    snapshot: AvailabilitySnapshot,
+    date_from: date,
+    date_to: date,
+    step_minutes: int,
+    employee_id: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, List[float]]:
+    """
+    Turnos libres por empleado entre `date_from` y `date_to` (inclusive, fechas
+    locales del negocio). Devuelve {employee_id: [inicio epoch, ...]}.
+    """
+    duration = snapshot.duration_minutes * 60
+    step = step_minutes * 60
+    not_before = (now or datetime.now(timezone.utc)).timestamp()
+    days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+
+    result: Dict[str, List[float]] = {}
+    for employee in snapshot.employees:
+        if employee_id is not None and employee.id != employee_id:
+            continue
+        slots: List[float] = []
+        for day in days:
+            window = _working_window(snapshot, employee, day)
+            if window is not None and window[1] > not_before:
+                slots.extend(slots_in_window(employee.busy, window[0], window[1], duration, step, not_before))
+        result[employee.id] = slots
+    return result
+
+
+def alternative_slots(
+    snapshot: AvailabilitySnapshot,
+    requested: datetime,
+    employee_id: str,
+    step_minutes: int,
+    limit: int,
+    now: Optional[datetime] = None,
+) -> List[Tuple[str, float]]:
+    """
+    Turnos libres más cercanos a `requested` (ese día y el siguiente), como
+    [(employee_id, inicio epoch)]. A igual distancia se prefiere el mismo empleado.
+    """
+    day = requested.astimezone(snapshot.timezone).date()
+    target = requested.timestamp()
+    slots = compute_availability(snapshot, day, day + timedelta(days=1), step_minutes, now=now)
+    candidates = sorted(
+        (abs(t - target), other != employee_id, t, other)
+        for other, starts in slots.items()
+        for t in starts
+    )
+    return [(other, t) for _, _, t, other in candidates[:limit]]
+
+
+def snapshot_range(date_from: date, date_to: date) -> Tuple[datetime, datetime]:
+    """
+    Rango UTC a pedir al snapshot para cubrir las fechas locales pedidas.
+    La zona horaria del negocio llega con el snapshot: se agrega un día de
+    margen a cada lado, que cubre cualquier offset.
+    """
+    start = datetime.combine(date_from - timedelta(days=1), time.min, tzinfo=timezone.utc)
+    end = datetime.combine(date_to + timedelta(days=2), time.min, tzinfo=timezone.utc)
+    return start, end
@@ -0,0 +1,324 @@
+"""
+Cache de disponibilidad mantenida por eventos de Postgres
+Guarda los huecos libres por (negocio, empleado, día local) y los datos del
+servicio (zona horaria, duración, empleados que lo hacen). Los turnos de
+cualquier servicio salen de los huecos con aritmética, sin ir a la base.
+
+Los triggers de availability_events_schema.sql publican cada cambio con
+NOTIFY; la conexión LISTEN del proceso (src/database/notifications.py) los
+entrega y se aplican sobre las entradas cacheadas: crear, mover o cancelar
+un turno rehace solo los huecos de los días afectados. Cambios de horarios,
+servicios o empleados descartan lo cacheado del negocio.
+
+Lecturas desactualizadas acotadas:
+- con la conexión LISTEN activa, la cache va detrás de la base por la demora
+  de los eventos (histograma iris_availability_event_lag_seconds);
+- sin conexión la cache se vacía y no se usa (consultas "bypass");
+- `ttl` limita la vida de cada entrada aunque se pierda un evento.
+"""
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from src.core.config import FromSettings
+from src.core.metrics import availability_cache_requests, availability_event_lag
+from src.database.notifications import postgres_listener
+from src.services.availability import (
+    AvailabilitySnapshot,
+    EmployeeIntervalIndex,
+    Interval,
+    _timestamp,
+    _working_window,
+    slots_from_gaps,
+)
+from src.utils.time import local_dates
+
+CHANNEL = "availability_changes"
+
+DayKey = Tuple[str, str, date]
+# employee_id -> entradas de cada día pedido, en orden
+AvailabilityView = Dict[str, List["DayAvailability"]]
+
+
+@dataclass
+class ServiceCatalog:
+    """Datos de un servicio que no dependen de las reservas"""
+    timezone: ZoneInfo
+    duration_minutes: int
+    employees: List[Tuple[str, str]]  # (id, nombre) de quienes hacen el servicio
+    loaded_at: float
+
+
+class DayAvailability:
+    """Huecos libres de un empleado en un día, con los intervalos ocupados que los producen"""
+
+    __slots__ = ("window", "busy", "gaps", "loaded_at")
+
+    def __init__(self, window: Optional[Interval], busy: Dict[str, Interval], loaded_at: float):
+        self.window = window
+        self.busy = busy  # id del turno o bloque -> intervalo
+        self.loaded_at = loaded_at
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        if self.window is None:
+            self.gaps: List[Interval] = []
+        else:
+            self.gaps = list(EmployeeIntervalIndex(list(self.busy.values())).free_gaps(*self.window))
+
+    def apply(self, item_id: str, interval: Optional[Interval]) -> None:
+        """Fijar (o quitar, con None) el intervalo de un turno o bloque; idempotente"""
+        if interval is None:
+            if self.busy.pop(item_id, None) is None:
+                return
+        elif self.busy.get(item_id) == interval:
+            return
+        else:
+            self.busy[item_id] = interval
+        self._rebuild()
+
+    def slots(self, duration: float, step: float, not_before: float) -> List[float]:
+        if self.window is None or self.window[1] <= not_before:
+            return []
+        return slots_from_gaps(self.gaps, self.window[0], duration, step, not_before)
+
+
+def _local_days(start: float, end: float, tz: ZoneInfo) -> List[date]:
+    first, last = local_dates((start, max(start, end - 1)), tz)
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def slots_by_employee(
+    catalog: ServiceCatalog,
+    view: AvailabilityView,
+    step_minutes: int,
+    employee_id: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, List[float]]:
+    """Turnos libres por empleado (mismo resultado que compute_availability)"""
+    duration = catalog.duration_minutes * 60
+    step = step_minutes * 60
+    not_before = (now or datetime.now(timezone.utc)).timestamp()
+    return {
+        employee: [t for entry in entries for t in entry.slots(duration, step, not_before)]
+        for employee, entries in view.items()
+        if employee_id is None or employee == employee_id
+    }
+
+
+class AvailabilityCache:
+    """Cache por (negocio, empleado, día) actualizada con los eventos de la base"""
+
+    ttl = FromSettings("availability_cache_ttl")
+    max_entries = FromSettings("availability_cache_max_entries")
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None, event_log_size: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Solo se usa mientras hay una conexión LISTEN activa
+        self.enabled = False
+        self.sequence = 0
+        self._catalogs: Dict[Tuple[str, str], ServiceCatalog] = {}
+        self._timezones: Dict[str, ZoneInfo] = {}
+        self._days: "OrderedDict[DayKey, DayAvailability]" = OrderedDict()
+        # Eventos recientes para reaplicar sobre cargas concurrentes con ellos
+        self._events: Deque[Tuple[int, Dict[str, Any]]] = deque(maxlen=event_log_size)
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.events = 0
+        self.last_event_lag: Optional[float] = None
+        self.max_event_lag = 0.0
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    def _count(self, result: str) -> None:
+        availability_cache_requests.inc((result,))
+
+    def lookup(
+        self, business_id: str, service_id: str, days: List[date], employee_id: Optional[str] = None
+    ) -> Optional[Tuple[ServiceCatalog, AvailabilityView]]:
+        """Catálogo y entradas de todos los días pedidos, o None si falta alguna"""
+        if not self.enabled:
+            self.bypassed += 1
+            self._count("bypass")
+            return None
+
+        now = time.monotonic()
+        ttl = self.ttl
+        catalog = self._catalogs.get((business_id, service_id))
+        if catalog is None or now - catalog.loaded_at > ttl:
+            self.misses += 1
+            self._count("miss")
+            return None
+
+        view: AvailabilityView = {}
+        for employee, _ in catalog.employees:
+            if employee_id is not None and employee != employee_id:
+                continue
+            entries = []
+            for day in days:
+                key = (business_id, employee, day)
+                entry = self._days.get(key)
+                if entry is None or now - entry.loaded_at > ttl:
+                    self.misses += 1
+                    self._count("miss")
+                    return None
+                self._days.move_to_end(key)
+                entries.append(entry)
+            view[employee] = entries
+
+        self.hits += 1
+        self._count("hit")
+        return catalog, view
+
+    def store(
+        self,
+        snapshot: AvailabilitySnapshot,
+        data: Dict[str, Any],
+        service_id: str,
+        days: List[date],
+        since: int,
+    ) -> Tuple[ServiceCatalog, AvailabilityView]:
+        """
+        Armar las entradas desde un snapshot recién cargado y guardarlas.
+        `since` es `sequence` antes de pedir el snapshot: los eventos llegados
+        durante la carga se reaplican (son idempotentes).
+        """
+        loaded_at = time.monotonic()
+        busy: Dict[str, Dict[str, Interval]] = {}
+        for employee_id, start, end, item_id in data["busy"]:
+            busy.setdefault(employee_id, {})[item_id] = (_timestamp(start), _timestamp(end))
+
+        catalog = ServiceCatalog(
+            timezone=snapshot.timezone,
+            duration_minutes=snapshot.duration_minutes,
+            employees=[(e.id, e.name) for e in snapshot.employees],
+            loaded_at=loaded_at,
+        )
+        view: AvailabilityView = {}
+        for employee in snapshot.employees:
+            items = busy.get(employee.id, {})
+            entries = []
+            for day in days:
+                window = _working_window(snapshot, employee, day)
+                day_items = {
+                    item_id: interval for item_id, interval in items.items()
+                    if window is not None and interval[0] < window[1] and interval[1] > window[0]
+                }
+                entries.append(DayAvailability(window, day_items, loaded_at))
+            view[employee.id] = entries
+
+        oldest = self._events[0][0] if self._events else self.sequence + 1
+        # Deshabilitada, vaciada durante la carga o con eventos perdidos: no se guarda
+        if not self.enabled or since + 1 < oldest:
+            return catalog, view
+
+        business_id = snapshot.business_id
+        self._timezones[business_id] = snapshot.timezone
+        self._catalogs[(business_id, service_id)] = catalog
+        for employee, entries in view.items():
+            for day, entry in zip(days, entries):
+                key = (business_id, employee, day)
+                self._days[key] = entry
+                self._days.move_to_end(key)
+        for sequence, event in self._events:
+            if sequence > since and event["business_id"] == business_id:
+                self._apply(event)
+        while len(self._days) > self.max_entries:
+            self._days.popitem(last=False)
+            self.evictions += 1
+        return catalog, view
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """Aplicar un evento de availability_changes"""
+        self.sequence += 1
+        self.events += 1
+        lag = max(0.0, time.time() - event.get("ts", time.time()))
+        self.last_event_lag = lag
+        self.max_event_lag = max(self.max_event_lag, lag)
+        availability_event_lag.observe(lag)
+        self._events.append((self.sequence, event))
+        self._apply(event)
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        business_id = event["business_id"]
+        if event.get("reset"):
+            self.invalidate_business(business_id)
+            return
+        tz = self._timezones.get(business_id)
+        if tz is None:
+            return
+
+        # Primero se quita el intervalo anterior de sus días y después se pone el
+        # nuevo: si es el mismo día, la entrada se rehace una sola vez
+        updates: Dict[DayKey, Optional[Interval]] = {}
+        old, new = event.get("old"), event.get("new")
+        if old:
+            for day in _local_days(old["start"], old["end"], tz):
+                updates[(business_id, old["employee_id"], day)] = None
+        if new:
+            for day in _local_days(new["start"], new["end"], tz):
+                updates[(business_id, new["employee_id"], day)] = (new["start"], new["end"])
+        for key, interval in updates.items():
+            entry = self._days.get(key)
+            if entry is not None:
+                entry.apply(event["id"], interval)
+
+    def invalidate_business(self, business_id: str) -> None:
+        """Descartar todo lo cacheado de un negocio"""
+        self._timezones.pop(business_id, None)
+        for key in [k for k in self._catalogs if k[0] == business_id]:
+            del self._catalogs[key]
+        for key in [k for k in self._days if k[0] == business_id]:
+            del self._days[key]
+
+    def connected(self) -> None:
+        """Conexión LISTEN activa: lo cacheado antes pudo perder eventos"""
+        self.clear()
+        self.enabled = True
+
+    def disconnected(self) -> None:
+        """Sin conexión LISTEN no hay forma de saber qué cambió"""
+        self.enabled = False
+        self.clear()
+
+    def clear(self) -> None:
+        """Vaciar la cache"""
+        self.sequence += 1
+        self._events.clear()
+        self._catalogs.clear()
+        self._timezones.clear()
+        self._days.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de uso y demora de los eventos"""
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "size": len(self._days),
+            "evictions": self.evictions,
+            "events": self.events,
+            "last_event_lag_ms": round(self.last_event_lag * 1000, 2) if self.last_event_lag is not None else None,
+            "max_event_lag_ms": round(self.max_event_lag * 1000, 2),
+            "ttl_seconds": self.ttl,
+        }
+
+
+# Instancia global (una cache por worker), alimentada por la conexión LISTEN del proceso
+availability_cache = AvailabilityCache()
+postgres_listener.subscribe(
+    CHANNEL,
+    availability_cache.apply_event,
+    on_connect=availability_cache.connected,
+    on_disconnect=availability_cache.disconnected,
+)
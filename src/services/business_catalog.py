@@ -0,0 +1,129 @@
+"""
+Catálogo público de negocios: datos del salón, horarios y servicios activos
+Cada negocio se cachea con el cuerpo ya serializado y su ETag, así un GET
+condicional que coincide no serializa ni consulta la base. Varias cargas
+simultáneas del mismo negocio comparten una sola consulta. Los códigos de
+acceso se resuelven con el índice de src/services/access_codes.py.
+
+La cache se invalida con los NOTIFY de catalog_events_schema.sql (canal
+"catalog_changes"); sin DATABASE_URL cada entrada vence por TTL.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.core.cache import Cache
+from src.core.config import FromSettings
+from src.database.notifications import postgres_listener
+from src.database.repositories import BusinessRepository
+from src.services.access_codes import access_code_index
+from src.utils.http import strong_etag
+from src.utils.serialization import dumps
+
+CHANNEL = "catalog_changes"
+
+SERVICE_FIELDS = ("id", "name", "description", "price", "duration_minutes", "points_awarded")
+
+
+class CatalogCache(Cache):
+    ttl = FromSettings("catalog_cache_ttl")
+    max_size = FromSettings("catalog_cache_max_size")
+
+
+# Instancia global: clave = id del negocio, valor = {"body", "etag"}
+catalog_cache = CatalogCache("business_catalog")
+
+# Se incrementa con cada invalidación: una carga que empezó antes no se guarda
+_generation = 0
+_inflight: Dict[str, "asyncio.Future[Optional[Dict[str, Any]]]"] = {}
+
+
+def build_catalog(business: Dict[str, Any]) -> Dict[str, Any]:
+    """Forma pública del catálogo (sin servicios inactivos)"""
+    return {
+        "id": business["id"],
+        "name": business["name"],
+        "address": business["address"],
+        "phone": business.get("phone"),
+        "timezone": business.get("timezone"),
+        "hours": sorted(business.get("business_hours") or [], key=lambda h: h["day_of_week"]),
+        "services": sorted(
+            ({field: s.get(field) for field in SERVICE_FIELDS}
+             for s in business.get("services") or [] if s.get("is_active", True)),
+            key=lambda s: (s["name"], s["id"]),
+        ),
+    }
+
+
+def render_catalog(business: Dict[str, Any]) -> Dict[str, Any]:
+    """Entrada de cache: cuerpo JSON estable (claves ordenadas) y su ETag"""
+    body = dumps(build_catalog(business), sort_keys=True)
+    return {"body": body.decode(), "etag": strong_etag(body)}
+
+
+async def _load_once(key: str, loader: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+    """Cargar `key` una sola vez aunque lo pidan varios requests a la vez"""
+    future = _inflight.get(key)
+    if future is not None:
+        return await asyncio.shield(future)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    generation = _generation
+    try:
+        entry = await loader()
+        if entry is not None and _generation == generation:
+            await catalog_cache.set(key, entry)
+        future.set_result(entry)
+        return entry
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Que los requests que esperaban reciban el error sin warnings de "never retrieved"
+        future.exception()
+        raise
+    finally:
+        del _inflight[key]
+
+
+async def get_catalog(business_id: str, businesses: BusinessRepository) -> Optional[Dict[str, Any]]:
+    """Entrada del catálogo de un negocio activo, o None si no existe"""
+    entry = await catalog_cache.get(business_id)
+    if entry is not None:
+        return entry
+
+    async def load() -> Optional[Dict[str, Any]]:
+        business = await businesses.get_catalog(business_id)
+        return render_catalog(business) if business else None
+
+    return await _load_once(business_id, load)
+
+
+async def get_catalog_by_code(access_code: str, businesses: BusinessRepository) -> Optional[Dict[str, Any]]:
+    """Como get_catalog, resolviendo el negocio por su código de acceso"""
+    business_id = await access_code_index.resolve(access_code, businesses)
+    if business_id is None:
+        return None
+    return await get_catalog(business_id, businesses)
+
+
+async def invalidate_catalog(business_id: str) -> None:
+    """Descartar el catálogo cacheado de un negocio"""
+    global _generation
+    _generation += 1
+    await catalog_cache.invalidate(business_id)
+
+
+async def clear_catalogs() -> None:
+    """Descartar todos los catálogos (al conectar LISTEN pudo haber eventos perdidos)"""
+    global _generation
+    _generation += 1
+    await catalog_cache.clear()
+
+
+async def _on_catalog_change(event: Dict[str, Any]) -> None:
+    await invalidate_catalog(event["business_id"])
+
+
+postgres_listener.subscribe(CHANNEL, _on_catalog_change, on_connect=clear_catalogs)
@@ -0,0 +1,148 @@
+"""
+Emails transaccionales: bienvenida, confirmación y recordatorio de turnos
+Nunca se envían dentro de un request: las rutas (o los triggers de
+jobs_schema.sql) encolan un trabajo y los handlers de este módulo lo
+ejecutan en segundo plano (ver src/services/jobs.py).
+
+El envío usa smtplib en un hilo. Sin SMTP_HOST los emails solo se registran
+en el log; para desarrollo hay un servidor que los captura en
+src/utils/smtp_sink.py.
+"""
+import asyncio
+import logging
+import smtplib
+import ssl
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Any, Dict, Optional
+
+from src.core.config import FromSettings
+from src.database.repositories import get_appointment_repository
+from src.services.jobs import PermanentJobError, job_queue
+from src.utils.time import get_timezone
+
+logger = logging.getLogger(__name__)
+
+# Estados en los que todavía tiene sentido avisar del turno
+ACTIVE_APPOINTMENT_STATUSES = ("scheduled", "confirmed")
+
+WELCOME_MESSAGES = {
+    "owner": "Tu salón ya está creado. Completá los horarios, servicios y empleados para empezar a recibir turnos.",
+    "employee": "Tu cuenta de empleado ya está activa. Ingresá para ver tu agenda.",
+    "customer": "Ya podés adherirte a tu salón con su código de acceso y reservar turnos.",
+}
+
+
+class EmailSender:
+    """Envío por SMTP; cada email abre su conexión (el volumen es bajo)"""
+
+    host = FromSettings("smtp_host")
+    port = FromSettings("smtp_port")
+    username = FromSettings("smtp_username")
+    password = FromSettings("smtp_password")
+    starttls = FromSettings("smtp_starttls")
+    timeout = FromSettings("smtp_timeout")
+    sender = FromSettings("email_from")
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, starttls: Optional[bool] = None):
+        self.host = host
+        self.port = port
+        self.starttls = starttls
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    def _send_sync(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                # Se crea una vez: cargar los certificados de la CA es costoso
+                if self._ssl_context is None:
+                    self._ssl_context = ssl.create_default_context()
+                smtp.starttls(context=self._ssl_context)
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            smtp.send_message(message)
+
+    async def send(self, to: str, subject: str, body: str) -> None:
+        """Enviar un email de texto; un destinatario rechazado es un error permanente"""
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = to
+        message["Subject"] = subject
+        message.set_content(body)
+
+        if not self.host:
+            logger.info("Email no enviado (sin SMTP_HOST): %s", subject, extra={"to": to})
+            return
+        try:
+            await asyncio.to_thread(self._send_sync, message)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise PermanentJobError(f"Destinatario rechazado: {to}") from e
+
+
+# Instancia global (la configuración se lee al enviar el primer email)
+email_sender = EmailSender()
+
+
+# --- Contenido ---
+
+def _local_start(appointment: Dict[str, Any]) -> datetime:
+    start = datetime.fromisoformat(appointment["start_datetime"])
+    return start.astimezone(get_timezone(appointment["timezone"]))
+
+
+def appointment_email(appointment: Dict[str, Any], reminder: bool) -> Dict[str, str]:
+    """Asunto y cuerpo del email de confirmación o de recordatorio de un turno"""
+    start = _local_start(appointment)
+    greeting = f"Hola {appointment['customer_name']}," if appointment.get("customer_name") else "Hola,"
+    if reminder:
+        subject = f"Recordatorio: tu turno en {appointment['business_name']}"
+        intro = "Te recordamos tu próximo turno:"
+    else:
+        subject = f"Turno confirmado en {appointment['business_name']}"
+        intro = "Tu turno quedó reservado:"
+    body = "\n".join([
+        greeting,
+        "",
+        intro,
+        f"  Servicio: {appointment['service_name']}",
+        f"  Con: {appointment['employee_name']}",
+        f"  Fecha: {start:%d/%m/%Y} a las {start:%H:%M}",
+        f"  Dirección: {appointment['business_address']}",
+        "",
+        f"{appointment['business_name']} - IRIS",
+    ])
+    return {"subject": subject, "body": body}
+
+
+# --- Encolar (desde las rutas) ---
+
+def enqueue_welcome_email(email: str, role: str) -> None:
+    """Email de bienvenida después de un registro (no demora la respuesta)"""
+    job_queue.enqueue_nowait("welcome_email", {"email": email, "role": role})
+
+
+# --- Handlers de la cola ---
+
+@job_queue.handler("welcome_email")
+async def send_welcome_email(payload: Dict[str, Any]) -> None:
+    message = WELCOME_MESSAGES.get(payload.get("role"), "")
+    await email_sender.send(payload["email"], "Bienvenido a IRIS", f"Hola,\n\n{message}\n\nEl equipo de IRIS")
+
+
+async def _send_appointment_email(payload: Dict[str, Any], reminder: bool) -> None:
+    appointment = await get_appointment_repository().notification(payload["appointment_id"])
+    if not appointment or appointment["status"] not in ACTIVE_APPOINTMENT_STATUSES:
+        # Turno eliminado o cancelado antes del envío: no hay nada que avisar
+        return
+    if not appointment.get("customer_email"):
+        raise PermanentJobError(f"El turno {appointment['id']} no tiene email del cliente")
+    await email_sender.send(appointment["customer_email"], **appointment_email(appointment, reminder))
+
+
+@job_queue.handler("appointment_confirmation")
+async def send_appointment_confirmation(payload: Dict[str, Any]) -> None:
+    await _send_appointment_email(payload, reminder=False)
+
+
+@job_queue.handler("appointment_reminder")
+async def send_appointment_reminder(payload: Dict[str, Any]) -> None:
+    await _send_appointment_email(payload, reminder=True)
@@ -0,0 +1,227 @@
+"""
+Importación masiva de empleados
+Crea las cuentas de Supabase Auth con concurrencia acotada, inserta todos los
+perfiles en un único insert por lotes y devuelve un reporte por fila. A
+diferencia de /auth/register/employee no se inicia sesión por cada empleado.
+
+    [parse filas] -> [create_user x N (semáforo)] -> [insert user_profiles (1 request)]
+
+Si el insert por lotes falla se eliminan las cuentas creadas (compensación).
+"""
+import asyncio
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, List, Optional
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+from src.core.log import get_log_context
+from src.database.repositories import AuthRepository, UserProfileRepository
+from src.schemas.auth import BulkEmployeeResult, EmployeeRegisterSchema
+from src.services.profile_cache import profile_cache
+
+CSV_CONTENT_TYPES = {"text/csv", "application/csv", "application/vnd.ms-excel"}
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+logger = logging.getLogger(__name__)
+
+
+class ImportFormatError(ValueError):
+    """El archivo subido no tiene un formato soportado o excede el límite de filas"""
+
+
+@dataclass
+class ImportRow:
+    """Fila de entrada: el empleado validado o el error de validación"""
+    row: int
+    email: Optional[str] = None
+    employee: Optional[EmployeeRegisterSchema] = None
+    error: Optional[str] = None
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'fila'}: {err['msg']}" for err in error.errors()
+    )
+
+
+def _to_row(row: int, data) -> ImportRow:
+    if not isinstance(data, dict):
+        return ImportRow(row=row, error="fila: se esperaba un objeto con email, password y first_name")
+    # El email se devuelve en el reporte: si no es texto (p. ej. un número en NDJSON) se lo muestra como texto
+    email = data.get("email")
+    if email is not None and not isinstance(email, str):
+        email = json.dumps(email, ensure_ascii=False)[:320]
+    try:
+        return ImportRow(row=row, email=email, employee=EmployeeRegisterSchema.model_validate(data))
+    except ValidationError as e:
+        return ImportRow(row=row, email=email, error=_validation_message(e))
+
+
+def rows_from_schemas(employees: Iterable[EmployeeRegisterSchema]) -> List[ImportRow]:
+    """Filas a partir de un body JSON ya validado por FastAPI"""
+    return [ImportRow(row=i, email=e.email, employee=e) for i, e in enumerate(employees, start=1)]
+
+
+def detect_format(upload: UploadFile) -> str:
+    """'csv' o 'ndjson' según el content-type o la extensión del archivo"""
+    content_type = (upload.content_type or "").split(";")[0].strip().lower()
+    filename = (upload.filename or "").lower()
+    if content_type in CSV_CONTENT_TYPES or filename.endswith(".csv"):
+        return "csv"
+    if content_type in NDJSON_CONTENT_TYPES or filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    raise ImportFormatError("Formato no soportado. Subí un archivo CSV o NDJSON.")
+
+
+def _parse_file(file: BinaryIO, fmt: str, max_rows: int) -> List[ImportRow]:
+    """
+    Parsear el archivo ya recibido. TextIOWrapper decodifica de forma
+    incremental (un carácter UTF-8 no se corta entre bloques) y un único
+    csv.reader admite campos entre comillas con saltos de línea.
+    """
+    rows: List[ImportRow] = []
+    file.seek(0)
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.reader(text)
+            header = [h.strip().lower() for h in next((v for v in reader if any(x.strip() for x in v)), [])]
+            if "email" not in header:
+                raise ImportFormatError("El CSV debe tener encabezado con al menos las columnas email, password y first_name.")
+            records = (
+                {k: (v.strip() or None) for k, v in zip(header, values)}
+                for values in reader if any(v.strip() for v in values)
+            )
+        else:
+            records = (line for line in text if line.strip())
+
+        for record in records:
+            if len(rows) >= max_rows:
+                raise ImportFormatError(f"El archivo excede el máximo de {max_rows} empleados por importación.")
+            if fmt == "ndjson":
+                try:
+                    record = json.loads(record)
+                except json.JSONDecodeError as e:
+                    rows.append(ImportRow(row=len(rows) + 1, error=f"JSON inválido: {e.msg}"))
+                    continue
+            rows.append(_to_row(len(rows) + 1, record))
+    except csv.Error as e:
+        raise ImportFormatError(f"CSV inválido: {e}")
+    finally:
+        # Sin detach, al descartar el wrapper se cerraría el archivo de UploadFile
+        text.detach()
+
+    return rows
+
+
+async def parse_upload(upload: UploadFile, max_rows: int) -> List[ImportRow]:
+    """Parsear un CSV (con encabezado) o NDJSON en filas validadas"""
+    fmt = detect_format(upload)
+    # El archivo puede estar volcado a disco: leerlo fuera del event loop
+    return await run_in_threadpool(_parse_file, upload.file, fmt, max_rows)
+
+
+def _creation_error(e: Exception) -> str:
+    if "already" in str(e).lower() or "users_email_key" in str(e):
+        return "El email ya está registrado."
+    # Los detalles van al log, no a la respuesta
+    logger.error("No se pudo crear un empleado importado", exc_info=(type(e), e, e.__traceback__))
+    return "No se pudo crear el usuario en Supabase Auth."
+
+
+async def import_employees(
+    rows: List[ImportRow],
+    business_id: str,
+    auth_repo: AuthRepository,
+    profiles: UserProfileRepository,
+    concurrency: int,
+) -> List[BulkEmployeeResult]:
+    """
+    Crear los empleados válidos de `rows` en el negocio `business_id`.
+    Devuelve un resultado por fila, en el orden de entrada.
+    """
+    results = {
+        r.row: BulkEmployeeResult(row=r.row, email=r.email, status="failed", error=r.error)
+        for r in rows
+    }
+
+    # Emails repetidos dentro del mismo lote: solo se intenta el primero
+    seen = set()
+    pending: List[ImportRow] = []
+    for r in rows:
+        if r.employee is None:
+            continue
+        email = r.employee.email.lower()
+        if email in seen:
+            results[r.row].error = "Email duplicado en el lote."
+            continue
+        seen.add(email)
+        pending.append(r)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def create(r: ImportRow):
+        async with semaphore:
+            try:
+                user = await auth_repo.create_user(r.employee.email, r.employee.password)
+            except Exception as e:
+                results[r.row].error = _creation_error(e)
+                return None
+        if not user:
+            results[r.row].error = "No se pudo crear el usuario en Supabase Auth."
+            return None
+        return r, user
+
+    created = [c for c in await asyncio.gather(*(create(r) for r in pending)) if c]
+    if not created:
+        return [results[r.row] for r in rows]
+
+    # Un único insert para todos los perfiles
+    try:
+        await profiles.create_many([
+            {
+                "id": user.id,
+                "role": "employee",
+                "business_id": business_id,
+                "first_name": r.employee.first_name,
+                "last_name": r.employee.last_name,
+            }
+            for r, user in created
+        ])
+    except Exception as e:
+        request_id = get_log_context().get("request_id")
+        logger.error(
+            "Falló el insert de %d perfiles importados", len(created), exc_info=(type(e), e, e.__traceback__)
+        )
+
+        # Compensación: eliminar las cuentas creadas en este lote
+        async def rollback(r: ImportRow, user) -> None:
+            async with semaphore:
+                try:
+                    await auth_repo.delete_user(user.id)
+                    results[r.row].error = f"No se pudo crear el perfil de usuario (request_id: {request_id})."
+                except Exception as delete_error:
+                    logger.critical(
+                        "No se pudo eliminar el usuario %s tras fallar el perfil", user.id,
+                        exc_info=(type(delete_error), delete_error, delete_error.__traceback__),
+                    )
+                    results[r.row].user_id = user.id
+                    results[r.row].error = (
+                        f"Error crítico: Falló la creación del perfil y también el rollback (request_id: {request_id})."
+                    )
+
+        await asyncio.gather(*(rollback(r, user) for r, user in created))
+        return [results[r.row] for r in rows]
+
+    for r, user in created:
+        results[r.row] = BulkEmployeeResult(row=r.row, email=r.employee.email, status="created", user_id=user.id)
+        # El perfil cambió: descartar cualquier rol cacheado para este usuario
+        await profile_cache.invalidate(user.id)
+
+    return [results[r.row] for r in rows]
@@ -0,0 +1,141 @@
+"""
+Monitor de dependencias para el endpoint de readiness
+Un task en segundo plano ejecuta las sondas (PostgREST, Supabase Auth y Redis
+si está configurado) en paralelo y con timeout, y guarda el último resultado.
+/ready solo lee ese resultado: el polling del balanceador no genera tráfico
+hacia Supabase ni bloquea al worker.
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.core.cache import get_redis
+from src.core.config import FromSettings, Settings
+from src.database.repositories import get_admin_table_repository, get_auth_repository
+
+Probe = Callable[[], Awaitable[Any]]
+
+
+async def _probe_postgrest() -> None:
+    # Una fila de businesses: recorre PostgREST y Postgres
+    await get_admin_table_repository().sample("businesses", "id")
+
+
+async def _probe_auth() -> None:
+    await get_auth_repository().health()
+
+
+async def _probe_redis() -> None:
+    await get_redis().ping()
+
+
+def default_probes(config: Settings) -> Dict[str, Probe]:
+    """Sondas según la configuración"""
+    probes: Dict[str, Probe] = {
+        "postgrest": _probe_postgrest,
+        "auth": _probe_auth,
+    }
+    if "redis" in (config.cache_backend, config.rate_limit_backend):
+        probes["redis"] = _probe_redis
+    return probes
+
+
+class HealthMonitor:
+    """Ejecuta las sondas periódicamente y cachea el resultado"""
+
+    probes = FromSettings(default_probes)
+    interval = FromSettings("health_check_interval")
+    timeout = FromSettings("health_check_timeout")
+    max_age = FromSettings("health_check_max_age")
+
+    def __init__(
+        self,
+        probes: Optional[Dict[str, Probe]] = None,
+        interval: Optional[float] = None,
+        timeout: Optional[float] = None,
+        max_age: Optional[float] = None,
+    ):
+        self.probes = probes
+        self.interval = interval
+        self.timeout = timeout
+        self.max_age = max_age
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run_probe(self, probe: Probe) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), timeout=self.timeout)
+            check = {"ok": True}
+        except asyncio.TimeoutError:
+            check = {"ok": False, "error": f"timeout ({self.timeout}s)"}
+        except Exception as e:
+            check = {"ok": False, "error": str(e) or type(e).__name__}
+        check["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return check
+
+    async def check(self) -> Dict[str, Any]:
+        """Ejecutar todas las sondas en paralelo y guardar el resultado"""
+        probes = self.probes
+        names = list(probes)
+        results = await asyncio.gather(*(self._run_probe(probes[name]) for name in names))
+        checks = dict(zip(names, results))
+        self._result = {
+            "ok": all(check["ok"] for check in results),
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "checks": checks,
+        }
+        self._checked_at = time.monotonic()
+        return self._result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Último resultado con su antigüedad; no hace llamadas de red"""
+        if self._result is None:
+            return {"status": "starting", "ready": False, "age_seconds": None, "checks": {}}
+
+        age = time.monotonic() - self._checked_at
+        stale = age > self.max_age
+        ready = self._result["ok"] and not stale
+        if stale:
+            status = "stale"
+        else:
+            status = "ready" if ready else "degraded"
+        return {
+            "status": status,
+            "ready": ready,
+            "checked_at": self._result["checked_at"],
+            "age_seconds": round(age, 1),
+            "checks": self._result["checks"],
+        }
+
+    async def _check_loop(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Se conserva el último resultado; quedará "stale" si no se recupera
+                pass
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Iniciar las sondas periódicas en segundo plano"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._check_loop())
+
+    async def stop(self) -> None:
+        """Detener las sondas en segundo plano"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Instancia global del monitor de dependencias
+health_monitor = HealthMonitor()
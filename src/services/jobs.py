@@ -0,0 +1,271 @@
+"""
+Cola de trabajos en segundo plano: emails y otros efectos secundarios
+Los trabajos se guardan en la tabla jobs (jobs_schema.sql): la respuesta de
+la API no espera al envío y nada se pierde si el proceso se reinicia. Cada
+worker ejecuta hasta `concurrency` trabajos a la vez; los que fallan se
+reintentan con backoff exponencial hasta max_attempts y después quedan en
+"failed" con el último error.
+
+Un INSERT en jobs publica un NOTIFY (canal "job_queue") que despierta a los
+workers; sin LISTEN se sondea cada `poll_interval` segundos.
+
+    @job_queue.handler("appointment_reminder")
+    async def send_reminder(payload): ...
+
+    job_queue.enqueue_nowait("appointment_reminder", {"appointment_id": ...})
+"""
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from src.core.config import FromSettings
+from src.core.metrics import job_duration, jobs_total
+from src.database.notifications import postgres_listener
+from src.database.repositories import JobRepository, get_job_repository
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "job_queue"
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Intentos del insert de enqueue_nowait antes de darlo por perdido
+ENQUEUE_ATTEMPTS = 3
+# Cada cuánto se eliminan los trabajos terminados viejos
+PURGE_INTERVAL = 3600.0
+
+
+class PermanentJobError(Exception):
+    """Error que no se arregla reintentando: el trabajo pasa directo a 'failed'"""
+
+
+def retry_delay(attempt: int, base: float, maximum: float) -> float:
+    """Backoff exponencial (base * 2^(intento - 1), con tope) con jitter de hasta la mitad"""
+    delay = min(maximum, base * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class JobQueue:
+    """Encola trabajos en la tabla jobs y los ejecuta con concurrencia acotada"""
+
+    enabled = FromSettings("jobs_enabled")
+    concurrency = FromSettings("jobs_concurrency")
+    poll_interval = FromSettings("jobs_poll_interval")
+    lease_seconds = FromSettings("jobs_lease_seconds")
+    retry_base = FromSettings("jobs_retry_base")
+    retry_max = FromSettings("jobs_retry_max")
+    retention_days = FromSettings("jobs_retention_days")
+
+    def __init__(
+        self,
+        repository: Callable[[], JobRepository] = get_job_repository,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        shutdown_timeout: float = 10.0,
+    ):
+        self.repository = repository
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.shutdown_timeout = shutdown_timeout
+        self._handlers: Dict[str, Handler] = {}
+        self._running: Dict[asyncio.Task, Dict[str, Any]] = {}
+        self._enqueues: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._saturated = False  # el último reclamo llenó todos los lugares
+        self._task: Optional[asyncio.Task] = None
+        self._next_purge = 0.0
+        self.counts: Dict[str, int] = {}
+
+    def handler(self, kind: str) -> Callable[[Handler], Handler]:
+        """Decorador: registrar la corrutina que ejecuta los trabajos de `kind`"""
+        def register(func: Handler) -> Handler:
+            self._handlers[kind] = func
+            return func
+        return register
+
+    def wake(self, *_: Any) -> None:
+        """Buscar trabajos ya, sin esperar al próximo sondeo"""
+        self._wakeup.set()
+
+    # --- Encolar ---
+
+    async def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        run_at: Optional[datetime] = None,
+        dedupe_key: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Guardar un trabajo; con una dedupe_key ya usada no se encola de nuevo (None)"""
+        job: Dict[str, Any] = {"kind": kind, "payload": payload}
+        if run_at is not None:
+            job["run_at"] = run_at.isoformat()
+        if dedupe_key is not None:
+            job["dedupe_key"] = dedupe_key
+        created = await self.repository().enqueue(job)
+        self.wake()
+        return created
+
+    def enqueue_nowait(self, kind: str, payload: Dict[str, Any], **options: Any) -> None:
+        """
+        Encolar sin esperar el insert, para no sumar un round trip a la
+        respuesta. Al apagar, stop() espera los inserts pendientes.
+        """
+        task = asyncio.ensure_future(self._enqueue_in_background(kind, payload, options))
+        self._enqueues.add(task)
+        task.add_done_callback(self._enqueues.discard)
+
+    async def _enqueue_in_background(self, kind: str, payload: Dict[str, Any], options: Dict[str, Any]) -> None:
+        for attempt in range(1, ENQUEUE_ATTEMPTS + 1):
+            try:
+                await self.enqueue(kind, payload, **options)
+                return
+            except Exception as e:
+                if attempt == ENQUEUE_ATTEMPTS:
+                    logger.error(
+                        "No se pudo encolar el trabajo %s", kind,
+                        exc_info=(type(e), e, e.__traceback__),
+                        extra={"job_kind": kind, "payload": payload},
+                    )
+                    return
+                await asyncio.sleep(retry_delay(attempt, 0.5, 5.0))
+
+    # --- Ejecutar ---
+
+    async def _close(self, job: Dict[str, Any], values: Dict[str, Any]) -> None:
+        try:
+            await self.repository().update_claimed(job, {"locked_until": None, **values})
+        except Exception as e:
+            # Si no se pudo cerrar, el lease vence y el trabajo se vuelve a reclamar
+            logger.warning("No se pudo actualizar el trabajo %s (%s)", job["id"], e)
+
+    async def _failed(self, job: Dict[str, Any], error: Exception) -> str:
+        message = f"{type(error).__name__}: {error}"[:2000]
+        extra = {"job_id": job["id"], "job_kind": job["kind"], "attempt": job["attempts"]}
+        if isinstance(error, PermanentJobError) or job["attempts"] >= job["max_attempts"]:
+            logger.error(
+                "Trabajo %s (%s) falló definitivamente", job["id"], job["kind"],
+                exc_info=(type(error), error, error.__traceback__), extra=extra,
+            )
+            await self._close(job, {"status": "failed", "last_error": message})
+            return "failed"
+
+        delay = retry_delay(job["attempts"], self.retry_base, self.retry_max)
+        logger.warning(
+            "Trabajo %s (%s) falló, se reintenta en %.0f s: %s", job["id"], job["kind"], delay, message,
+            extra=extra,
+        )
+        run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        await self._close(job, {"status": "pending", "run_at": run_at.isoformat(), "last_error": message})
+        return "retry"
+
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        kind = job["kind"]
+        start = time.perf_counter()
+        try:
+            handler = self._handlers.get(kind)
+            if handler is None:
+                raise PermanentJobError(f"No hay handler para '{kind}'")
+            await handler(job["payload"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            result = await self._failed(job, e)
+        else:
+            await self._close(job, {"status": "done", "last_error": None})
+            result = "done"
+        job_duration.observe(time.perf_counter() - start, (kind,))
+        jobs_total.inc((kind, result))
+        self.counts[result] = self.counts.get(result, 0) + 1
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._running.pop(task, None)
+        if self._saturated:
+            self._wakeup.set()
+
+    async def _claim(self) -> None:
+        free = self.concurrency - len(self._running)
+        self._saturated = free <= 0
+        if free <= 0:
+            return
+        try:
+            jobs = await self.repository().claim(free, self.lease_seconds)
+        except Exception as e:
+            logger.warning("No se pudieron reclamar trabajos (%s)", e)
+            return
+        for job in jobs:
+            task = asyncio.create_task(self._execute(job))
+            self._running[task] = job
+            task.add_done_callback(self._finished)
+        # Llenó todos los lugares: puede haber más esperando, se reclama al liberarse uno
+        self._saturated = len(jobs) == free
+
+    async def _purge(self) -> None:
+        if time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + PURGE_INTERVAL
+        before = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        try:
+            await self.repository().purge(before)
+        except Exception as e:
+            logger.warning("No se pudieron eliminar los trabajos terminados (%s)", e)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            await self._claim()
+            await self._purge()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Ejecutar trabajos en segundo plano (arranque de la aplicación)"""
+        if not self.enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Dejar de reclamar, esperar los inserts pendientes y, hasta
+        shutdown_timeout, los trabajos en curso; los que no terminan se
+        cancelan y se devuelven a la cola.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._enqueues:
+            await asyncio.gather(*self._enqueues, return_exceptions=True)
+
+        if self._running:
+            _, pending = await asyncio.wait(list(self._running), timeout=self.shutdown_timeout)
+            unfinished = [self._running[task] for task in pending]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            now = datetime.now(timezone.utc).isoformat()
+            for job in unfinished:
+                await self._close(job, {"status": "pending", "run_at": now})
+
+    def stats(self) -> Dict[str, Any]:
+        """Trabajos en curso, inserts pendientes y resultados"""
+        return {
+            "running": len(self._running),
+            "pending_enqueues": len(self._enqueues),
+            "results": dict(self.counts),
+        }
+
+
+# Instancia global: cada worker ejecuta trabajos; los NOTIFY de jobs lo despiertan
+job_queue = JobQueue()
+postgres_listener.subscribe(CHANNEL, job_queue.wake, on_connect=job_queue.wake)
@@ -0,0 +1,41 @@
+"""
+Puntos de fidelización: errores del ledger y reconstrucción de saldos
+Los movimientos y los saldos se mantienen en la base (loyalty_schema.sql):
+acumular, canjear y ajustar son una sola llamada y el saldo se actualiza en la
+misma transacción. La reconstrucción corre en la cola de trabajos porque
+recorre todo el ledger de un negocio (o de todos).
+"""
+import logging
+from typing import Any, Dict, Optional
+
+from fastapi import status
+
+from src.database.repositories import get_loyalty_repository
+from src.services.jobs import job_queue
+
+logger = logging.getLogger(__name__)
+
+# Errores de loyalty_redeem / loyalty_adjust (el message de RAISE EXCEPTION)
+LOYALTY_ERRORS = {
+    "reward_not_found": (status.HTTP_404_NOT_FOUND, "Recompensa no encontrada"),
+    "insufficient_points": (status.HTTP_409_CONFLICT, "El cliente no tiene puntos suficientes."),
+}
+
+
+def enqueue_rebuild(business_id: Optional[str] = None) -> None:
+    """Verificar y corregir los saldos en segundo plano (repetirlo no cambia el resultado)"""
+    job_queue.enqueue_nowait("loyalty_rebuild", {"business_id": business_id})
+
+
+@job_queue.handler("loyalty_rebuild")
+async def rebuild_balances(payload: Dict[str, Any]) -> None:
+    repository = get_loyalty_repository()
+    business_id = payload.get("business_id")
+    mismatches = await repository.verify(business_id)
+    if not mismatches:
+        return
+    fixed = await repository.rebuild(business_id)
+    logger.warning(
+        "Saldos de puntos corregidos: %d de %d con diferencias", fixed, len(mismatches),
+        extra={"business_id": business_id},
+    )
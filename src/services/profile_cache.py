@@ -0,0 +1,14 @@
+"""
+Cache de perfiles de usuario (rol y business_id) para los RoleChecker
+"""
+from src.core.cache import Cache
+from src.core.config import FromSettings
+
+
+class ProfileCache(Cache):
+    ttl = FromSettings("profile_cache_ttl")
+    max_size = FromSettings("profile_cache_max_size")
+
+
+# Instancia global: clave = id del usuario, valor = {"role", "business_id"}
+profile_cache = ProfileCache("user_profiles")
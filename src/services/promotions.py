@@ -0,0 +1,251 @@
+"""
+Promociones vigentes por negocio, en memoria y ordenadas por sus límites
+Cada worker carga una vez las promociones activas que no vencieron de un
+negocio; cuáles están vigentes (valid_from <= ahora <= valid_until) se decide
+con la hora actual, sin volver a la base: una promoción empieza y vence en
+su timestamp exacto.
+
+Por negocio, las promociones se recorren ordenadas por valid_from y las
+vigentes se guardan en un heap por valid_until. La respuesta se arma solo
+cuando se cruza un límite (el próximo inicio o vencimiento); entre límites
+una consulta es una comparación. Los tiempos se comparan en microsegundos
+enteros, la precisión de timestamptz.
+
+Las ediciones de los owners se aplican en el worker que las hace
+(write-through) y llegan a los demás por los NOTIFY de
+promotions_schema.sql (canal "promotion_changes"), que descartan el negocio.
+`ttl` limita la vida de cada negocio cargado aunque se pierda un evento.
+"""
+import asyncio
+import heapq
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.config import FromSettings
+from src.core.metrics import promotion_lookups
+from src.database.notifications import postgres_listener
+from src.database.repositories import PromotionRepository
+
+CHANNEL = "promotion_changes"
+
+PUBLIC_FIELDS = ("id", "title", "description", "valid_from", "valid_until")
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NEVER = float("inf")
+DELETED = -1  # versión de una promoción eliminada en este worker
+
+ActivePromotions = Tuple[Dict[str, Any], ...]
+
+
+def micros(value: Any) -> int:
+    """Microsegundos desde epoch de un datetime aware o un timestamp ISO"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+class BusinessPromotions:
+    """Promociones activas de un negocio con un cursor sobre sus límites de vigencia"""
+
+    __slots__ = (
+        "loaded_at", "promotions", "versions",
+        "_starts", "_next", "_ends", "_active", "_position", "_next_change", "_view",
+    )
+
+    def __init__(self, promotions: List[Dict[str, Any]], loaded_at: float):
+        self.loaded_at = loaded_at
+        self.promotions: Dict[str, Dict[str, Any]] = {}
+        # id -> versión (updated_at) de lo aplicado con write-through, para reconocer su evento
+        self.versions: Dict[str, int] = {}
+        for promotion in promotions:
+            if promotion.get("status", "active") == "active":
+                self.promotions[promotion["id"]] = promotion
+        self._reset()
+
+    def __len__(self) -> int:
+        return len(self.promotions)
+
+    def _reset(self) -> None:
+        # (inicio, fin, id) ordenados por inicio; _next es el próximo por empezar
+        self._starts = sorted(
+            (micros(p["valid_from"]), micros(p["valid_until"]), p["id"]) for p in self.promotions.values()
+        )
+        self._next = 0
+        self._ends: List[Tuple[int, str]] = []  # heap (fin, id) de las vigentes
+        self._active: Dict[str, Tuple[int, str]] = {}  # id -> clave de orden (fin, id)
+        self._position = -NEVER
+        self._next_change = self._starts[0][0] if self._starts else NEVER
+        self._view: ActivePromotions = ()
+
+    def active(self, now: int) -> ActivePromotions:
+        """Promociones vigentes en `now` (microsegundos), de la que vence antes a la última"""
+        if self._position <= now < self._next_change:
+            return self._view
+        if now < self._position:
+            # La consulta es anterior a la última (reloj hacia atrás): se recorre desde el principio
+            self._reset()
+        self._advance(now)
+        return self._view
+
+    def _advance(self, now: int) -> None:
+        changed = False
+        starts = self._starts
+        while self._next < len(starts) and starts[self._next][0] <= now:
+            start, end, promotion_id = starts[self._next]
+            self._next += 1
+            if end >= now:
+                heapq.heappush(self._ends, (end, promotion_id))
+                self._active[promotion_id] = (end, promotion_id)
+                changed = True
+        # valid_until es inclusivo: vence un microsegundo después
+        while self._ends and self._ends[0][0] < now:
+            _, promotion_id = heapq.heappop(self._ends)
+            del self._active[promotion_id]
+            changed = True
+
+        self._position = now
+        next_start = starts[self._next][0] if self._next < len(starts) else NEVER
+        next_end = self._ends[0][0] + 1 if self._ends else NEVER
+        self._next_change = min(next_start, next_end)
+        if changed:
+            self._view = tuple(
+                {field: self.promotions[promotion_id].get(field) for field in PUBLIC_FIELDS}
+                for _, promotion_id in sorted(self._active.values())
+            )
+
+    def put(self, promotion: Dict[str, Any]) -> None:
+        """Agregar o reemplazar una promoción (una inactiva se quita)"""
+        if promotion.get("status", "active") == "active":
+            self.promotions[promotion["id"]] = promotion
+        else:
+            self.promotions.pop(promotion["id"], None)
+        if promotion.get("updated_at"):
+            self.versions[promotion["id"]] = micros(promotion["updated_at"])
+        self._reset()
+
+    def remove(self, promotion_id: str) -> None:
+        self.promotions.pop(promotion_id, None)
+        self.versions[promotion_id] = DELETED
+        self._reset()
+
+
+class PromotionIndex:
+    """Promociones por negocio (LRU), cargadas una vez y resueltas con la hora actual"""
+
+    ttl = FromSettings("promotions_cache_ttl")
+    max_businesses = FromSettings("promotions_cache_max_businesses")
+
+    def __init__(self, ttl: Optional[float] = None, max_businesses: Optional[int] = None):
+        self.ttl = ttl
+        self.max_businesses = max_businesses
+        self._businesses: "OrderedDict[str, BusinessPromotions]" = OrderedDict()
+        # Se incrementa con cada invalidación: una carga que empezó antes no se guarda
+        self._generation = 0
+        self._inflight: Dict[str, "asyncio.Future[BusinessPromotions]"] = {}
+        self.counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._businesses)
+
+    def _count(self, result: str) -> None:
+        self.counts[result] = self.counts.get(result, 0) + 1
+        promotion_lookups.inc((result,))
+
+    async def active(
+        self, business_id: str, promotions: PromotionRepository, now: Optional[datetime] = None
+    ) -> ActivePromotions:
+        """Promociones vigentes de un negocio en `now` (por defecto, ahora)"""
+        now = now or datetime.now(timezone.utc)
+        entry = self._businesses.get(business_id)
+        if entry is not None and time.monotonic() - entry.loaded_at <= self.ttl:
+            self._businesses.move_to_end(business_id)
+            self._count("hit")
+        else:
+            self._count("load")
+            entry = await self._load_once(business_id, promotions)
+        return entry.active(micros(now))
+
+    async def _load_once(self, business_id: str, promotions: PromotionRepository) -> BusinessPromotions:
+        """Cargar un negocio una sola vez aunque lo pidan varios requests a la vez"""
+        future = self._inflight.get(business_id)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[business_id] = future
+        generation = self._generation
+        try:
+            rows = await promotions.list_current(business_id, datetime.now(timezone.utc))
+            entry = BusinessPromotions(rows, time.monotonic())
+            if self._generation == generation:
+                self._businesses[business_id] = entry
+                self._businesses.move_to_end(business_id)
+                while len(self._businesses) > self.max_businesses:
+                    self._businesses.popitem(last=False)
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Que los requests que esperaban reciban el error sin warnings de "never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._inflight[business_id]
+
+    # --- Write-through (ediciones hechas en este worker) ---
+
+    def put(self, business_id: str, promotion: Dict[str, Any]) -> None:
+        """Aplicar una promoción creada o editada en este worker"""
+        self._generation += 1
+        entry = self._businesses.get(business_id)
+        if entry is not None:
+            entry.put(promotion)
+
+    def remove(self, business_id: str, promotion_id: str) -> None:
+        """Quitar una promoción eliminada en este worker"""
+        self._generation += 1
+        entry = self._businesses.get(business_id)
+        if entry is not None:
+            entry.remove(promotion_id)
+
+    # --- Invalidación ---
+
+    def invalidate(self, business_id: str) -> None:
+        """Descartar las promociones cargadas de un negocio"""
+        self._generation += 1
+        self._businesses.pop(business_id, None)
+
+    def clear(self) -> None:
+        """Descartar todo (al conectar LISTEN pudo haber eventos perdidos)"""
+        self._generation += 1
+        self._businesses.clear()
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """Aplicar un evento de promotion_changes"""
+        entry = self._businesses.get(event["business_id"])
+        if entry is None:
+            self._generation += 1
+            return
+        version = micros(event["updated_at"]) if event.get("updated_at") else DELETED
+        if entry.versions.get(event.get("id")) == version:
+            # Cambio propio, ya aplicado con write-through
+            return
+        self.invalidate(event["business_id"])
+
+    def stats(self) -> Dict[str, Any]:
+        """Negocios cargados, promociones en memoria y resultados de las consultas"""
+        return {
+            "businesses": len(self._businesses),
+            "promotions": sum(len(entry) for entry in self._businesses.values()),
+            "lookups": dict(self.counts),
+        }
+
+
+# Instancia global (un índice por worker), invalidado por la conexión LISTEN del proceso
+promotion_index = PromotionIndex()
+postgres_listener.subscribe(CHANNEL, promotion_index.apply_event, on_connect=promotion_index.clear)
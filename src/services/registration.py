@@ -0,0 +1,209 @@
+"""
+Pipelines de registro (owner, employee, customer) sobre el motor de sagas
+Cada paso tiene su compensación; los pasos independientes corren en paralelo:
+
+    owner:    [create_user, create_business] -> [create_profile, sign_in]
+    employee: [create_user] -> [create_profile, sign_in]
+    customer: [sign_up] -> [create_profile]
+    onboarding: [create_user] -> [onboard, sign_in]
+
+El estado de entrada lleva los repositorios (`auth_repo`, `businesses`,
+`profiles`) y los datos del registro (`email`, `password`, ...).
+"""
+import logging
+from typing import Any, Dict
+
+from fastapi import HTTPException, status
+from gotrue.types import Session
+
+from src.core.log import get_log_context
+from src.core.metrics import record_saga_step
+from src.services.access_codes import access_code_index, create_business
+from src.services.profile_cache import profile_cache
+from src.services.saga import Saga, SagaError, SagaStep
+
+logger = logging.getLogger(__name__)
+
+
+def registration_http_error(error: SagaError) -> HTTPException:
+    """Traducir el fallo de una saga de registro a una respuesta HTTP"""
+    e = error.original
+    request_id = get_log_context().get("request_id")
+
+    if not error.compensated:
+        # Los detalles van al log, no a la respuesta
+        logger.critical(
+            "Falló la saga %s y también su compensación", error.saga,
+            exc_info=(type(e), e, e.__traceback__),
+            extra={
+                "failed_step": error.failed_step,
+                "compensation_errors": {step: repr(err) for step, err in error.compensation_errors},
+            },
+        )
+        return HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error crítico: Falló la creación y también el rollback (request_id: {request_id})."
+        )
+
+    if "duplicate key value violates unique constraint" in str(e) and "users_email_key" in str(e):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El email ya está registrado."
+        )
+
+    if isinstance(e, HTTPException):
+        return e
+
+    logger.error(
+        "Falló la saga %s en el paso %s", error.saga, error.failed_step,
+        exc_info=(type(e), e, e.__traceback__),
+    )
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Ocurrió un error inesperado durante el registro (request_id: {request_id})."
+    )
+
+
+# --- Usuario en Supabase Auth ---
+
+async def _create_user(state: Dict[str, Any]):
+    user = await state["auth_repo"].create_user(state["email"], state["password"])
+    if not user:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No se pudo crear el usuario en Supabase Auth.")
+    return user
+
+
+async def _sign_up(state: Dict[str, Any]):
+    response = await state["auth_repo"].sign_up(state["email"], state["password"])
+    if not response.user:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No se pudo crear el usuario en Supabase Auth.")
+    return response
+
+
+async def _delete_user(state: Dict[str, Any], user) -> None:
+    await state["auth_repo"].delete_user(user.id)
+
+
+async def _delete_signed_up_user(state: Dict[str, Any], response) -> None:
+    await state["auth_repo"].delete_user(response.user.id)
+
+
+# --- Negocio ---
+
+async def _create_business(state: Dict[str, Any]) -> Dict[str, Any]:
+    # Con un código de acceso único (se reintenta si el generado ya existe)
+    business = await create_business(state["businesses"], {
+        "name": f"Salón de {state['email'].split('@')[0]}",
+        "address": "Dirección pendiente",
+        "is_active": True
+    })
+    if not business:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="No se pudo crear el negocio.")
+    return business
+
+
+async def _delete_business(state: Dict[str, Any], business: Dict[str, Any]) -> None:
+    await state["businesses"].delete(business["id"])
+    access_code_index.discard(business["access_code"], business["id"])
+
+
+async def _onboard_owner(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Negocio + perfil + horarios/servicios/empleados en una transacción (RPC)"""
+    user = state["create_user"]
+    data = state["onboarding"]
+    result = await state["businesses"].onboard_owner(
+        user.id,
+        data["business"],
+        first_name=data.get("first_name"),
+        last_name=data.get("last_name"),
+        hours=data.get("hours"),
+        services=data.get("services"),
+        employees=data.get("employees"),
+    )
+    if not result or not result.get("business"):
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="No se pudo crear el negocio.")
+    # El perfil cambió: descartar cualquier rol cacheado para este usuario
+    await profile_cache.invalidate(user.id)
+    access_code_index.add(result["business"]["access_code"], result["business"]["id"])
+    return result
+
+
+async def _undo_onboarding(state: Dict[str, Any], result: Dict[str, Any]) -> None:
+    # Borra en cascada horarios, servicios y empleados; el perfil cae con el usuario
+    await state["businesses"].delete(result["business"]["id"])
+    access_code_index.discard(result["business"]["access_code"], result["business"]["id"])
+    await profile_cache.invalidate(state["create_user"].id)
+
+
+# --- Perfil ---
+
+def _profile_step(role: str, user_id, business_id, depends_on) -> SagaStep:
+    """Paso que inserta el perfil de `role`; `user_id(state)` y `business_id(state)` resuelven las claves"""
+
+    async def create_profile(state: Dict[str, Any]) -> Dict[str, Any]:
+        profile = await state["profiles"].create({
+            "id": user_id(state),
+            "role": role,
+            "business_id": business_id(state),
+        })
+        if not profile:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="No se pudo crear el perfil de usuario.")
+        # El perfil cambió: descartar cualquier rol cacheado para este usuario
+        await profile_cache.invalidate(profile["id"])
+        return profile
+
+    async def delete_profile(state: Dict[str, Any], profile: Dict[str, Any]) -> None:
+        await state["profiles"].delete(profile["id"])
+        await profile_cache.invalidate(profile["id"])
+
+    return SagaStep("create_profile", create_profile, delete_profile, depends_on=depends_on)
+
+
+# --- Sesión ---
+
+async def _sign_in(state: Dict[str, Any]) -> Session:
+    session = await state["auth_repo"].sign_in_with_password(state["email"], state["password"])
+    if not session:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Usuario creado pero no se pudo iniciar sesión.")
+    return session
+
+
+owner_registration = Saga("register_owner", [
+    SagaStep("create_user", _create_user, _delete_user),
+    SagaStep("create_business", _create_business, _delete_business),
+    _profile_step(
+        "owner",
+        user_id=lambda state: state["create_user"].id,
+        business_id=lambda state: state["create_business"]["id"],
+        depends_on=["create_user", "create_business"],
+    ),
+    SagaStep("sign_in", _sign_in, depends_on=["create_user"]),
+], on_step=record_saga_step)
+
+employee_registration = Saga("register_employee", [
+    SagaStep("create_user", _create_user, _delete_user),
+    _profile_step(
+        "employee",
+        user_id=lambda state: state["create_user"].id,
+        business_id=lambda state: state["business_id"],
+        depends_on=["create_user"],
+    ),
+    SagaStep("sign_in", _sign_in, depends_on=["create_user"]),
+], on_step=record_saga_step)
+
+customer_registration = Saga("register_customer", [
+    SagaStep("sign_up", _sign_up, _delete_signed_up_user),
+    _profile_step(
+        "customer",
+        user_id=lambda state: state["sign_up"].user.id,
+        # Los clientes pueden pertenecer a múltiples negocios
+        business_id=lambda state: None,
+        depends_on=["sign_up"],
+    ),
+], on_step=record_saga_step)
+
+owner_onboarding = Saga("onboard_owner", [
+    SagaStep("create_user", _create_user, _delete_user),
+    SagaStep("onboard", _onboard_owner, _undo_onboarding, depends_on=["create_user"]),
+    SagaStep("sign_in", _sign_in, depends_on=["create_user"]),
+], on_step=record_saga_step)
@@ -0,0 +1,84 @@
+"""
+Recordatorios de turnos: escaneo por ventanas de tiempo
+Cada `scan_interval` segundos se encolan, con una sola sentencia
+(enqueue_appointment_reminders), los recordatorios de los turnos que
+empiezan en [última ventana, ahora + lead). La consulta recorre un rango del
+índice parcial idx_appointments_start_active en lugar de revisar turno por
+turno, y la dedupe_key de jobs evita duplicados aunque varios workers
+escaneen la misma ventana.
+
+El primer escaneo de cada proceso cubre [ahora, ahora + lead) completo: los
+recordatorios que vencieron mientras no había workers (despliegue, caída) se
+encolan tarde en lugar de perderse, y los que otro worker ya encoló no se
+repiten. Los turnos reservados con menos anticipación que `lead` no reciben
+recordatorio (la función los filtra por created_at): ya tienen el email de
+confirmación.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from src.core.config import FromSettings
+from src.database.repositories import get_appointment_repository
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderScheduler:
+    """Encola los recordatorios de turnos a medida que entran en la ventana de aviso"""
+
+    enabled = FromSettings("jobs_enabled")
+    lead_hours = FromSettings("reminder_lead_hours")
+    scan_interval = FromSettings("reminder_scan_interval")
+
+    def __init__(self, lead_hours: Optional[float] = None, scan_interval: Optional[float] = None):
+        self.lead_hours = lead_hours
+        self.scan_interval = scan_interval
+        # Fin de la última ventana escaneada (inicio de la próxima)
+        self.scanned_until: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def scan(self, now: Optional[datetime] = None) -> int:
+        """Encolar los recordatorios que vencieron desde el último escaneo"""
+        now = now or datetime.now(timezone.utc)
+        lead = timedelta(hours=self.lead_hours)
+        # Al arrancar no se sabe hasta dónde llegó el proceso anterior: toda la ventana
+        start = self.scanned_until or now
+        end = now + lead
+        if end <= start:
+            return 0
+        count = await get_appointment_repository().enqueue_reminders(start, end, int(lead.total_seconds()))
+        self.scanned_until = end
+        if count:
+            logger.info("Recordatorios encolados: %d", count)
+        return count
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.scan()
+            except Exception as e:
+                # La ventana no avanza: el próximo escaneo la cubre
+                logger.warning("No se pudieron encolar los recordatorios (%s)", e)
+            await asyncio.sleep(self.scan_interval)
+
+    def start(self) -> None:
+        """Escanear en segundo plano (arranque de la aplicación)"""
+        if not self.enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Instancia global: cada worker escanea; las ventanas repetidas no duplican trabajos
+reminder_scheduler = ReminderScheduler()
@@ -0,0 +1,178 @@
+"""
+Motor de sagas: pasos con dependencias, ejecución concurrente y compensación
+Los pasos sin dependencias entre sí se ejecutan en paralelo; si alguno falla,
+se compensan en orden inverso los pasos ya completados. Lo mismo si la
+ejecución se cancela: los pasos en curso se cancelan y la compensación
+corre protegida (shield) antes de propagar la cancelación.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+StepAction = Callable[[Dict[str, Any]], Awaitable[Any]]
+StepCompensation = Callable[[Dict[str, Any], Any], Awaitable[None]]
+StepHook = Callable[[str, str, float, bool], None]
+
+
+class SagaStep:
+    """Un paso de la saga: acción, compensación opcional y dependencias"""
+
+    __slots__ = ("name", "action", "compensate", "depends_on")
+
+    def __init__(
+        self,
+        name: str,
+        action: StepAction,
+        compensate: Optional[StepCompensation] = None,
+        depends_on: Sequence[str] = (),
+    ):
+        self.name = name
+        self.action = action
+        self.compensate = compensate
+        self.depends_on = tuple(depends_on)
+
+
+class SagaResult:
+    """Resultados por paso y duración de cada uno (ms)"""
+
+    def __init__(self, results: Dict[str, Any], timings: Dict[str, float]):
+        self.results = results
+        self.timings = timings
+
+    def __getitem__(self, step_name: str) -> Any:
+        return self.results[step_name]
+
+
+class SagaError(Exception):
+    """Un paso falló; los pasos completados ya fueron compensados"""
+
+    def __init__(
+        self,
+        saga: str,
+        failed_step: str,
+        original: BaseException,
+        compensation_errors: List[Tuple[str, BaseException]],
+        timings: Dict[str, float],
+    ):
+        self.saga = saga
+        self.failed_step = failed_step
+        self.original = original
+        self.compensation_errors = compensation_errors
+        self.timings = timings
+        super().__init__(f"Saga '{saga}' falló en el paso '{failed_step}': {original}")
+
+    @property
+    def compensated(self) -> bool:
+        """Indica si todas las compensaciones terminaron bien"""
+        return not self.compensation_errors
+
+
+class Saga:
+    """
+    Saga reutilizable. Se define una vez y se ejecuta con `run(state)`, donde
+    `state` contiene las entradas; el resultado de cada paso se agrega a
+    `state` con el nombre del paso para que lo usen los pasos dependientes.
+    """
+
+    def __init__(self, name: str, steps: Sequence[SagaStep], on_step: Optional[StepHook] = None):
+        self.name = name
+        self.steps = list(steps)
+        self.on_step = on_step
+        self.waves = self._build_waves(self.steps)
+
+    @staticmethod
+    def _build_waves(steps: Sequence[SagaStep]) -> List[List[SagaStep]]:
+        """Agrupar los pasos en oleadas según sus dependencias (orden topológico)"""
+        names = {step.name for step in steps}
+        for step in steps:
+            unknown = set(step.depends_on) - names
+            if unknown:
+                raise ValueError(f"El paso '{step.name}' depende de pasos inexistentes: {sorted(unknown)}")
+
+        waves: List[List[SagaStep]] = []
+        done: set = set()
+        pending = list(steps)
+        while pending:
+            wave = [step for step in pending if set(step.depends_on) <= done]
+            if not wave:
+                raise ValueError(f"Dependencias circulares entre: {[step.name for step in pending]}")
+            waves.append(wave)
+            done.update(step.name for step in wave)
+            pending = [step for step in pending if step.name not in done]
+        return waves
+
+    async def _run_step(self, step: SagaStep, state: Dict[str, Any], timings: Dict[str, float]) -> Any:
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = await step.action(state)
+            ok = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            timings[step.name] = round(elapsed * 1000, 3)
+            if self.on_step is not None:
+                self.on_step(self.name, step.name, elapsed, ok)
+
+    async def _compensate(
+        self, completed: List[SagaStep], state: Dict[str, Any]
+    ) -> List[Tuple[str, BaseException]]:
+        errors: List[Tuple[str, BaseException]] = []
+        for step in reversed(completed):
+            if step.compensate is None:
+                continue
+            try:
+                await step.compensate(state, state[step.name])
+            except Exception as e:
+                errors.append((step.name, e))
+        return errors
+
+    @staticmethod
+    def _collect(
+        wave: List[SagaStep], tasks: List[asyncio.Task], state: Dict[str, Any], completed: List[SagaStep]
+    ) -> Optional[Tuple[SagaStep, BaseException]]:
+        """Registrar los pasos terminados bien de una oleada; devuelve la primera falla"""
+        failure: Optional[Tuple[SagaStep, BaseException]] = None
+        for step, task in zip(wave, tasks):
+            if not task.done():
+                continue
+            error = asyncio.CancelledError() if task.cancelled() else task.exception()
+            if error is not None:
+                failure = failure or (step, error)
+            else:
+                state[step.name] = task.result()
+                completed.append(step)
+        return failure
+
+    async def _cancel(
+        self, wave: List[SagaStep], tasks: List[asyncio.Task], state: Dict[str, Any], completed: List[SagaStep]
+    ) -> None:
+        """Cancelar los pasos en curso y compensar todo lo completado"""
+        for task in tasks:
+            task.cancel()
+        await asyncio.wait(tasks)
+        self._collect(wave, tasks, state, completed)
+        await self._compensate(completed, state)
+
+    async def run(self, state: Dict[str, Any]) -> SagaResult:
+        state = dict(state)
+        timings: Dict[str, float] = {}
+        completed: List[SagaStep] = []
+
+        for wave in self.waves:
+            tasks = [asyncio.ensure_future(self._run_step(step, state, timings)) for step in wave]
+            try:
+                await asyncio.wait(tasks)
+            except asyncio.CancelledError:
+                # Cancelada desde afuera (timeout, cliente desconectado): se compensa
+                # igual que ante una falla, aunque vuelvan a cancelar a quien espera
+                await asyncio.shield(self._cancel(wave, tasks, state, completed))
+                raise
+
+            failure = self._collect(wave, tasks, state, completed)
+            if failure is not None:
+                compensation_errors = await asyncio.shield(self._compensate(completed, state))
+                failed_step, original = failure
+                raise SagaError(self.name, failed_step.name, original, compensation_errors, timings)
+
+        return SagaResult({step.name: state[step.name] for step in self.steps}, timings)
@@ -0,0 +1,28 @@
+"""
+Configuración compartida de los tests
+La configuración mínima sale de variables de entorno ficticias: ningún test
+usa un proyecto de Supabase real ni lee el .env local.
+"""
+import pytest
+
+from src.core.config import get_settings
+
+TEST_ENV = {
+    "SUPABASE_URL": "http://supabase.test",
+    "SUPABASE_ANON_KEY": "anon-key",
+    "SUPABASE_SERVICE_ROLE_KEY": "service-role-key",
+    "ADMIN_SECRET": "test",
+    "DATABASE_URL": "",
+    "SMTP_HOST": "",
+}
+
+
+@pytest.fixture(autouse=True)
+def settings_env(monkeypatch, tmp_path):
+    """Entorno de prueba; la configuración se vuelve a leer en cada test"""
+    for name, value in TEST_ENV.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.chdir(tmp_path)  # sin .env
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
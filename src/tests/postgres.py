@@ -0,0 +1,90 @@
+"""
+Postgres local para los tests que necesitan las funciones y constraints reales
+Con DATABASE_URL (una base desde la que el usuario pueda crear otras) cada
+test crea una base descartable, carga los esquemas de src/database con
+los objetos de Supabase que dan por existentes (roles, auth.users, auth.uid)
+y la elimina al terminar. Sin DATABASE_URL los tests se saltean.
+
+    DATABASE_URL=postgresql://postgres@localhost/postgres python -m pytest src/tests
+
+Requiere las extensiones uuid-ossp y btree_gist en el servidor.
+"""
+import os
+import uuid
+
+import pytest
+
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover - asyncpg es opcional
+    asyncpg = None
+
+# Se lee al importar: el fixture settings_env vacía DATABASE_URL en cada test
+DATABASE_URL = os.environ.get("DATABASE_URL") or None
+
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "database")
+
+requires_postgres = pytest.mark.skipif(
+    DATABASE_URL is None or asyncpg is None, reason="requiere DATABASE_URL (Postgres local) y asyncpg"
+)
+
+# Lo que Supabase ya trae creado
+SUPABASE_PRELUDE = """
+DO $$
+DECLARE
+    role_name TEXT;
+BEGIN
+    FOREACH role_name IN ARRAY ARRAY['anon', 'authenticated', 'service_role'] LOOP
+        IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = role_name) THEN
+            EXECUTE format('CREATE ROLE %I NOLOGIN', role_name);
+        END IF;
+    END LOOP;
+END $$;
+
+CREATE SCHEMA IF NOT EXISTS auth;
+CREATE TABLE IF NOT EXISTS auth.users (
+    id UUID PRIMARY KEY,
+    email TEXT
+);
+CREATE OR REPLACE FUNCTION auth.uid() RETURNS UUID
+LANGUAGE sql STABLE
+AS $$ SELECT NULLIF(current_setting('request.jwt.claim.sub', true), '')::uuid $$;
+"""
+
+
+def _database_url(name: str) -> str:
+    """DATABASE_URL apuntando a otra base del mismo servidor"""
+    base, _, query = DATABASE_URL.partition("?")
+    server = base.rsplit("/", 1)[0]
+    return f"{server}/{name}" + (f"?{query}" if query else "")
+
+
+async def create_database(*schemas: str) -> str:
+    """Crear una base descartable con el preludio y los esquemas en orden; devuelve su URL"""
+    name = f"iris_test_{uuid.uuid4().hex[:12]}"
+    admin = await asyncpg.connect(DATABASE_URL)
+    try:
+        await admin.execute(f'CREATE DATABASE "{name}"')
+    finally:
+        await admin.close()
+
+    url = _database_url(name)
+    conn = await asyncpg.connect(url)
+    try:
+        await conn.execute(SUPABASE_PRELUDE)
+        for schema in schemas:
+            with open(os.path.join(SCHEMA_DIR, schema)) as f:
+                await conn.execute(f.read())
+    finally:
+        await conn.close()
+    return url
+
+
+async def drop_database(url: str) -> None:
+    name = url.partition("?")[0].rsplit("/", 1)[1]
+    admin = await asyncpg.connect(DATABASE_URL)
+    try:
+        await admin.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+    finally:
+        await admin.close()
+
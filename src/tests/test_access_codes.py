@@ -0,0 +1,98 @@
+"""
+Tests de la resolución de códigos de acceso (src/services/access_codes.py)
+"""
+import time
+from typing import Dict, List, Optional
+
+import pytest
+
+from src.services import access_codes
+from src.services.access_codes import AccessCodeIndex
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeBusinessRepository:
+    def __init__(self, codes: Dict[str, str]):
+        self.codes = codes
+        self.queries: List[str] = []
+
+    async def get_id_by_access_code(self, code: str) -> Optional[str]:
+        self.queries.append(code)
+        return self.codes.get(code)
+
+    async def list_access_codes(self, start: int, end: int) -> List[dict]:
+        rows = [{"access_code": c, "id": b} for c, b in sorted(self.codes.items())]
+        return rows[start:end + 1]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+async def test_database_hits_expire_without_listen(clock):
+    repo = FakeBusinessRepository({"ABCD2345": "b1"})
+    index = AccessCodeIndex(negative_ttl=60, negative_max_size=10)
+
+    assert await index.resolve("abcd-2345", repo) == "b1"
+    assert await index.resolve("ABCD2345", repo) == "b1"
+    assert repo.queries == ["ABCD2345"]
+
+    # El negocio cambió de código en otro worker: sin LISTEN no llega el aviso
+    del repo.codes["ABCD2345"]
+    clock[0] += 61
+    assert await index.resolve("ABCD2345", repo) is None
+    assert len(repo.queries) == 2
+    assert len(index) == 0
+
+
+async def test_database_hits_are_bounded(clock):
+    repo = FakeBusinessRepository({f"CODE{i:04d}": f"b{i}" for i in range(5)})
+    index = AccessCodeIndex(negative_ttl=60, negative_max_size=3)
+
+    for i in range(5):
+        await index.resolve(f"CODE{i:04d}", repo)
+    assert index.stats()["positive_size"] == 3
+    # Los dos más viejos salieron: se vuelven a consultar
+    await index.resolve("CODE0000", repo)
+    await index.resolve("CODE0004", repo)
+    assert repo.queries[5:] == ["CODE0000"]
+
+
+async def test_negative_entries_expire(clock):
+    repo = FakeBusinessRepository({})
+    index = AccessCodeIndex(negative_ttl=60, negative_max_size=10)
+
+    assert await index.resolve("ZZZZ2345", repo) is None
+    assert await index.resolve("ZZZZ2345", repo) is None
+    assert len(repo.queries) == 1
+    clock[0] += 61
+    repo.codes["ZZZZ2345"] = "b9"
+    assert await index.resolve("ZZZZ2345", repo) == "b9"
+
+
+async def test_events_update_database_hits():
+    repo = FakeBusinessRepository({"ABCD2345": "b1"})
+    index = AccessCodeIndex(negative_ttl=60, negative_max_size=10)
+    await index.resolve("ABCD2345", repo)
+
+    index.apply_event({"business_id": "b1", "old": "ABCD2345", "new": "EFGH2345"})
+    del repo.codes["ABCD2345"]
+    assert await index.resolve("ABCD2345", repo) is None
+    assert await index.resolve("EFGH2345", repo) == "b1"
+    assert repo.queries == ["ABCD2345", "ABCD2345"]
+
+
+async def test_authoritative_index_does_not_query(monkeypatch):
+    repo = FakeBusinessRepository({"ABCD2345": "b1"})
+    monkeypatch.setattr(access_codes, "get_business_repository", lambda: repo)
+    index = AccessCodeIndex(negative_ttl=60, negative_max_size=10)
+    await index.connected()  # recarga el índice completo
+
+    assert index.authoritative
+    assert await index.resolve("ABCD2345", repo) == "b1"
+    assert await index.resolve("ZZZZ2345", repo) is None
+    assert repo.queries == []
@@ -0,0 +1,318 @@
+"""
+Tests de la cache de disponibilidad (src/services/availability_cache.py)
+Cada escenario se compara con compute_availability sobre un snapshot con los
+mismos intervalos ocupados: la cache tiene que dar los mismos turnos.
+"""
+import asyncio
+import json
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from src.database.notifications import PostgresListener
+from src.services.availability import AvailabilitySnapshot, compute_availability, snapshot_range
+from src.services.availability_cache import CHANNEL, AvailabilityCache, slots_by_employee
+from src.tests.postgres import asyncpg, create_database, drop_database, requires_postgres
+
+BUSINESS = "b1"
+SERVICE = "s1"
+EMPLOYEES = ("e1", "e2")
+TZ = "America/Argentina/Buenos_Aires"  # UTC-3
+DAYS = [date(2030, 1, 7), date(2030, 1, 8), date(2030, 1, 9)]
+NOW = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+def at(day: int, hour: int, minute: int = 0) -> datetime:
+    """Hora local de Buenos Aires del día DAYS[day] como datetime UTC"""
+    return datetime(2030, 1, 7 + day, hour, minute, tzinfo=timezone.utc) + timedelta(hours=3)
+
+
+def snapshot_data(busy: dict) -> dict:
+    """Fila de availability_snapshot; `busy` = {id: (empleado, inicio, fin)}"""
+    return {
+        "business": {"id": BUSINESS, "timezone": TZ},
+        "service": {"id": SERVICE, "duration_minutes": 60},
+        # Abierto todo el día para que haya turnos que crucen la medianoche
+        "business_hours": [
+            {"day_of_week": d, "open_time": "00:00:00", "close_time": "23:59:00", "is_closed": False}
+            for d in range(7)
+        ],
+        "employees": [{"id": e, "name": e, "hours": []} for e in EMPLOYEES],
+        "busy": [[e, start.isoformat(), end.isoformat(), item] for item, (e, start, end) in busy.items()],
+    }
+
+
+def event(item: str, old=None, new=None, business: str = BUSINESS) -> dict:
+    def interval(value):
+        if value is None:
+            return None
+        employee, start, end = value
+        return {"employee_id": employee, "start": start.timestamp(), "end": end.timestamp()}
+    return {"business_id": business, "id": item, "old": interval(old), "new": interval(new), "ts": time.time()}
+
+
+def expected(busy: dict) -> dict:
+    snapshot = AvailabilitySnapshot.from_rpc(snapshot_data(busy))
+    return compute_availability(snapshot, DAYS[0], DAYS[-1], 30, now=NOW)
+
+
+def cached_slots(cache: AvailabilityCache) -> dict:
+    hit = cache.lookup(BUSINESS, SERVICE, DAYS)
+    assert hit is not None
+    return slots_by_employee(*hit, step_minutes=30, now=NOW)
+
+
+def store(cache: AvailabilityCache, busy: dict, since=None) -> None:
+    data = snapshot_data(busy)
+    since = cache.sequence if since is None else since
+    cache.store(AvailabilitySnapshot.from_rpc(data), data, SERVICE, DAYS, since)
+
+
+@pytest.fixture
+def cache():
+    cache = AvailabilityCache(ttl=60, max_entries=1000)
+    cache.connected()
+    return cache
+
+
+def test_store_matches_snapshot(cache):
+    busy = {"a1": ("e1", at(0, 10), at(0, 11)), "k1": ("e2", at(1, 12), at(1, 15))}
+    store(cache, busy)
+    assert cached_slots(cache) == expected(busy)
+
+
+def test_create_move_and_cancel(cache):
+    busy = {"a1": ("e1", at(0, 10), at(0, 11))}
+    store(cache, busy)
+
+    # Crear
+    busy["a2"] = ("e1", at(0, 14), at(0, 15))
+    cache.apply_event(event("a2", new=busy["a2"]))
+    assert cached_slots(cache) == expected(busy)
+
+    # Mover a otro empleado y otra hora
+    old, busy["a2"] = busy["a2"], ("e2", at(0, 16), at(0, 17))
+    cache.apply_event(event("a2", old=old, new=busy["a2"]))
+    assert cached_slots(cache) == expected(busy)
+
+    # Cancelar
+    old = busy.pop("a1")
+    cache.apply_event(event("a1", old=old))
+    assert cached_slots(cache) == expected(busy)
+
+
+def test_move_across_day_boundary(cache):
+    busy = {"a1": ("e1", at(0, 10), at(0, 11))}
+    store(cache, busy)
+
+    # Al día siguiente
+    old, busy["a1"] = busy["a1"], ("e1", at(1, 9), at(1, 10))
+    cache.apply_event(event("a1", old=old, new=busy["a1"]))
+    assert cached_slots(cache) == expected(busy)
+
+    # Cruzando la medianoche local: ocupa el final de un día y el principio del otro
+    old, busy["a1"] = busy["a1"], ("e1", at(1, 23, 30), at(2, 0, 30))
+    cache.apply_event(event("a1", old=old, new=busy["a1"]))
+    assert cached_slots(cache) == expected(busy)
+
+    old = busy.pop("a1")
+    cache.apply_event(event("a1", old=old))
+    assert cached_slots(cache) == expected(busy)
+
+
+def test_events_are_idempotent(cache):
+    busy = {}
+    store(cache, busy)
+    busy["a1"] = ("e1", at(0, 10), at(0, 11))
+    for _ in range(2):
+        cache.apply_event(event("a1", new=busy["a1"]))
+    assert cached_slots(cache) == expected(busy)
+
+
+def test_reset_invalidates_business(cache):
+    store(cache, {})
+    cache.apply_event({"business_id": "other", "reset": True, "ts": time.time()})
+    assert cache.lookup(BUSINESS, SERVICE, DAYS) is not None
+    cache.apply_event({"business_id": BUSINESS, "reset": True, "ts": time.time()})
+    assert cache.lookup(BUSINESS, SERVICE, DAYS) is None
+
+
+def test_store_replays_events_during_load(cache):
+    loaded = {"a1": ("e1", at(0, 10), at(0, 11))}
+    since = cache.sequence
+    # Mientras la consulta viaja se crea un turno y se cancela el que leyó
+    cache.apply_event(event("a2", new=("e2", at(2, 9), at(2, 12))))
+    cache.apply_event(event("a1", old=loaded["a1"]))
+    store(cache, loaded, since=since)
+
+    assert cached_slots(cache) == expected({"a2": ("e2", at(2, 9), at(2, 12))})
+
+
+def test_store_skipped_when_event_log_overflows():
+    cache = AvailabilityCache(ttl=60, max_entries=1000, event_log_size=2)
+    cache.connected()
+    since = cache.sequence
+    for i in range(3):
+        cache.apply_event(event(f"x{i}", new=("e1", at(0, 10 + i), at(0, 11 + i))))
+    # Se perdió el primer evento posterior a `since`: la carga no se guarda
+    store(cache, {}, since=since)
+    assert cache.lookup(BUSINESS, SERVICE, DAYS) is None
+
+    # Una carga posterior a los eventos sí
+    store(cache, {})
+    assert cache.lookup(BUSINESS, SERVICE, DAYS) is not None
+
+
+def test_store_skipped_when_cleared_during_load(cache):
+    since = cache.sequence
+    cache.connected()  # reconexión mientras se cargaba
+    store(cache, {}, since=since)
+    assert cache.lookup(BUSINESS, SERVICE, DAYS) is None
+
+
+def test_disconnected_bypasses_and_clears(cache):
+    store(cache, {})
+    cache.disconnected()
+    assert cache.lookup(BUSINESS, SERVICE, DAYS) is None
+    assert cache.bypassed == 1
+    # Sin conexión tampoco se guarda
+    store(cache, {})
+    assert len(cache) == 0
+
+    cache.connected()
+    assert cache.lookup(BUSINESS, SERVICE, DAYS) is None
+    store(cache, {})
+    assert cache.lookup(BUSINESS, SERVICE, DAYS) is not None
+
+
+def test_new_cache_is_bypassed_until_connected():
+    cache = AvailabilityCache(ttl=60, max_entries=1000)
+    store(cache, {})
+    assert cache.lookup(BUSINESS, SERVICE, DAYS) is None
+    assert cache.stats()["enabled"] is False
+
+
+def test_ttl_expiry(cache, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    store(cache, {})
+
+    clock[0] += 59
+    assert cache.lookup(BUSINESS, SERVICE, DAYS) is not None
+    clock[0] += 2
+    assert cache.lookup(BUSINESS, SERVICE, DAYS) is None
+
+
+def test_max_entries_evicts_oldest():
+    cache = AvailabilityCache(ttl=60, max_entries=len(EMPLOYEES) * len(DAYS))
+    cache.connected()
+    store(cache, {})
+    other = snapshot_data({})
+    other["business"]["id"] = "b2"
+    cache.store(AvailabilitySnapshot.from_rpc(other), other, SERVICE, DAYS, cache.sequence)
+
+    assert len(cache) == len(EMPLOYEES) * len(DAYS)
+    assert cache.lookup(BUSINESS, SERVICE, DAYS) is None
+    assert cache.lookup("b2", SERVICE, DAYS) is not None
+
+
+# --- Triggers reales: NOTIFY de Postgres -> PostgresListener -> cache ---
+
+PG_SCHEMAS = ("tables_schema.sql", "user_profiles_schema.sql", "availability_schema.sql",
+              "availability_events_schema.sql")
+SNAPSHOT = "SELECT row_to_json(s) FROM availability_snapshot($1, $2, $3, $4) s"
+
+
+async def load(conn, cache: AvailabilityCache, business: str, service: str) -> dict:
+    """Lo que hace el endpoint en un miss: leer el snapshot y guardarlo; devuelve los datos"""
+    since = cache.sequence
+    data = json.loads(await conn.fetchval(SNAPSHOT, uuid.UUID(business), uuid.UUID(service),
+                                          *snapshot_range(DAYS[0], DAYS[-1])))
+    cache.store(AvailabilitySnapshot.from_rpc(data), data, service, DAYS, since)
+    return data
+
+
+async def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "no llegó el evento"
+        await asyncio.sleep(0.01)
+
+
+@requires_postgres
+@pytest.mark.asyncio
+async def test_notify_keeps_cache_in_sync():
+    url = await create_database(*PG_SCHEMAS)
+    cache = AvailabilityCache(ttl=60, max_entries=1000)
+    listener = PostgresListener(dsn=url, reconnect_delay=0.1)
+    listener.subscribe(CHANNEL, cache.apply_event, on_connect=cache.connected, on_disconnect=cache.disconnected)
+    conn = await asyncpg.connect(url)
+    try:
+        business = await conn.fetchval(
+            "INSERT INTO businesses (name, address, timezone) VALUES ('Cache', 'Test', $1) RETURNING id", TZ
+        )
+        await conn.executemany(
+            "INSERT INTO business_hours (business_id, day_of_week, open_time, close_time) "
+            "VALUES ($1, $2, '00:00', '23:59')",
+            [(business, day) for day in range(7)],
+        )
+        service = await conn.fetchval(
+            "INSERT INTO services (business_id, name, price, duration_minutes) "
+            "VALUES ($1, 'Corte', 1000, 60) RETURNING id",
+            business,
+        )
+        employee = await conn.fetchval(
+            "INSERT INTO employees (business_id, name) VALUES ($1, 'Empleado') RETURNING id", business
+        )
+        business, service = str(business), str(service)
+
+        listener.start()
+        await wait_for(lambda: cache.enabled)
+        await load(conn, cache, business, service)
+
+        async def check(change: str, *args):
+            events = cache.events
+            result = await conn.fetchval(change, *args)
+            await wait_for(lambda: cache.events > events)
+            hit = cache.lookup(business, service, DAYS)
+            assert hit is not None
+            fresh = AvailabilitySnapshot.from_rpc(json.loads(await conn.fetchval(
+                SNAPSHOT, uuid.UUID(business), uuid.UUID(service), *snapshot_range(DAYS[0], DAYS[-1])
+            )))
+            assert slots_by_employee(*hit, step_minutes=30, now=NOW) == compute_availability(
+                fresh, DAYS[0], DAYS[-1], 30, now=NOW
+            )
+            return result
+
+        appointment = await check(
+            "INSERT INTO appointments (business_id, customer_id, employee_id, service_id, start_datetime, "
+            "end_datetime) VALUES ($1, $2, $3, $4, $5, $6) RETURNING id",
+            uuid.UUID(business), uuid.uuid4(), employee, uuid.UUID(service), at(0, 10), at(0, 11),
+        )
+        # Mover a la medianoche local del día siguiente
+        await check(
+            "UPDATE appointments SET start_datetime = $2, end_datetime = $3 WHERE id = $1",
+            appointment, at(1, 23, 30), at(2, 0, 30),
+        )
+        await check("UPDATE appointments SET status = 'cancelled' WHERE id = $1", appointment)
+
+        # Cambiar horarios descarta lo cacheado del negocio
+        events = cache.events
+        await conn.execute("UPDATE business_hours SET close_time = '20:00' WHERE business_id = $1",
+                           uuid.UUID(business))
+        await wait_for(lambda: cache.events > events)
+        assert cache.lookup(business, service, DAYS) is None
+
+        # Perder la conexión LISTEN desactiva la cache hasta reconectar
+        await load(conn, cache, business, service)
+        await conn.execute("SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                           "WHERE query LIKE 'LISTEN%' AND pid <> pg_backend_pid()")
+        await wait_for(lambda: not cache.enabled)
+        assert cache.lookup(business, service, DAYS) is None
+        await wait_for(lambda: cache.enabled)
+    finally:
+        await listener.stop()
+        await conn.close()
+        await drop_database(url)
@@ -0,0 +1,117 @@
+"""
+Reservas simultáneas contra Postgres: el EXCLUDE de appointments (btree_gist)
+y book_appointment deciden un único ganador por horario
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+
+from src.tests.postgres import asyncpg, create_database, drop_database, requires_postgres
+
+pytestmark = [requires_postgres, pytest.mark.asyncio]
+
+SCHEMAS = ("tables_schema.sql", "user_profiles_schema.sql", "availability_schema.sql", "booking_schema.sql")
+BOOK = "SELECT id FROM book_appointment($1, $2, $3, $4, $5)"
+DURATION_MINUTES = 60
+# Lunes 10:00 en Buenos Aires (zona por defecto de businesses)
+START = datetime(2030, 1, 7, 13, 0, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def pool():
+    url = await create_database(*SCHEMAS)
+    pool = await asyncpg.create_pool(url, min_size=20, max_size=20)
+    try:
+        yield pool
+    finally:
+        await pool.close()
+        await drop_database(url)
+
+
+async def seed(pool, customers: int) -> dict:
+    """Negocio abierto todo el día, un servicio de una hora, un empleado y `customers` clientes"""
+    async with pool.acquire() as conn:
+        business_id = await conn.fetchval(
+            "INSERT INTO businesses (name, address) VALUES ('Concurrencia', 'Test') RETURNING id"
+        )
+        await conn.executemany(
+            "INSERT INTO business_hours (business_id, day_of_week, open_time, close_time) "
+            "VALUES ($1, $2, '00:00', '23:59')",
+            [(business_id, day) for day in range(7)],
+        )
+        service_id = await conn.fetchval(
+            "INSERT INTO services (business_id, name, price, duration_minutes) VALUES ($1, 'Corte', 1000, $2) "
+            "RETURNING id",
+            business_id, DURATION_MINUTES,
+        )
+        employee_id = await conn.fetchval(
+            "INSERT INTO employees (business_id, name) VALUES ($1, 'Empleado') RETURNING id", business_id
+        )
+        customer_ids = [uuid.uuid4() for _ in range(customers)]
+        await conn.executemany(
+            "INSERT INTO customer_businesses (customer_id, business_id, customer_name) VALUES ($1, $2, 'Cliente')",
+            [(c, business_id) for c in customer_ids],
+        )
+    return {"business": business_id, "service": service_id, "employee": employee_id, "customers": customer_ids}
+
+
+async def book_all(pool, data: dict, starts: list) -> list:
+    """Todas las reservas a la vez (cada una en su conexión); el resultado o la excepción de cada una"""
+    gate = asyncio.Event()
+
+    async def book(customer_id, start):
+        async with pool.acquire() as conn:
+            await gate.wait()
+            return await conn.fetchval(BOOK, data["business"], customer_id, data["employee"], data["service"], start)
+
+    tasks = [asyncio.create_task(book(c, s)) for c, s in zip(data["customers"], starts)]
+    await asyncio.sleep(0.2)  # que las tareas tomen conexión y esperen juntas
+    gate.set()
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def test_same_slot_has_one_winner(pool):
+    data = await seed(pool, 40)
+    results = await book_all(pool, data, [START] * 40)
+
+    winners = [r for r in results if not isinstance(r, BaseException)]
+    losers = [r for r in results if isinstance(r, BaseException)]
+    assert len(winners) == 1
+    assert len(losers) == 39
+    assert {getattr(e, "sqlstate", repr(e)) for e in losers} == {"23P01"}
+
+    async with pool.acquire() as conn:
+        assert await conn.fetchval("SELECT count(*) FROM appointments") == 1
+
+
+async def test_overlapping_slots_never_overlap(pool):
+    data = await seed(pool, 40)
+    # Inicios cada 15 minutos en una ventana de 3 horas: se pisan parcialmente
+    starts = [START + timedelta(minutes=15 * (i % 12)) for i in range(40)]
+    results = await book_all(pool, data, starts)
+
+    errors = [r for r in results if isinstance(r, BaseException)]
+    # Sin deadlocks (40P01): todo rechazo es un conflicto de horario
+    assert {getattr(e, "sqlstate", repr(e)) for e in errors} <= {"23P01"}
+    async with pool.acquire() as conn:
+        overlaps = await conn.fetchval("""
+            SELECT count(*) FROM appointments a
+            JOIN appointments b ON a.employee_id = b.employee_id AND a.id < b.id
+            WHERE tstzrange(a.start_datetime, a.end_datetime) && tstzrange(b.start_datetime, b.end_datetime)
+        """)
+        booked = await conn.fetchval("SELECT count(*) FROM appointments")
+    assert overlaps == 0
+    # Con turnos de una hora en tres horas de inicios entran al menos dos
+    assert booked == len(results) - len(errors) >= 2
+
+
+async def test_cancelled_slot_can_be_booked_again(pool):
+    data = await seed(pool, 2)
+    first = await book_all(pool, {**data, "customers": data["customers"][:1]}, [START])
+    async with pool.acquire() as conn:
+        await conn.execute("UPDATE appointments SET status = 'cancelled' WHERE id = $1", first[0])
+    second = await book_all(pool, {**data, "customers": data["customers"][1:]}, [START])
+    assert not isinstance(second[0], BaseException)
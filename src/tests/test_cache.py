@@ -0,0 +1,158 @@
+"""
+Tests de Cache (src/core/cache.py) en memoria y sobre un Redis falso con TTL
+"""
+import fnmatch
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import pytest
+
+from src.core import cache as cache_module
+from src.core.cache import Cache, MemoryCacheBackend, RedisCacheBackend
+from src.core.config import get_settings
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeRedis:
+    """Lo que usa RedisCacheBackend de redis.asyncio: get, set(px), delete y scan_iter"""
+
+    def __init__(self):
+        self.data: Dict[str, Tuple[float, str]] = {}
+
+    def _alive(self, key: str) -> Optional[str]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._alive(key)
+
+    async def set(self, key: str, value: str, px: int) -> None:
+        assert isinstance(value, str) and isinstance(px, int) and px > 0
+        self.data[key] = (time.monotonic() + px / 1000, value)
+
+    async def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+    async def scan_iter(self, match: str):
+        for key in [k for k in self.data if fnmatch.fnmatchcase(k, match)]:
+            yield key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(cache_module, "_redis", fake)
+    return fake
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request, monkeypatch):
+    """Backend configurado en CACHE_BACKEND; las caches lo crean en el primer uso"""
+    monkeypatch.setenv("CACHE_BACKEND", request.param)
+    if request.param == "redis":
+        request.getfixturevalue("redis")
+    get_settings.cache_clear()
+    return request.param
+
+
+async def test_default_ttl_and_max_size_from_settings(backend, monkeypatch):
+    monkeypatch.setenv("CACHE_TTL", "42")
+    monkeypatch.setenv("CACHE_MAX_SIZE", "7")
+    get_settings.cache_clear()
+
+    cache = Cache("defaults")
+    assert cache.ttl == 42
+    assert cache.max_size == 7
+    await cache.set("k", {"v": 1})
+    assert await cache.get("k") == {"v": 1}
+    assert Cache("explicit", ttl=5, max_size=3).ttl == 5
+
+
+async def test_ttl_expiry(backend, clock):
+    cache = Cache("ttl", ttl=10)
+    await cache.set("short", 1, ttl=1)
+    await cache.set("long", 2)
+
+    clock[0] += 5
+    assert await cache.get("short") is None
+    assert await cache.get("long") == 2
+    clock[0] += 6
+    assert await cache.get("long") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+async def test_get_or_load_does_not_cache_none(backend):
+    cache = Cache("loader", ttl=60)
+    calls = []
+
+    async def missing():
+        calls.append("missing")
+        return None
+
+    async def found():
+        calls.append("found")
+        return {"role": "customer"}
+
+    assert await cache.get_or_load("k", missing) is None
+    assert await cache.get_or_load("k", missing) is None
+    assert await cache.get_or_load("k", found) == {"role": "customer"}
+    assert await cache.get_or_load("k", found) == {"role": "customer"}
+    assert calls == ["missing", "missing", "found"]
+
+
+async def test_clear_only_affects_its_namespace(backend):
+    profiles = Cache("profiles", ttl=60)
+    catalog = Cache("catalog", ttl=60)
+    await profiles.set("k", 1)
+    await catalog.set("k", 2)
+
+    await profiles.clear()
+    assert await profiles.get("k") is None
+    assert await catalog.get("k") == 2
+
+
+async def test_memory_lru_eviction():
+    backend = MemoryCacheBackend(max_size=2)
+    cache = Cache("lru", ttl=60, backend=backend)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    assert await cache.get("a") == 1  # "b" queda como el menos usado
+    await cache.set("c", 3)
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == 1
+    assert await cache.get("c") == 3
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 1
+
+
+async def test_redis_keys_are_namespaced_json(redis):
+    await Cache("profiles", ttl=1.5, backend=RedisCacheBackend("profiles")).set("u1", {"role": "owner"})
+    assert list(redis.data) == ["iris:profiles:u1"]
+    assert json.loads(redis.data["iris:profiles:u1"][1]) == {"role": "owner"}
+
+
+async def test_redis_clear_does_not_match_prefixed_namespaces(redis):
+    short = Cache("a", ttl=60, backend=RedisCacheBackend("a"))
+    longer = Cache("ab", ttl=60, backend=RedisCacheBackend("ab"))
+    await short.set("k", 1)
+    await longer.set("k", 2)
+
+    await short.clear()
+    assert await longer.get("k") == 2
@@ -0,0 +1,51 @@
+"""
+Tests del envío de emails (src/services/emails.py) contra el SMTP sink local
+"""
+import pytest
+import pytest_asyncio
+
+from src.services import emails
+from src.services.emails import EmailSender, send_welcome_email
+from src.utils.smtp_sink import SMTPSink
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def sink():
+    async with SMTPSink(port=0) as sink:
+        yield sink
+
+
+def sender_for(sink: SMTPSink) -> EmailSender:
+    return EmailSender(host=sink.host, port=sink.port, starttls=False)
+
+
+async def test_send_delivers_message(sink):
+    await sender_for(sink).send("cliente@example.com", "Turno confirmado", "Tu turno quedó reservado.\n.Fin")
+
+    message = (await sink.wait_for(1))[0]
+    assert message["To"] == "cliente@example.com"
+    assert message["From"] == "IRIS <no-reply@iris-app.com>"
+    assert message["Subject"] == "Turno confirmado"
+    assert message["X-Sink-Rcpt-To"] == "cliente@example.com"
+    # La línea que empieza con "." llega sin el punto duplicado del protocolo
+    assert message.get_content().splitlines() == ["Tu turno quedó reservado.", ".Fin"]
+
+
+async def test_send_without_host_only_logs(sink, caplog):
+    caplog.set_level("INFO", logger="src.services.emails")
+    await EmailSender().send("cliente@example.com", "Bienvenido a IRIS", "Hola")
+
+    assert sink.messages == []
+    assert "Email no enviado (sin SMTP_HOST): Bienvenido a IRIS" in caplog.text
+
+
+async def test_welcome_email_handler(sink, monkeypatch):
+    monkeypatch.setattr(emails, "email_sender", sender_for(sink))
+    await send_welcome_email({"email": "owner@example.com", "role": "owner"})
+
+    message = (await sink.wait_for(1))[0]
+    assert message["Subject"] == "Bienvenido a IRIS"
+    assert message["To"] == "owner@example.com"
+    assert emails.WELCOME_MESSAGES["owner"] in message.get_content()
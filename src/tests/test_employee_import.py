@@ -0,0 +1,117 @@
+"""
+Tests de la importación masiva de empleados (src/services/employee_import.py)
+"""
+import io
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.employee_import import ImportFormatError, _parse_file, import_employees
+
+
+class FakeAuthRepository:
+    def __init__(self):
+        self.created = []
+        self.deleted = []
+
+    async def create_user(self, email, password):
+        if email.startswith("taken"):
+            raise Exception('duplicate key value violates unique constraint "users_email_key"')
+        user = SimpleNamespace(id=str(uuid.uuid4()), email=email)
+        self.created.append(user)
+        return user
+
+    async def delete_user(self, user_id):
+        self.deleted.append(user_id)
+
+
+class FakeProfileRepository:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.inserted = []
+
+    async def create_many(self, profiles):
+        if self.fail:
+            raise Exception("connection reset by peer (postgres 10.0.0.5)")
+        self.inserted.extend(profiles)
+        return profiles
+
+
+def parse(data: bytes, fmt: str, max_rows: int = 10):
+    return _parse_file(io.BytesIO(data), fmt, max_rows)
+
+
+def test_ndjson_bad_types_are_row_errors():
+    rows = parse(
+        b'{"email": 5, "password": "Secret-123", "first_name": "A"}\n'
+        b'{"email": "b@example.com", "password": 123, "first_name": "B"}\n'
+        b'["c@example.com"]\n'
+        b'not json\n'
+        b'{"email": "d@example.com", "password": "Secret-123", "first_name": "D"}\n',
+        "ndjson",
+    )
+    assert [r.row for r in rows] == [1, 2, 3, 4, 5]
+    assert rows[0].email == "5" and rows[0].employee is None and "email" in rows[0].error
+    assert rows[1].employee is None and "password" in rows[1].error
+    assert rows[2].email is None and rows[2].error
+    assert rows[3].error.startswith("JSON inválido")
+    assert rows[4].employee is not None and rows[4].error is None
+
+
+def test_csv_missing_columns_are_row_errors():
+    rows = parse(
+        b"email,password,first_name\n"
+        b"a@example.com,Secret-123\n"
+        b"b@example.com,Secret-123,Bea,extra\n"
+        b"not-an-email,Secret-123,C\n",
+        "csv",
+    )
+    assert "first_name" in rows[0].error
+    assert rows[1].employee.first_name == "Bea"
+    assert rows[2].email == "not-an-email" and "email" in rows[2].error
+
+
+def test_csv_without_email_header():
+    with pytest.raises(ImportFormatError):
+        parse(b"name,password\nA,Secret-123\n", "csv")
+
+
+@pytest.mark.parametrize("fmt, data", [
+    ("csv", b"email,password,first_name\n" + b"a@example.com,Secret-123,A\n" * 4),
+    ("ndjson", b'{"email": "a@example.com", "password": "Secret-123", "first_name": "A"}\n' * 4),
+])
+def test_max_rows(fmt, data):
+    assert len(parse(data, fmt, max_rows=4)) == 4
+    with pytest.raises(ImportFormatError):
+        parse(data, fmt, max_rows=3)
+
+
+@pytest.mark.asyncio
+async def test_import_reports_invalid_rows_without_failing():
+    rows = parse(
+        b'{"email": 5, "password": "Secret-123", "first_name": "A"}\n'
+        b'{"email": "b@example.com", "password": "Secret-123", "first_name": "B"}\n'
+        b'{"email": "B@example.com", "password": "Secret-123", "first_name": "B"}\n'
+        b'{"email": "taken@example.com", "password": "Secret-123", "first_name": "C"}\n',
+        "ndjson",
+    )
+    auth, profiles = FakeAuthRepository(), FakeProfileRepository()
+    results = await import_employees(rows, "business-1", auth, profiles, concurrency=2)
+
+    assert [r.status for r in results] == ["failed", "created", "failed", "failed"]
+    assert results[0].email == "5"
+    assert results[2].error == "Email duplicado en el lote."
+    assert results[3].error == "El email ya está registrado."
+    assert [p["first_name"] for p in profiles.inserted] == ["B"]
+
+
+@pytest.mark.asyncio
+async def test_profile_failure_rolls_back_without_leaking_details():
+    rows = parse(b'{"email": "a@example.com", "password": "Secret-123", "first_name": "A"}\n', "ndjson")
+    auth, profiles = FakeAuthRepository(), FakeProfileRepository(fail=True)
+    results = await import_employees(rows, "business-1", auth, profiles, concurrency=2)
+
+    assert auth.deleted == [auth.created[0].id]
+    assert results[0].status == "failed"
+    assert "postgres" not in results[0].error
@@ -0,0 +1,255 @@
+"""
+Tests de la cola de trabajos (src/services/jobs.py) sobre un JobRepository en memoria
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.services.jobs import JobQueue, PermanentJobError
+
+pytestmark = pytest.mark.asyncio
+
+
+class InMemoryJobRepository:
+    """Mismo contrato que JobRepository y que la función claim_jobs de jobs_schema.sql"""
+
+    def __init__(self):
+        self.jobs: Dict[int, Dict[str, Any]] = {}
+        self.claims = 0
+
+    async def enqueue(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = job.get("dedupe_key")
+        if key and any(j.get("dedupe_key") == key for j in self.jobs.values()):
+            return None
+        row = {
+            "id": len(self.jobs) + 1,
+            "kind": job["kind"],
+            "payload": job["payload"],
+            "status": "pending",
+            "attempts": 0,
+            "max_attempts": job.get("max_attempts", 5),
+            "run_at": job.get("run_at") or datetime.now(timezone.utc).isoformat(),
+            "locked_until": None,
+            "dedupe_key": key,
+            "last_error": None,
+        }
+        self.jobs[row["id"]] = row
+        return dict(row)
+
+    async def claim(self, limit: int, lease_seconds: int) -> List[Dict[str, Any]]:
+        self.claims += 1
+        now = datetime.now(timezone.utc)
+        due = sorted(
+            (
+                j for j in self.jobs.values()
+                if (j["status"] == "pending" and datetime.fromisoformat(j["run_at"]) <= now)
+                or (j["status"] == "running" and datetime.fromisoformat(j["locked_until"]) < now)
+            ),
+            key=lambda j: j["run_at"],
+        )[:limit]
+        for job in due:
+            job.update(
+                status="running",
+                attempts=job["attempts"] + 1,
+                locked_until=(now + timedelta(seconds=lease_seconds)).isoformat(),
+            )
+        return [dict(j) for j in due]
+
+    async def update_claimed(self, job: Dict[str, Any], values: Dict[str, Any]) -> None:
+        row = self.jobs[job["id"]]
+        if row["attempts"] == job["attempts"] and row["status"] == "running":
+            row.update(values)
+
+    async def purge(self, before: datetime) -> None:
+        pass
+
+
+@pytest.fixture
+def repository():
+    return InMemoryJobRepository()
+
+
+@pytest.fixture
+def queue(repository):
+    queue = JobQueue(lambda: repository, concurrency=4, poll_interval=0.01, shutdown_timeout=0.1)
+    # Reintentos inmediatos
+    queue.retry_base = 0.001
+    queue.retry_max = 0.001
+    return queue
+
+
+async def wait_until(predicate, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timeout esperando la condición"
+        await asyncio.sleep(0.005)
+
+
+async def test_job_done(queue, repository):
+    received = []
+
+    @queue.handler("welcome_email")
+    async def handler(payload):
+        received.append(payload)
+
+    queue.start()
+    try:
+        await queue.enqueue("welcome_email", {"email": "a@example.com"})
+        await wait_until(lambda: repository.jobs[1]["status"] == "done")
+    finally:
+        await queue.stop()
+
+    assert received == [{"email": "a@example.com"}]
+    assert repository.jobs[1]["attempts"] == 1
+    assert repository.jobs[1]["locked_until"] is None
+    assert queue.counts == {"done": 1}
+
+
+async def test_retry_then_failed_after_max_attempts(queue, repository):
+    calls = []
+
+    @queue.handler("flaky")
+    async def handler(payload):
+        calls.append(payload)
+        raise RuntimeError("SMTP caído")
+
+    await repository.enqueue({"kind": "flaky", "payload": {}, "max_attempts": 3})
+    queue.start()
+    try:
+        await wait_until(lambda: repository.jobs[1]["status"] == "failed")
+    finally:
+        await queue.stop()
+
+    job = repository.jobs[1]
+    assert len(calls) == 3
+    assert job["attempts"] == 3
+    assert job["last_error"] == "RuntimeError: SMTP caído"
+    assert queue.counts == {"retry": 2, "failed": 1}
+
+
+async def test_retry_is_scheduled_with_backoff(queue, repository):
+    @queue.handler("flaky")
+    async def handler(payload):
+        raise RuntimeError("timeout")
+
+    queue.retry_base = 60
+    queue.retry_max = 3600
+    await repository.enqueue({"kind": "flaky", "payload": {}})
+    queue.start()
+    try:
+        await wait_until(lambda: queue.counts.get("retry") == 1)
+    finally:
+        await queue.stop()
+
+    job = repository.jobs[1]
+    delay = datetime.fromisoformat(job["run_at"]) - datetime.now(timezone.utc)
+    assert job["status"] == "pending"
+    assert timedelta(seconds=25) < delay <= timedelta(seconds=60)
+
+
+async def test_permanent_error_fails_without_retry(queue, repository):
+    @queue.handler("bad_address")
+    async def handler(payload):
+        raise PermanentJobError("Destinatario rechazado")
+
+    await repository.enqueue({"kind": "bad_address", "payload": {}, "max_attempts": 5})
+    queue.start()
+    try:
+        await wait_until(lambda: repository.jobs[1]["status"] == "failed")
+    finally:
+        await queue.stop()
+
+    assert repository.jobs[1]["attempts"] == 1
+    assert repository.jobs[1]["last_error"] == "PermanentJobError: Destinatario rechazado"
+
+
+async def test_unknown_kind_fails(queue, repository):
+    await repository.enqueue({"kind": "unknown", "payload": {}})
+    queue.start()
+    try:
+        await wait_until(lambda: repository.jobs[1]["status"] == "failed")
+    finally:
+        await queue.stop()
+
+    assert repository.jobs[1]["attempts"] == 1
+    assert "No hay handler para 'unknown'" in repository.jobs[1]["last_error"]
+
+
+async def test_stop_returns_in_flight_jobs_to_pending(queue, repository):
+    started = asyncio.Event()
+    cancelled = []
+
+    @queue.handler("slow")
+    async def handler(payload):
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(payload)
+            raise
+
+    await repository.enqueue({"kind": "slow", "payload": {"n": 1}})
+    queue.start()
+    await asyncio.wait_for(started.wait(), timeout=2)
+    await queue.stop()
+
+    job = repository.jobs[1]
+    assert cancelled == [{"n": 1}]
+    assert job["status"] == "pending"
+    assert job["locked_until"] is None
+    assert datetime.fromisoformat(job["run_at"]) <= datetime.now(timezone.utc)
+    assert queue.stats()["running"] == 0
+
+
+async def test_only_latest_claim_closes_job(queue, repository):
+    @queue.handler("noop")
+    async def handler(payload):
+        pass
+
+    await repository.enqueue({"kind": "noop", "payload": {}})
+    stale = (await repository.claim(1, 300))[0]
+    # El lease venció y otro worker lo volvió a reclamar
+    repository.jobs[1]["locked_until"] = datetime.now(timezone.utc).isoformat()
+    await repository.claim(1, 300)
+
+    await queue._execute(stale)
+    assert repository.jobs[1]["status"] == "running"
+    assert repository.jobs[1]["attempts"] == 2
+
+
+async def test_stop_waits_for_background_enqueues(queue, repository):
+    queue.enqueue_nowait("welcome_email", {"email": "a@example.com"}, dedupe_key="welcome:a")
+    queue.enqueue_nowait("welcome_email", {"email": "a@example.com"}, dedupe_key="welcome:a")
+    await queue.stop()
+
+    assert [j["dedupe_key"] for j in repository.jobs.values()] == ["welcome:a"]
+    assert queue.stats()["pending_enqueues"] == 0
+
+
+async def test_concurrency_is_bounded(queue, repository):
+    running = 0
+    peak = 0
+    release = asyncio.Event()
+
+    @queue.handler("work")
+    async def handler(payload):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await release.wait()
+        running -= 1
+
+    for i in range(10):
+        await repository.enqueue({"kind": "work", "payload": {"n": i}})
+    queue.start()
+    try:
+        await wait_until(lambda: running == 4)
+        await asyncio.sleep(0.05)
+        release.set()
+        await wait_until(lambda: all(j["status"] == "done" for j in repository.jobs.values()))
+    finally:
+        await queue.stop()
+
+    assert peak == 4
@@ -0,0 +1,35 @@
+"""
+Tests de la construcción de la aplicación (src/main.py)
+"""
+import os
+import subprocess
+import sys
+
+from src.core.config import get_settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_import_without_environment(tmp_path):
+    """Importar src.main no lee la configuración ni crea clientes"""
+    code = (
+        "import src.main\n"
+        "from src.core.config import get_settings\n"
+        "assert get_settings.cache_info().currsize == 0\n"
+        "assert 'app' not in vars(src.main)\n"
+    )
+    env = {"PATH": os.environ.get("PATH", ""), "PYTHONPATH": ROOT}
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_create_app(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "false")
+    get_settings.cache_clear()
+    from src.main import create_app
+
+    app = create_app()
+    paths = set(app.openapi()["paths"])
+    assert {"/", "/health", "/auth/register/owner", "/api/v1/promotions"} <= paths
+    # Cada llamada arma una app nueva con la configuración vigente
+    assert create_app() is not app
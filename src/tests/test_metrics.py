@@ -0,0 +1,38 @@
+"""
+Acceso a /metrics (src/api/routes/metrics.py): solo con el token del scraper
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.config import get_settings
+from src.tests.conftest import TEST_ENV
+
+
+def client(monkeypatch, **env) -> TestClient:
+    """Cliente sin lifespan: no hacen falta las tareas en segundo plano"""
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "false")
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    get_settings.cache_clear()
+    from src.main import create_app
+
+    return TestClient(create_app())
+
+
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer otro"}, {"Authorization": "Basic dGVzdA=="}])
+def test_metrics_requires_token(monkeypatch, headers):
+    response = client(monkeypatch).get("/metrics", headers=headers)
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_metrics_with_admin_secret(monkeypatch):
+    response = client(monkeypatch).get("/metrics", headers={"Authorization": f"Bearer {TEST_ENV['ADMIN_SECRET']}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+
+def test_metrics_token_replaces_admin_secret(monkeypatch):
+    c = client(monkeypatch, METRICS_TOKEN="scraper")
+    assert c.get("/metrics", headers={"Authorization": "Bearer scraper"}).status_code == 200
+    assert c.get("/metrics", headers={"Authorization": f"Bearer {TEST_ENV['ADMIN_SECRET']}"}).status_code == 401
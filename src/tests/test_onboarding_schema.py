@@ -0,0 +1,77 @@
+"""
+Validación del cuerpo de POST /onboarding/owner (src/schemas/onboarding.py)
+Lo que la base rechazaría (o redondearía) se responde con 422 antes de
+crear el usuario en Supabase Auth.
+"""
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from src.core.config import get_settings
+from src.schemas.onboarding import BusinessHoursSchema, OwnerOnboardingSchema, ServiceOnboardingSchema
+
+
+def payload(**overrides) -> dict:
+    return {
+        "email": "owner@example.com",
+        "password": "secreto123",
+        "business": {"name": "Salón", "address": "Calle 1"},
+        "hours": [
+            {"day_of_week": 1, "open_time": "09:00", "close_time": "18:00"},
+            {"day_of_week": 0, "is_closed": True},
+        ],
+        "services": [{"name": "Corte", "price": "99999999.99", "duration_minutes": 30}],
+        **overrides,
+    }
+
+
+def test_valid_payload():
+    data = OwnerOnboardingSchema.model_validate(payload())
+    assert data.services[0].price == Decimal("99999999.99")
+
+
+def test_duplicate_day_of_week():
+    hours = [
+        {"day_of_week": 1, "open_time": "09:00", "close_time": "12:00"},
+        {"day_of_week": 1, "open_time": "14:00", "close_time": "18:00"},
+    ]
+    with pytest.raises(ValidationError, match="day_of_week"):
+        OwnerOnboardingSchema.model_validate(payload(hours=hours))
+
+
+@pytest.mark.parametrize("hours", [
+    {"day_of_week": 1},
+    {"day_of_week": 1, "open_time": "09:00"},
+    {"day_of_week": 1, "close_time": "18:00"},
+])
+def test_open_day_needs_hours(hours):
+    with pytest.raises(ValidationError, match="open_time y close_time"):
+        BusinessHoursSchema.model_validate(hours)
+
+
+@pytest.mark.parametrize("close_time", ["09:00", "08:00"])
+def test_close_time_after_open_time(close_time):
+    with pytest.raises(ValidationError, match="posterior"):
+        BusinessHoursSchema.model_validate({"day_of_week": 1, "open_time": "09:00", "close_time": close_time})
+
+
+def test_closed_day_needs_no_hours():
+    assert BusinessHoursSchema.model_validate({"day_of_week": 1, "is_closed": True}).open_time is None
+
+
+@pytest.mark.parametrize("price", ["100000000.00", "1e10", "10.005"])
+def test_price_fits_decimal_10_2(price):
+    with pytest.raises(ValidationError):
+        ServiceOnboardingSchema.model_validate({"name": "Corte", "price": price, "duration_minutes": 30})
+
+
+def test_endpoint_returns_422(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "false")
+    get_settings.cache_clear()
+    from src.main import create_app
+
+    hours = [{"day_of_week": 1, "open_time": "18:00", "close_time": "09:00"}]
+    response = TestClient(create_app()).post("/onboarding/owner", json=payload(hours=hours))
+    assert response.status_code == 422
@@ -0,0 +1,145 @@
+"""
+Tests de las promociones vigentes en memoria (src/services/promotions.py)
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import pytest
+
+from src.services.promotions import BusinessPromotions, PromotionIndex, micros
+
+T0 = datetime(2030, 1, 1, tzinfo=timezone.utc)
+US = timedelta(microseconds=1)
+
+
+def promotion(id: str, start: timedelta, end: timedelta, **extra) -> Dict[str, Any]:
+    return {
+        "id": id,
+        "title": id.upper(),
+        "valid_from": (T0 + start).isoformat(),
+        "valid_until": (T0 + end).isoformat(),
+        **extra,
+    }
+
+
+def ids(entry: BusinessPromotions, at: datetime) -> List[str]:
+    return [p["id"] for p in entry.active(micros(at))]
+
+
+def test_valid_until_is_inclusive():
+    entry = BusinessPromotions([promotion("a", timedelta(0), timedelta(hours=1))], loaded_at=0)
+
+    assert ids(entry, T0 - US) == []
+    assert ids(entry, T0) == ["a"]
+    assert ids(entry, T0 + timedelta(hours=1)) == ["a"]
+    assert ids(entry, T0 + timedelta(hours=1) + US) == []
+
+
+def test_active_ordered_by_valid_until():
+    entry = BusinessPromotions([
+        promotion("late", timedelta(0), timedelta(days=3)),
+        promotion("soon", timedelta(hours=1), timedelta(days=1)),
+        promotion("future", timedelta(days=5), timedelta(days=6)),
+        promotion("paused", timedelta(0), timedelta(days=9), status="inactive"),
+    ], loaded_at=0)
+
+    assert ids(entry, T0) == ["late"]
+    assert ids(entry, T0 + timedelta(hours=2)) == ["soon", "late"]
+    assert ids(entry, T0 + timedelta(days=2)) == ["late"]
+    assert ids(entry, T0 + timedelta(days=5)) == ["future"]
+    assert ids(entry, T0 + timedelta(days=7)) == []
+
+
+def test_clock_going_backwards():
+    entry = BusinessPromotions([
+        promotion("a", timedelta(0), timedelta(hours=1)),
+        promotion("b", timedelta(hours=2), timedelta(hours=3)),
+    ], loaded_at=0)
+
+    assert ids(entry, T0 + timedelta(hours=2, minutes=30)) == ["b"]
+    # Otro request con una hora anterior (relojes distintos, `now` explícito)
+    assert ids(entry, T0 + timedelta(minutes=30)) == ["a"]
+    assert ids(entry, T0 - timedelta(minutes=1)) == []
+    assert ids(entry, T0 + timedelta(hours=2, minutes=30)) == ["b"]
+
+
+def test_write_through_resorts():
+    entry = BusinessPromotions([
+        promotion("a", timedelta(0), timedelta(hours=5)),
+        promotion("b", timedelta(0), timedelta(hours=10)),
+    ], loaded_at=0)
+    now = T0 + timedelta(hours=1)
+    assert ids(entry, now) == ["a", "b"]
+
+    # b ahora vence antes que a
+    entry.put(promotion("b", timedelta(0), timedelta(hours=2)))
+    assert ids(entry, now) == ["b", "a"]
+    # c empieza antes de la posición ya recorrida
+    entry.put(promotion("c", -timedelta(hours=1), timedelta(hours=3)))
+    assert ids(entry, now) == ["b", "c", "a"]
+    # Pausar y eliminar quitan de las vigentes
+    entry.put(promotion("a", timedelta(0), timedelta(hours=5), status="inactive"))
+    entry.remove("c")
+    assert ids(entry, now) == ["b"]
+    assert ids(entry, T0 + timedelta(hours=2) + US) == []
+
+
+class FakePromotionRepository:
+    def __init__(self, rows: Dict[str, List[Dict[str, Any]]]):
+        self.rows = rows
+        self.loads = 0
+
+    async def list_current(self, business_id: str, now: datetime) -> List[Dict[str, Any]]:
+        self.loads += 1
+        return list(self.rows.get(business_id, []))
+
+
+@pytest.mark.asyncio
+async def test_own_events_are_ignored_and_others_invalidate():
+    repo = FakePromotionRepository({"b1": [promotion("a", timedelta(0), timedelta(days=1))]})
+    index = PromotionIndex(ttl=300, max_businesses=10)
+    now = T0 + timedelta(hours=1)
+    assert [p["id"] for p in await index.active("b1", repo, now)] == ["a"]
+
+    # Edición en este worker: write-through y luego su propio NOTIFY
+    updated_at = (T0 + timedelta(minutes=5)).isoformat()
+    edited = promotion("a", timedelta(0), timedelta(days=1), title="Nuevo", updated_at=updated_at)
+    index.put("b1", edited)
+    index.apply_event({"business_id": "b1", "id": "a", "updated_at": updated_at})
+    assert [p["title"] for p in await index.active("b1", repo, now)] == ["Nuevo"]
+    assert repo.loads == 1
+
+    # Eliminación propia: el evento llega sin updated_at
+    index.remove("b1", "a")
+    index.apply_event({"business_id": "b1", "id": "a", "updated_at": None})
+    assert await index.active("b1", repo, now) == ()
+    assert repo.loads == 1
+
+    # Cambio de otro worker (otra versión): se descarta el negocio y se recarga
+    repo.rows["b1"] = [promotion("z", timedelta(0), timedelta(days=1))]
+    index.apply_event({"business_id": "b1", "id": "z", "updated_at": (T0 + timedelta(minutes=9)).isoformat()})
+    assert [p["id"] for p in await index.active("b1", repo, now)] == ["z"]
+    assert repo.loads == 2
+
+
+@pytest.mark.asyncio
+async def test_event_during_load_discards_it():
+    gate = asyncio.Event()
+
+    class SlowRepository(FakePromotionRepository):
+        async def list_current(self, business_id, now):
+            rows = await super().list_current(business_id, now)
+            await gate.wait()
+            return rows
+
+    repo = SlowRepository({"b1": [promotion("a", timedelta(0), timedelta(days=1))]})
+    index = PromotionIndex(ttl=300, max_businesses=10)
+    load = asyncio.create_task(index.active("b1", repo, T0))
+    await asyncio.sleep(0)
+    # Otro worker cambió el negocio mientras se leía: la lectura puede ser vieja
+    index.apply_event({"business_id": "b1", "id": "a", "updated_at": T0.isoformat()})
+    gate.set()
+
+    assert [p["id"] for p in await load] == ["a"]  # el request que la pidió la usa igual
+    assert len(index) == 0
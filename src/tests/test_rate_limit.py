@@ -0,0 +1,144 @@
+"""
+Tests del token bucket en memoria (src/core/rate_limit.py) y del middleware por IP
+"""
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.middleware.rate_limit import RateLimitMiddleware
+from src.core.rate_limit import MemoryRateLimitBackend, RateLimitResult
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.mark.asyncio
+async def test_bucket_allows_burst_then_refills(clock):
+    backend = MemoryRateLimitBackend()
+    results = [await backend.hit("k", limit=3, window=60) for _ in range(4)]
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert [r.remaining for r in results] == [2, 1, 0, 0]
+
+    # Un token cada 20 s
+    clock[0] += 19.9
+    assert not (await backend.hit("k", 3, 60)).allowed
+    clock[0] += 0.2
+    assert (await backend.hit("k", 3, 60)).allowed
+    # Nunca más que la capacidad
+    clock[0] += 3600
+    assert (await backend.hit("k", 3, 60)).remaining == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_after_rounds_up(clock):
+    backend = MemoryRateLimitBackend()
+    await backend.hit("k", limit=2, window=3)
+    await backend.hit("k", limit=2, window=3)
+    rejected = await backend.hit("k", limit=2, window=3)
+
+    assert rejected.retry_after == pytest.approx(1.5)
+    assert rejected.headers()["Retry-After"] == "2"
+    assert rejected.headers()["X-RateLimit-Remaining"] == "0"
+    # Menos de un segundo de espera se anuncia como 1 (Retry-After es entero)
+    assert RateLimitResult(False, 10, 0, 0.01).headers()["Retry-After"] == "1"
+    assert "Retry-After" not in RateLimitResult(True, 10, 9, 0.0).headers()
+
+
+@pytest.mark.asyncio
+async def test_cost_greater_than_one(clock):
+    backend = MemoryRateLimitBackend()
+    assert (await backend.hit("k", limit=10, window=10, cost=4)).remaining == 6
+    assert (await backend.hit("k", limit=10, window=10, cost=4)).remaining == 2
+    rejected = await backend.hit("k", limit=10, window=10, cost=4)
+    assert not rejected.allowed
+    assert rejected.retry_after == pytest.approx(2.0)  # faltan 2 tokens a 1 por segundo
+    # El rechazo no consume tokens
+    assert (await backend.hit("k", limit=10, window=10, cost=2)).remaining == 0
+
+
+@pytest.mark.asyncio
+async def test_full_buckets_are_pruned(clock):
+    backend = MemoryRateLimitBackend(max_keys=3)
+    for key in ("a", "b", "c"):
+        await backend.hit(key, limit=5, window=10)
+    clock[0] += 5
+    await backend.hit("c", limit=5, window=10)  # sigue activo
+    clock[0] += 6  # a y b ya se rellenaron
+
+    await backend.hit("d", limit=5, window=10)
+    assert len(backend) == 2
+    assert set(backend._buckets) == {"c", "d"}
+
+
+@pytest.mark.asyncio
+async def test_prune_keeps_newest_when_all_active(clock):
+    backend = MemoryRateLimitBackend(max_keys=4)
+    for key in "abcd":
+        clock[0] += 1
+        await backend.hit(key, limit=5, window=60)
+    await backend.hit("e", limit=5, window=60)
+    assert set(backend._buckets) == {"c", "d", "e"}
+
+
+def create_client(backend: MemoryRateLimitBackend) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/items")
+    async def items():
+        return []
+
+    @app.post("/auth/register/owner")
+    async def register():
+        return {}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=backend,
+        requests=2,
+        window=60,
+        overrides={"/auth/register/owner": (1, 60)},
+        exempt_paths=["/health"],
+    )
+    return TestClient(app)
+
+
+def test_middleware_rejects_with_429_and_headers(clock):
+    client = create_client(MemoryRateLimitBackend())
+
+    first = client.get("/items")
+    assert first.status_code == 200
+    assert first.headers["X-RateLimit-Limit"] == "2"
+    assert first.headers["X-RateLimit-Remaining"] == "1"
+    client.get("/items")
+
+    rejected = client.get("/items")
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "30"
+    assert rejected.headers["X-RateLimit-Limit"] == "2"
+    assert rejected.headers["X-RateLimit-Remaining"] == "0"
+    assert rejected.json()["detail"].startswith("Demasiadas solicitudes")
+
+
+def test_middleware_exempt_paths_and_overrides(clock):
+    client = create_client(MemoryRateLimitBackend())
+
+    for _ in range(5):
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert "X-RateLimit-Limit" not in response.headers
+
+    # Balde propio para la ruta con override: no consume del global
+    assert client.post("/auth/register/owner").status_code == 200
+    assert client.post("/auth/register/owner").status_code == 429
+    assert client.get("/items").status_code == 200
+    assert client.options("/items").status_code != 429
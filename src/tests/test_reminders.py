@@ -0,0 +1,113 @@
+"""
+Tests del escaneo de recordatorios (src/services/reminders.py)
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+
+from src.services import reminders
+from src.services.reminders import ReminderScheduler
+from src.tests.postgres import asyncpg, create_database, drop_database, requires_postgres
+
+pytestmark = pytest.mark.asyncio
+
+NOW = datetime(2030, 1, 7, 12, 0, tzinfo=timezone.utc)
+LEAD = timedelta(hours=24)
+
+
+class FakeAppointmentRepository:
+    def __init__(self):
+        self.windows = []
+        self.fail = False
+
+    async def enqueue_reminders(self, start: datetime, end: datetime, lead_seconds: int) -> int:
+        if self.fail:
+            raise RuntimeError("Supabase no responde")
+        self.windows.append((start, end, lead_seconds))
+        return 1
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    repo = FakeAppointmentRepository()
+    monkeypatch.setattr(reminders, "get_appointment_repository", lambda: repo)
+    return repo
+
+
+async def test_first_scan_covers_whole_lead_window(repo):
+    scheduler = ReminderScheduler(lead_hours=24, scan_interval=60)
+    await scheduler.scan(NOW)
+    # Después de una caída no se pierden los turnos que entraron en la ventana
+    assert repo.windows == [(NOW, NOW + LEAD, 86400)]
+
+
+async def test_next_scans_continue_from_last_window(repo):
+    scheduler = ReminderScheduler(lead_hours=24, scan_interval=60)
+    await scheduler.scan(NOW)
+    await scheduler.scan(NOW + timedelta(seconds=60))
+    await scheduler.scan(NOW + timedelta(seconds=60))  # nada nuevo
+
+    assert repo.windows[1] == (NOW + LEAD, NOW + LEAD + timedelta(seconds=60), 86400)
+    assert len(repo.windows) == 2
+
+
+async def test_failed_scan_does_not_advance(repo):
+    scheduler = ReminderScheduler(lead_hours=24, scan_interval=60)
+    await scheduler.scan(NOW)
+    repo.fail = True
+    with pytest.raises(RuntimeError):
+        await scheduler.scan(NOW + timedelta(seconds=60))
+    repo.fail = False
+    await scheduler.scan(NOW + timedelta(seconds=600))
+
+    assert repo.windows[-1] == (NOW + LEAD, NOW + LEAD + timedelta(seconds=600), 86400)
+
+
+# --- Función enqueue_appointment_reminders contra Postgres ---
+
+SCHEMAS = ("tables_schema.sql", "user_profiles_schema.sql", "jobs_schema.sql")
+
+
+@pytest_asyncio.fixture
+async def conn():
+    url = await create_database(*SCHEMAS)
+    conn = await asyncpg.connect(url)
+    try:
+        yield conn
+    finally:
+        await conn.close()
+        await drop_database(url)
+
+
+@requires_postgres
+async def test_enqueue_reminders_skips_short_notice_and_duplicates(conn):
+    business = await conn.fetchval("INSERT INTO businesses (name, address) VALUES ('R', 'Test') RETURNING id")
+    service = await conn.fetchval(
+        "INSERT INTO services (business_id, name, price, duration_minutes) VALUES ($1, 'Corte', 1000, 60) "
+        "RETURNING id",
+        business,
+    )
+    employee = await conn.fetchval("INSERT INTO employees (business_id, name) VALUES ($1, 'E') RETURNING id", business)
+    now = await conn.fetchval("SELECT now()")
+
+    async def appointment(starts_in: timedelta, booked_ago: timedelta):
+        return await conn.fetchval(
+            "INSERT INTO appointments (business_id, customer_id, employee_id, service_id, start_datetime, "
+            "end_datetime, created_at) VALUES ($1, $2, $3, $4, $5, $6, $7) RETURNING id",
+            business, uuid.uuid4(), employee, service, now + starts_in, now + starts_in + timedelta(hours=1),
+            now - booked_ago,
+        )
+
+    # Reservado hace días; su recordatorio venció durante una caída
+    overdue = await appointment(timedelta(hours=2), timedelta(days=3))
+    # Reservado hace una hora para dentro de tres: solo la confirmación
+    await appointment(timedelta(hours=3), timedelta(hours=1))
+
+    enqueue = "SELECT enqueue_appointment_reminders($1, $2, $3)"
+    assert await conn.fetchval(enqueue, now, now + LEAD, int(LEAD.total_seconds())) == 1
+    assert await conn.fetchval(enqueue, now, now + LEAD, int(LEAD.total_seconds())) == 0
+    assert await conn.fetchval(
+        "SELECT payload->>'appointment_id' FROM jobs WHERE kind = 'appointment_reminder'"
+    ) == str(overdue)
@@ -0,0 +1,132 @@
+"""
+Tests del motor de sagas (src/services/saga.py): compensación ante fallas y cancelación
+"""
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from src.services.saga import Saga, SagaError, SagaStep
+
+pytestmark = pytest.mark.asyncio
+
+
+class Recorder:
+    """Pasos de prueba que anotan acciones y compensaciones en `log`"""
+
+    def __init__(self):
+        self.log: List[str] = []
+        self.started: Dict[str, asyncio.Event] = {}
+        self.release = asyncio.Event()
+
+    def step(self, name: str, depends_on=(), fail: bool = False, block: bool = False,
+             compensation_fails: bool = False) -> SagaStep:
+        started = self.started.setdefault(name, asyncio.Event())
+
+        async def action(state: Dict[str, Any]) -> str:
+            started.set()
+            if block:
+                try:
+                    await self.release.wait()
+                except asyncio.CancelledError:
+                    self.log.append(f"cancelled {name}")
+                    raise
+            if fail:
+                raise RuntimeError(f"{name} falló")
+            self.log.append(f"do {name}")
+            return f"{name}-result"
+
+        async def compensate(state: Dict[str, Any], result: Any) -> None:
+            await asyncio.sleep(0)  # cede el control como una llamada real
+            assert result == f"{name}-result"
+            if compensation_fails:
+                raise RuntimeError(f"undo {name} falló")
+            self.log.append(f"undo {name}")
+
+        return SagaStep(name, action, compensate, depends_on)
+
+
+async def test_steps_run_by_waves():
+    r = Recorder()
+    saga = Saga("ok", [r.step("a"), r.step("b", ["a"]), r.step("c", ["a"])])
+    result = await saga.run({})
+
+    assert result["b"] == "b-result"
+    assert r.log[0] == "do a"
+    assert sorted(r.log[1:]) == ["do b", "do c"]
+
+
+async def test_failure_compensates_completed_steps_in_reverse():
+    r = Recorder()
+    saga = Saga("fail", [
+        r.step("a"),
+        r.step("b", ["a"]),
+        r.step("c", ["a"], fail=True),
+        r.step("d", ["b", "c"]),
+    ])
+    with pytest.raises(SagaError) as error:
+        await saga.run({})
+
+    assert error.value.failed_step == "c"
+    assert error.value.compensated
+    # b terminó en la misma oleada que falló c: también se compensa
+    assert r.log[-2:] == ["undo b", "undo a"]
+    assert "do d" not in r.log
+
+
+async def test_compensation_errors_are_reported():
+    r = Recorder()
+    saga = Saga("fail", [r.step("a", compensation_fails=True), r.step("b"), r.step("c", ["a", "b"], fail=True)])
+    with pytest.raises(SagaError) as error:
+        await saga.run({})
+
+    assert not error.value.compensated
+    assert [name for name, _ in error.value.compensation_errors] == ["a"]
+    assert "undo b" in r.log
+
+
+async def test_cancellation_compensates_and_propagates():
+    r = Recorder()
+    saga = Saga("cancel", [
+        r.step("a"),
+        r.step("b", ["a"]),
+        r.step("c", ["a"], block=True),
+        r.step("d", ["c"]),
+    ])
+    task = asyncio.create_task(saga.run({}))
+    await r.started["c"].wait()
+    await asyncio.sleep(0)  # b termina mientras c sigue en curso
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert "cancelled c" in r.log
+    assert r.log[-2:] == ["undo b", "undo a"]
+    assert "do d" not in r.log
+
+
+async def test_compensation_finishes_even_if_cancelled_again():
+    r = Recorder()
+    compensating = asyncio.Event()
+    finish = asyncio.Event()
+
+    async def slow_undo(state, result):
+        compensating.set()
+        await finish.wait()
+        r.log.append("undo a")
+
+    a = r.step("a")
+    a.compensate = slow_undo
+    saga = Saga("cancel", [a, r.step("b", ["a"], block=True)])
+    task = asyncio.create_task(saga.run({}))
+    await r.started["b"].wait()
+    task.cancel()
+    await compensating.wait()
+    task.cancel()  # segunda cancelación mientras compensa
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    finish.set()
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert r.log[-1] == "undo a"
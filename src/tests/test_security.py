@@ -0,0 +1,151 @@
+"""
+Tests de la verificación local de tokens (src/core/security.py) y de la
+vuelta a Supabase Auth cuando no hay clave local para el token
+"""
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from fastapi import HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.core import auth, security
+from src.core.security import NoLocalKeyError, SigningKeyCache, TokenVerificationError, TokenVerifier
+
+pytestmark = pytest.mark.asyncio
+
+ISSUER = "http://supabase.test/auth/v1"
+JWKS_URL = f"{ISSUER}/.well-known/jwks.json"
+SECRET = "x" * 32
+
+
+def claims(**overrides) -> dict:
+    now = int(time.time())
+    return {"sub": "user-1", "aud": "authenticated", "iss": ISSUER, "exp": now + 3600, "iat": now, **overrides}
+
+
+def public_jwk(private_key, kid: str, algorithm: str) -> dict:
+    key = json.loads(jwt.algorithms.get_default_algorithms()[algorithm].to_jwk(private_key.public_key()))
+    return {**key, "kid": kid, "alg": algorithm}
+
+
+RSA_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+EC_KEY = ec.generate_private_key(ec.SECP256R1())
+
+
+@pytest.fixture
+def jwks(monkeypatch):
+    """JWKS publicado por el Supabase falso; `requests` cuenta las descargas"""
+    published = {"keys": [], "requests": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert str(request.url) == JWKS_URL
+        published["requests"] += 1
+        return httpx.Response(200, json={"keys": published["keys"]})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        security.httpx, "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    return published
+
+
+def verifier(jwt_secret=None) -> TokenVerifier:
+    return TokenVerifier(SigningKeyCache(jwks_url=JWKS_URL, jwt_secret=jwt_secret), leeway=0)
+
+
+async def test_hs256_with_secret():
+    token = jwt.encode(claims(), SECRET, algorithm="HS256")
+    assert (await verifier(SECRET).verify(token))["sub"] == "user-1"
+
+    forged = jwt.encode(claims(), "y" * 32, algorithm="HS256")
+    with pytest.raises(TokenVerificationError):
+        await verifier(SECRET).verify(forged)
+
+
+async def test_hs256_without_secret_needs_remote_check(jwks):
+    jwks["keys"] = [public_jwk(RSA_KEY, "rsa-1", "RS256")]
+    v = verifier()
+    await v.key_cache.refresh()
+    assert v.can_verify_locally
+
+    token = jwt.encode(claims(), SECRET, algorithm="HS256")
+    with pytest.raises(NoLocalKeyError):
+        await v.verify(token)
+
+
+@pytest.mark.parametrize("private_key,algorithm", [(RSA_KEY, "RS256"), (EC_KEY, "ES256")])
+async def test_unknown_kid_refreshes_jwks(jwks, private_key, algorithm):
+    v = verifier()
+    await v.key_cache.refresh()  # JWKS vacío: la clave rotó después
+    jwks["keys"] = [public_jwk(private_key, "new", algorithm)]
+
+    token = jwt.encode(claims(), private_key, algorithm=algorithm, headers={"kid": "new"})
+    assert (await v.verify(token))["sub"] == "user-1"
+    assert jwks["requests"] == 2
+
+    # Un kid que tampoco está publicado no vuelve a descargar el JWKS enseguida
+    unknown = jwt.encode(claims(), private_key, algorithm=algorithm, headers={"kid": "other"})
+    with pytest.raises(TokenVerificationError, match="desconocida"):
+        await v.verify(unknown)
+    assert jwks["requests"] == 2
+
+
+async def test_expired_token():
+    token = jwt.encode(claims(exp=int(time.time()) - 5), SECRET, algorithm="HS256")
+    with pytest.raises(TokenVerificationError, match="expired"):
+        await verifier(SECRET).verify(token)
+
+
+@pytest.mark.parametrize("overrides", [{"aud": "anon"}, {"iss": "http://otro.test/auth/v1"}])
+async def test_audience_and_issuer_mismatch(overrides):
+    token = jwt.encode(claims(**overrides), SECRET, algorithm="HS256")
+    with pytest.raises(TokenVerificationError):
+        await verifier(SECRET).verify(token)
+
+
+class FakeAuthRepository:
+    def __init__(self, user=None):
+        self.user = user
+        self.calls = 0
+
+    async def get_user(self, token: str):
+        self.calls += 1
+        return self.user
+
+
+async def current_user(token: str, auth_repo: FakeAuthRepository):
+    request = Request({"type": "http", "headers": []})
+    return await auth.get_current_user(
+        request, HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), auth_repo
+    )
+
+
+async def test_hs256_falls_back_to_remote_when_only_jwks(jwks, monkeypatch):
+    jwks["keys"] = [public_jwk(RSA_KEY, "rsa-1", "RS256")]
+    v = verifier()
+    await v.key_cache.refresh()
+    monkeypatch.setattr(auth, "token_verifier", v)
+
+    user = SimpleNamespace(id="user-2", email="a@b.test", user_metadata={}, app_metadata={})
+    repo = FakeAuthRepository(user)
+    context = await current_user(jwt.encode(claims(sub="user-2"), SECRET, algorithm="HS256"), repo)
+    assert context.user_id == "user-2"
+    assert repo.calls == 1
+
+    # Supabase Auth rechaza el token: 401
+    with pytest.raises(HTTPException) as error:
+        await current_user(jwt.encode(claims(), SECRET, algorithm="HS256"), FakeAuthRepository(None))
+    assert error.value.status_code == 401
+
+    # Un token asimétrico inválido no pasa a la verificación remota
+    repo = FakeAuthRepository(user)
+    expired = jwt.encode(claims(exp=int(time.time()) - 5), RSA_KEY, algorithm="RS256", headers={"kid": "rsa-1"})
+    with pytest.raises(HTTPException):
+        await current_user(expired, repo)
+    assert repo.calls == 0
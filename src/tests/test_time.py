@@ -0,0 +1,83 @@
+"""
+Conversión en lote de src/utils/time.py en los días de cambio de horario
+Buenos Aires tuvo horario de verano hasta 2009, con cambios a medianoche (el
+día local empieza a la 01:00 o la medianoche se repite); Nueva York cambia a
+las 02:00.
+"""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from src.utils.time import day_window, get_timezone, local_dates, to_local
+
+US = 1e-6
+
+
+def ts(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+# (zona, instante UTC, hora local esperada)
+CASES = [
+    # Buenos Aires, 19/10/2008: 00:00 -03 pasa a 01:00 -02
+    ("America/Argentina/Buenos_Aires", "2008-10-19T02:59:59+00:00", "2008-10-18T23:59:59-03:00"),
+    ("America/Argentina/Buenos_Aires", "2008-10-19T03:00:00+00:00", "2008-10-19T01:00:00-02:00"),
+    # Buenos Aires, 15/03/2009: 00:00 -02 vuelve a 23:00 -03 del 14 (se repite la última hora)
+    ("America/Argentina/Buenos_Aires", "2009-03-15T01:59:59+00:00", "2009-03-14T23:59:59-02:00"),
+    ("America/Argentina/Buenos_Aires", "2009-03-15T02:00:00+00:00", "2009-03-14T23:00:00-03:00"),
+    ("America/Argentina/Buenos_Aires", "2009-03-15T03:00:00+00:00", "2009-03-15T00:00:00-03:00"),
+    # Nueva York, 08/03/2026: 02:00 EST pasa a 03:00 EDT
+    ("America/New_York", "2026-03-08T06:59:59+00:00", "2026-03-08T01:59:59-05:00"),
+    ("America/New_York", "2026-03-08T07:00:00+00:00", "2026-03-08T03:00:00-04:00"),
+    # Nueva York, 01/11/2026: 02:00 EDT vuelve a 01:00 EST (01:30 ocurre dos veces)
+    ("America/New_York", "2026-11-01T05:30:00+00:00", "2026-11-01T01:30:00-04:00"),
+    ("America/New_York", "2026-11-01T06:00:00+00:00", "2026-11-01T01:00:00-05:00"),
+    ("America/New_York", "2026-11-01T06:30:00+00:00", "2026-11-01T01:30:00-05:00"),
+    # Sin cambios de horario: siempre -03
+    ("America/Argentina/Buenos_Aires", "2026-10-04T03:00:00+00:00", "2026-10-04T00:00:00-03:00"),
+]
+
+
+@pytest.mark.parametrize("zone,utc,expected", CASES)
+def test_to_local_and_local_dates_at_transitions(zone, utc, expected):
+    tz = get_timezone(zone)
+    assert [d.isoformat() for d in to_local([ts(utc)], tz)] == [expected]
+    assert local_dates([ts(utc)], tz) == [date.fromisoformat(expected[:10])]
+
+
+@pytest.mark.parametrize("zone", ["America/Argentina/Buenos_Aires", "America/New_York"])
+def test_batch_matches_zoneinfo_around_transitions(zone):
+    """Lotes ordenados que cruzan el cambio (reusan el tramo) y el microsegundo previo a cada uno"""
+    tz = get_timezone(zone)
+    timestamps = []
+    for _, utc, _ in (case for case in CASES if case[0] == zone):
+        t = ts(utc)
+        timestamps += [t - 3600, t - US, t, t + US, t + 1800]
+    timestamps.sort()
+
+    expected = [datetime.fromtimestamp(t, tz) for t in timestamps]
+    assert [d.isoformat() for d in to_local(timestamps, tz)] == [d.isoformat() for d in expected]
+    assert local_dates(timestamps, tz) == [d.date() for d in expected]
+    # Los datetimes llevan offset fijo: el mismo instante
+    assert [d.timestamp() for d in to_local(timestamps, tz)] == pytest.approx(timestamps, abs=US)
+
+
+@pytest.mark.parametrize("zone,day,hours", [
+    ("America/Argentina/Buenos_Aires", date(2008, 10, 19), 23),
+    ("America/Argentina/Buenos_Aires", date(2009, 3, 14), 25),
+    ("America/New_York", date(2026, 3, 8), 23),
+    ("America/New_York", date(2026, 11, 1), 25),
+])
+def test_every_minute_of_transition_days(zone, day, hours):
+    tz = get_timezone(zone)
+    start, end = day_window(day, tz)
+    assert end - start == hours * 3600
+
+    minutes = [start + 60 * i for i in range(hours * 60)]
+    assert local_dates(minutes, tz) == [day] * len(minutes)
+    local = to_local(minutes, tz)
+    assert local[0].isoformat() == datetime.fromtimestamp(start, tz).isoformat()
+    assert [d.utcoffset() for d in local] == [datetime.fromtimestamp(t, tz).utcoffset() for t in minutes]
+    # El minuto siguiente al día ya es el día siguiente
+    assert local_dates([end], tz) == [day + timedelta(days=1)]
+    assert to_local([end], tz)[0].astimezone(timezone.utc).timestamp() == end
@@ -0,0 +1,28 @@
+"""
+Utilidades HTTP: ETags y GET condicional
+"""
+import hashlib
+from typing import Optional
+
+
+def strong_etag(body: bytes) -> str:
+    """ETag fuerte derivado del contenido exacto de la respuesta"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    ¿El header If-None-Match incluye `etag`? Para GET la comparación es débil
+    (RFC 9110): se ignora el prefijo W/ de los valores recibidos.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -0,0 +1,27 @@
+"""
+Utilidades de routing compartidas por middlewares y dependencies
+"""
+from typing import Optional
+
+from starlette.types import Scope
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """
+    Plantilla de la ruta que atendió el request (p. ej. /appointments/{id}),
+    o None si ninguna ruta coincidió. Según la versión de FastAPI la ruta puede
+    no incluir el prefijo del router: se completa con los segmentos de la URL.
+    """
+    route = scope.get("route")
+    if route is None:
+        return None
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if not template:
+        return None
+
+    path_segments = [s for s in scope["path"].split("/") if s]
+    template_segments = [s for s in template.split("/") if s]
+    extra = len(path_segments) - len(template_segments)
+    if extra <= 0 or ":path}" in template:
+        return template
+    return "/" + "/".join(path_segments[:extra] + template_segments)
@@ -0,0 +1,95 @@
+"""
+Serialización JSON rápida de respuestas
+Las rutas con response_model ya serializan con pydantic-core (FastAPI valida
+y hace dump_json directo a bytes). Este módulo cubre el resto:
+  - dumps: orjson (o json si no está instalado) con el mismo formato que
+    pydantic para datetimes, fechas y UUIDs
+  - FastJSONResponse: JSONResponse que renderiza con dumps, para las rutas que
+    devuelven dicts propios (evita jsonable_encoder)
+  - trusted_response: datos armados por el propio backend que ya tienen la
+    forma del schema; se serializan sin volver a validarlos. Con DEBUG se
+    validan igual contra el schema (TypeAdapter precompilado por tipo) para
+    detectar diferencias entre el armado y el schema.
+
+    return trusted_response({"business_id": business, "employees": [...]}, AvailabilityResponse)
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from src.core.config import settings
+
+
+def _default(value: Any) -> Any:
+    """Tipos que orjson / json no serializan por sí mismos"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+try:
+    import orjson
+
+    # Z para UTC, como pydantic; claves no str (p. ej. enteros) como jsonable_encoder
+    _OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def dumps(content: Any, sort_keys: bool = False) -> bytes:
+        """JSON compacto en UTF-8"""
+        option = _OPTIONS | orjson.OPT_SORT_KEYS if sort_keys else _OPTIONS
+        return orjson.dumps(content, default=_default, option=option)
+except ImportError:  # pragma: no cover - orjson es opcional
+    import json
+
+    def _json_default(value: Any) -> Any:
+        if isinstance(value, datetime):
+            text = value.isoformat()
+            return text[:-6] + "Z" if text.endswith("+00:00") else text
+        if isinstance(value, (date, time)):
+            return value.isoformat()
+        if isinstance(value, UUID):
+            return str(value)
+        return _default(value)
+
+    def dumps(content: Any, sort_keys: bool = False) -> bytes:
+        """JSON compacto en UTF-8"""
+        return json.dumps(
+            content, default=_json_default, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys
+        ).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serializada con dumps"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def type_adapter(schema: Any) -> TypeAdapter:
+    """TypeAdapter de un schema (o tipo como List[...]); se construye una vez por proceso"""
+    return TypeAdapter(schema)
+
+
+def trusted_response(
+    content: Any,
+    schema: Any = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> FastJSONResponse:
+    """
+    Respuesta con datos armados por el backend con la forma de `schema`: se
+    serializan sin validar (FastAPI no valida las Response que devuelve una
+    ruta). Con DEBUG se validan contra `schema` antes de responder.
+    """
+    if schema is not None and settings.debug:
+        type_adapter(schema).validate_python(content)
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
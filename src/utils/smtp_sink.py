@@ -0,0 +1,165 @@
+"""
+Servidor SMTP local que captura los emails en lugar de enviarlos
+Para desarrollo y pruebas: acepta cualquier remitente y destinatario,
+guarda cada mensaje en memoria (y opcionalmente como .eml) y no entrega nada.
+Sin dependencias (smtpd ya no está en la biblioteca estándar); no soporta
+STARTTLS ni AUTH.
+
+    python -m src.utils.smtp_sink [--host 127.0.0.1] [--port 1025] [--dir ./emails]
+
+con SMTP_HOST=127.0.0.1 SMTP_PORT=1025 SMTP_STARTTLS=false. Desde código:
+
+    async with SMTPSink(port=0) as sink:
+        ...  # sink.port es el puerto asignado
+        sink.messages[-1]["Subject"]
+"""
+import argparse
+import asyncio
+import logging
+import os
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_SIZE = 10 * 1024 * 1024
+
+
+class SMTPSink:
+    """Servidor SMTP mínimo (RFC 5321) que guarda los mensajes recibidos"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 1025, directory: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.directory = directory
+        self.messages: List[EmailMessage] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._received = asyncio.Condition()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._session, self.host, self.port)
+        # Con port=0 el sistema asigna uno libre
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "SMTPSink":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def wait_for(self, count: int, timeout: float = 5.0) -> List[EmailMessage]:
+        """Esperar a que haya al menos `count` mensajes recibidos"""
+        async with self._received:
+            await asyncio.wait_for(self._received.wait_for(lambda: len(self.messages) >= count), timeout)
+        return self.messages
+
+    async def _store(self, data: bytes, sender: str, recipients: List[str]) -> None:
+        message = message_from_bytes(data, policy=policy.default)
+        message["X-Sink-Mail-From"] = sender
+        message["X-Sink-Rcpt-To"] = ", ".join(recipients)
+        if self.directory:
+            path = os.path.join(self.directory, f"{len(self.messages) + 1:05d}.eml")
+            with open(path, "wb") as f:
+                f.write(message.as_bytes())
+        async with self._received:
+            self.messages.append(message)
+            self._received.notify_all()
+        logger.info("Email capturado: %s -> %s", message["Subject"], ", ".join(recipients))
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode())
+
+        sender: Optional[str] = None
+        recipients: List[str] = []
+        reply("220 iris-smtp-sink ESMTP")
+        try:
+            while True:
+                await writer.drain()
+                line = await reader.readline()
+                if not line:
+                    break
+                command, _, argument = line.decode("utf-8", "replace").strip().partition(" ")
+                command = command.upper()
+
+                if command == "EHLO":
+                    writer.write(f"250-iris-smtp-sink\r\n250-SIZE {MAX_MESSAGE_SIZE}\r\n250 8BITMIME\r\n".encode())
+                elif command == "HELO":
+                    reply("250 iris-smtp-sink")
+                elif command == "MAIL":
+                    sender, recipients = argument.partition(":")[2].split(" ")[0].strip("<>"), []
+                    reply("250 OK")
+                elif command == "RCPT":
+                    if sender is None:
+                        reply("503 MAIL primero")
+                        continue
+                    recipients.append(argument.partition(":")[2].split(" ")[0].strip("<>"))
+                    reply("250 OK")
+                elif command == "DATA":
+                    if not recipients:
+                        reply("503 RCPT primero")
+                        continue
+                    reply("354 Terminar con <CRLF>.<CRLF>")
+                    await writer.drain()
+                    lines = []
+                    while True:
+                        data_line = await reader.readline()
+                        if not data_line or data_line in (b".\r\n", b".\n"):
+                            break
+                        # Quitar el punto duplicado de las líneas que empiezan con "."
+                        lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                    await self._store(b"".join(lines), sender, recipients)
+                    sender, recipients = None, []
+                    reply("250 OK")
+                elif command == "RSET":
+                    sender, recipients = None, []
+                    reply("250 OK")
+                elif command == "NOOP":
+                    reply("250 OK")
+                elif command == "QUIT":
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else:
+                    reply("502 Comando no soportado")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def _serve(host: str, port: int, directory: Optional[str]) -> None:
+    sink = SMTPSink(host, port, directory)
+    await sink.start()
+    print(f"SMTP sink escuchando en {host}:{sink.port}" + (f" (guardando en {directory})" if directory else ""))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await sink.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor SMTP local que captura emails")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--dir", default=None, help="directorio donde guardar cada email como .eml")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        asyncio.run(_serve(args.host, args.port, args.dir))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
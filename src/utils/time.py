@@ -0,0 +1,191 @@
+"""
+Utilidades de zonas horarias: conversión en lote y ventanas de días locales
+Los timestamps se guardan en UTC y se muestran en la zona de cada negocio.
+Las zonas (zoneinfo) se crean una vez por nombre. Para convertir listas
+grandes de timestamps (los turnos libres de un mes) cada zona guarda, por
+año, los instantes exactos en que cambia su offset: dentro de un tramo con
+el mismo offset la conversión es aritmética, sin consultar las reglas de la
+zona por cada timestamp.
+
+    tz = get_timezone(business["timezone"])
+    starts = to_local(slot_timestamps, tz)
+    start, end = day_window(date(2026, 10, 4), tz)
+
+Los datetimes de to_local llevan un tzinfo de offset fijo: mismo isoformat()
+que con la zona, pensados para mostrar. Para sumar días u horas de reloj usar
+la zona (get_timezone).
+"""
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from src.core.config import settings
+
+SECOND = timedelta(seconds=1)
+DAY_SECONDS = 86400
+DAY_MICROSECONDS = DAY_SECONDS * 1_000_000
+# datetime redondea los timestamps al microsegundo: los tramos se corren medio microsegundo
+HALF_MICROSECOND = 5e-7
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=None)
+def _zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+def get_timezone(name: Optional[str] = None) -> ZoneInfo:
+    """Zona por nombre IANA (sin nombre, la de DEFAULT_TIMEZONE); una instancia por nombre"""
+    return _zone(name or settings.default_timezone)
+
+
+@lru_cache(maxsize=None)
+def _fixed(offset: int) -> timezone:
+    return timezone(timedelta(seconds=offset))
+
+
+def _offset(t: float, tz: tzinfo) -> int:
+    return datetime.fromtimestamp(t, tz).utcoffset() // SECOND
+
+
+class OffsetTable:
+    """
+    Tramos de offset UTC constante de una zona, calculados por año al usarlos.
+    Cada año es (inicios, offsets): inicios[i] <= t < inicios[i + 1] tiene
+    offsets[i]; el último inicio es el comienzo del año siguiente.
+    """
+
+    def __init__(self, tz: tzinfo):
+        self.tz = tz
+        self._years: Dict[int, Tuple[List[float], List[int]]] = {}
+
+    def _build(self, year: int) -> Tuple[List[float], List[int]]:
+        t = datetime(year, 1, 1, tzinfo=timezone.utc).timestamp()
+        end = datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp()
+        current = _offset(t, self.tz)
+        starts, offsets = [t], [current]
+        # Un muestreo diario encuentra cada cambio; la bisección da el segundo exacto
+        while t < end:
+            following = min(t + DAY_SECONDS, end)
+            offset = _offset(following, self.tz)
+            if offset != current:
+                low, high = t, following
+                while high - low > 1:
+                    middle = (low + high) // 2
+                    if _offset(middle, self.tz) == current:
+                        low = middle
+                    else:
+                        high = middle
+                starts.append(high)
+                offsets.append(offset)
+                current = offset
+            t = following
+        starts.append(end)
+        self._years[year] = (starts, offsets)
+        return starts, offsets
+
+    def segment(self, t: float) -> Tuple[float, float, int]:
+        """Tramo [desde, hasta) que contiene a `t` y su offset en segundos"""
+        t += HALF_MICROSECOND
+        year = datetime.fromtimestamp(t, timezone.utc).year
+        starts, offsets = self._year(year)
+        # fromtimestamp redondea al microsegundo: cerca del borde puede dar el año vecino
+        if t < starts[0]:
+            starts, offsets = self._year(year - 1)
+        elif t >= starts[-1]:
+            starts, offsets = self._year(year + 1)
+        i = bisect_right(starts, t) - 1
+        return starts[i] - HALF_MICROSECOND, starts[i + 1] - HALF_MICROSECOND, offsets[i]
+
+    def _year(self, year: int) -> Tuple[List[float], List[int]]:
+        return self._years.get(year) or self._build(year)
+
+
+@lru_cache(maxsize=None)
+def offset_table(tz: tzinfo) -> OffsetTable:
+    """Tabla de offsets de una zona (una por zona y proceso)"""
+    return OffsetTable(tz)
+
+
+def _segments(timestamps: Iterable[float], tz: tzinfo) -> Iterable[Tuple[float, int]]:
+    """(timestamp, offset) de cada timestamp; ordenados, solo se busca al cambiar de tramo"""
+    table = offset_table(tz)
+    low = high = 0.0
+    offset = 0
+    for t in timestamps:
+        if not low <= t < high:
+            low, high, offset = table.segment(t)
+        yield t, offset
+
+
+def utc_offsets(timestamps: Iterable[float], tz: tzinfo) -> List[int]:
+    """Offset UTC en segundos de cada timestamp en la zona"""
+    return [offset for _, offset in _segments(timestamps, tz)]
+
+
+def to_local(timestamps: Iterable[float], tz: tzinfo) -> List[datetime]:
+    """Datetimes locales (offset fijo, ver arriba) de una lista de timestamps UTC"""
+    table = offset_table(tz)
+    fromtimestamp = datetime.fromtimestamp
+    result: List[datetime] = []
+    append = result.append
+    low = high = 0.0
+    local: tzinfo = timezone.utc
+    for t in timestamps:
+        if not low <= t < high:
+            low, high, offset = table.segment(t)
+            local = _fixed(offset)
+        append(fromtimestamp(t, local))
+    return result
+
+
+def local_dates(timestamps: Iterable[float], tz: tzinfo) -> List[date]:
+    """Fecha local de cada timestamp, sin construir datetimes"""
+    fromordinal = date.fromordinal
+    return [
+        fromordinal(EPOCH_ORDINAL + (round(t * 1_000_000) + offset * 1_000_000) // DAY_MICROSECONDS)
+        for t, offset in _segments(timestamps, tz)
+    ]
+
+
+def day_start(day: date, tz: tzinfo) -> float:
+    """
+    Primer instante del día local. Si la medianoche no existe (el reloj salta
+    de 00:00 a 01:00) es el momento del salto; si se repite, la segunda.
+    """
+    candidates = sorted(
+        datetime.combine(day, time.min, tzinfo=tz).replace(fold=fold).timestamp() for fold in (0, 1)
+    )
+    for t in candidates:
+        if datetime.fromtimestamp(t, tz).date() == day:
+            return t
+    return candidates[-1]
+
+
+def day_window(day: date, tz: tzinfo) -> Tuple[float, float]:
+    """Instantes UTC [inicio, fin) del día local (23, 24 o 25 horas con cambios de horario)"""
+    return day_start(day, tz), day_start(day + timedelta(days=1), tz)
+
+
+def day_windows(days: Sequence[date], tz: tzinfo) -> List[Tuple[float, float]]:
+    """day_window de cada día; los días consecutivos comparten el límite"""
+    starts: Dict[date, float] = {}
+    result = []
+    for day in days:
+        following = day + timedelta(days=1)
+        if day not in starts:
+            starts[day] = day_start(day, tz)
+        if following not in starts:
+            starts[following] = day_start(following, tz)
+        result.append((starts[day], starts[following]))
+    return result
+
+
+def utc_window(date_from: date, date_to: date, tz: tzinfo) -> Tuple[datetime, datetime]:
+    """Rango UTC [inicio de date_from, fin de date_to) de días locales, para consultas"""
+    return (
+        datetime.fromtimestamp(day_start(date_from, tz), timezone.utc),
+        datetime.fromtimestamp(day_start(date_to + timedelta(days=1), tz), timezone.utc),
+    )